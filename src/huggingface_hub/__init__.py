@@ -52,9 +52,19 @@ __version__ = "0.29.0.dev0"
 # WARNING: any comment added in this dictionary definition will be lost when
 # re-generating the file !
 _SUBMOD_ATTRS = {
+    "_async_download": [
+        "ahf_hub_download",
+        "asnapshot_download",
+    ],
+    "_async_hf_file_system": [
+        "AsyncHfFileSystem",
+    ],
     "_commit_scheduler": [
         "CommitScheduler",
     ],
+    "_download_range": [
+        "hf_hub_download_range",
+    ],
     "_inference_endpoints": [
         "InferenceEndpoint",
         "InferenceEndpointError",
@@ -70,6 +80,13 @@ _SUBMOD_ATTRS = {
         "logout",
         "notebook_login",
     ],
+    "_read_bytes": [
+        "hf_hub_read_bytes",
+    ],
+    "_remote_safetensors": [
+        "RemoteSafetensorsFile",
+        "RemoteSafetensorsSlice",
+    ],
     "_snapshot_download": [
         "snapshot_download",
     ],
@@ -183,6 +200,7 @@ _SUBMOD_ATTRS = {
         "delete_tag",
         "delete_webhook",
         "disable_webhook",
+        "download_safetensors_tensors",
         "duplicate_space",
         "edit_discussion_comment",
         "enable_webhook",
@@ -507,6 +525,7 @@ _SUBMOD_ATTRS = {
 # ```
 
 __all__ = [
+    "AsyncHfFileSystem",
     "AsyncInferenceClient",
     "AudioClassificationInput",
     "AudioClassificationOutputElement",
@@ -649,6 +668,8 @@ __all__ = [
     "REPO_TYPE_DATASET",
     "REPO_TYPE_MODEL",
     "REPO_TYPE_SPACE",
+    "RemoteSafetensorsFile",
+    "RemoteSafetensorsSlice",
     "RepoCard",
     "RepoUrl",
     "Repository",
@@ -756,6 +777,8 @@ __all__ = [
     "add_collection_item",
     "add_space_secret",
     "add_space_variable",
+    "ahf_hub_download",
+    "asnapshot_download",
     "auth_check",
     "auth_list",
     "auth_switch",
@@ -787,6 +810,7 @@ __all__ = [
     "delete_tag",
     "delete_webhook",
     "disable_webhook",
+    "download_safetensors_tensors",
     "dump_environment_info",
     "duplicate_space",
     "edit_discussion_comment",
@@ -818,6 +842,8 @@ __all__ = [
     "get_webhook",
     "grant_access",
     "hf_hub_download",
+    "hf_hub_download_range",
+    "hf_hub_read_bytes",
     "hf_hub_url",
     "interpreter_login",
     "list_accepted_access_requests",
@@ -1000,7 +1026,13 @@ if os.environ.get("EAGER_IMPORT", ""):
 # make style
 # ```
 if TYPE_CHECKING:  # pragma: no cover
+    from ._async_download import (
+        ahf_hub_download,  # noqa: F401
+        asnapshot_download,  # noqa: F401
+    )
+    from ._async_hf_file_system import AsyncHfFileSystem  # noqa: F401
     from ._commit_scheduler import CommitScheduler  # noqa: F401
+    from ._download_range import hf_hub_download_range  # noqa: F401
     from ._inference_endpoints import (
         InferenceEndpoint,  # noqa: F401
         InferenceEndpointError,  # noqa: F401
@@ -1016,6 +1048,11 @@ if TYPE_CHECKING:  # pragma: no cover
         logout,  # noqa: F401
         notebook_login,  # noqa: F401
     )
+    from ._read_bytes import hf_hub_read_bytes  # noqa: F401
+    from ._remote_safetensors import (
+        RemoteSafetensorsFile,  # noqa: F401
+        RemoteSafetensorsSlice,  # noqa: F401
+    )
     from ._snapshot_download import snapshot_download  # noqa: F401
     from ._space_api import (
         SpaceHardware,  # noqa: F401
@@ -1125,6 +1162,7 @@ if TYPE_CHECKING:  # pragma: no cover
         delete_tag,  # noqa: F401
         delete_webhook,  # noqa: F401
         disable_webhook,  # noqa: F401
+        download_safetensors_tensors,  # noqa: F401
         duplicate_space,  # noqa: F401
         edit_discussion_comment,  # noqa: F401
         enable_webhook,  # noqa: F401
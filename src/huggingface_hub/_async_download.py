@@ -0,0 +1,880 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains asynchronous counterparts of `hf_hub_download` and `snapshot_download`, built on `aiohttp`.
+
+Files are downloaded to the same cache as the synchronous methods and the cache layout, locking and metadata logic are
+shared with them. All downloads run on the event loop: many files can be downloaded concurrently through a single
+`aiohttp.ClientSession` (and therefore a single bounded connection pool).
+"""
+
+import asyncio
+import functools
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import constants
+from ._bandwidth import athrottle
+from ._download_parts import DownloadParts, get_parts_path
+from ._snapshot_download import _prepare_snapshot_download, _resolve_snapshot, _write_snapshot_manifest
+from .file_download import (
+    HfFileMetadata,
+    _add_to_global_blob_store,
+    _cache_commit_hash_for_specific_revision,
+    _check_disk_space,
+    _check_etag_hash,
+    _chmod_and_move,
+    _copy_from_read_only_cache,
+    _create_symlink,
+    _get_cached_pointer_path_after_head_call_error,
+    _get_cached_pointer_path_before_head_call,
+    _get_download_parts,
+    _get_from_read_only_cache,
+    _get_global_blob_path,
+    _get_metadata_or_catch_error,
+    _get_parts_save_interval,
+    _get_pointer_path,
+    _get_read_only_storage_folders,
+    _get_relative_filename,
+    _get_resumed_hasher,
+    _int_or_none,
+    _link_or_copy,
+    _normalize_etag,
+    _raise_on_head_call_error,
+    _range_headers,
+    _update_hasher_from_file,
+    hf_hub_url,
+    repo_folder_name,
+)
+from .utils import (
+    AsyncWeakFileLock,
+    OfflineModeIsEnabled,
+    build_hf_headers,
+    hf_raise_for_status,
+    is_aiohttp_available,
+    logging,
+    validate_hf_hub_args,
+)
+from .utils import tqdm as hf_tqdm
+from .utils._http import _adjust_range_header
+from .utils.tqdm import is_tqdm_disabled
+
+
+if TYPE_CHECKING:
+    from aiohttp import ClientResponse, ClientSession
+
+
+logger = logging.get_logger(__name__)
+
+
+@validate_hf_hub_args
+async def ahf_hub_download(
+    repo_id: str,
+    filename: str,
+    *,
+    subfolder: Optional[str] = None,
+    repo_type: Optional[str] = None,
+    revision: Optional[str] = None,
+    library_name: Optional[str] = None,
+    library_version: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+    user_agent: Union[Dict, str, None] = None,
+    force_download: bool = False,
+    etag_timeout: float = constants.DEFAULT_ETAG_TIMEOUT,
+    token: Union[bool, str, None] = None,
+    local_files_only: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+    endpoint: Optional[str] = None,
+    verify: bool = False,
+    session: Optional["ClientSession"] = None,
+    _file_metadata: Optional[HfFileMetadata] = None,
+) -> str:
+    """Asynchronous version of [`hf_hub_download`], built on `aiohttp`.
+
+    The file is downloaded to the cache (downloading to a `local_dir` is not supported). Behavior is the same as
+    [`hf_hub_download`]: same cache layout, same locks (concurrent downloads of the same file wait for each other,
+    across coroutines and processes) and same handling of network errors. Proxies are read from the environment.
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        filename (`str`):
+            The name of the file in the repo.
+        subfolder (`str`, *optional*):
+            An optional value corresponding to a folder inside the model repo.
+        repo_type (`str`, *optional*):
+            Set to `"dataset"` or `"space"` if downloading from a dataset or space, `None` or `"model"` if downloading
+            from a model. Default is `None`.
+        revision (`str`, *optional*):
+            An optional Git revision id which can be a branch name, a tag, or a commit hash.
+        library_name (`str`, *optional*):
+            The name of the library to which the object corresponds.
+        library_version (`str`, *optional*):
+            The version of the library.
+        cache_dir (`str`, `Path`, *optional*):
+            Path to the folder where cached files are stored.
+        user_agent (`dict`, `str`, *optional*):
+            The user-agent info in the form of a dictionary or a string.
+        force_download (`bool`, *optional*, defaults to `False`):
+            Whether the file should be downloaded even if it already exists in the local cache.
+        etag_timeout (`float`, *optional*, defaults to `10`):
+            When fetching ETag, how many seconds to wait for the server to send data before giving up.
+        token (`str`, `bool`, *optional*):
+            A token to be used for the download.
+                - If `True`, the token is read from the HuggingFace config folder.
+                - If a string, it's used as the authentication token.
+        local_files_only (`bool`, *optional*, defaults to `False`):
+            If `True`, avoid downloading the file and return the path to the local cached file if it exists.
+        headers (`dict`, *optional*):
+            Additional headers to be sent with the request.
+        endpoint (`str`, *optional*):
+            Endpoint of the Hub. Defaults to <https://huggingface.co>.
+        verify (`bool`, *optional*, defaults to `False`):
+            If `True`, the content of the file is checked against its ETag. See [`hf_hub_download`].
+        session (`aiohttp.ClientSession`, *optional*):
+            Session used to make the requests. Pass the same session to concurrent calls to share a single connection
+            pool. If not provided, a new session is created and closed for this call.
+
+    Returns:
+        `str`: Local path of file or if networking is off, last version of file cached on disk.
+
+    Raises:
+        Same errors as [`hf_hub_download`].
+
+    Example:
+    ```py
+    >>> import asyncio
+    >>> from huggingface_hub import ahf_hub_download
+    >>> asyncio.run(ahf_hub_download("openai-community/gpt2", "config.json"))
+    '/home/user/.cache/huggingface/hub/models--openai-community--gpt2/snapshots/607a30d.../config.json'
+    ```
+    """
+    if constants.HF_HUB_ETAG_TIMEOUT != constants.DEFAULT_ETAG_TIMEOUT:
+        # Respect environment variable above user value
+        etag_timeout = constants.HF_HUB_ETAG_TIMEOUT
+
+    if cache_dir is None:
+        cache_dir = constants.HF_HUB_CACHE
+    if revision is None:
+        revision = constants.DEFAULT_REVISION
+    if isinstance(cache_dir, Path):
+        cache_dir = str(cache_dir)
+
+    if subfolder == "":
+        subfolder = None
+    if subfolder is not None:
+        # This is used to create a URL, and not a local path, hence the forward slash.
+        filename = f"{subfolder}/{filename}"
+
+    if repo_type is None:
+        repo_type = "model"
+    if repo_type not in constants.REPO_TYPES:
+        raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(constants.REPO_TYPES)}")
+
+    hf_headers = build_hf_headers(
+        token=token,
+        library_name=library_name,
+        library_version=library_version,
+        user_agent=user_agent,
+        headers=headers,
+    )
+
+    download = functools.partial(
+        _ahf_hub_download_to_cache_dir,
+        cache_dir=cache_dir,
+        repo_id=repo_id,
+        filename=filename,
+        repo_type=repo_type,
+        revision=revision,
+        endpoint=endpoint,
+        etag_timeout=etag_timeout,
+        headers=hf_headers,
+        token=token,
+        local_files_only=local_files_only,
+        force_download=force_download,
+        verify=verify,
+        file_metadata=_file_metadata,
+    )
+    if session is not None:
+        return await download(session=session)
+    async with _get_client_session() as new_session:
+        return await download(session=new_session)
+
+
+@validate_hf_hub_args
+async def asnapshot_download(
+    repo_id: str,
+    *,
+    repo_type: Optional[str] = None,
+    revision: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+    library_name: Optional[str] = None,
+    library_version: Optional[str] = None,
+    user_agent: Optional[Union[Dict, str]] = None,
+    etag_timeout: float = constants.DEFAULT_ETAG_TIMEOUT,
+    force_download: bool = False,
+    token: Optional[Union[bool, str]] = None,
+    local_files_only: bool = False,
+    allow_patterns: Optional[Union[List[str], str]] = None,
+    ignore_patterns: Optional[Union[List[str], str]] = None,
+    max_connections: int = 64,
+    tqdm_class: Optional[Any] = None,
+    headers: Optional[Dict[str, str]] = None,
+    endpoint: Optional[str] = None,
+    verify: bool = False,
+    session: Optional["ClientSession"] = None,
+) -> str:
+    """Asynchronous version of [`snapshot_download`], built on `aiohttp`.
+
+    The repo is resolved exactly as in [`snapshot_download`] (in a thread, as it relies on [`HfApi`]). Files are then
+    downloaded to the cache concurrently on the event loop, largest first, through a single connection pool.
+    Downloading to a `local_dir` is not supported.
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        max_connections (`int`, *optional*, defaults to 64):
+            Maximum number of files downloaded at the same time (i.e. size of the connection pool). Ignored if
+            `session` is provided.
+        session (`aiohttp.ClientSession`, *optional*):
+            Session used to make the requests. If not provided, a new session is created and closed for this call.
+
+        See [`snapshot_download`] for the other arguments.
+
+    Returns:
+        `str`: folder path of the repo snapshot.
+
+    Raises:
+        Same errors as [`snapshot_download`].
+
+    Example:
+    ```py
+    >>> import asyncio
+    >>> from huggingface_hub import asnapshot_download
+    >>> asyncio.run(asnapshot_download("openai-community/gpt2", allow_patterns="*.json"))
+    '/home/user/.cache/huggingface/hub/models--openai-community--gpt2/snapshots/607a30d...'
+    ```
+    """
+    loop = asyncio.get_running_loop()
+    resolved = await loop.run_in_executor(
+        None,
+        functools.partial(
+            _resolve_snapshot,
+            repo_id=repo_id,
+            repo_type=repo_type,
+            revision=revision,
+            cache_dir=cache_dir,
+            local_dir=None,
+            library_name=library_name,
+            library_version=library_version,
+            user_agent=user_agent,
+            endpoint=endpoint,
+            headers=headers,
+            token=token,
+            local_files_only=local_files_only,
+            force_download=force_download,
+            allow_patterns=allow_patterns,
+            ignore_patterns=ignore_patterns,
+        ),
+    )
+    if isinstance(resolved, str):
+        # Repo cannot be reached but files are on disk
+        return resolved
+    to_download = resolved
+
+    # Link the blobs already cached and check disk space as in `snapshot_download` (in a thread, as it hits the disk)
+    sizes_to_download = await loop.run_in_executor(
+        None,
+        functools.partial(_prepare_snapshot_download, to_download, local_dir=None, force_download=force_download),
+    )
+
+    # Largest files first (semaphore waiters are woken up in order)
+    filenames = sorted(sizes_to_download, key=lambda filename: sizes_to_download[filename], reverse=True)
+    semaphore = asyncio.Semaphore(max_connections)
+
+    async def _inner_download(filename: str, session: "ClientSession") -> None:
+        async with semaphore:
+            await ahf_hub_download(
+                repo_id,
+                filename,
+                repo_type=repo_type,
+                revision=to_download.commit_hash,
+                cache_dir=cache_dir,
+                library_name=library_name,
+                library_version=library_version,
+                user_agent=user_agent,
+                force_download=force_download,
+                etag_timeout=etag_timeout,
+                token=token,
+                headers=headers,
+                endpoint=endpoint,
+                verify=verify,
+                session=session,
+                _file_metadata=to_download.files_metadata.get(filename),
+            )
+        progress.update(1)
+
+    async def _download_all(session: "ClientSession") -> None:
+        tasks = [asyncio.ensure_future(_inner_download(filename, session)) for filename in filenames]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    # User can use its own tqdm class or the default one from `huggingface_hub.utils`
+    with (tqdm_class or hf_tqdm)(total=len(filenames), desc=f"Fetching {len(filenames)} files") as progress:
+        if session is not None:
+            await _download_all(session)
+        else:
+            async with _get_client_session(limit=max_connections) as new_session:
+                await _download_all(new_session)
+
+    await loop.run_in_executor(
+        None,
+        functools.partial(
+            _write_snapshot_manifest,
+            to_download,
+            allow_patterns=allow_patterns,
+            ignore_patterns=ignore_patterns,
+            force_download=force_download,
+        ),
+    )
+    return to_download.snapshot_folder
+
+
+async def _ahf_hub_download_to_cache_dir(
+    session: "ClientSession",
+    *,
+    # Destination
+    cache_dir: str,
+    # File info
+    repo_id: str,
+    filename: str,
+    repo_type: str,
+    revision: str,
+    # HTTP info
+    endpoint: Optional[str],
+    etag_timeout: float,
+    headers: Dict[str, str],
+    token: Optional[Union[bool, str]],
+    # Additional options
+    local_files_only: bool,
+    force_download: bool,
+    verify: bool = False,
+    file_metadata: Optional[HfFileMetadata] = None,
+) -> str:
+    """Download a given file to a cache folder, if not already present.
+
+    Asynchronous version of `_hf_hub_download_to_cache_dir`. Only the HTTP calls differ. Files are looked up in the
+    read-only cache layers (see `HF_HUB_CACHE` and `HF_HUB_CACHE_PROMOTE`) before being downloaded.
+    """
+    locks_dir = os.path.join(cache_dir, ".locks")
+    storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    read_only_storage_folders = _get_read_only_storage_folders(cache_dir, repo_id=repo_id, repo_type=repo_type)
+    promote = constants.HF_HUB_CACHE_PROMOTE
+    relative_filename = _get_relative_filename(filename)
+    loop = asyncio.get_running_loop()
+
+    # if file is already on disk for a commit hash or a recently resolved revision, shortcut everything.
+    if not force_download:
+        pointer_path = _get_cached_pointer_path_before_head_call(
+            storage_folder, repo_id=repo_id, filename=filename, relative_filename=relative_filename, revision=revision
+        )
+        if pointer_path is not None:
+            return pointer_path
+        for read_only_storage_folder in read_only_storage_folders:
+            pointer_path = _get_cached_pointer_path_before_head_call(
+                read_only_storage_folder,
+                repo_id=repo_id,
+                filename=filename,
+                relative_filename=relative_filename,
+                revision=revision,
+            )
+            if pointer_path is not None:
+                return await loop.run_in_executor(
+                    None, _get_from_read_only_cache, pointer_path, read_only_storage_folder, storage_folder, promote
+                )
+
+    # Make the HEAD call asynchronously. Errors are handled by `_get_metadata_or_catch_error` as for sync downloads.
+    head_call_error: Optional[Exception] = None
+    if file_metadata is None and not local_files_only:
+        url = hf_hub_url(repo_id, filename, repo_type=repo_type, revision=revision, endpoint=endpoint)
+        try:
+            file_metadata = await _aget_hf_file_metadata(session, url, headers=headers, timeout=etag_timeout)
+        except Exception as error:
+            head_call_error = error
+
+    (url_to_download, etag, commit_hash, expected_size, head_call_error) = _get_metadata_or_catch_error(
+        repo_id=repo_id,
+        filename=filename,
+        repo_type=repo_type,
+        revision=revision,
+        endpoint=endpoint,
+        proxies=None,
+        etag_timeout=etag_timeout,
+        headers=headers,
+        token=token,
+        local_files_only=local_files_only,
+        storage_folder=storage_folder,
+        relative_filename=relative_filename,
+        file_metadata=file_metadata,
+        head_call_error=head_call_error,
+    )
+
+    if head_call_error is not None:
+        # Couldn't make a HEAD call => let's try to find a local file
+        if not force_download:
+            pointer_path = _get_cached_pointer_path_after_head_call_error(storage_folder, relative_filename, revision)
+            if pointer_path is not None:
+                return pointer_path
+            for read_only_storage_folder in read_only_storage_folders:
+                pointer_path = _get_cached_pointer_path_after_head_call_error(
+                    read_only_storage_folder, relative_filename, revision
+                )
+                if pointer_path is not None:
+                    return await loop.run_in_executor(
+                        None,
+                        _get_from_read_only_cache,
+                        pointer_path,
+                        read_only_storage_folder,
+                        storage_folder,
+                        promote,
+                    )
+
+        # Otherwise, raise appropriate error
+        _raise_on_head_call_error(head_call_error, force_download, local_files_only)
+
+    # From now on, etag, commit_hash, url and size are not None.
+    assert etag is not None, "etag must have been retrieved from server"
+    assert commit_hash is not None, "commit_hash must have been retrieved from server"
+    assert url_to_download is not None, "file location must have been retrieved from server"
+    assert expected_size is not None, "expected_size must have been retrieved from server"
+    blob_path = os.path.join(storage_folder, "blobs", etag)
+    pointer_path = _get_pointer_path(storage_folder, commit_hash, relative_filename)
+
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    os.makedirs(os.path.dirname(pointer_path), exist_ok=True)
+    await loop.run_in_executor(None, _cache_commit_hash_for_specific_revision, storage_folder, revision, commit_hash)
+
+    # If file already exists, return it (except if force_download=True)
+    if not force_download:
+        if os.path.exists(pointer_path):
+            return pointer_path
+
+        if os.path.exists(blob_path):
+            # we have the blob already, but not the pointer
+            await loop.run_in_executor(
+                None, functools.partial(_create_symlink, blob_path, pointer_path, new_blob=False)
+            )
+            return pointer_path
+
+        if not promote:
+            # file is in a read-only cache layer => return it as is
+            for read_only_storage_folder in read_only_storage_folders:
+                read_only_pointer_path = _get_pointer_path(read_only_storage_folder, commit_hash, relative_filename)
+                if os.path.exists(read_only_pointer_path):
+                    return read_only_pointer_path
+
+    # Blob in a read-only cache layer (maybe for another commit) => copy it instead of downloading it
+    read_only_blob_path = None
+    if not force_download:
+        read_only_blob_path = next(
+            (
+                os.path.join(folder, "blobs", etag)
+                for folder in read_only_storage_folders
+                if os.path.isfile(os.path.join(folder, "blobs", etag))
+            ),
+            None,
+        )
+
+    # Prevent parallel downloads of the same file with a lock.
+    lock_path = os.path.join(locks_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type), f"{etag}.lock")
+
+    # Some Windows versions do not allow for paths longer than 255 characters.
+    # In this case, we must specify it as an extended path by using the "\\?\" prefix.
+    if os.name == "nt" and len(os.path.abspath(lock_path)) > 255:
+        lock_path = "\\\\?\\" + os.path.abspath(lock_path)
+
+    if os.name == "nt" and len(os.path.abspath(blob_path)) > 255:
+        blob_path = "\\\\?\\" + os.path.abspath(blob_path)
+
+    global_blob_path = _get_global_blob_path(cache_dir, etag)
+
+    Path(lock_path).parent.mkdir(parents=True, exist_ok=True)
+    async with AsyncWeakFileLock(lock_path):
+        if global_blob_path is not None and not force_download and os.path.isfile(global_blob_path):
+            # Blob already downloaded for another repo => no need to download it again
+            logger.info(f"Blob '{etag}' found in global blob store. Linking it to {blob_path}")
+            await loop.run_in_executor(None, _link_or_copy, global_blob_path, blob_path)
+        elif read_only_blob_path is not None:
+            logger.info(f"Blob '{etag}' found in read-only cache. Copying it to {blob_path}")
+            await loop.run_in_executor(None, _copy_from_read_only_cache, read_only_blob_path, blob_path)
+        else:
+            await _adownload_to_tmp_and_move(
+                session,
+                incomplete_path=Path(blob_path + ".incomplete"),
+                destination_path=Path(blob_path),
+                url_to_download=url_to_download,
+                headers=headers,
+                expected_size=expected_size,
+                filename=filename,
+                force_download=force_download,
+                verify_etag=etag if verify else None,
+            )
+            if global_blob_path is not None:
+                await loop.run_in_executor(None, _add_to_global_blob_store, blob_path, global_blob_path)
+        if not os.path.exists(pointer_path):
+            await loop.run_in_executor(
+                None, functools.partial(_create_symlink, blob_path, pointer_path, new_blob=True)
+            )
+
+    return pointer_path
+
+
+async def _aget_hf_file_metadata(
+    session: "ClientSession", url: str, *, headers: Dict[str, str], timeout: Optional[float]
+) -> HfFileMetadata:
+    """Asynchronous version of [`get_hf_file_metadata`]. `headers` must already contain the auth headers."""
+    response = await _arequest(
+        session,
+        "HEAD",
+        url,
+        headers={**headers, "Accept-Encoding": "identity"},  # we want to know the real size of the file
+        timeout=timeout,
+        allow_redirects=False,
+        follow_relative_redirects=True,
+    )
+    response.release()
+    return HfFileMetadata(
+        commit_hash=response.headers.get(constants.HUGGINGFACE_HEADER_X_REPO_COMMIT),
+        # We favor a custom header indicating the etag of the linked resource, and
+        # we fallback to the regular etag header.
+        etag=_normalize_etag(
+            response.headers.get(constants.HUGGINGFACE_HEADER_X_LINKED_ETAG) or response.headers.get("ETag")
+        ),
+        # Either from response headers (if redirected) or defaults to request url
+        location=response.headers.get("Location") or str(response.url),
+        size=_int_or_none(
+            response.headers.get(constants.HUGGINGFACE_HEADER_X_LINKED_SIZE) or response.headers.get("Content-Length")
+        ),
+    )
+
+
+async def _adownload_to_tmp_and_move(
+    session: "ClientSession",
+    *,
+    incomplete_path: Path,
+    destination_path: Path,
+    url_to_download: str,
+    headers: Dict[str, str],
+    expected_size: Optional[int],
+    filename: str,
+    force_download: bool,
+    verify_etag: Optional[str] = None,
+) -> None:
+    """Asynchronous version of `_download_to_tmp_and_move`.
+
+    Files are downloaded on a single connection. A download interrupted by a parallel download (see `_download_parts`)
+    is resumed by downloading the missing chunks one after the other. Blocking disk operations (loading the chunks
+    sidecar, disk space checks, hashing of the resumed content, writes, moving the blob) run in the default executor to
+    not block the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if destination_path.exists() and not force_download:
+        # Do nothing if already exists (except if force_download=True)
+        return
+
+    if incomplete_path.exists() and force_download:
+        logger.info(f"Removing incomplete file '{incomplete_path}' (force_download=True)")
+        incomplete_path.unlink(missing_ok=True)
+        get_parts_path(incomplete_path).unlink(missing_ok=True)
+
+    parts, resume_size = await loop.run_in_executor(
+        None, _load_download_parts, incomplete_path, headers, expected_size
+    )
+    message = f"Downloading '{filename}' to '{incomplete_path}'"
+    if resume_size > 0 and expected_size is not None:
+        message += f" (resume from {resume_size}/{expected_size})"
+    logger.info(message)
+
+    if expected_size is not None:  # might be None if HTTP header not set correctly
+        # Check disk space in both tmp and destination path
+        await loop.run_in_executor(None, _check_disk_space, expected_size, incomplete_path.parent)
+        await loop.run_in_executor(None, _check_disk_space, expected_size, destination_path.parent)
+
+    hasher = await loop.run_in_executor(
+        None, _get_resumed_hasher, verify_etag, expected_size, incomplete_path, resume_size, parts
+    )
+
+    progress_cm = hf_tqdm(
+        unit="B",
+        unit_scale=True,
+        total=expected_size,
+        initial=resume_size,
+        desc=filename if len(filename) <= 40 else f"(…){filename[-40:]}",
+        disable=is_tqdm_disabled(logger.getEffectiveLevel()),
+        name="huggingface_hub.ahf_hub_download",
+    )
+    with incomplete_path.open("r+b") as f, progress_cm as progress:
+        try:
+            if parts is None:
+                await _aget_range(
+                    session, url_to_download, f, headers=headers, start=resume_size, progress=progress, hasher=hasher
+                )
+            else:
+                for start, end in parts.missing_ranges(max_range_size=constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE):
+                    await _aget_range(
+                        session,
+                        url_to_download,
+                        f,
+                        headers=headers,
+                        start=start,
+                        end=end,
+                        progress=progress,
+                        parts=parts,
+                    )
+        except _RangeNotSupportedError:
+            f.close()
+            incomplete_path.unlink(missing_ok=True)
+            get_parts_path(incomplete_path).unlink(missing_ok=True)
+            raise EnvironmentError(
+                f"Cannot resume the download of '{filename}': the server does not support range requests. The"
+                " incomplete file has been deleted. Please retry."
+            )
+        await loop.run_in_executor(None, f.flush)
+        size = os.fstat(f.fileno()).st_size
+        if parts is not None and hasher is not None:
+            f.seek(0)
+            await loop.run_in_executor(None, _update_hasher_from_file, hasher, f, size)
+
+    if expected_size is not None and expected_size != size:
+        raise EnvironmentError(
+            f"Consistency check failed: file should be of size {expected_size} but has size {size} ({filename}).\nThis"
+            " is usually due to network issues while downloading the file. Please retry with `force_download=True`."
+        )
+
+    if hasher is not None and verify_etag is not None:
+        _check_etag_hash(hasher, verify_etag, incomplete_path, filename)
+
+    # Delete the sidecar file before moving the blob: if the process is interrupted in between, the complete
+    # incomplete file is resumed (i.e. moved) on next call.
+    get_parts_path(incomplete_path).unlink(missing_ok=True)
+    logger.info(f"Download complete. Moving file to {destination_path}")
+    await loop.run_in_executor(None, _chmod_and_move, incomplete_path, destination_path)
+
+
+def _load_download_parts(
+    incomplete_path: Path, headers: Dict[str, str], expected_size: Optional[int]
+) -> Tuple[Optional[DownloadParts], int]:
+    """Return the chunks tracker of an incomplete file (if any) and the number of bytes already downloaded."""
+    with incomplete_path.open("ab") as f:
+        parts = _get_download_parts(
+            incomplete_path, f, headers=headers, expected_size=expected_size, parallel_download=False
+        )
+        return parts, parts.completed_size if parts is not None else f.tell()
+
+
+class _RangeNotSupportedError(Exception):
+    """Raised when a range request is answered with the full content."""
+
+
+async def _aget_range(
+    session: "ClientSession",
+    url: str,
+    temp_file: BinaryIO,
+    *,
+    headers: Dict[str, str],
+    start: int,
+    end: Optional[int] = None,
+    progress: Any,
+    hasher: Optional[Any] = None,
+    parts: Optional[DownloadParts] = None,
+) -> None:
+    """Download the `[start, end)` bytes of `url` (until the end of the file if `end` is None) at their offset in
+    `temp_file`.
+
+    If the connection breaks or times out, the download is resumed after a short pause. It gives up after 5 attempts
+    without receiving new data. Data is written in the default executor, as it waits for the disk. If `parts` is
+    provided, downloaded chunks are flushed to disk and marked as completed (see `_get_parts_save_interval`).
+    """
+    aiohttp = _import_aiohttp()
+    loop = asyncio.get_running_loop()
+    position = start
+    nb_retries = 5
+    save_interval = _get_parts_save_interval(parts) if parts is not None else 0
+    while end is None or position < end:
+        if end is not None:
+            request_headers = _range_headers(headers, position, end)
+        elif position > 0:
+            request_headers = {**headers, "Range": _adjust_range_header(headers.get("Range"), position)}
+        else:
+            request_headers = headers
+        try:
+            response = await _arequest(
+                session, "GET", url, headers=request_headers, timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT
+            )
+            async with response:
+                if "Range" in request_headers and response.status != 206:
+                    raise _RangeNotSupportedError()
+                temp_file.seek(position)
+                async for chunk in response.content.iter_chunked(constants.DOWNLOAD_CHUNK_SIZE):
+                    if end is not None and len(chunk) > end - position:
+                        chunk = chunk[: end - position]
+                    await athrottle(len(chunk), url)
+                    await loop.run_in_executor(None, temp_file.write, chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    progress.update(len(chunk))
+                    position += len(chunk)
+                    # Some data has been downloaded from the server so we reset the number of retries.
+                    nb_retries = 5
+                    if parts is not None and (
+                        position == end or position // save_interval != (position - len(chunk)) // save_interval
+                    ):
+                        # Chunks have been fully downloaded => persist them before recording them in the sidecar
+                        await loop.run_in_executor(None, _save_completed_range, temp_file, parts, start, position)
+                    if end is not None and position >= end:
+                        break
+            if end is None:
+                return
+            if position < end:
+                raise requests.ConnectionError(f"Connection closed after {position - start} bytes of the range.")
+        except (
+            requests.ConnectionError,
+            requests.Timeout,
+            aiohttp.ClientPayloadError,
+            aiohttp.ClientConnectionError,
+            asyncio.TimeoutError,
+        ) as error:
+            if isinstance(error, (requests.exceptions.SSLError, requests.exceptions.ProxyError)):
+                raise
+            if nb_retries <= 0:
+                logger.warning("Error while downloading from %s: %s\nMax retries exceeded.", url, str(error))
+                raise
+            logger.warning("Error while downloading from %s: %s\nTrying to resume download...", url, str(error))
+            nb_retries -= 1
+            await asyncio.sleep(1)
+            await loop.run_in_executor(None, temp_file.flush)
+
+
+def _save_completed_range(temp_file: BinaryIO, parts: DownloadParts, start: int, end: int) -> None:
+    """Flush the `[start, end)` bytes of `temp_file` to disk, then record them as completed in the sidecar file."""
+    temp_file.flush()
+    os.fsync(temp_file.fileno())
+    parts.mark_completed(start, end)
+    parts.save()
+
+
+async def _arequest(
+    session: "ClientSession",
+    method: str,
+    url: str,
+    *,
+    headers: Dict[str, str],
+    timeout: Optional[float],
+    params: Optional[Dict[str, str]] = None,
+    data: Optional[Any] = None,
+    allow_redirects: bool = True,
+    follow_relative_redirects: bool = False,
+) -> "ClientResponse":
+    """Make a request with `aiohttp` and raise the same errors as the `requests`-based methods.
+
+    Connection errors and timeouts are converted to their `requests` counterparts. HTTP errors are raised by
+    [`hf_raise_for_status`] (e.g. [`RepositoryNotFoundError`]). Relative redirects are followed if
+    `follow_relative_redirects=True` even when `allow_redirects=False` (see `_request_wrapper`).
+    """
+    aiohttp = _import_aiohttp()
+    if constants.HF_HUB_OFFLINE:
+        raise OfflineModeIsEnabled(
+            f"Cannot reach {url}: offline mode is enabled. To disable it, please unset the `HF_HUB_OFFLINE` environment variable."
+        )
+    try:
+        response = await session.request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            data=data,
+            allow_redirects=allow_redirects,
+            timeout=aiohttp.ClientTimeout(total=None, connect=timeout, sock_read=timeout),
+        )
+    except aiohttp.ClientSSLError as error:
+        raise requests.exceptions.SSLError(str(error)) from error
+    except aiohttp.ClientProxyConnectionError as error:
+        raise requests.exceptions.ProxyError(str(error)) from error
+    except asyncio.TimeoutError as error:
+        raise requests.exceptions.Timeout(f"Request to {url} timed out.") from error
+    except aiohttp.ClientConnectionError as error:
+        raise requests.exceptions.ConnectionError(str(error)) from error
+
+    if follow_relative_redirects and 300 <= response.status <= 399:
+        parsed_target = urlparse(response.headers["Location"])
+        if parsed_target.netloc == "":
+            # This means it is a relative 'location' headers, as allowed by RFC 7231.
+            response.release()
+            next_url = urlparse(url)._replace(path=parsed_target.path).geturl()
+            return await _arequest(
+                session,
+                method,
+                next_url,
+                headers=headers,
+                timeout=timeout,
+                params=params,
+                data=data,
+                allow_redirects=allow_redirects,
+                follow_relative_redirects=True,
+            )
+
+    if response.status >= 400:
+        content = await response.read()
+        response.release()
+        hf_raise_for_status(_to_requests_response(response, content, method=method))
+    return response
+
+
+def _to_requests_response(response: "ClientResponse", content: bytes, method: str) -> requests.Response:
+    """Convert an `aiohttp` response to a `requests` one, to share the error handling logic."""
+    requests_response = requests.Response()
+    requests_response.status_code = response.status
+    requests_response.reason = response.reason or ""
+    requests_response.headers = CaseInsensitiveDict(response.headers)
+    requests_response.url = str(response.url)
+    requests_response._content = content
+    requests_response.request = requests.Request(method=method, url=str(response.request_info.url)).prepare()
+    return requests_response
+
+
+def _get_client_session(limit: int = 100) -> "ClientSession":
+    aiohttp = _import_aiohttp()
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit), trust_env=True)
+
+
+def _import_aiohttp():
+    # Make sure `aiohttp` is installed on the machine.
+    if not is_aiohttp_available():
+        raise ImportError(
+            "Please install aiohttp to use `ahf_hub_download`, `asnapshot_download` or `AsyncHfFileSystem` (`pip"
+            " install aiohttp`)."
+        )
+    import aiohttp
+
+    return aiohttp
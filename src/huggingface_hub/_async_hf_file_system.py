@@ -0,0 +1,665 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains an asynchronous counterpart of `HfFileSystem`, implementing fsspec's `AsyncFileSystem` with `aiohttp`.
+
+Paths are resolved with the same logic as `HfFileSystem.resolve_path`. All requests of a file system instance go
+through a single `aiohttp.ClientSession`, so that many files can be read concurrently on one event loop with a bounded
+connection pool. Concurrent calls needing the same repo info or directory listing share a single request.
+"""
+
+import asyncio
+import os
+import shutil
+import time
+import weakref
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+from fsspec.asyn import AsyncFileSystem, FSTimeoutError, _run_coros_in_chunks, sync
+from fsspec.callbacks import DEFAULT_CALLBACK
+from fsspec.utils import isfilelike
+
+from . import constants
+from ._async_download import _aget_range, _arequest, _get_client_session
+from ._bandwidth import athrottle
+from .errors import EntryNotFoundError, HfHubHTTPError, RepositoryNotFoundError, RevisionNotFoundError
+from .file_download import hf_hub_url
+from .hf_api import HfApi, RepoFile, RepoFolder
+from .hf_file_system import (
+    _CAT_RANGES_MAX_GAP,
+    _REDIRECT_INVALID_STATUS_CODES,
+    HfFileSystemResolvedPath,
+    _dircache_entry,
+    _get_cached_blob_path,
+    _get_redirect_expiration,
+    _get_redirect_headers,
+    _merge_ranges,
+    _parse_path,
+    _raise_file_not_found,
+    _redirect_cache_key,
+    _redirect_cache_key_matches,
+)
+from .utils import HFValidationError, validate_repo_id
+
+
+if TYPE_CHECKING:
+    from aiohttp import ClientResponse, ClientSession
+
+
+class AsyncHfFileSystem(AsyncFileSystem):
+    """
+    Access a remote Hugging Face Hub repository as if were a local file system, from asynchronous code.
+
+    This is the asynchronous counterpart of [`HfFileSystem`], for fsspec async callers (e.g. zarr v3) and async data
+    loaders. Listing and reading files (`_ls`, `_info`, `_cat_file`, `_cat_ranges`, `_get_file` and the methods built
+    on them) is supported. Writing files is not: use [`HfFileSystem`] instead.
+
+    All the requests of an instance share a single `aiohttp` session. When used with `asynchronous=True`, the session
+    must be created in the event loop with `await fs.set_session()` and closed with `await session.close()`. Otherwise,
+    the synchronous methods (`fs.cat_file`, `fs.ls`, etc.) run on fsspec's event loop thread.
+
+    Unlike [`HfFileSystem`], listings are not expanded with the last commit of each entry unless `expand_info=True`
+    is passed, since it makes them slower.
+
+    Args:
+        token (`str` or `bool`, *optional*):
+            A valid user access token (string). Defaults to the locally saved
+            token, which is the recommended method for authentication (see
+            https://huggingface.co/docs/huggingface_hub/quick-start#authentication).
+            To disable authentication, pass `False`.
+        endpoint (`str`, *optional*):
+            Endpoint of the Hub. Defaults to <https://huggingface.co>.
+    Usage:
+
+    ```python
+    >>> from huggingface_hub import AsyncHfFileSystem
+
+    >>> fs = AsyncHfFileSystem(asynchronous=True)
+    >>> session = await fs.set_session()
+
+    >>> # List files
+    >>> await fs._ls("datasets/my-username/my-dataset", detail=False)
+    ['datasets/my-username/my-dataset/.gitattributes',
+     'datasets/my-username/my-dataset/README.md',
+     'datasets/my-username/my-dataset/data.json']
+
+    >>> # Read many files concurrently
+    >>> contents = await asyncio.gather(*[fs._cat_file(path) for path in paths])
+    >>> await session.close()
+    ```
+    """
+
+    root_marker = ""
+    protocol = "hf"
+
+    def __init__(
+        self,
+        *args,
+        endpoint: Optional[str] = None,
+        token: Union[bool, str, None] = None,
+        **storage_options,
+    ):
+        super().__init__(*args, **storage_options)
+        self.endpoint = endpoint or constants.ENDPOINT
+        self.token = token
+        self._api = HfApi(endpoint=endpoint, token=token)
+        self._session: Optional["ClientSession"] = None
+        # Same as `HfFileSystem._repo_and_revision_exists_cache`
+        self._repo_and_revision_exists_cache: Dict[
+            Tuple[str, str, Optional[str]], Tuple[bool, Optional[Exception]]
+        ] = {}
+        # Same as `HfFileSystem._redirect_cache`
+        self._redirect_cache: Dict[Tuple[str, str, str, str], Tuple[str, float]] = {}
+        # Requests in flight, shared by the calls needing the same result (see `_dedupe`)
+        self._pending: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def set_session(self) -> "ClientSession":
+        """Return the `aiohttp` session of the file system, creating it in the running event loop if needed."""
+        if self._session is None or self._session.closed:
+            self._session = _get_client_session()
+            if not self.asynchronous:
+                weakref.finalize(self, self.close_session, self.loop, self._session)
+        return self._session
+
+    @staticmethod
+    def close_session(loop: Optional[asyncio.AbstractEventLoop], session: "ClientSession") -> None:
+        # Taken from https://github.com/fsspec/filesystem_spec/blob/2024.12.0/fsspec/implementations/http.py#L125
+        if loop is not None and loop.is_running():
+            try:
+                sync(loop, session.close, timeout=0.1)
+                return
+            except (TimeoutError, FSTimeoutError, NotImplementedError):
+                pass
+        connector = getattr(session, "_connector", None)
+        if connector is not None:
+            # close after loop is dead
+            connector._close()
+
+    def invalidate_cache(self, path: Optional[str] = None) -> None:
+        """
+        Clear the cache for a given path.
+
+        For more details, refer to [fsspec documentation](
+        https://filesystem-spec.readthedocs.io/en/latest/api.html#fsspec.spec.AbstractFileSystem.invalidate_cache).
+
+        Args:
+            path (`str`, *optional*):
+                Path to clear from cache. If not provided, clear the entire cache.
+        """
+        if not path:
+            self.dircache.clear()
+            self._repo_and_revision_exists_cache.clear()
+            self._redirect_cache.clear()
+        else:
+            stripped_path: str = self._strip_protocol(path)
+            # Matched on the path: resolving it would require calls to the Hub
+            for key in [key for key in self._redirect_cache if _redirect_cache_key_matches(key, stripped_path)]:
+                self._redirect_cache.pop(key, None)
+            path = stripped_path
+            while path:
+                self.dircache.pop(path, None)
+                path = self._parent(path)
+
+    async def _resolve_path(self, path: str, revision: Optional[str] = None) -> HfFileSystemResolvedPath:
+        """
+        Resolve a Hugging Face file system path into its components.
+
+        Same as [`HfFileSystem.resolve_path`]. The repo infos it needs are fetched asynchronously.
+        """
+        stripped_path: str = self._strip_protocol(path)
+        parsed = _parse_path(stripped_path, revision)
+        err = None
+        for repo_id, path_in_repo in parsed.candidates:
+            repo_and_revision_exist, candidate_err = await self._repo_and_revision_exist(
+                parsed.repo_type, repo_id, parsed.revision
+            )
+            if repo_and_revision_exist:
+                return parsed.resolve(repo_id, path_in_repo)
+            err = err or candidate_err
+            if not parsed.should_try_next(candidate_err):
+                break
+        parsed.raise_not_found(err)
+
+    async def _repo_and_revision_exist(
+        self, repo_type: str, repo_id: str, revision: Optional[str]
+    ) -> Tuple[bool, Optional[Exception]]:
+        key = (repo_type, repo_id, revision)
+        if key not in self._repo_and_revision_exists_cache:
+            await self._dedupe(("repo_info", *key), self._fetch_repo_and_revision_exist, *key)
+        return self._repo_and_revision_exists_cache[key]
+
+    async def _fetch_repo_and_revision_exist(self, repo_type: str, repo_id: str, revision: Optional[str]) -> None:
+        url = f"{self.endpoint}/api/{repo_type}s/{repo_id}"
+        if revision is not None:
+            url += f"/revision/{quote(revision, safe='')}"
+        try:
+            validate_repo_id(repo_id)
+            response = await _arequest(
+                await self.set_session(),
+                "GET",
+                url,
+                headers=self._api._build_hf_headers(),
+                timeout=constants.HF_HUB_ETAG_TIMEOUT,
+            )
+            response.release()
+        except (RepositoryNotFoundError, HFValidationError) as e:
+            self._repo_and_revision_exists_cache[(repo_type, repo_id, revision)] = False, e
+            self._repo_and_revision_exists_cache[(repo_type, repo_id, None)] = False, e
+        except RevisionNotFoundError as e:
+            self._repo_and_revision_exists_cache[(repo_type, repo_id, revision)] = False, e
+            self._repo_and_revision_exists_cache[(repo_type, repo_id, None)] = True, None
+        else:
+            self._repo_and_revision_exists_cache[(repo_type, repo_id, revision)] = True, None
+            self._repo_and_revision_exists_cache[(repo_type, repo_id, None)] = True, None
+
+    async def _dedupe(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run `func(*args)`, or wait for the result of the call already running for `key`."""
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(*args))
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        # Shielded: a cancelled caller must not cancel the request of the others
+        return await asyncio.shield(future)
+
+    async def _ls(
+        self, path: str, detail: bool = True, refresh: bool = False, revision: Optional[str] = None, **kwargs
+    ) -> Union[List[str], List[Dict[str, Any]]]:
+        """
+        List the contents of a directory.
+
+        For more details, refer to [fsspec documentation](
+        https://filesystem-spec.readthedocs.io/en/latest/api.html#fsspec.spec.AbstractFileSystem.ls).
+
+        Args:
+            path (`str`):
+                Path to the directory.
+            detail (`bool`, *optional*):
+                If True, returns a list of dictionaries containing file information. If False,
+                returns a list of file paths. Defaults to True.
+            refresh (`bool`, *optional*):
+                If True, bypass the cache and fetch the latest data. Defaults to False.
+            revision (`str`, *optional*):
+                The git revision to list from.
+
+        Returns:
+            `List[Union[str, Dict[str, Any]]]`: List of file paths (if detail=False) or list of file information
+            dictionaries (if detail=True).
+        """
+        resolved_path = await self._resolve_path(path, revision=revision)
+        path = resolved_path.unresolve()
+        expand_info = kwargs.get("expand_info", False)
+        try:
+            out = await self._ls_tree(path, refresh=refresh, revision=revision, expand_info=expand_info)
+        except EntryNotFoundError:
+            # Path could be a file
+            if not resolved_path.path_in_repo:
+                _raise_file_not_found(path, None)
+            out = await self._ls_tree(self._parent(path), refresh=refresh, revision=revision, expand_info=expand_info)
+            out = [o for o in out if o["name"] == path]
+            if len(out) == 0:
+                _raise_file_not_found(path, None)
+        return out if detail else [o["name"] for o in out]
+
+    async def _ls_tree(
+        self, path: str, refresh: bool = False, revision: Optional[str] = None, expand_info: bool = False
+    ) -> List[Dict[str, Any]]:
+        resolved_path = await self._resolve_path(path, revision=revision)
+        path = resolved_path.unresolve()
+        if path in self.dircache and not refresh:
+            out = self.dircache[path]
+            if not expand_info or all(o["last_commit"] is not None for o in out):
+                return out
+        return await self._dedupe(("tree", path, expand_info), self._fetch_tree, resolved_path, expand_info)
+
+    async def _fetch_tree(self, resolved_path: HfFileSystemResolvedPath, expand_info: bool) -> List[Dict[str, Any]]:
+        root_path = HfFileSystemResolvedPath(
+            resolved_path.repo_type,
+            resolved_path.repo_id,
+            resolved_path.revision,
+            path_in_repo="",
+            _raw_revision=resolved_path._raw_revision,
+        ).unresolve()
+        encoded_path_in_repo = "/" + quote(resolved_path.path_in_repo, safe="") if resolved_path.path_in_repo else ""
+        url: Optional[str] = (
+            f"{self.endpoint}/api/{resolved_path.repo_type}s/{resolved_path.repo_id}"
+            f"/tree/{quote(resolved_path.revision, safe='')}{encoded_path_in_repo}"
+        )
+        # Same query as `HfApi.list_repo_tree`. Next pages are linked with their query in the `Link` header.
+        params: Optional[Dict[str, str]] = {"recursive": "False", "expand": str(expand_info)}
+        session = await self.set_session()
+        out = []
+        while url is not None:
+            response = await _arequest(
+                session,
+                "GET",
+                url,
+                headers=self._api._build_hf_headers(),
+                params=params,
+                timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+            )
+            async with response:
+                items = await response.json(content_type=None)
+                next_link = response.links.get("next")
+            for item in items:
+                path_info: Union[RepoFile, RepoFolder] = (
+                    RepoFile(**item) if item["type"] == "file" else RepoFolder(**item)
+                )
+                out.append(_dircache_entry(root_path, path_info))
+            url = str(next_link["url"]) if next_link is not None else None
+            params = None
+        self.dircache[resolved_path.unresolve()] = out
+        return out
+
+    async def _info(
+        self, path: str, refresh: bool = False, revision: Optional[str] = None, **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Get information about a file or directory.
+
+        For more details, refer to [fsspec documentation](
+        https://filesystem-spec.readthedocs.io/en/latest/api.html#fsspec.spec.AbstractFileSystem.info).
+
+        Args:
+            path (`str`):
+                Path to get info for.
+            refresh (`bool`, *optional*):
+                If True, bypass the cache and fetch the latest data. Defaults to False.
+            revision (`str`, *optional*):
+                The git revision to get info from.
+
+        Returns:
+            `Dict[str, Any]`: Dictionary containing file information (type, size, etc.).
+        """
+        resolved_path = await self._resolve_path(path, revision=revision)
+        path = resolved_path.unresolve()
+        if not resolved_path.path_in_repo:
+            # Path is the root directory
+            return {"name": path, "size": 0, "type": "directory"}
+        if kwargs.get("expand_info", False):
+            return await self._fetch_path_info(resolved_path)
+
+        parent_path = self._parent(path)
+        try:
+            # Listing the parent directory is shared by all its entries
+            parent_infos = await self._ls_tree(parent_path, refresh=refresh, revision=revision)
+        except EntryNotFoundError as e:
+            _raise_file_not_found(path, e)
+        out = [o for o in parent_infos if o["name"] == path]
+        if not out:
+            _raise_file_not_found(path, None)
+        return out[0]
+
+    async def _fetch_path_info(self, resolved_path: HfFileSystemResolvedPath) -> Dict[str, Any]:
+        # Same request as `HfApi.get_paths_info`
+        response = await _arequest(
+            await self.set_session(),
+            "POST",
+            f"{self.endpoint}/api/{resolved_path.repo_type}s/{resolved_path.repo_id}"
+            f"/paths-info/{quote(resolved_path.revision, safe='')}",
+            headers=self._api._build_hf_headers(),
+            data=[("paths", resolved_path.path_in_repo), ("expand", "True")],
+            timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+        )
+        async with response:
+            items = await response.json(content_type=None)
+        if not items:
+            _raise_file_not_found(resolved_path.unresolve(), None)
+        path_info: Union[RepoFile, RepoFolder] = (
+            RepoFile(**items[0]) if items[0]["type"] == "file" else RepoFolder(**items[0])
+        )
+        root_path = HfFileSystemResolvedPath(
+            resolved_path.repo_type,
+            resolved_path.repo_id,
+            resolved_path.revision,
+            path_in_repo="",
+            _raw_revision=resolved_path._raw_revision,
+        ).unresolve()
+        return _dircache_entry(root_path, path_info)
+
+    async def _get_response(
+        self, resolved_path: HfFileSystemResolvedPath, headers: Dict[str, str]
+    ) -> "ClientResponse":
+        """Send a GET request for a file, reusing the CDN URL it was last redirected to (see `HfFileSystem._get`)."""
+        session = await self.set_session()
+        key = _redirect_cache_key(resolved_path)
+        cached = self._redirect_cache.get(key)
+        if cached is not None:
+            location, expires_at = cached
+            if time.time() < expires_at:
+                try:
+                    return await _arequest(
+                        session,
+                        "GET",
+                        location,
+                        headers={
+                            **headers,
+                            **_get_redirect_headers(location, self.endpoint, self._api._build_hf_headers()),
+                        },
+                        timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+                    )
+                except HfHubHTTPError as e:
+                    if e.response is None or e.response.status_code not in _REDIRECT_INVALID_STATUS_CODES:
+                        raise
+            self._redirect_cache.pop(key, None)
+
+        url = self._url(resolved_path)
+        response = await _arequest(
+            session,
+            "GET",
+            url,
+            headers={**headers, **self._api._build_hf_headers()},
+            timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+        )
+        if response.history and str(response.url) != url:
+            self._redirect_cache[key] = (str(response.url), _get_redirect_expiration(str(response.url)))
+        return response
+
+    def _url(self, resolved_path: HfFileSystemResolvedPath) -> str:
+        return hf_hub_url(
+            repo_id=resolved_path.repo_id,
+            revision=resolved_path.revision,
+            filename=resolved_path.path_in_repo,
+            repo_type=resolved_path.repo_type,
+            endpoint=self.endpoint,
+        )
+
+    async def _fetch_range(
+        self, resolved_path: HfFileSystemResolvedPath, details: Dict[str, Any], start: int, end: int
+    ) -> bytes:
+        """Fetch the `[start, end)` bytes of a file, from the local cache if the file has been downloaded."""
+        content = await asyncio.get_running_loop().run_in_executor(
+            None, _read_cached_range, resolved_path, details, start, end
+        )
+        if content is not None:
+            return content
+        response = await self._get_response(resolved_path, headers={"range": f"bytes={start}-{end - 1}"})
+        async with response:
+            content = await response.read()
+        if response.status != 206 and (start, end) != (0, len(content)):
+            # Range ignored by the server
+            content = content[start:end]
+        await athrottle(len(content), str(response.url))
+        return content
+
+    async def _cat_file(
+        self,
+        path: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        revision: Optional[str] = None,
+        **kwargs,
+    ) -> bytes:
+        """
+        Get the content of a file, or of a range of it.
+
+        Args:
+            path (`str`):
+                Path of the file.
+            start (`int`, *optional*):
+                Offset of the first byte to read. Negative values are counted from the end of the file.
+            end (`int`, *optional*):
+                Offset of the byte after the last one to read. `None` means the end of the file. Negative values are
+                counted from the end of the file.
+            revision (`str`, *optional*):
+                The git revision to read from.
+
+        Returns:
+            `bytes`: The content of the file between `start` and `end`.
+        """
+        resolved_path = await self._resolve_path(path, revision=revision)
+        info = await self._info(path, revision=revision)
+        if info["type"] == "directory":
+            raise IsADirectoryError(path)
+        start, end, _ = slice(start, end).indices(info["size"])
+        if start >= end:
+            return b""
+        return await self._fetch_range(resolved_path, info, start, end)
+
+    async def _cat_ranges(
+        self,
+        paths: List[str],
+        starts: Union[int, None, List[Optional[int]]],
+        ends: Union[int, None, List[Optional[int]]],
+        max_gap: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        on_error: str = "return",
+        revision: Optional[str] = None,
+        **kwargs,
+    ) -> List[Union[bytes, Exception]]:
+        """
+        Get the contents of byte ranges from one or more files.
+
+        Same as [`HfFileSystem.cat_ranges`]: ranges of a same file that are less than `max_gap` bytes apart are
+        fetched in a single request, with at most `HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY` requests in flight per file.
+        At most `batch_size` requests are sent concurrently (defaults to fsspec's `gather_batch_size`).
+
+        Args:
+            paths (`List[str]`):
+                Paths of the files to read from. A path can be repeated to read several ranges of a file.
+            starts (`int` or `List[int]`):
+                Offsets of the first bytes to read. Negative values are counted from the end of the file. If an int
+                is passed, it is used for all paths.
+            ends (`int` or `List[int]`):
+                Offsets of the bytes after the last ones to read. `None` means the end of the file. Negative values
+                are counted from the end of the file. If an int is passed, it is used for all paths.
+            max_gap (`int`, *optional*):
+                Maximum number of bytes between two ranges of a file to fetch them in a single request. Defaults to
+                64KB.
+            batch_size (`int`, *optional*):
+                Maximum number of concurrent requests.
+            on_error (`str`, *optional*):
+                If `"return"` (default), errors are returned in place of the content of the ranges that failed.
+                Otherwise, the first error is raised.
+            revision (`str`, *optional*):
+                The git revision to read from.
+
+        Returns:
+            `List[Union[bytes, Exception]]`: The content of each range, in the same order as `paths`.
+        """
+        if not isinstance(paths, list):
+            raise TypeError(f"`paths` must be a list, got {type(paths)}.")
+        if not isinstance(starts, list):
+            starts = [starts] * len(paths)
+        if not isinstance(ends, list):
+            ends = [ends] * len(paths)
+        if len(starts) != len(paths) or len(ends) != len(paths):
+            raise ValueError("`paths`, `starts` and `ends` must have the same length.")
+        max_gap = _CAT_RANGES_MAX_GAP if max_gap is None else max_gap
+
+        async def _resolve(path: str) -> Tuple[HfFileSystemResolvedPath, Dict[str, Any]]:
+            resolved_path = await self._resolve_path(path, revision=revision)
+            info = await self._info(path, revision=revision)
+            if info["type"] == "directory":
+                raise IsADirectoryError(path)
+            return resolved_path, info
+
+        unique_paths = list(dict.fromkeys(paths))
+        resolved = dict(
+            zip(unique_paths, await asyncio.gather(*[_resolve(path) for path in unique_paths], return_exceptions=True))
+        )
+
+        out: List[Union[bytes, Exception]] = [b""] * len(paths)
+        files: Dict[str, Tuple[HfFileSystemResolvedPath, Dict[str, Any]]] = {}
+        # (start, end, index in output) of the ranges of each file
+        ranges_per_file: Dict[str, List[Tuple[int, int, int]]] = {}
+        for index, (path, start, end) in enumerate(zip(paths, starts, ends)):
+            file = resolved[path]
+            if isinstance(file, BaseException):
+                if not isinstance(file, Exception) or on_error != "return":
+                    raise file
+                out[index] = file
+                continue
+            files[path] = file
+            start, end, _ = slice(start, end).indices(file[1]["size"])
+            if start < end:
+                ranges_per_file.setdefault(path, []).append((start, end, index))
+
+        requests = _merge_ranges(ranges_per_file, max_gap)
+
+        semaphores = {
+            path: asyncio.Semaphore(constants.HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY) for path in ranges_per_file
+        }
+
+        async def _fetch(path: str, start: int, end: int) -> bytes:
+            resolved_path, info = files[path]
+            async with semaphores[path]:
+                return await self._fetch_range(resolved_path, info, start, end)
+
+        results = await _run_coros_in_chunks(
+            [_fetch(path, start, end) for path, start, end, _ in requests],
+            batch_size=batch_size or self.batch_size,
+            nofiles=True,
+            return_exceptions=True,
+        )
+        for (_, request_start, request_end, members), data in zip(requests, results):
+            if isinstance(data, BaseException):
+                if not isinstance(data, Exception) or on_error != "return":
+                    raise data
+                for _, _, index in members:
+                    out[index] = data
+                continue
+            for start, end, index in members:
+                # No copy if the range has not been merged with another one
+                if (start, end) == (request_start, request_end):
+                    out[index] = data
+                else:
+                    out[index] = data[start - request_start : end - request_start]
+        return out
+
+    async def _get_file(
+        self, rpath: str, lpath: Any, callback=DEFAULT_CALLBACK, revision: Optional[str] = None, **kwargs
+    ) -> None:
+        """
+        Copy single remote file to local.
+
+        The download is resumed if the connection breaks. If the file is in the local cache, it is copied from there.
+
+        Args:
+            rpath (`str`):
+                Remote path to download from.
+            lpath (`str`):
+                Local path (or file-like object) to download to.
+            callback (`Callback`, *optional*):
+                Optional callback to track download progress. Defaults to no callback.
+            revision (`str`, *optional*):
+                The git revision to download from.
+        """
+        resolved_path = await self._resolve_path(rpath, revision=revision)
+        info = await self._info(rpath, revision=revision)
+        if info["type"] == "directory":
+            if not isfilelike(lpath):
+                os.makedirs(lpath, exist_ok=True)
+            return None
+        callback.set_size(info["size"])
+
+        if not isfilelike(lpath):
+            if isinstance(lpath, (str, Path)) and os.path.dirname(lpath):
+                os.makedirs(os.path.dirname(lpath), exist_ok=True)
+            loop = asyncio.get_running_loop()
+            blob_path = await loop.run_in_executor(None, _get_cached_blob_path, resolved_path, info)
+            if blob_path is not None:
+                await loop.run_in_executor(None, shutil.copyfile, blob_path, lpath)
+                callback.relative_update(info["size"])
+                return None
+
+        outfile = lpath if isfilelike(lpath) else open(lpath, "wb")
+        try:
+            await _aget_range(
+                await self.set_session(),
+                self._url(resolved_path),
+                outfile,
+                headers=self._api._build_hf_headers(),
+                start=0,
+                end=info["size"],
+                progress=SimpleNamespace(update=callback.relative_update),
+            )
+        finally:
+            if outfile is not lpath:
+                outfile.close()
+
+
+def _read_cached_range(
+    resolved_path: HfFileSystemResolvedPath, details: Dict[str, Any], start: int, end: int
+) -> Optional[bytes]:
+    """Read the `[start, end)` bytes of a file from the local cache, or return `None` if it is not cached."""
+    blob_path = _get_cached_blob_path(resolved_path, details)
+    if blob_path is None:
+        return None
+    with open(blob_path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
@@ -0,0 +1,161 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains a process-wide bandwidth limiter for downloads and uploads.
+
+The limit is set with `HF_HUB_MAX_BANDWIDTH` (e.g. `"500MB/s"`) and is shared by all threads (and coroutines) of the
+process. If `HF_HUB_MAX_BANDWIDTH_PER_HOST` is set, each host gets its own budget instead. Bytes are accounted for in
+a token bucket: transfers are paced so that the average throughput over a second never exceeds the limit.
+"""
+
+import asyncio
+import functools
+import io
+import os
+import threading
+import time
+from typing import BinaryIO, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from . import constants
+
+
+class _TokenBucket:
+    """Thread-safe token bucket refilled at `rate` bytes per second, holding at most 1 second of budget.
+
+    A transfer larger than the budget is allowed but puts the bucket in debt: the next transfers wait until it is paid
+    back. This way, the average throughput is respected whatever the size of the chunks.
+    """
+
+    def __init__(self, rate: int) -> None:
+        self.rate = rate
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, nbytes: int) -> float:
+        """Consume `nbytes` tokens and return the number of seconds to wait before transferring them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.rate), self._tokens + (now - self._last) * self.rate) - nbytes
+            self._last = now
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+_BUCKETS: Dict[Tuple[int, Optional[str]], _TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+@functools.lru_cache()
+def parse_bandwidth(value: str) -> int:
+    """Parse a bandwidth like `"500MB/s"` to a number of bytes per second.
+
+    Units are the ones supported by [`parse_size_to_int`] (`"KB"`, `"MB"`, `"GB"`, `"TB"`). A plain number is
+    interpreted as bytes per second. The `"/s"` suffix is optional.
+
+    Example:
+    ```py
+    >>> parse_bandwidth("500MB/s")
+    500000000
+    ```
+    """
+    from .serialization._base import parse_size_to_int
+
+    value = value.strip()
+    if value.lower().endswith("/s"):
+        value = value[:-2]
+    try:
+        rate = int(value) if value.isdigit() else parse_size_to_int(value)
+    except ValueError as e:
+        raise ValueError(
+            f"Invalid bandwidth '{value}' (HF_HUB_MAX_BANDWIDTH). Expected a value like '500MB/s'."
+        ) from e
+    if rate <= 0:
+        raise ValueError(f"Invalid bandwidth '{value}' (HF_HUB_MAX_BANDWIDTH). Must be positive.")
+    return rate
+
+
+def _get_bucket(url: Optional[str]) -> Optional[_TokenBucket]:
+    if not constants.HF_HUB_MAX_BANDWIDTH:
+        return None
+    rate = parse_bandwidth(constants.HF_HUB_MAX_BANDWIDTH)
+    host = urlparse(url).netloc if constants.HF_HUB_MAX_BANDWIDTH_PER_HOST and url is not None else None
+    key = (rate, host)
+    bucket = _BUCKETS.get(key)
+    if bucket is None:
+        with _BUCKETS_LOCK:
+            bucket = _BUCKETS.setdefault(key, _TokenBucket(rate))
+    return bucket
+
+
+def throttle(nbytes: int, url: Optional[str] = None) -> None:
+    """Block until `nbytes` can be transferred from/to `url` without exceeding `HF_HUB_MAX_BANDWIDTH`.
+
+    No-op if no limit is set.
+    """
+    bucket = _get_bucket(url)
+    if bucket is not None:
+        delay = bucket.reserve(nbytes)
+        if delay > 0:
+            time.sleep(delay)
+
+
+async def athrottle(nbytes: int, url: Optional[str] = None) -> None:
+    """Async version of [`throttle`]. Waits without blocking the event loop."""
+    bucket = _get_bucket(url)
+    if bucket is not None:
+        delay = bucket.reserve(nbytes)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def throttle_fileobj(fileobj: BinaryIO, url: Optional[str] = None) -> BinaryIO:
+    """Return `fileobj` wrapped in a [`ThrottledFileObj`] if a bandwidth limit is set, `fileobj` itself otherwise."""
+    if not constants.HF_HUB_MAX_BANDWIDTH:
+        return fileobj
+    return ThrottledFileObj(fileobj, url)  # type: ignore[return-value]
+
+
+class ThrottledFileObj(io.IOBase):
+    """Wrap a seekable file-like object so that data read from it (e.g. by `requests` to upload it) is throttled.
+
+    `tell` and `seek` are forwarded so that `requests` can compute the `Content-Length`. It is an `io.IOBase` so that
+    [`http_backoff`] rewinds it before retrying a request (otherwise the retried request would send an empty body).
+    Closing the wrapper does not close the wrapped file.
+    """
+
+    def __init__(self, fileobj: BinaryIO, url: Optional[str] = None) -> None:
+        self.fileobj = fileobj
+        self.url = url
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.fileobj.read(n)
+        throttle(len(data), self.url)
+        return data
+
+    def tell(self) -> int:
+        return self.fileobj.tell()
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self.fileobj.seek(offset, whence)
+
+    def __iter__(self):
+        # Same behavior as `SliceFileObj`: `requests` only needs the object to be iterable to stream it
+        yield self.read(n=4 * 1024 * 1024)
@@ -0,0 +1,171 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains utilities to track which chunks of a file have been downloaded.
+
+When a file is downloaded by range requests, chunks are written at their offset in the `.incomplete` file in any
+order. The size of the `.incomplete` file does not tell how much has been downloaded. Completed chunks are recorded
+in a `.parts` sidecar file next to it so that an interrupted download can fetch only the missing chunks.
+
+```
+[4.0K]  blobs
+├── [ 21G]  403450e234d65943a7dcf7e05a771ce3c92faa84dd07db4ac20f592037a1e4bd.incomplete
+└── [ 512]  403450e234d65943a7dcf7e05a771ce3c92faa84dd07db4ac20f592037a1e4bd.incomplete.parts
+```
+
+Sidecar file structure (JSON):
+```
+{"version": 1, "size": 22548578304, "chunk_size": 67108864, "completed": "<hex-encoded bitmap>"}
+```
+
+A chunk is marked as complete only once all its bytes have been received and flushed to disk (`os.fsync`). The
+sidecar itself is replaced atomically. If the process or the machine crashes, the worst case is that some downloaded
+chunks are not recorded yet and will be downloaded again. The size of the full file is still checked once the
+download is complete.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+_PARTS_VERSION = 1
+
+
+def get_parts_path(incomplete_path: Path) -> Path:
+    """Return the path of the sidecar file tracking the downloaded chunks of `incomplete_path`."""
+    return incomplete_path.parent / f"{incomplete_path.name}.parts"
+
+
+class DownloadParts:
+    """Bitmap of the downloaded chunks of a file, persisted in a sidecar file.
+
+    Chunk `i` covers bytes `[i * chunk_size, min((i + 1) * chunk_size, size))` of the file. This class is thread-safe.
+
+    Args:
+        path (`Path`):
+            Path of the sidecar file. See [`get_parts_path`].
+        size (`int`):
+            Total size of the file being downloaded.
+        chunk_size (`int`):
+            Size of each chunk.
+        completed (`bytearray`, *optional*):
+            Bitmap of the completed chunks. Defaults to no chunk completed.
+    """
+
+    def __init__(self, path: Path, size: int, chunk_size: int, completed: Optional[bytearray] = None) -> None:
+        if chunk_size <= 0:
+            raise ValueError(f"`chunk_size` must be a positive integer, got {chunk_size}.")
+        self.path = path
+        self.size = size
+        self.chunk_size = chunk_size
+        self.nb_chunks = (size + chunk_size - 1) // chunk_size
+        self.completed = completed if completed is not None else bytearray((self.nb_chunks + 7) // 8)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path, size: int) -> Optional["DownloadParts"]:
+        """Load the sidecar file at `path`.
+
+        Returns `None` if the file does not exist, cannot be parsed or was created for a file of a different size.
+        """
+        try:
+            data = json.loads(path.read_text())
+            if data["version"] != _PARTS_VERSION or data["size"] != size:
+                return None
+            parts = cls(path, size=size, chunk_size=data["chunk_size"], completed=bytearray.fromhex(data["completed"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if len(parts.completed) != (parts.nb_chunks + 7) // 8:
+            return None
+        return parts
+
+    def is_completed(self, index: int) -> bool:
+        """Return whether chunk `index` has been downloaded."""
+        return bool(self.completed[index // 8] & (1 << (index % 8)))
+
+    @property
+    def completed_size(self) -> int:
+        """Number of bytes already downloaded (i.e. in completed chunks)."""
+        with self._lock:
+            return sum(
+                self._chunk_end(index) - index * self.chunk_size
+                for index in range(self.nb_chunks)
+                if self.is_completed(index)
+            )
+
+    @property
+    def is_done(self) -> bool:
+        """Whether all chunks have been downloaded."""
+        with self._lock:
+            return all(self.is_completed(index) for index in range(self.nb_chunks))
+
+    def mark_completed(self, start: int, end: int) -> None:
+        """Mark as completed all chunks fully contained in the `[start, end)` byte interval.
+
+        Must be called only once the bytes have been flushed to disk (e.g. with `os.fsync`). Changes are kept in memory
+        until [`save`] is called.
+        """
+        first = (start + self.chunk_size - 1) // self.chunk_size
+        with self._lock:
+            for index in range(first, self.nb_chunks):
+                if self._chunk_end(index) > end:
+                    break
+                self.completed[index // 8] |= 1 << (index % 8)
+
+    def missing_ranges(self, max_range_size: int) -> List[Tuple[int, int]]:
+        """Return the `(start, end)` byte ranges still to download.
+
+        Consecutive missing chunks are grouped together in ranges of at most `max_range_size` bytes (but at least one
+        chunk).
+        """
+        ranges: List[Tuple[int, int]] = []
+        with self._lock:
+            for index in range(self.nb_chunks):
+                if self.is_completed(index):
+                    continue
+                start, end = index * self.chunk_size, self._chunk_end(index)
+                if ranges and ranges[-1][1] == start and end - ranges[-1][0] <= max_range_size:
+                    ranges[-1] = (ranges[-1][0], end)
+                else:
+                    ranges.append((start, end))
+        return ranges
+
+    def save(self) -> None:
+        """Persist the sidecar file atomically."""
+        with self._lock:
+            content = json.dumps(
+                {
+                    "version": _PARTS_VERSION,
+                    "size": self.size,
+                    "chunk_size": self.chunk_size,
+                    "completed": self.completed.hex(),
+                }
+            )
+            tmp_path = self.path.parent / f"{self.path.name}.tmp"
+            with tmp_path.open("w") as f:
+                f.write(content)
+                # Content must be on disk before the rename, otherwise a crash can leave an empty sidecar
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def delete(self) -> None:
+        """Delete the sidecar file, if it exists."""
+        self.path.unlink(missing_ok=True)
+
+    def _chunk_end(self, index: int) -> int:
+        return min((index + 1) * self.chunk_size, self.size)
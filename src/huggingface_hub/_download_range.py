@@ -0,0 +1,485 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains `hf_hub_download_range` to download and cache only a byte range of a file.
+
+Ranges are written at their offset in the `.incomplete` file of the blob, i.e. a sparse file, and recorded in its
+`.parts` sidecar (see `_download_parts.py`). This is the same layout as an interrupted parallel download:
+
+```
+[4.0K]  blobs
+├── [ 21G]  403450e234d65943a7dcf7e05a771ce3c92faa84dd07db4ac20f592037a1e4bd.incomplete
+└── [ 512]  403450e234d65943a7dcf7e05a771ce3c92faa84dd07db4ac20f592037a1e4bd.incomplete.parts
+```
+
+Repeated reads of a range are served from disk and a later `hf_hub_download` of the same file only downloads the
+chunks that are still missing. Once all chunks have been fetched, the blob is completed and linked in the snapshot
+exactly as if it had been downloaded with `hf_hub_download`.
+"""
+
+import os
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+from . import constants
+from ._download_parts import DownloadParts, get_parts_path
+from .file_download import (
+    _cache_commit_hash_for_specific_revision,
+    _chmod_and_move,
+    _create_symlink,
+    _download_to_tmp_and_move,
+    _get_cached_pointer_path_after_head_call_error,
+    _get_cached_pointer_path_before_head_call,
+    _get_metadata_or_catch_error,
+    _get_pointer_path,
+    _get_read_only_storage_folders,
+    _get_relative_filename,
+    _http_get_parallel,
+    _raise_on_head_call_error,
+    _range_headers,
+    _request_wrapper,
+    repo_folder_name,
+)
+from .utils import WeakFileLock, build_hf_headers, hf_raise_for_status, logging, tqdm, validate_hf_hub_args
+from .utils.tqdm import is_tqdm_disabled
+
+
+logger = logging.get_logger(__name__)
+
+# Granularity of the ranges fetched in a sparse blob. Small enough to fetch a header or a footer without downloading
+# much more than needed. An existing `.parts` sidecar (e.g. interrupted parallel download) keeps its own chunk size. A
+# full download resuming a sparse blob saves its sidecar at the granularity of a parallel download instead.
+_SPARSE_CHUNK_SIZE = 1024 * 1024
+
+
+@validate_hf_hub_args
+def hf_hub_download_range(
+    repo_id: str,
+    filename: str,
+    start: int,
+    end: Optional[int] = None,
+    *,
+    subfolder: Optional[str] = None,
+    repo_type: Optional[str] = None,
+    revision: Optional[str] = None,
+    library_name: Optional[str] = None,
+    library_version: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+    user_agent: Union[Dict, str, None] = None,
+    proxies: Optional[Dict] = None,
+    etag_timeout: float = constants.DEFAULT_ETAG_TIMEOUT,
+    token: Union[bool, str, None] = None,
+    local_files_only: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+    endpoint: Optional[str] = None,
+) -> bytes:
+    """Download a byte range of a file from the Hub and cache it.
+
+    This is meant to read a small part of a large file, e.g. the footer of a parquet file or the header of a
+    safetensors file, without downloading the whole file. Bytes are downloaded by chunks of 1MB and kept in the cache
+    in a sparse file next to the blob. Repeated reads of the same range are served from disk and a later
+    [`hf_hub_download`] of the file only downloads the missing chunks. If the file is already fully cached, the range
+    is read from it.
+
+    `start` and `end` follow Python's slicing semantics: `end` is excluded, `None` means "until the end of the file"
+    and negative values are counted from the end of the file. For instance, `start=-8` returns the last 8 bytes.
+
+    As for [`hf_hub_download`], a HEAD call is made to resolve the file metadata unless the file is fully cached for a
+    commit hash or a recently resolved revision (see `HF_HUB_REVISION_TTL`). Partially cached files cannot be read
+    offline.
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        filename (`str`):
+            The name of the file in the repo.
+        start (`int`):
+            Offset of the first byte to read. Negative values are counted from the end of the file.
+        end (`int`, *optional*):
+            Offset of the byte after the last one to read. Defaults to the end of the file. Negative values are
+            counted from the end of the file.
+        subfolder (`str`, *optional*):
+            An optional value corresponding to a folder inside the repo.
+        repo_type (`str`, *optional*):
+            Set to `"dataset"` or `"space"` if downloading from a dataset or space, `None` or `"model"` if downloading
+            from a model. Default is `None`.
+        revision (`str`, *optional*):
+            An optional Git revision id which can be a branch name, a tag, or a commit hash.
+        library_name (`str`, *optional*):
+            The name of the library to which the object corresponds.
+        library_version (`str`, *optional*):
+            The version of the library.
+        cache_dir (`str`, `Path`, *optional*):
+            Path to the folder where cached files are stored.
+        user_agent (`dict`, `str`, *optional*):
+            The user-agent info in the form of a dictionary or a string.
+        proxies (`dict`, *optional*):
+            Dictionary mapping protocol to the URL of the proxy passed to `requests.request`.
+        etag_timeout (`float`, *optional*, defaults to `10`):
+            When fetching ETag, how many seconds to wait for the server to send data before giving up which is passed
+            to `requests.request`.
+        token (`str`, `bool`, *optional*):
+            A token to be used for the download.
+                - If `True`, the token is read from the HuggingFace config folder.
+                - If a string, it's used as the authentication token.
+        local_files_only (`bool`, *optional*, defaults to `False`):
+            If `True`, avoid making any HTTP call and only read the file if it is fully cached.
+        headers (`dict`, *optional*):
+            Additional headers to be sent with the request.
+        endpoint (`str`, *optional*):
+            Hugging Face Hub base url. Will default to https://huggingface.co/. Otherwise, one can set the
+            `HF_ENDPOINT` environment variable.
+
+    Returns:
+        `bytes`: The content of the file between `start` and `end`.
+
+    Raises:
+        [`~utils.RepositoryNotFoundError`]
+            If the repository to download from cannot be found. This may be because it doesn't exist, because
+            `repo_type` is not set correctly, or because the repo is `private` and you do not have access.
+        [`~utils.RevisionNotFoundError`]
+            If the revision to download from cannot be found.
+        [`~utils.EntryNotFoundError`]
+            If the file to download cannot be found.
+        [`~utils.LocalEntryNotFoundError`]
+            If network is disabled or unavailable and file is not fully cached.
+
+    Example:
+
+    ```python
+    >>> import struct
+    >>> from huggingface_hub import hf_hub_download_range
+    >>> header_size = struct.unpack("<Q", hf_hub_download_range("openai-community/gpt2", "model.safetensors", 0, 8))[0]
+    >>> header = hf_hub_download_range("openai-community/gpt2", "model.safetensors", 8, 8 + header_size)
+    ```
+    """
+    if constants.HF_HUB_ETAG_TIMEOUT != constants.DEFAULT_ETAG_TIMEOUT:
+        # Respect environment variable above user value
+        etag_timeout = constants.HF_HUB_ETAG_TIMEOUT
+
+    if cache_dir is None:
+        cache_dir = constants.HF_HUB_CACHE
+    if revision is None:
+        revision = constants.DEFAULT_REVISION
+    if isinstance(cache_dir, Path):
+        cache_dir = str(cache_dir)
+
+    if subfolder == "":
+        subfolder = None
+    if subfolder is not None:
+        filename = f"{subfolder}/{filename}"
+
+    if repo_type is None:
+        repo_type = "model"
+    if repo_type not in constants.REPO_TYPES:
+        raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(constants.REPO_TYPES)}")
+
+    hf_headers = build_hf_headers(
+        token=token,
+        library_name=library_name,
+        library_version=library_version,
+        user_agent=user_agent,
+        headers=headers,
+    )
+    file, size = _open_ranges(
+        repo_id=repo_id,
+        filename=filename,
+        ranges=[(start, end)],
+        repo_type=repo_type,
+        revision=revision,
+        cache_dir=cache_dir,
+        headers=hf_headers,
+        proxies=proxies,
+        etag_timeout=etag_timeout,
+        token=token,
+        local_files_only=local_files_only,
+        endpoint=endpoint,
+    )
+    with file:
+        start, end, _ = slice(start, end).indices(size)
+        file.seek(start)
+        return file.read(max(end - start, 0))
+
+
+def _open_ranges(
+    *,
+    repo_id: str,
+    filename: str,
+    ranges: Sequence[Tuple[int, Optional[int]]],
+    repo_type: str,
+    revision: str,
+    cache_dir: str,
+    headers: Dict[str, str],
+    proxies: Optional[Dict],
+    etag_timeout: float,
+    token: Union[bool, str, None],
+    local_files_only: bool,
+    endpoint: Optional[str],
+) -> Tuple[BinaryIO, int]:
+    """Make sure the given byte ranges of a file are in the cache and open it.
+
+    Ranges follow the same semantics as in [`hf_hub_download_range`]. Return the file opened in binary mode and the
+    size of the remote file. The opened file is either the complete blob or its sparse `.incomplete` file: only the
+    requested ranges are guaranteed to be present. The file is opened while holding the lock of the blob so that it can
+    be read even if it is completed (i.e. moved) by another process in the meantime.
+
+    Method should not be called directly. Please use `hf_hub_download_range` instead.
+    """
+    storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    # writable cache first, then read-only cache layers (see `HF_HUB_CACHE`)
+    storage_folders = [
+        storage_folder,
+        *_get_read_only_storage_folders(cache_dir, repo_id=repo_id, repo_type=repo_type),
+    ]
+    relative_filename = _get_relative_filename(filename)
+
+    # 1. File fully cached for a commit hash or a recently resolved revision => read from disk
+    for folder in storage_folders:
+        pointer_path = _get_cached_pointer_path_before_head_call(
+            folder, repo_id=repo_id, filename=filename, relative_filename=relative_filename, revision=revision
+        )
+        if pointer_path is not None:
+            return _open_file(pointer_path)
+
+    # 2. Get metadata from the Hub
+    (url_to_download, etag, commit_hash, expected_size, head_call_error) = _get_metadata_or_catch_error(
+        repo_id=repo_id,
+        filename=filename,
+        repo_type=repo_type,
+        revision=revision,
+        endpoint=endpoint,
+        proxies=proxies,
+        etag_timeout=etag_timeout,
+        headers=headers,
+        token=token,
+        local_files_only=local_files_only,
+        storage_folder=storage_folder,
+        relative_filename=relative_filename,
+    )
+
+    if head_call_error is not None:
+        # Couldn't make a HEAD call => only a fully cached file can be read
+        for folder in storage_folders:
+            pointer_path = _get_cached_pointer_path_after_head_call_error(folder, relative_filename, revision)
+            if pointer_path is not None:
+                return _open_file(pointer_path)
+        _raise_on_head_call_error(head_call_error, force_download=False, local_files_only=local_files_only)
+
+    assert etag is not None, "etag must have been retrieved from server"
+    assert commit_hash is not None, "commit_hash must have been retrieved from server"
+    assert url_to_download is not None, "file location must have been retrieved from server"
+    assert expected_size is not None, "expected_size must have been retrieved from server"
+    _cache_commit_hash_for_specific_revision(storage_folder, revision, commit_hash)
+
+    # 3. Blob already complete (maybe for another commit) => read from disk
+    for folder in storage_folders:
+        blob_path = os.path.join(folder, "blobs", etag)
+        if os.path.isfile(blob_path):
+            return open(blob_path, "rb"), expected_size
+
+    # 4. Fetch missing chunks in the sparse blob
+    file = _open_sparse_blob(
+        cache_dir=cache_dir,
+        repo_id=repo_id,
+        repo_type=repo_type,
+        filename=filename,
+        url=url_to_download,
+        etag=etag,
+        commit_hash=commit_hash,
+        expected_size=expected_size,
+        ranges=[slice(start, end).indices(expected_size)[:2] for start, end in ranges],
+        headers=headers,
+        proxies=proxies,
+    )
+    return file, expected_size
+
+
+def _open_sparse_blob(
+    *,
+    cache_dir: str,
+    repo_id: str,
+    repo_type: str,
+    filename: str,
+    url: str,
+    etag: str,
+    commit_hash: str,
+    expected_size: int,
+    ranges: Sequence[Tuple[int, int]],
+    headers: Dict[str, str],
+    proxies: Optional[Dict],
+) -> BinaryIO:
+    """Download the missing chunks covering `ranges` of a blob whose metadata are already known and open it.
+
+    `ranges` are `(start, end)` offsets, `end` excluded. Return the complete blob if it exists, the sparse
+    `.incomplete` file otherwise. Once all chunks have been downloaded, the blob is completed and linked in the
+    snapshot of `commit_hash`. Used by [`hf_hub_download_range`] and [`RemoteSafetensorsFile`] which resolves the file
+    metadata only once.
+    """
+    storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    blob_path = os.path.join(storage_folder, "blobs", etag)
+    pointer_path = _get_pointer_path(storage_folder, commit_hash, _get_relative_filename(filename))
+    lock_path = os.path.join(
+        cache_dir, ".locks", repo_folder_name(repo_id=repo_id, repo_type=repo_type), f"{etag}.lock"
+    )
+    if os.path.isfile(blob_path):
+        return open(blob_path, "rb")
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with WeakFileLock(lock_path):
+        if not os.path.isfile(blob_path):  # might have been completed by another process while waiting for the lock
+            _download_sparse_ranges(
+                url,
+                incomplete_path=Path(blob_path + ".incomplete"),
+                blob_path=Path(blob_path),
+                ranges=ranges,
+                expected_size=expected_size,
+                filename=filename,
+                headers=headers,
+                proxies=proxies,
+            )
+        if not os.path.isfile(blob_path):
+            return open(blob_path + ".incomplete", "rb")
+        # All chunks have been downloaded => blob is complete
+        if not os.path.exists(pointer_path):
+            os.makedirs(os.path.dirname(pointer_path), exist_ok=True)
+            _create_symlink(blob_path, pointer_path, new_blob=True)
+        return open(blob_path, "rb")
+
+
+def _download_sparse_ranges(
+    url: str,
+    *,
+    incomplete_path: Path,
+    blob_path: Path,
+    ranges: Sequence[Tuple[int, int]],
+    expected_size: int,
+    filename: str,
+    headers: Dict[str, str],
+    proxies: Optional[Dict],
+) -> None:
+    """Download the chunks covering `ranges` that are missing in `incomplete_path`.
+
+    Chunks are tracked in the `.parts` sidecar file, exactly as for an interrupted parallel download. Bytes already in
+    an incomplete file without sidecar (interrupted single-connection download) are recorded as completed. If the
+    server does not support range requests, the whole file is downloaded. If all chunks are downloaded, the file is
+    moved to `blob_path`.
+
+    Must be called while holding the lock of the blob.
+    """
+    parts = _load_or_create_parts(incomplete_path, expected_size)
+
+    # Chunks covering the requested ranges. Gaps of at most one chunk are downloaded as well to save a request.
+    spans: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        start = start // parts.chunk_size * parts.chunk_size
+        end = min(-(-end // parts.chunk_size) * parts.chunk_size, expected_size)
+        if spans and start - spans[-1][1] <= parts.chunk_size:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+
+    # Missing ranges are aligned on chunks => so are they once trimmed to the spans
+    ranges = []
+    for missing_start, missing_end in parts.missing_ranges(
+        max_range_size=constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE
+    ):
+        for span_start, span_end in spans:
+            if max(missing_start, span_start) < min(missing_end, span_end):
+                ranges.append((max(missing_start, span_start), min(missing_end, span_end)))
+
+    if ranges:
+        logger.info(f"Downloading {len(ranges)} range(s) of '{filename}' to '{incomplete_path}'")
+        response = _request_wrapper(
+            method="GET",
+            url=url,
+            stream=True,
+            proxies=proxies,
+            headers=_range_headers(headers, *ranges[0]),
+            timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+        )
+        hf_raise_for_status(response)
+        if response.status_code != 206:
+            logger.info("Server does not support range requests. Downloading the whole file.")
+            response.close()
+            parts.delete()
+            _download_to_tmp_and_move(
+                incomplete_path=incomplete_path,
+                destination_path=blob_path,
+                url_to_download=url,
+                proxies=proxies,
+                headers=headers,
+                expected_size=expected_size,
+                filename=filename,
+                force_download=True,
+            )
+            return
+
+        # Same as in `http_get`: if redirected to a CDN, fetch the next ranges from the final location without auth
+        ranges_url, ranges_headers = url, headers
+        if response.url != url and urlparse(response.url).netloc != urlparse(url).netloc:
+            ranges_url = response.url
+            ranges_headers = {key: value for key, value in headers.items() if key.lower() != "authorization"}
+
+        displayed_filename = filename if len(filename) <= 40 else f"(…){filename[-40:]}"
+        with tqdm(
+            unit="B",
+            unit_scale=True,
+            total=sum(range_end - range_start for range_start, range_end in ranges),
+            desc=displayed_filename,
+            disable=is_tqdm_disabled(logger.getEffectiveLevel()),
+            name="huggingface_hub.http_get",
+        ) as progress:
+            with incomplete_path.open("ab") as f:
+                _http_get_parallel(
+                    ranges_url,
+                    f,
+                    ranges=ranges,
+                    first_response=response,
+                    proxies=proxies,
+                    headers=ranges_headers,
+                    progress=progress,
+                    parts=parts,
+                    resolve_url=url if ranges_url != url else None,
+                    resolve_headers=headers,
+                )
+
+    if parts.is_done:
+        logger.info(f"All chunks of '{filename}' have been downloaded. Moving file to {blob_path}")
+        parts.delete()
+        _chmod_and_move(incomplete_path, blob_path)
+
+
+def _load_or_create_parts(incomplete_path: Path, expected_size: int) -> DownloadParts:
+    """Return the chunks tracker of a sparse blob, creating the incomplete file and its sidecar if needed."""
+    parts_path = get_parts_path(incomplete_path)
+    with incomplete_path.open("ab") as f:
+        resume_size = f.tell()
+    if parts_path.exists():
+        parts = DownloadParts.load(parts_path, size=expected_size)
+        if parts is not None and resume_size > 0:
+            return parts
+        logger.info(f"Removing incomplete file '{incomplete_path}' (invalid chunks file)")
+        os.truncate(incomplete_path, 0)
+        resume_size = 0
+    parts = DownloadParts(parts_path, size=expected_size, chunk_size=_SPARSE_CHUNK_SIZE)
+    parts.mark_completed(0, resume_size)  # single-connection download interrupted => contiguous prefix
+    parts.save()
+    return parts
+
+
+def _open_file(path: str) -> Tuple[BinaryIO, int]:
+    return open(path, "rb"), os.path.getsize(path)
@@ -0,0 +1,140 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains a scheduler to download many files of heterogeneous sizes concurrently.
+
+Used by `snapshot_download`. Files are downloaded largest first so that the biggest files do not end up being
+downloaded alone at the end of the run. Concurrency is limited both by the number of files (`max_workers`) and by
+the number of bytes in flight (`max_bytes_in_flight`). If `HF_HUB_ENABLE_PARALLEL_DOWNLOAD` is set, files that
+represent more than their fair share of the total (or that do not fit in the byte budget) are split into ranges
+downloaded concurrently (see `http_get`).
+"""
+
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from . import constants
+from .utils import logging
+from .utils._cache_manager import _format_size
+from .utils.tqdm import tqdm as hf_tqdm
+
+
+logger = logging.get_logger(__name__)
+
+
+def download_largest_first(
+    download_fn: Callable[[str, bool], Any],
+    files: Dict[str, int],
+    *,
+    max_workers: int,
+    max_bytes_in_flight: Optional[int] = None,
+    tqdm_class: Optional[Any] = None,
+    desc: Optional[str] = None,
+) -> None:
+    """Download `files` concurrently, largest first, with a budget of bytes in flight.
+
+    Args:
+        download_fn (`Callable[[str, bool], Any]`):
+            Function downloading a single file. Called with the filename and whether the file should be split into
+            ranges downloaded concurrently. Files are never split if `HF_HUB_ENABLE_PARALLEL_DOWNLOAD` is not set.
+        files (`Dict[str, int]`):
+            Mapping from filenames to their size in bytes. Use 0 if the size is unknown or if the file will not be
+            downloaded (e.g. already cached).
+        max_workers (`int`):
+            Maximum number of files downloaded at the same time.
+        max_bytes_in_flight (`int`, *optional*):
+            Maximum cumulated size of the files downloaded at the same time. A file larger than the budget is
+            downloaded alone. Defaults to no limit.
+        tqdm_class (`tqdm`, *optional*):
+            Class of the progress bar (one step per file). Defaults to the HF progress bar.
+        desc (`str`, *optional*):
+            Description of the progress bar.
+
+    Raises:
+        The first exception raised by `download_fn`. Once a download has failed, no new download is started.
+    """
+    pending: Deque[Tuple[str, int]] = collections.deque(
+        sorted(files.items(), key=lambda item: item[1], reverse=True)  # stable => listing order for equal sizes
+    )
+    total_size = sum(files.values())
+    nb_workers = max(1, min(max_workers, len(pending)))
+    condition = threading.Condition()
+    state = {"bytes_in_flight": 0, "bytes_done": 0, "failed": False}
+    start_time = time.monotonic()
+
+    def _should_split(size: int) -> bool:
+        if not constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD or size <= constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE:
+            return False
+        if max_bytes_in_flight is not None and size > max_bytes_in_flight:
+            return True
+        return size * nb_workers > total_size
+
+    def _next_file() -> Optional[Tuple[str, int, int]]:
+        with condition:
+            while not state["failed"] and pending:
+                filename, size = pending[0]
+                cost = size if max_bytes_in_flight is None else min(size, max_bytes_in_flight)
+                if (
+                    state["bytes_in_flight"] == 0
+                    or max_bytes_in_flight is None
+                    or state["bytes_in_flight"] + cost <= max_bytes_in_flight
+                ):
+                    pending.popleft()
+                    state["bytes_in_flight"] += cost
+                    return filename, size, cost
+                condition.wait()
+            return None
+
+    def _worker() -> None:
+        while True:
+            next_file = _next_file()
+            if next_file is None:
+                return
+            filename, size, cost = next_file
+            try:
+                download_fn(filename, _should_split(size))
+            except BaseException:
+                with condition:
+                    state["failed"] = True
+                raise
+            finally:
+                with condition:
+                    state["bytes_in_flight"] -= cost
+                    condition.notify_all()
+            with condition:
+                state["bytes_done"] += size
+                bytes_done = state["bytes_done"]
+                progress.update(1)
+                if bytes_done > 0:
+                    progress.set_postfix_str(_throughput(bytes_done, time.monotonic() - start_time), refresh=False)
+
+    with (tqdm_class or hf_tqdm)(total=len(pending), desc=desc) as progress:
+        with ThreadPoolExecutor(max_workers=nb_workers, thread_name_prefix="hf_snapshot_download") as executor:
+            futures = [executor.submit(_worker) for _ in range(nb_workers)]
+        for future in futures:
+            future.result()  # raise first exception, if any
+
+    if state["bytes_done"] > 0:
+        elapsed = time.monotonic() - start_time
+        logger.info(
+            f"Downloaded {len(files)} files ({_format_size(state['bytes_done'])}B) in {elapsed:.1f}s"
+            f" ({_throughput(state['bytes_done'], elapsed)})."
+        )
+
+
+def _throughput(nb_bytes: int, elapsed: float) -> str:
+    return f"{_format_size(int(nb_bytes / max(elapsed, 1e-3)))}B/s"
@@ -0,0 +1,134 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains an on-disk cache of repo directory listings, used by `HfFileSystem` if `HF_HUB_FS_LISTINGS_CACHE` is set.
+
+A listing at a given commit never changes, so listings are keyed by `(commit_hash, path)` and never expire. Branches and
+tags resolved to a commit hash are stored as well and trusted for `HF_HUB_REVISION_TTL` seconds. The cache is a sqlite
+database per repo (in `<cache>/.listings/`) so that it can be shared between processes, e.g. DataLoader workers.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from . import constants
+from .file_download import REGEX_COMMIT_HASH, repo_folder_name
+from .utils import logging
+
+
+logger = logging.get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS refs (revision TEXT PRIMARY KEY, commit_hash TEXT NOT NULL, resolved_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS listings (
+    commit_hash TEXT NOT NULL, path TEXT NOT NULL, entries TEXT NOT NULL, PRIMARY KEY (commit_hash, path)
+);
+"""
+
+
+class ListingsCache:
+    """Directory listings of a repo, stored in a sqlite database.
+
+    A listing is the list of the entries of a directory, each entry being a JSON-serializable dict with a `"path"` key
+    (relative to the repo root). Listings are only cached if they are complete.
+
+    The cache must never break a listing: any error (read-only file system, corrupted database, etc.) is logged and
+    treated as a cache miss.
+    """
+
+    def __init__(self, repo_type: str, repo_id: str, cache_dir: Optional[str] = None) -> None:
+        cache_dir = cache_dir if cache_dir is not None else constants.HF_HUB_CACHE
+        self.path = os.path.join(
+            cache_dir,
+            constants.LISTINGS_CACHE_DIR_NAME,
+            repo_folder_name(repo_id=repo_id, repo_type=repo_type) + ".db",
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # A connection per operation: `HfFileSystem` instances are shared between threads and forked processes
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def get_commit_hash(self, revision: str) -> Optional[str]:
+        """Return the commit hash of `revision` if it can be trusted without calling the Hub, None otherwise.
+
+        A commit hash is always trusted once it is known to exist. A branch or tag is trusted if it has been resolved
+        less than `HF_HUB_REVISION_TTL` seconds ago.
+        """
+        is_commit_hash = REGEX_COMMIT_HASH.match(revision) is not None
+        if not is_commit_hash and constants.HF_HUB_REVISION_TTL <= 0:
+            return None
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute(
+                    "SELECT commit_hash, resolved_at FROM refs WHERE revision = ?", (revision,)
+                ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Could not read listings cache {self.path}: {e}")
+            return None
+        if row is None:
+            return None
+        commit_hash, resolved_at = row
+        if not is_commit_hash and time.time() - resolved_at > constants.HF_HUB_REVISION_TTL:
+            return None
+        return commit_hash
+
+    def set_commit_hash(self, revision: str, commit_hash: str) -> None:
+        """Remember that `revision` points to `commit_hash` (now)."""
+        self._write("INSERT OR REPLACE INTO refs VALUES (?, ?, ?)", [(revision, commit_hash, time.time())])
+
+    def delete_commit_hash(self, revision: str) -> None:
+        """Forget the commit hash of `revision`, e.g. after a commit has been pushed to it."""
+        self._write("DELETE FROM refs WHERE revision = ?", [(revision,)])
+
+    def get_listings(self, commit_hash: str, path: str, recursive: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Return the cached listings of `path` (and of all its subdirectories if `recursive`), keyed by directory.
+
+        Subdirectories that are not cached are missing from the output. The caller is responsible for checking the
+        listing is complete.
+        """
+        query = "SELECT path, entries FROM listings WHERE commit_hash = ? AND path = ?"
+        params = [commit_hash, path]
+        if recursive:
+            prefix = path + "/" if path else ""
+            query = "SELECT path, entries FROM listings WHERE commit_hash = ? AND (path = ? OR substr(path, 1, ?) = ?)"
+            params += [len(prefix), prefix]  # type: ignore[list-item]
+        try:
+            with closing(self._connect()) as connection:
+                rows = connection.execute(query, params).fetchall()
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Could not read listings cache {self.path}: {e}")
+            return {}
+        return {dir_path: json.loads(entries) for dir_path, entries in rows}
+
+    def set_listings(self, commit_hash: str, listings: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Store complete listings, keyed by directory path."""
+        self._write(
+            "INSERT OR REPLACE INTO listings VALUES (?, ?, ?)",
+            [(commit_hash, dir_path, json.dumps(entries)) for dir_path, entries in listings.items()],
+        )
+
+    def _write(self, query: str, rows: List[tuple]) -> None:
+        try:
+            with closing(self._connect()) as connection:
+                with connection:  # commit in a single transaction
+                    connection.executemany(query, rows)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug(f"Could not write listings cache {self.path}: {e}")
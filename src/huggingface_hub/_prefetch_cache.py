@@ -0,0 +1,156 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains a read-ahead cache for `HfFileSystemFile`, used with `fs.open(path, cache_type="prefetch")`.
+
+When a file is read sequentially (tar shards, jsonl, CSV, etc.), the next blocks are fetched in background threads
+while the current one is consumed. The number of blocks in flight (the "window") starts at 1 and doubles each time the
+reader has to wait for a block, i.e. each time blocks are consumed faster than they are fetched. It is capped by a
+memory budget. Random accesses stop the read-ahead until the reads are sequential again.
+"""
+
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from fsspec.caching import BaseCache
+
+from . import constants
+from .utils import logging
+
+
+logger = logging.get_logger(__name__)
+
+# Maximum number of bytes held by the read-ahead of a file (blocks in flight and blocks not consumed yet).
+_DEFAULT_MAX_PREFETCH_SIZE = 64 * 1024 * 1024
+
+
+class PrefetchCache(BaseCache):
+    """fsspec cache fetching the next blocks of a file in background threads when it is read sequentially.
+
+    Args:
+        blocksize (`int`):
+            Size of the blocks fetched from the remote file.
+        fetcher (`Callable[[int, int], bytes]`):
+            Function fetching the bytes between `start` and `end` (excluded) of the remote file.
+        size (`int`):
+            Size of the remote file.
+        max_prefetch_size (`int`, *optional*):
+            Memory budget of the read-ahead, in bytes. Defaults to 64MB. At least one block is always prefetched.
+        max_workers (`int`, *optional*):
+            Maximum number of blocks fetched concurrently. Defaults to `HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY`.
+    """
+
+    name = "prefetch"
+
+    def __init__(
+        self,
+        blocksize: int,
+        fetcher: Callable[[int, int], bytes],
+        size: int,
+        max_prefetch_size: int = _DEFAULT_MAX_PREFETCH_SIZE,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        super().__init__(blocksize, fetcher, size)
+        self.nblocks = -(-size // blocksize)
+        self.max_workers = max_workers or constants.HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY
+        self.max_window = max(1, min(max_prefetch_size // blocksize, self.max_workers))
+        self.window = 1
+        self._blocks: Dict[int, "Future[bytes]"] = {}
+        self._last_block: Optional[int] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _fetch(self, start: Optional[int], stop: Optional[int]) -> bytes:
+        start = start or 0
+        end: int = self.size if stop is None else min(stop, self.size)
+        if start >= end:
+            return b""
+        first_block, last_block = start // self.blocksize, (end - 1) // self.blocksize
+
+        sequential = self._last_block is not None and first_block in (self._last_block, self._last_block + 1)
+        if not sequential:
+            # Random access => drop the read-ahead
+            self.window = 1
+            for block_number in list(self._blocks):
+                if not first_block <= block_number <= last_block:
+                    self._blocks.pop(block_number).cancel()
+        else:
+            # Blocks already consumed are not needed anymore
+            for block_number in list(self._blocks):
+                if block_number < first_block:
+                    self._blocks.pop(block_number).cancel()
+
+        chunks: List[bytes] = []
+        for block_number in range(first_block, last_block + 1):
+            chunks.append(self._get_block(block_number))
+        self._last_block = last_block
+
+        if sequential:
+            self._prefetch(last_block + 1, last_block + 1 + self.window)
+
+        first_block_start = first_block * self.blocksize
+        data = b"".join(chunks) if len(chunks) > 1 else chunks[0]
+        return data[start - first_block_start : end - first_block_start]
+
+    def _get_block(self, block_number: int) -> bytes:
+        future = self._blocks.get(block_number)
+        if future is None:
+            self.miss_count += 1
+            data = self._fetch_block(block_number)
+            self._blocks[block_number] = _completed_future(data)
+            return data
+
+        self.hit_count += 1
+        if not future.done() and self.window < self.max_window:
+            # Reader waits for the read-ahead => fetch further ahead
+            self.window = min(2 * self.window, self.max_window)
+            logger.debug(f"Read-ahead window increased to {self.window} blocks")
+        try:
+            return future.result()
+        except Exception as e:
+            # Retry in the reader's thread so that a persistent error is raised there
+            logger.debug(f"Failed to prefetch block {block_number}, fetching it again: {e}")
+            data = self._fetch_block(block_number)
+            self._blocks[block_number] = _completed_future(data)
+            return data
+
+    def _fetch_block(self, block_number: int) -> bytes:
+        start = block_number * self.blocksize
+        end = min(start + self.blocksize, self.size)
+        self.total_requested_bytes += end - start
+        return self.fetcher(start, end)
+
+    def _prefetch(self, first_block: int, end_block: int) -> None:
+        end_block = min(end_block, self.nblocks)
+        if first_block >= end_block:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hf-prefetch")
+            weakref.finalize(self, self._executor.shutdown, wait=False)
+        for block_number in range(first_block, end_block):
+            if block_number not in self._blocks:
+                self._blocks[block_number] = self._executor.submit(self._fetch_block, block_number)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Threads and pending blocks are not picklable (e.g. file sent to a DataLoader worker)
+        state = self.__dict__.copy()
+        state["_blocks"] = {}
+        state["_executor"] = None
+        return state
+
+
+def _completed_future(data: bytes) -> "Future[bytes]":
+    future: "Future[bytes]" = Future()
+    future.set_result(data)
+    return future
@@ -0,0 +1,349 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains `hf_hub_read_bytes` to load small files from the Hub directly in memory.
+
+Files are kept in a process-wide LRU cache keyed by `(endpoint, repo_type, repo_id, commit_hash, filename)`. On a miss,
+the disk cache is used if the file has already been downloaded with `hf_hub_download`. Otherwise the file is fetched
+from the Hub without being written to disk.
+"""
+
+import collections
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, OrderedDict, Tuple, Union
+
+from . import constants
+from .errors import EntryNotFoundError
+from .file_download import (
+    REGEX_COMMIT_HASH,
+    _get_cached_pointer_path_after_head_call_error,
+    _get_fresh_commit_hash_for_revision,
+    _get_metadata_or_catch_error,
+    _get_pointer_path,
+    _get_read_only_storage_folders,
+    _get_relative_filename,
+    _raise_on_head_call_error,
+    _request_wrapper,
+    repo_folder_name,
+)
+from .utils import build_hf_headers, hf_raise_for_status, logging, validate_hf_hub_args
+
+
+logger = logging.get_logger(__name__)
+
+_CacheKey = Tuple[str, str, str, str, str]  # (endpoint, repo_type, repo_id, commit_hash, filename)
+_RefKey = Tuple[str, str, str, str]  # (endpoint, repo_type, repo_id, revision)
+
+
+class _BytesLRUCache:
+    """Thread-safe LRU cache of file contents, bounded by the total number of bytes it holds.
+
+    Branches and tags resolved to a commit hash are remembered as well. They are trusted for `HF_HUB_REVISION_TTL`
+    seconds, the same way refs are trusted on disk.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[_CacheKey, bytes] = collections.OrderedDict()
+        self._refs: Dict[_RefKey, Tuple[str, float]] = {}
+
+    def get(self, key: _CacheKey) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+            return content
+
+    def put(self, key: _CacheKey, content: bytes) -> None:
+        if len(content) > self.max_size:
+            return  # never evict the whole cache for a single file
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = content
+            self.size += len(content)
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get_ref(self, key: _RefKey, *, max_age: Optional[float]) -> Optional[str]:
+        """Return the commit hash `key` has been resolved to, if resolved less than `max_age` seconds ago."""
+        with self._lock:
+            ref = self._refs.get(key)
+        if ref is None:
+            return None
+        commit_hash, resolved_at = ref
+        if max_age is not None and time.monotonic() - resolved_at > max_age:
+            return None
+        return commit_hash
+
+    def set_ref(self, key: _RefKey, commit_hash: str) -> None:
+        with self._lock:
+            self._refs[key] = (commit_hash, time.monotonic())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._refs.clear()
+            self.size = 0
+
+
+_MEMORY_CACHE = _BytesLRUCache(max_size=constants.HF_HUB_MEMORY_CACHE_SIZE)
+
+
+@validate_hf_hub_args
+def hf_hub_read_bytes(
+    repo_id: str,
+    filename: str,
+    *,
+    subfolder: Optional[str] = None,
+    repo_type: Optional[str] = None,
+    revision: Optional[str] = None,
+    library_name: Optional[str] = None,
+    library_version: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+    user_agent: Union[Dict, str, None] = None,
+    proxies: Optional[Dict] = None,
+    etag_timeout: float = constants.DEFAULT_ETAG_TIMEOUT,
+    token: Union[bool, str, None] = None,
+    local_files_only: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+    endpoint: Optional[str] = None,
+) -> bytes:
+    """Read the content of a file from the Hub, without writing it to disk.
+
+    This is meant for small files read repeatedly (e.g. `config.json`). Contents are kept in a process-wide LRU cache,
+    keyed by endpoint, repo, commit hash and filename, whose size is bounded by `HF_HUB_MEMORY_CACHE_SIZE` (64MB by
+    default). Files larger than this limit are read but not kept in memory. On a cache miss, the file is read from the
+    disk cache if it has already been downloaded with [`hf_hub_download`]. Otherwise it is fetched from the Hub, without
+    creating any file in the cache.
+
+    As for [`hf_hub_download`], a HEAD call is made to resolve `revision` unless it is a commit hash or it has been
+    resolved less than `HF_HUB_REVISION_TTL` seconds ago. If the Hub cannot be reached, the last known version of the
+    file is returned.
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        filename (`str`):
+            The name of the file in the repo.
+        subfolder (`str`, *optional*):
+            An optional value corresponding to a folder inside the repo.
+        repo_type (`str`, *optional*):
+            Set to `"dataset"` or `"space"` if reading from a dataset or space, `None` or `"model"` if reading from a
+            model. Default is `None`.
+        revision (`str`, *optional*):
+            An optional Git revision id which can be a branch name, a tag, or a commit hash.
+        library_name (`str`, *optional*):
+            The name of the library to which the object corresponds.
+        library_version (`str`, *optional*):
+            The version of the library.
+        cache_dir (`str`, `Path`, *optional*):
+            Path to the folder where cached files are stored. Only read, never written.
+        user_agent (`dict`, `str`, *optional*):
+            The user-agent info in the form of a dictionary or a string.
+        proxies (`dict`, *optional*):
+            Dictionary mapping protocol to the URL of the proxy passed to `requests.request`.
+        etag_timeout (`float`, *optional*, defaults to `10`):
+            When fetching ETag, how many seconds to wait for the server to send data before giving up which is passed
+            to `requests.request`.
+        token (`str`, `bool`, *optional*):
+            A token to be used for the download.
+                - If `True`, the token is read from the HuggingFace config folder.
+                - If a string, it's used as the authentication token.
+        local_files_only (`bool`, *optional*, defaults to `False`):
+            If `True`, avoid making any HTTP call and only look in the memory and disk caches.
+        headers (`dict`, *optional*):
+            Additional headers to be sent with the request.
+        endpoint (`str`, *optional*):
+            Hugging Face Hub base url. Will default to https://huggingface.co/. Otherwise, one can set the
+            `HF_ENDPOINT` environment variable.
+
+    Returns:
+        `bytes`: The content of the file.
+
+    Raises:
+        [`~utils.RepositoryNotFoundError`]
+            If the repository to download from cannot be found. This may be because it doesn't exist, because
+            `repo_type` is not set correctly, or because the repo is `private` and you do not have access.
+        [`~utils.RevisionNotFoundError`]
+            If the revision to download from cannot be found.
+        [`~utils.EntryNotFoundError`]
+            If the file to download cannot be found.
+        [`~utils.LocalEntryNotFoundError`]
+            If network is disabled or unavailable and file is not found in cache.
+
+    Example:
+
+    ```python
+    >>> import json
+    >>> from huggingface_hub import hf_hub_read_bytes
+    >>> config = json.loads(hf_hub_read_bytes("openai-community/gpt2", "config.json"))
+    ```
+    """
+    if constants.HF_HUB_ETAG_TIMEOUT != constants.DEFAULT_ETAG_TIMEOUT:
+        # Respect environment variable above user value
+        etag_timeout = constants.HF_HUB_ETAG_TIMEOUT
+
+    if cache_dir is None:
+        cache_dir = constants.HF_HUB_CACHE
+    if revision is None:
+        revision = constants.DEFAULT_REVISION
+    if isinstance(cache_dir, Path):
+        cache_dir = str(cache_dir)
+
+    if subfolder == "":
+        subfolder = None
+    if subfolder is not None:
+        filename = f"{subfolder}/{filename}"
+
+    if repo_type is None:
+        repo_type = "model"
+    if repo_type not in constants.REPO_TYPES:
+        raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(constants.REPO_TYPES)}")
+
+    # Same repo on two endpoints (e.g. the Hub and a mirror) can have different contents => kept apart in memory
+    cache_endpoint = (endpoint or constants.ENDPOINT).rstrip("/")
+
+    storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    # writable cache first, then read-only cache layers (see `HF_HUB_CACHE`)
+    storage_folders = [
+        storage_folder,
+        *_get_read_only_storage_folders(cache_dir, repo_id=repo_id, repo_type=repo_type),
+    ]
+    relative_filename = _get_relative_filename(filename)
+    ref_key: _RefKey = (cache_endpoint, repo_type, repo_id, revision)
+
+    # 1. Revision is known without calling the Hub => read from memory or disk cache
+    commit_hash = _get_trusted_commit_hash(storage_folder, ref_key)
+    if commit_hash is not None:
+        content = _read_from_caches(
+            storage_folders, (cache_endpoint, repo_type, repo_id, commit_hash, filename), relative_filename
+        )
+        if content is not None:
+            return content
+        if any(
+            os.path.isfile(os.path.join(folder, ".no_exist", commit_hash, relative_filename))
+            for folder in storage_folders
+        ):
+            raise EntryNotFoundError(
+                f"File '{filename}' does not exist in {repo_id} at revision '{revision}' ({commit_hash}). "
+                "Non-existence of the file has been cached locally."
+            )
+
+    # 2. Resolve revision on the Hub. `storage_folder` is not passed to avoid writing to the cache.
+    hf_headers = build_hf_headers(
+        token=token,
+        library_name=library_name,
+        library_version=library_version,
+        user_agent=user_agent,
+        headers=headers,
+    )
+    (url_to_download, etag, commit_hash, expected_size, head_call_error) = _get_metadata_or_catch_error(
+        repo_id=repo_id,
+        filename=filename,
+        repo_type=repo_type,
+        revision=revision,
+        endpoint=endpoint,
+        proxies=proxies,
+        etag_timeout=etag_timeout,
+        headers=hf_headers,
+        token=token,
+        local_files_only=local_files_only,
+    )
+
+    if head_call_error is not None:
+        # Couldn't make a HEAD call => return the last known version, from memory or disk
+        last_commit_hash = _MEMORY_CACHE.get_ref(ref_key, max_age=None)
+        if last_commit_hash is not None:
+            content = _MEMORY_CACHE.get((cache_endpoint, repo_type, repo_id, last_commit_hash, filename))
+            if content is not None:
+                return content
+        for folder in storage_folders:
+            pointer_path = _get_cached_pointer_path_after_head_call_error(folder, relative_filename, revision)
+            if pointer_path is not None:
+                with open(pointer_path, "rb") as f:
+                    return f.read()
+        _raise_on_head_call_error(head_call_error, force_download=False, local_files_only=local_files_only)
+
+    assert etag is not None, "etag must have been retrieved from server"
+    assert commit_hash is not None, "commit_hash must have been retrieved from server"
+    assert url_to_download is not None, "file location must have been retrieved from server"
+    if commit_hash != revision:
+        _MEMORY_CACHE.set_ref(ref_key, commit_hash)
+
+    # 3. Look again in memory and on disk, now that the commit hash is known
+    key: _CacheKey = (cache_endpoint, repo_type, repo_id, commit_hash, filename)
+    content = _read_from_caches(storage_folders, key, relative_filename)
+    if content is not None:
+        return content
+    for folder in storage_folders:
+        blob_path = os.path.join(folder, "blobs", etag)
+        if os.path.isfile(blob_path):
+            with open(blob_path, "rb") as f:
+                content = f.read()
+            _MEMORY_CACHE.put(key, content)
+            return content
+
+    # 4. Download content in memory
+    logger.info(f"Reading '{filename}' from {repo_id} in memory.")
+    response = _request_wrapper(
+        method="GET",
+        url=url_to_download,
+        headers=hf_headers,
+        proxies=proxies,
+        timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+    )
+    hf_raise_for_status(response)
+    content = response.content
+    if expected_size is not None and len(content) != expected_size:
+        raise EnvironmentError(
+            f"Consistency check failed: file should be of size {expected_size} but has size {len(content)}"
+            f" ({filename}).\nThis is usually due to network issues. Please retry."
+        )
+    _MEMORY_CACHE.put(key, content)
+    return content
+
+
+def _get_trusted_commit_hash(storage_folder: str, ref_key: _RefKey) -> Optional[str]:
+    """Return the commit hash of a revision if it can be trusted without calling the Hub, None otherwise."""
+    revision = ref_key[3]
+    if REGEX_COMMIT_HASH.match(revision):
+        return revision
+    if constants.HF_HUB_REVISION_TTL <= 0:
+        return None
+    return _MEMORY_CACHE.get_ref(
+        ref_key, max_age=constants.HF_HUB_REVISION_TTL
+    ) or _get_fresh_commit_hash_for_revision(storage_folder, revision)
+
+
+def _read_from_caches(storage_folders: List[str], key: _CacheKey, relative_filename: str) -> Optional[bytes]:
+    """Read a file from the memory cache, or from the disk caches (and keep it in memory). Return None if not cached."""
+    content = _MEMORY_CACHE.get(key)
+    if content is not None:
+        return content
+    for storage_folder in storage_folders:
+        pointer_path = _get_pointer_path(storage_folder, key[3], relative_filename)
+        if os.path.isfile(pointer_path):
+            with open(pointer_path, "rb") as f:
+                content = f.read()
+            _MEMORY_CACHE.put(key, content)
+            return content
+    return None
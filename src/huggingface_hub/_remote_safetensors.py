@@ -0,0 +1,439 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains `RemoteSafetensorsFile` to read tensors from a safetensors file on the Hub without downloading it.
+
+Bytes are read by blocks. Blocks are kept in a per-file LRU cache in memory and in the sparse blob of the file in the
+HF cache (see `_download_range.py`), so only the bytes actually touched are downloaded, once.
+"""
+
+import collections
+import json
+import math
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Literal, Optional, OrderedDict, Sequence, Tuple, Union
+
+from . import _download_range, constants
+from .errors import HfHubHTTPError, SafetensorsParsingError
+from .file_download import (
+    _get_cached_pointer_path_before_head_call,
+    _get_relative_filename,
+    get_hf_file_metadata,
+    hf_hub_url,
+    repo_folder_name,
+)
+from .utils import (
+    SafetensorsFileMetadata,
+    TensorInfo,
+    build_hf_headers,
+    is_numpy_available,
+    is_torch_available,
+    logging,
+    validate_hf_hub_args,
+)
+
+
+logger = logging.get_logger(__name__)
+
+# Safetensors dtypes => numpy dtypes (little-endian). BF16 and F8 types are not supported by numpy.
+_NUMPY_DTYPES = {
+    "BOOL": "bool",
+    "U8": "u1",
+    "I8": "i1",
+    "U16": "<u2",
+    "I16": "<i2",
+    "U32": "<u4",
+    "I32": "<i4",
+    "U64": "<u8",
+    "I64": "<i8",
+    "F16": "<f2",
+    "F32": "<f4",
+    "F64": "<f8",
+}
+
+# Safetensors dtypes => torch dtypes names. Some of them are not available in older versions of torch.
+_TORCH_DTYPES = {
+    "BOOL": "bool",
+    "U8": "uint8",
+    "I8": "int8",
+    "U16": "uint16",
+    "I16": "int16",
+    "U32": "uint32",
+    "I32": "int32",
+    "U64": "uint64",
+    "I64": "int64",
+    "F16": "float16",
+    "BF16": "bfloat16",
+    "F32": "float32",
+    "F64": "float64",
+    "F8_E4M3": "float8_e4m3fn",
+    "F8_E5M2": "float8_e5m2",
+}
+
+
+class _BlockLRUCache:
+    """Thread-safe LRU cache of the blocks of a file, bounded by the total number of bytes it holds."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self._lock = threading.Lock()
+        self._blocks: OrderedDict[int, bytes] = collections.OrderedDict()
+
+    def get(self, index: int) -> Optional[bytes]:
+        with self._lock:
+            block = self._blocks.get(index)
+            if block is not None:
+                self._blocks.move_to_end(index)
+            return block
+
+    def put(self, index: int, block: bytes) -> None:
+        if len(block) > self.max_size:
+            return
+        with self._lock:
+            previous = self._blocks.pop(index, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._blocks[index] = block
+            self.size += len(block)
+            while self.size > self.max_size:
+                _, evicted = self._blocks.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self.size = 0
+
+
+class RemoteSafetensorsFile:
+    """Read tensors from a safetensors file on the Hub, downloading only the bytes that are accessed.
+
+    This is the remote equivalent of `safetensors.safe_open`: tensors are listed from the header of the file and each
+    tensor (or slice of a tensor) is downloaded on demand, using range requests. Bytes are read by blocks of 1MB.
+    Blocks are kept in memory in an LRU cache (bounded by `memory_cache_size`) and on disk in the HF cache as a sparse
+    file (see [`hf_hub_download_range`]). Reading the same tensor again doesn't download anything and a later
+    [`hf_hub_download`] of the file only downloads the blocks that were not read. If the file is already in the cache,
+    it is read from disk.
+
+    The file metadata are resolved once when the object is created: all reads are made at the same commit.
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        filename (`str`, *optional*):
+            The name of the safetensors file in the repo. Defaults to `"model.safetensors"`.
+        framework (`str`, *optional*):
+            The framework of the returned tensors: `"np"` for numpy arrays (default) or `"pt"` for torch tensors.
+            `BF16` and `F8` tensors can only be read with `"pt"`.
+        repo_type (`str`, *optional*):
+            Set to `"dataset"` or `"space"` if the file is in a dataset or space, `None` or `"model"` if in a
+            model. Default is `None`.
+        revision (`str`, *optional*):
+            An optional Git revision id which can be a branch name, a tag, or a commit hash.
+        cache_dir (`str`, `Path`, *optional*):
+            Path to the folder where cached files are stored.
+        token (`str`, `bool`, *optional*):
+            A token to be used for the download.
+                - If `True`, the token is read from the HuggingFace config folder.
+                - If a string, it's used as the authentication token.
+        endpoint (`str`, *optional*):
+            Hugging Face Hub base url. Will default to https://huggingface.co/. Otherwise, one can set the
+            `HF_ENDPOINT` environment variable.
+        memory_cache_size (`int`, *optional*):
+            Maximum number of bytes kept in memory. Defaults to `HF_HUB_MEMORY_CACHE_SIZE` (64MB).
+
+    Raises:
+        [`SafetensorsParsingError`]
+            If the header of the file couldn't be parsed correctly.
+
+    Example:
+    ```py
+    >>> from huggingface_hub import RemoteSafetensorsFile
+    >>> with RemoteSafetensorsFile("openai-community/gpt2", framework="pt") as f:
+    ...     print(len(f.keys()))
+    ...     wte = f.get_tensor("wte.weight")  # downloads ~150MB instead of ~550MB
+    ...     first_rows = f.get_slice("wpe.weight")[:10]  # downloads only the first 10 rows
+    160
+    ```
+    """
+
+    @validate_hf_hub_args
+    def __init__(
+        self,
+        repo_id: str,
+        filename: str = constants.SAFETENSORS_SINGLE_FILE,
+        *,
+        framework: Literal["np", "pt"] = "np",
+        repo_type: Optional[str] = None,
+        revision: Optional[str] = None,
+        cache_dir: Union[str, Path, None] = None,
+        token: Union[bool, str, None] = None,
+        endpoint: Optional[str] = None,
+        memory_cache_size: Optional[int] = None,
+    ) -> None:
+        if framework not in ("np", "pt"):
+            raise ValueError(f"Invalid framework: '{framework}'. Must be one of 'np' or 'pt'.")
+        if framework == "np" and not is_numpy_available():
+            raise ImportError("Please install numpy to read tensors as numpy arrays (`pip install numpy`).")
+        if framework == "pt" and not is_torch_available():
+            raise ImportError("Please install torch to read tensors as torch tensors (`pip install torch`).")
+        if repo_type is None:
+            repo_type = constants.REPO_TYPE_MODEL
+        if repo_type not in constants.REPO_TYPES:
+            raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(constants.REPO_TYPES)}")
+
+        self.repo_id = repo_id
+        self.filename = filename
+        self.framework = framework
+        self.repo_type = repo_type
+        self._cache_dir = str(cache_dir or constants.HF_HUB_CACHE)
+        self._headers = build_hf_headers(token=token)
+        self._block_size = _download_range._SPARSE_CHUNK_SIZE
+        self._blocks = _BlockLRUCache(
+            max_size=memory_cache_size if memory_cache_size is not None else constants.HF_HUB_MEMORY_CACHE_SIZE
+        )
+
+        # Resolve the file once: either fully cached or remote at a fixed commit
+        revision = revision or constants.DEFAULT_REVISION
+        storage_folder = os.path.join(self._cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+        self._local_path = _get_cached_pointer_path_before_head_call(
+            storage_folder,
+            repo_id=repo_id,
+            filename=filename,
+            relative_filename=_get_relative_filename(filename),
+            revision=revision,
+        )
+        if self._local_path is not None:
+            self.size = os.path.getsize(self._local_path)
+        else:
+            file_metadata = get_hf_file_metadata(
+                hf_hub_url(repo_id, filename, repo_type=repo_type, revision=revision, endpoint=endpoint),
+                token=token,
+            )
+            if file_metadata.commit_hash is None or file_metadata.etag is None or file_metadata.size is None:
+                raise EnvironmentError(
+                    f"Could not resolve '{filename}' in '{repo_id}': missing commit hash, etag or size in the"
+                    " response."
+                )
+            self._commit_hash = file_metadata.commit_hash
+            self._etag = file_metadata.etag
+            # The location is usually a signed URL that expires => resolved again at the same commit when rejected
+            self._url = file_metadata.location
+            self._resolve_url = hf_hub_url(
+                repo_id, filename, repo_type=repo_type, revision=self._commit_hash, endpoint=endpoint
+            )
+            self._token = token
+            self.size = file_metadata.size
+
+        # Parse header
+        header_size = struct.unpack("<Q", self._read(0, 8))[0]
+        if header_size > constants.SAFETENSORS_MAX_HEADER_LENGTH:
+            raise SafetensorsParsingError(
+                f"Failed to parse safetensors header for '{filename}' (repo '{repo_id}', revision '{revision}'): "
+                f"safetensors header is too big. Maximum supported size is {constants.SAFETENSORS_MAX_HEADER_LENGTH} "
+                f"bytes (got {header_size})."
+            )
+        try:
+            header = json.loads(self._read(8, 8 + header_size).decode(errors="ignore"))
+            self._data_start = 8 + header_size
+            self._metadata = SafetensorsFileMetadata(
+                metadata=header.pop("__metadata__", {}),
+                tensors={
+                    name: TensorInfo(
+                        dtype=tensor["dtype"],
+                        shape=tensor["shape"],
+                        data_offsets=tuple(tensor["data_offsets"]),  # type: ignore
+                    )
+                    for name, tensor in header.items()
+                },
+            )
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError) as e:
+            raise SafetensorsParsingError(
+                f"Failed to parse safetensors header for '{filename}' (repo '{repo_id}', revision '{revision}'): "
+                "header format not recognized. Please make sure this is a correctly formatted safetensors file."
+            ) from e
+
+    def __enter__(self) -> "RemoteSafetensorsFile":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._blocks.clear()
+
+    def __repr__(self) -> str:
+        return (
+            f"RemoteSafetensorsFile(repo_id='{self.repo_id}', filename='{self.filename}', tensors={len(self.keys())})"
+        )
+
+    def keys(self) -> List[str]:
+        """Return the names of the tensors in the file, in the order of their data."""
+        return sorted(self._metadata.tensors, key=lambda name: self._metadata.tensors[name].data_offsets)
+
+    def metadata(self) -> Dict[str, str]:
+        """Return the metadata stored in the header of the file (`__metadata__`)."""
+        return self._metadata.metadata
+
+    def get_tensor(self, name: str) -> Any:
+        """Download and return a tensor as a numpy array or a torch tensor, depending on `framework`."""
+        info = self._get_info(name)
+        buffer = self._read(self._data_start + info.data_offsets[0], self._data_start + info.data_offsets[1])
+        return self._to_tensor(buffer, info.dtype, info.shape)
+
+    def get_slice(self, name: str) -> "RemoteSafetensorsSlice":
+        """Return a lazy view of a tensor. Indexing it downloads only the rows it needs.
+
+        Example:
+        ```py
+        >>> tensor_slice = f.get_slice("model.embed_tokens.weight")
+        >>> tensor_slice.get_shape()
+        [128256, 4096]
+        >>> rows = tensor_slice[1000:1010]  # downloads 10 rows only
+        ```
+        """
+        return RemoteSafetensorsSlice(self, name, self._get_info(name))
+
+    def _get_info(self, name: str) -> TensorInfo:
+        try:
+            return self._metadata.tensors[name]
+        except KeyError:
+            raise KeyError(f"Tensor '{name}' not found in '{self.filename}' ({self.repo_id}).") from None
+
+    def _to_tensor(self, buffer: bytearray, dtype: str, shape: Sequence[int]) -> Any:
+        if self.framework == "np":
+            import numpy as np
+
+            if dtype not in _NUMPY_DTYPES:
+                raise ValueError(f"dtype '{dtype}' is not supported by numpy. Please use `framework='pt'` instead.")
+            return np.frombuffer(buffer, dtype=_NUMPY_DTYPES[dtype]).reshape(shape)
+
+        import torch
+
+        torch_dtype = getattr(torch, _TORCH_DTYPES.get(dtype, ""), None)
+        if torch_dtype is None:
+            raise ValueError(f"dtype '{dtype}' is not supported by your version of torch.")
+        if len(buffer) == 0:
+            return torch.empty(shape, dtype=torch_dtype)
+        return torch.frombuffer(buffer, dtype=torch_dtype).reshape(shape)
+
+    def _read(self, start: int, end: int) -> bytearray:
+        """Read the `[start, end)` bytes of the file, from the memory cache, the disk cache or the Hub."""
+        buffer = bytearray(max(end - start, 0))
+        if end <= start:
+            return buffer
+        block_size = self._block_size
+        missing = []
+        for index in range(start // block_size, (end - 1) // block_size + 1):
+            block = self._blocks.get(index)
+            if block is None:
+                missing.append(index)
+            else:
+                _copy_block(buffer, start, end, index * block_size, block)
+        if len(missing) > 0:
+            with self._open(
+                [(index * block_size, min((index + 1) * block_size, self.size)) for index in missing]
+            ) as f:
+                for index in missing:
+                    f.seek(index * block_size)
+                    block = f.read(min(block_size, self.size - index * block_size))
+                    _copy_block(buffer, start, end, index * block_size, block)
+                    self._blocks.put(index, block)
+        return buffer
+
+    def _open(self, ranges: List[Tuple[int, int]]) -> BinaryIO:
+        if self._local_path is not None:
+            return open(self._local_path, "rb")
+        try:
+            return self._open_sparse_blob(ranges)
+        except HfHubHTTPError as e:
+            if e.response is None or e.response.status_code != 403 or self._url == self._resolve_url:
+                raise
+            # Signed URL has expired (e.g. file kept open for a long time) => resolve it again and retry once
+            logger.info(f"Location of '{self.filename}' has been rejected (403). Resolving it again.")
+            self._url = get_hf_file_metadata(self._resolve_url, token=self._token).location
+            return self._open_sparse_blob(ranges)
+
+    def _open_sparse_blob(self, ranges: List[Tuple[int, int]]) -> BinaryIO:
+        return _download_range._open_sparse_blob(
+            cache_dir=self._cache_dir,
+            repo_id=self.repo_id,
+            repo_type=self.repo_type,
+            filename=self.filename,
+            url=self._url,
+            etag=self._etag,
+            commit_hash=self._commit_hash,
+            expected_size=self.size,
+            ranges=ranges,
+            headers=self._headers,
+            proxies=None,
+        )
+
+
+class RemoteSafetensorsSlice:
+    """Lazy view of a tensor of a [`RemoteSafetensorsFile`], returned by [`RemoteSafetensorsFile.get_slice`].
+
+    Indexing the slice downloads only the rows of the first dimension it needs. Indexes on the other dimensions are
+    applied once the rows have been downloaded.
+    """
+
+    def __init__(self, file: RemoteSafetensorsFile, name: str, info: TensorInfo) -> None:
+        self._file = file
+        self.name = name
+        self._info = info
+
+    def get_shape(self) -> List[int]:
+        return list(self._info.shape)
+
+    def get_dtype(self) -> str:
+        return self._info.dtype
+
+    def __getitem__(self, key: Any) -> Any:
+        if not isinstance(key, tuple):
+            key = (key,)
+        shape = self._info.shape
+        numel = math.prod(shape)
+        if len(shape) == 0 or numel == 0 or len(key) == 0 or not isinstance(key[0], (int, slice)):
+            return self._file.get_tensor(self.name)[key]
+
+        # Rows of the first dimension to download
+        first = key[0]
+        if isinstance(first, int):
+            row = first + shape[0] if first < 0 else first
+            if not 0 <= row < shape[0]:
+                raise IndexError(f"Index {first} is out of bounds for dimension 0 with size {shape[0]}.")
+            row_start, row_end, key = row, row + 1, (0, *key[1:])
+        else:
+            rows = range(*first.indices(shape[0]))
+            if len(rows) == 0:
+                row_start, row_end = 0, 0
+                key = (slice(0, 0), *key[1:])
+            else:
+                row_start, row_end = min(rows[0], rows[-1]), max(rows[0], rows[-1]) + 1
+                stop = rows[-1] - row_start + (1 if rows.step > 0 else -1)
+                key = (slice(rows[0] - row_start, stop if stop >= 0 else None, rows.step), *key[1:])
+
+        row_bytes = (self._info.data_offsets[1] - self._info.data_offsets[0]) // shape[0]
+        data_start = self._file._data_start + self._info.data_offsets[0]
+        buffer = self._file._read(data_start + row_start * row_bytes, data_start + row_end * row_bytes)
+        rows_tensor = self._file._to_tensor(buffer, self._info.dtype, [row_end - row_start, *shape[1:]])
+        return rows_tensor[key]
+
+
+def _copy_block(buffer: bytearray, start: int, end: int, block_start: int, block: bytes) -> None:
+    """Copy the part of `block` (starting at `block_start` in the file) overlapping `[start, end)` in `buffer`."""
+    low, high = max(start, block_start), min(end, block_start + len(block))
+    if low < high:
+        buffer[low - start : high - start] = memoryview(block)[low - block_start : high - block_start]
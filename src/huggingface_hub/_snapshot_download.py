@@ -1,15 +1,29 @@
+import bisect
+import json
 import os
+import uuid
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Literal, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Union
 
 import requests
 from tqdm.auto import tqdm as base_tqdm
-from tqdm.contrib.concurrent import thread_map
 
 from . import constants
+from ._download_scheduler import download_largest_first
 from .errors import GatedRepoError, LocalEntryNotFoundError, RepositoryNotFoundError, RevisionNotFoundError
-from .file_download import REGEX_COMMIT_HASH, hf_hub_download, repo_folder_name
-from .hf_api import DatasetInfo, HfApi, ModelInfo, SpaceInfo
+from .file_download import (
+    REGEX_COMMIT_HASH,
+    HfFileMetadata,
+    _check_disk_space,
+    _create_symlink,
+    _get_pointer_path,
+    _get_read_only_storage_folders,
+    hf_hub_download,
+    hf_hub_url,
+    repo_folder_name,
+)
+from .hf_api import DatasetInfo, HfApi, ModelInfo, RepoFile, RepoFolder, SpaceInfo
 from .utils import OfflineModeIsEnabled, filter_repo_objects, logging, validate_hf_hub_args
 from .utils import tqdm as hf_tqdm
 
@@ -36,9 +50,11 @@ def snapshot_download(
     allow_patterns: Optional[Union[List[str], str]] = None,
     ignore_patterns: Optional[Union[List[str], str]] = None,
     max_workers: int = 8,
+    max_bytes_in_flight: Optional[int] = None,
     tqdm_class: Optional[base_tqdm] = None,
     headers: Optional[Dict[str, str]] = None,
     endpoint: Optional[str] = None,
+    verify: bool = False,
     # Deprecated args
     local_dir_use_symlinks: Union[bool, Literal["auto"]] = "auto",
     resume_download: Optional[bool] = None,
@@ -102,12 +118,19 @@ def snapshot_download(
         max_workers (`int`, *optional*):
             Number of concurrent threads to download files (1 thread = 1 file download).
             Defaults to 8.
+        max_bytes_in_flight (`int`, *optional*):
+            Maximum cumulated size (in bytes) of the files downloaded at the same time. Files are downloaded largest
+            first and, if `HF_HUB_ENABLE_PARALLEL_DOWNLOAD` is set, files larger than their share of the snapshot are
+            split into ranges downloaded concurrently. Defaults to no limit.
         tqdm_class (`tqdm`, *optional*):
             If provided, overwrites the default behavior for the progress bar. Passed
             argument must inherit from `tqdm.auto.tqdm` or at least mimic its behavior.
             Note that the `tqdm_class` is not passed to each individual download.
             Defaults to the custom HF progress bar that can be disabled by setting
             `HF_HUB_DISABLE_PROGRESS_BARS` environment variable.
+        verify (`bool`, *optional*, defaults to `False`):
+            If `True`, the content of each downloaded file is checked against its ETag (sha256 for LFS files, git-sha1
+            for regular files). See [`hf_hub_download`].
 
     Returns:
         `str`: folder path of the repo snapshot.
@@ -125,6 +148,192 @@ def snapshot_download(
         [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
             if some parameter value is invalid.
     """
+    resolved = _resolve_snapshot(
+        repo_id=repo_id,
+        repo_type=repo_type,
+        revision=revision,
+        cache_dir=cache_dir,
+        local_dir=local_dir,
+        library_name=library_name,
+        library_version=library_version,
+        user_agent=user_agent,
+        endpoint=endpoint,
+        headers=headers,
+        token=token,
+        local_files_only=local_files_only,
+        force_download=force_download,
+        allow_patterns=allow_patterns,
+        ignore_patterns=ignore_patterns,
+    )
+    if isinstance(resolved, str):
+        # Repo cannot be reached but files are on disk, or snapshot is complete in a read-only cache layer
+        return resolved
+    commit_hash = resolved.commit_hash
+    snapshot_folder = resolved.snapshot_folder
+    files_metadata = resolved.files_metadata
+
+    # we pass the commit_hash to hf_hub_download
+    # so no network call happens if we already
+    # have the file locally.
+    def _inner_hf_hub_download(repo_file: str, split: bool = False):
+        return hf_hub_download(
+            repo_id,
+            filename=repo_file,
+            repo_type=repo_type,
+            revision=commit_hash,
+            endpoint=endpoint,
+            cache_dir=cache_dir,
+            local_dir=local_dir,
+            local_dir_use_symlinks=local_dir_use_symlinks,
+            library_name=library_name,
+            library_version=library_version,
+            user_agent=user_agent,
+            proxies=proxies,
+            etag_timeout=etag_timeout,
+            resume_download=resume_download,
+            force_download=force_download,
+            token=token,
+            headers=headers,
+            verify=verify,
+            _file_metadata=files_metadata.get(repo_file),
+            _parallel_download=True if split else None,
+            # files found in a read-only cache layer are copied so that the snapshot folder is complete
+            _promote=True,
+        )
+
+    sizes_to_download = _prepare_snapshot_download(resolved, local_dir=local_dir, force_download=force_download)
+    files_to_download = list(sizes_to_download)
+
+    if constants.HF_HUB_ENABLE_HF_TRANSFER:
+        # when using hf_transfer we don't want extra parallelism
+        # from the one hf_transfer provides
+        for file in files_to_download:
+            _inner_hf_hub_download(file)
+    else:
+        download_largest_first(
+            _inner_hf_hub_download,
+            sizes_to_download,
+            max_workers=max_workers,
+            max_bytes_in_flight=max_bytes_in_flight,
+            desc=f"Fetching {len(files_to_download)} files",
+            # User can use its own tqdm class or the default one from `huggingface_hub.utils`
+            tqdm_class=tqdm_class or hf_tqdm,
+        )
+
+    if local_dir is not None:
+        return str(os.path.realpath(local_dir))
+    _write_snapshot_manifest(
+        resolved, allow_patterns=allow_patterns, ignore_patterns=ignore_patterns, force_download=force_download
+    )
+    return snapshot_folder
+
+
+def _prepare_snapshot_download(
+    resolved: "_SnapshotToDownload", *, local_dir: Union[str, Path, None], force_download: bool
+) -> Dict[str, int]:
+    """Prepare the download of the files resolved by [`_resolve_snapshot`].
+
+    Files whose blob is already cached are linked in the snapshot folder and the disk space is checked once for the
+    whole snapshot. Shared by [`snapshot_download`] and [`asnapshot_download`].
+
+    Returns:
+        `Dict[str, int]`: the files to download, mapped to the number of bytes to download for each of them (`0` if
+        the file is already on disk or its size is unknown).
+    """
+    commit_hash = resolved.commit_hash
+    snapshot_folder = resolved.snapshot_folder
+    files_metadata = resolved.files_metadata
+    storage_folder = os.path.dirname(os.path.dirname(snapshot_folder))
+
+    def _link_cached_blob(repo_file: str) -> bool:
+        # Create the pointer of a file whose blob is already cached (e.g. file unchanged since a previous commit)
+        # without going through `hf_hub_download`. Return whether the file is in the snapshot folder.
+        metadata = files_metadata.get(repo_file)
+        if metadata is None or metadata.etag is None:
+            return False
+        pointer_path = _get_pointer_path(storage_folder, commit_hash, repo_file)
+        if os.path.exists(pointer_path):
+            return True
+        blob_path = os.path.join(storage_folder, "blobs", metadata.etag)
+        if not os.path.exists(blob_path):
+            return False
+        os.makedirs(os.path.dirname(pointer_path), exist_ok=True)
+        _create_symlink(blob_path, pointer_path, new_blob=False)
+        return True
+
+    files_to_download = resolved.filenames
+    if local_dir is None and not force_download:
+        files_to_download = [file for file in resolved.filenames if not _link_cached_blob(file)]
+
+    def _size_to_download(repo_file: str) -> int:
+        # Used to schedule downloads and check disk space. Files already on disk are not downloaded => 0
+        metadata = files_metadata.get(repo_file)
+        if metadata is None or metadata.size is None:
+            return 0
+        if force_download:
+            return metadata.size
+        if local_dir is not None:
+            local_path = os.path.join(local_dir, *repo_file.split("/"))
+            if os.path.isfile(local_path) and os.path.getsize(local_path) == metadata.size:
+                return 0
+        elif os.path.exists(os.path.join(snapshot_folder, *repo_file.split("/"))) or (
+            metadata.etag is not None and os.path.exists(os.path.join(storage_folder, "blobs", metadata.etag))
+        ):
+            return 0
+        return metadata.size
+
+    sizes_to_download = {file: _size_to_download(file) for file in files_to_download}
+
+    # Check disk space once for the whole snapshot instead of running out of space on the last file
+    nb_files_to_download = sum(1 for size in sizes_to_download.values() if size > 0)
+    if nb_files_to_download > 0:
+        _check_disk_space(
+            sum(sizes_to_download.values()),
+            local_dir if local_dir is not None else storage_folder,
+            nb_files=nb_files_to_download,
+        )
+    return sizes_to_download
+
+
+@dataclass
+class _SnapshotToDownload:
+    """Files to download for a snapshot, as resolved by [`_resolve_snapshot`]."""
+
+    commit_hash: str
+    snapshot_folder: str
+    filenames: List[str]
+    files_metadata: Dict[str, HfFileMetadata]
+    # All files of the repo at `commit_hash` (before filtering), written in the snapshot manifest
+    repo_files: List[str] = field(default_factory=list)
+    # Git tree id of each folder of the repo (if listed), written in the snapshot manifest
+    folders: Dict[str, str] = field(default_factory=dict)
+
+
+def _resolve_snapshot(
+    *,
+    repo_id: str,
+    repo_type: Optional[str],
+    revision: Optional[str],
+    cache_dir: Union[str, Path, None],
+    local_dir: Union[str, Path, None],
+    library_name: Optional[str],
+    library_version: Optional[str],
+    user_agent: Optional[Union[Dict, str]],
+    endpoint: Optional[str],
+    headers: Optional[Dict[str, str]],
+    token: Optional[Union[bool, str]],
+    local_files_only: bool,
+    force_download: bool,
+    allow_patterns: Optional[Union[List[str], str]],
+    ignore_patterns: Optional[Union[List[str], str]],
+) -> Union[str, _SnapshotToDownload]:
+    """Resolve the commit and the files to download for a snapshot.
+
+    Shared by [`snapshot_download`] and [`asnapshot_download`]. Returns the path to the snapshot folder (or
+    `local_dir`) if the repo cannot be reached but the snapshot is already on disk, if the snapshot manifest confirms
+    that all requested files are cached or if the snapshot is complete in a read-only cache layer. Otherwise, returns
+    the commit hash, the filtered list of files and their metadata (if some files have to be downloaded).
+    """
     if cache_dir is None:
         cache_dir = constants.HF_HUB_CACHE
     if revision is None:
@@ -138,6 +347,21 @@ def snapshot_download(
         raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(constants.REPO_TYPES)}")
 
     storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    read_only_storage_folders = _get_read_only_storage_folders(cache_dir, repo_id=repo_id, repo_type=repo_type)
+
+    # Pinned commit => if the snapshot manifest lists all requested files, no need to call the Hub nor to check files
+    if local_dir is None and not force_download and REGEX_COMMIT_HASH.match(revision):
+        folders = [storage_folder] if constants.HF_HUB_CACHE_PROMOTE else [storage_folder, *read_only_storage_folders]
+        for folder in folders:
+            snapshot_folder = os.path.join(folder, "snapshots", revision)
+            manifest = _read_snapshot_manifest(snapshot_folder)
+            if manifest is not None and _is_complete_in_manifest(
+                manifest,
+                filter_repo_objects(
+                    items=manifest["repo_files"], allow_patterns=allow_patterns, ignore_patterns=ignore_patterns
+                ),
+            ):
+                return snapshot_folder
 
     repo_info: Union[ModelInfo, DatasetInfo, SpaceInfo, None] = None
     api_call_error: Optional[Exception] = None
@@ -188,24 +412,26 @@ def snapshot_download(
     #    - f the specified revision is a branch or tag, look inside "refs".
     # => if local_dir is not None, we will return the path to the local folder if it exists.
     if repo_info is None:
-        # Try to get which commit hash corresponds to the specified revision
-        commit_hash = None
-        if REGEX_COMMIT_HASH.match(revision):
-            commit_hash = revision
-        else:
-            ref_path = os.path.join(storage_folder, "refs", revision)
-            if os.path.exists(ref_path):
-                # retrieve commit_hash from refs file
-                with open(ref_path) as f:
-                    commit_hash = f.read()
-
-        # Try to locate snapshot folder for this commit hash
-        if commit_hash is not None:
-            snapshot_folder = os.path.join(storage_folder, "snapshots", commit_hash)
-            if os.path.exists(snapshot_folder):
-                # Snapshot folder exists => let's return it
-                # (but we can't check if all the files are actually there)
-                return snapshot_folder
+        # Look in the writable cache first, then in the read-only cache layers (see `HF_HUB_CACHE`)
+        for folder in [storage_folder, *read_only_storage_folders]:
+            # Try to get which commit hash corresponds to the specified revision
+            commit_hash = None
+            if REGEX_COMMIT_HASH.match(revision):
+                commit_hash = revision
+            else:
+                ref_path = os.path.join(folder, "refs", revision)
+                if os.path.exists(ref_path):
+                    # retrieve commit_hash from refs file
+                    with open(ref_path) as f:
+                        commit_hash = f.read()
+
+            # Try to locate snapshot folder for this commit hash
+            if commit_hash is not None:
+                snapshot_folder = os.path.join(folder, "snapshots", commit_hash)
+                if os.path.exists(snapshot_folder):
+                    # Snapshot folder exists => let's return it
+                    # (but we can't check if all the files are actually there)
+                    return snapshot_folder
         # If local_dir is not None, return it if it exists and is not empty
         if local_dir is not None:
             local_dir = Path(local_dir)
@@ -254,8 +480,14 @@ def snapshot_download(
     # if passed revision is not identical to commit_hash
     # then revision has to be a branch name or tag name.
     # In that case store a ref.
+    previous_commit_hash: Optional[str] = None
     if revision != commit_hash:
         ref_path = os.path.join(storage_folder, "refs", revision)
+        try:
+            with open(ref_path) as f:
+                previous_commit_hash = f.read()
+        except OSError:
+            pass
         try:
             os.makedirs(os.path.dirname(ref_path), exist_ok=True)
             with open(ref_path, "w") as f:
@@ -263,45 +495,285 @@ def snapshot_download(
         except OSError as e:
             logger.warning(f"Ignored error while writing commit hash to {ref_path}: {e}.")
 
-    # we pass the commit_hash to hf_hub_download
-    # so no network call happens if we already
-    # have the file locally.
-    def _inner_hf_hub_download(repo_file: str):
-        return hf_hub_download(
-            repo_id,
-            filename=repo_file,
+    def _is_complete(folder: str) -> bool:
+        if _is_complete_in_manifest(_read_snapshot_manifest(folder), filtered_repo_files):
+            return True
+        return all(os.path.exists(os.path.join(folder, *file.split("/"))) for file in filtered_repo_files)
+
+    # All files listed in the snapshot manifest => nothing to download
+    if (
+        local_dir is None
+        and not force_download
+        and _is_complete_in_manifest(_read_snapshot_manifest(snapshot_folder), filtered_repo_files)
+    ):
+        return snapshot_folder
+
+    # Snapshot fully available in a read-only cache layer => return it as is (unless files must be copied to the
+    # writable cache, see `HF_HUB_CACHE_PROMOTE`)
+    if local_dir is None and not force_download and not constants.HF_HUB_CACHE_PROMOTE:
+        if not _is_complete(snapshot_folder):
+            for read_only_storage_folder in read_only_storage_folders:
+                read_only_snapshot_folder = os.path.join(read_only_storage_folder, "snapshots", commit_hash)
+                if _is_complete(read_only_snapshot_folder):
+                    return read_only_snapshot_folder
+
+    # Resolve the metadata (etag, size) of all files in a single listing instead of one HEAD call per file.
+    # Not needed if all files are already in the snapshot folder (no network call is made for them).
+    # If the tree of a previous commit is known, only the folders that changed since then are listed.
+    tree = _RepoTree()
+    if local_dir is not None or force_download or not _is_complete(snapshot_folder):
+        tree = _list_repo_tree(
+            api,
+            repo_id=repo_id,
             repo_type=repo_type,
-            revision=commit_hash,
+            commit_hash=commit_hash,
             endpoint=endpoint,
-            cache_dir=cache_dir,
-            local_dir=local_dir,
-            local_dir_use_symlinks=local_dir_use_symlinks,
-            library_name=library_name,
-            library_version=library_version,
-            user_agent=user_agent,
-            proxies=proxies,
-            etag_timeout=etag_timeout,
-            resume_download=resume_download,
-            force_download=force_download,
             token=token,
-            headers=headers,
+            base_tree=_find_base_tree(
+                storage_folder, commit_hash=commit_hash, previous_commit_hash=previous_commit_hash
+            ),
         )
 
-    if constants.HF_HUB_ENABLE_HF_TRANSFER:
-        # when using hf_transfer we don't want extra parallelism
-        # from the one hf_transfer provides
-        for file in filtered_repo_files:
-            _inner_hf_hub_download(file)
+    return _SnapshotToDownload(
+        commit_hash=commit_hash,
+        snapshot_folder=snapshot_folder,
+        filenames=filtered_repo_files,
+        files_metadata=tree.files,
+        repo_files=[f.rfilename for f in repo_info.siblings],
+        folders=tree.folders,
+    )
+
+
+def _find_base_tree(
+    storage_folder: str, *, commit_hash: str, previous_commit_hash: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """Return the tree of a previously downloaded commit, to list only what changed since then.
+
+    The commit previously pointed by the requested ref is used in priority. Otherwise (e.g. revision is a commit hash),
+    the most recently written snapshot manifest of the repo is used.
+    """
+    snapshots_folder = os.path.join(storage_folder, "snapshots")
+    candidates = []
+    if previous_commit_hash is not None and previous_commit_hash != commit_hash:
+        candidates.append(os.path.join(snapshots_folder, previous_commit_hash))
     else:
-        thread_map(
-            _inner_hf_hub_download,
-            filtered_repo_files,
-            desc=f"Fetching {len(filtered_repo_files)} files",
-            max_workers=max_workers,
-            # User can use its own tqdm class or the default one from `huggingface_hub.utils`
-            tqdm_class=tqdm_class or hf_tqdm,
+        manifest_paths = []
+        try:
+            for name in os.listdir(snapshots_folder):
+                manifest_path = os.path.join(snapshots_folder, name, constants.SNAPSHOT_MANIFEST_NAME)
+                if name != commit_hash and os.path.isfile(manifest_path):
+                    manifest_paths.append(manifest_path)
+        except OSError:
+            pass
+        candidates = [os.path.dirname(path) for path in sorted(manifest_paths, key=os.path.getmtime, reverse=True)]
+    for snapshot_folder in candidates:
+        manifest = _read_snapshot_manifest(snapshot_folder)
+        if manifest is not None and "tree" in manifest:
+            return manifest["tree"]
+    return None
+
+
+def _read_snapshot_manifest(snapshot_folder: str) -> Optional[Dict[str, Any]]:
+    """Read the manifest of a snapshot folder (see [`_write_snapshot_manifest`]). Return None if missing or invalid."""
+    try:
+        with open(os.path.join(snapshot_folder, constants.SNAPSHOT_MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(manifest, dict)
+        or manifest.get("version") != 1
+        or not isinstance(manifest.get("files"), dict)
+        or not isinstance(manifest.get("repo_files"), list)
+    ):
+        return None
+    tree = manifest.get("tree")
+    if tree is not None and (
+        not isinstance(tree, dict)
+        or not isinstance(tree.get("files"), dict)
+        or not isinstance(tree.get("folders"), dict)
+    ):
+        del manifest["tree"]
+    return manifest
+
+
+def _is_complete_in_manifest(manifest: Optional[Dict[str, Any]], filenames: Iterable[str]) -> bool:
+    """Return whether all `filenames` are listed as cached in `manifest`."""
+    if manifest is None:
+        return False
+    files = manifest["files"]
+    return all(filename in files for filename in filenames)
+
+
+def _write_snapshot_manifest(
+    snapshot: _SnapshotToDownload,
+    *,
+    allow_patterns: Optional[Union[List[str], str]],
+    ignore_patterns: Optional[Union[List[str], str]],
+    force_download: bool = False,
+) -> None:
+    """Write `snapshots/<commit_hash>/.manifest` once all files of `snapshot` are in the cache.
+
+    The manifest lists the path, size and etag of each cached file, all files of the repo at this commit and the
+    patterns used to filter them. Files from a previous manifest are kept (unless `force_download=True`), so that
+    downloads with different patterns add up. A later call can then check that a snapshot is complete with a single
+    file read (see [`_resolve_snapshot`]).
+
+    If the whole repo has been listed, the manifest also stores its tree (metadata of all files and tree id of all
+    folders) so that a later commit can be listed incrementally (see [`_list_repo_tree`]).
+
+    The manifest is written atomically. Failing to write it is not an error: the snapshot is then checked file by file.
+    """
+    if not snapshot.filenames or constants.SNAPSHOT_MANIFEST_NAME in snapshot.repo_files:
+        return  # nothing downloaded or the name is taken by a file of the repo
+
+    manifest = _read_snapshot_manifest(snapshot.snapshot_folder)
+    files: Dict[str, Dict[str, Any]] = manifest["files"] if manifest is not None and not force_download else {}
+    for filename in snapshot.filenames:
+        metadata = snapshot.files_metadata.get(filename)
+        if metadata is not None and metadata.size is not None:
+            files[filename] = {"size": metadata.size, "etag": metadata.etag}
+        elif filename not in files:
+            # File was already cached (no metadata fetched) => read it from the pointer
+            pointer_path = os.path.join(snapshot.snapshot_folder, *filename.split("/"))
+            try:
+                files[filename] = {
+                    "size": os.path.getsize(pointer_path),
+                    "etag": os.path.basename(os.path.realpath(pointer_path)) if os.path.islink(pointer_path) else None,
+                }
+            except OSError:
+                return  # file missing => snapshot is not complete
+
+    # Tree of the whole repo, used to list only the folders that changed when downloading a later commit
+    tree: Optional[Dict[str, Any]] = manifest.get("tree") if manifest is not None else None
+    if snapshot.files_metadata and all(filename in snapshot.files_metadata for filename in snapshot.repo_files):
+        tree = {
+            "files": {
+                path: {"size": metadata.size, "etag": metadata.etag}
+                for path, metadata in snapshot.files_metadata.items()
+            },
+            "folders": snapshot.folders,
+        }
+
+    manifest_path = os.path.join(snapshot.snapshot_folder, constants.SNAPSHOT_MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": 1,
+                    "commit_hash": snapshot.commit_hash,
+                    "allow_patterns": allow_patterns,
+                    "ignore_patterns": ignore_patterns,
+                    "repo_files": snapshot.repo_files,
+                    "files": files,
+                    **({"tree": tree} if tree is not None else {}),
+                },
+                f,
+            )
+        os.replace(tmp_path, manifest_path)
+    except OSError as e:
+        logger.warning(f"Ignored error while writing snapshot manifest to {manifest_path}: {e}.")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@dataclass
+class _RepoTree:
+    """Files and folders of a repo at a given commit, as listed by [`_list_repo_tree`]."""
+
+    # Metadata of each file, indexed by path
+    files: Dict[str, HfFileMetadata] = field(default_factory=dict)
+    # Git tree id of each folder, indexed by path
+    folders: Dict[str, str] = field(default_factory=dict)
+
+
+def _list_repo_tree(
+    api: HfApi,
+    *,
+    repo_id: str,
+    repo_type: str,
+    commit_hash: str,
+    endpoint: Optional[str],
+    token: Optional[Union[bool, str]],
+    base_tree: Optional[Dict[str, Any]] = None,
+) -> _RepoTree:
+    """List the metadata of all files of a repo at a given commit.
+
+    Metadata are the same as the ones returned by a HEAD call on each file (see [`get_hf_file_metadata`]): the etag is
+    the sha256 of LFS files and the git hash of regular files. Files are downloaded from their resolve url at
+    `commit_hash`. If the listing fails, an empty tree is returned and metadata are fetched file by file instead.
+
+    If `base_tree` is provided (tree of a previous commit, as stored in a snapshot manifest), the tree is listed folder
+    by folder and folders with the same tree id as in `base_tree` are not listed: their files are taken from
+    `base_tree`. Otherwise, the whole tree is listed recursively at once.
+    """
+    tree = _RepoTree()
+    base_paths = sorted(base_tree["files"]) if base_tree is not None else []
+    base_folder_paths = sorted(base_tree["folders"]) if base_tree is not None else []
+
+    def _add_file(path: str, etag: Optional[str], size: Optional[int]) -> None:
+        tree.files[path] = HfFileMetadata(
+            commit_hash=commit_hash,
+            etag=etag,
+            location=hf_hub_url(repo_id, path, repo_type=repo_type, revision=commit_hash, endpoint=endpoint),
+            size=size,
         )
 
-    if local_dir is not None:
-        return str(os.path.realpath(local_dir))
-    return snapshot_folder
+    def _add_items(items: Iterable[Union[RepoFile, RepoFolder]]) -> List[str]:
+        # Return the folders that still have to be listed
+        changed_folders = []
+        for item in items:
+            if isinstance(item, RepoFile):
+                _add_file(
+                    item.path,
+                    etag=item.lfs.sha256 if item.lfs is not None else item.blob_id,
+                    size=item.lfs.size if item.lfs is not None else item.size,
+                )
+            elif base_tree is not None and base_tree["folders"].get(item.path) == item.tree_id:
+                # Unchanged folder => reuse files and subfolders of the previous commit
+                prefix = item.path + "/"
+                for path in _iter_paths_with_prefix(base_paths, prefix):
+                    _add_file(path, etag=base_tree["files"][path]["etag"], size=base_tree["files"][path]["size"])
+                for path in _iter_paths_with_prefix(base_folder_paths, prefix):
+                    tree.folders[path] = base_tree["folders"][path]
+                tree.folders[item.path] = item.tree_id
+            else:
+                tree.folders[item.path] = item.tree_id
+                changed_folders.append(item.path)
+        return changed_folders
+
+    try:
+        if base_tree is None:
+            _add_items(
+                api.list_repo_tree(
+                    repo_id=repo_id, recursive=True, revision=commit_hash, repo_type=repo_type, token=token
+                )
+            )
+        else:
+            folders_to_list: List[Optional[str]] = [None]  # start from the root
+            while folders_to_list:
+                folder = folders_to_list.pop()
+                folders_to_list.extend(
+                    _add_items(
+                        api.list_repo_tree(
+                            repo_id=repo_id,
+                            path_in_repo=folder,
+                            revision=commit_hash,
+                            repo_type=repo_type,
+                            token=token,
+                        )
+                    )
+                )
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.HTTPError) as error:
+        logger.info(f"Could not list files of {repo_id} ({error}). Metadata will be fetched for each file.")
+        return _RepoTree()
+    return tree
+
+
+def _iter_paths_with_prefix(sorted_paths: List[str], prefix: str) -> Iterator[str]:
+    """Yield the paths of `sorted_paths` starting with `prefix`."""
+    for index in range(bisect.bisect_left(sorted_paths, prefix), len(sorted_paths)):
+        if not sorted_paths[index].startswith(prefix):
+            break
+        yield sorted_paths[index]
@@ -1,7 +1,7 @@
 import os
 import re
 import typing
-from typing import Literal, Optional, Tuple
+from typing import List, Literal, Optional, Tuple
 
 
 # Possible values for env variables
@@ -130,6 +130,12 @@ HUGGINGFACE_ASSETS_CACHE = os.getenv("HUGGINGFACE_ASSETS_CACHE", default_assets_
 
 # New env variables
 HF_HUB_CACHE = os.getenv("HF_HUB_CACHE", HUGGINGFACE_HUB_CACHE)
+# `HF_HUB_CACHE` can be a list of directories separated by `os.pathsep` (":" on Linux/macOS, ";" on Windows). The first
+# one is the writable cache. The next ones are read-only cache layers (e.g. a shared network cache pre-populated by
+# another job), looked up before downloading anything.
+_hf_hub_cache_layers = [path for path in HF_HUB_CACHE.split(os.pathsep) if path] or [default_cache_path]
+HF_HUB_CACHE = _hf_hub_cache_layers[0]
+HF_HUB_READ_ONLY_CACHES: List[str] = _hf_hub_cache_layers[1:]
 HF_ASSETS_CACHE = os.getenv("HF_ASSETS_CACHE", HUGGINGFACE_ASSETS_CACHE)
 
 HF_HUB_OFFLINE = _is_true(os.environ.get("HF_HUB_OFFLINE") or os.environ.get("TRANSFORMERS_OFFLINE"))
@@ -181,6 +187,44 @@ HF_HUB_DISABLE_IMPLICIT_TOKEN: bool = _is_true(os.environ.get("HF_HUB_DISABLE_IM
 # - https://github.com/huggingface/hf_transfer (private)
 HF_HUB_ENABLE_HF_TRANSFER: bool = _is_true(os.environ.get("HF_HUB_ENABLE_HF_TRANSFER"))
 
+# Enable pure-Python parallel downloads: large files are split in byte ranges fetched concurrently.
+# Concurrency is the number of connections opened per file. Chunk size is the size of each range request.
+HF_HUB_ENABLE_PARALLEL_DOWNLOAD: bool = _is_true(os.environ.get("HF_HUB_ENABLE_PARALLEL_DOWNLOAD"))
+HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY: int = _as_int(os.environ.get("HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY")) or 8
+HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE: int = (
+    _as_int(os.environ.get("HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE")) or 64 * 1024 * 1024
+)
+# Allocate the whole file on disk before downloading it in parallel chunks (`posix_fallocate`, if supported).
+# Only downloads tracked in a chunks sidecar (parallel or resumed parallel downloads) are preallocated: a download on a
+# single connection resumes from the size of the incomplete file, which preallocation would set to the full size.
+HF_HUB_PREALLOCATE_FILES: bool = _is_true(os.environ.get("HF_HUB_PREALLOCATE_FILES"))
+
+# Fail a download before it starts if the disk is known not to have enough free space for it (warn by default).
+HF_HUB_STRICT_DISK_SPACE_CHECK: bool = _is_true(os.environ.get("HF_HUB_STRICT_DISK_SPACE_CHECK"))
+
+# Share LFS blobs across repos: blobs are stored once in a global store keyed by their sha256 (in `<cache>/blobs-global`)
+# and hardlinked into each repo's `blobs/` folder. A blob found in the store is not downloaded again.
+HF_HUB_ENABLE_GLOBAL_BLOB_STORE: bool = _is_true(os.environ.get("HF_HUB_ENABLE_GLOBAL_BLOB_STORE"))
+GLOBAL_BLOBS_DIR_NAME = "blobs-global"
+
+# File written in `snapshots/<commit_hash>/` once a snapshot is downloaded. It lists the files of the snapshot that are
+# in the cache, so that a later `snapshot_download` can check the snapshot is complete without listing the folder.
+SNAPSHOT_MANIFEST_NAME = ".manifest"
+
+# Persist `HfFileSystem` directory listings on disk (in `<cache>/.listings`), keyed by commit hash. Listings are shared
+# between processes (e.g. DataLoader workers) and reused across sessions. Branches and tags are resolved to a commit hash
+# at most every `HF_HUB_REVISION_TTL` seconds.
+HF_HUB_FS_LISTINGS_CACHE: bool = _is_true(os.environ.get("HF_HUB_FS_LISTINGS_CACHE"))
+LISTINGS_CACHE_DIR_NAME = ".listings"
+
+# Persist the blocks read by `HfFileSystem` in the sparse blob of the file in the cache (see `hf_hub_download_range`).
+# Blocks read again (e.g. in another epoch) are read from disk. Once all blocks have been read, the blob is complete.
+HF_HUB_FS_BLOCK_CACHE: bool = _is_true(os.environ.get("HF_HUB_FS_BLOCK_CACHE"))
+
+# Allow files copied from the cache to a local dir to be hardlinks to the cached blobs (when reflinks are not supported).
+# Disabled by default: modifying a hardlinked file in place would modify the cached file as well.
+HF_HUB_LOCAL_DIR_ENABLE_HARDLINKS: bool = _is_true(os.environ.get("HF_HUB_LOCAL_DIR_ENABLE_HARDLINKS"))
+
 
 # UNUSED
 # We don't use symlinks in local dir anymore.
@@ -194,6 +238,21 @@ HF_HUB_ETAG_TIMEOUT: int = _as_int(os.environ.get("HF_HUB_ETAG_TIMEOUT")) or DEF
 # Used to override the get request timeout on a system level
 HF_HUB_DOWNLOAD_TIMEOUT: int = _as_int(os.environ.get("HF_HUB_DOWNLOAD_TIMEOUT")) or DEFAULT_DOWNLOAD_TIMEOUT
 
+# Used to cap the bandwidth used by downloads and uploads, e.g. "500MB/s" (shared by all threads of the process).
+# If `HF_HUB_MAX_BANDWIDTH_PER_HOST` is set, the limit applies to each host separately.
+HF_HUB_MAX_BANDWIDTH: Optional[str] = os.environ.get("HF_HUB_MAX_BANDWIDTH") or None
+HF_HUB_MAX_BANDWIDTH_PER_HOST: bool = _is_true(os.environ.get("HF_HUB_MAX_BANDWIDTH_PER_HOST"))
+
+# Number of seconds during which a branch or tag resolved to a commit hash is trusted without calling the Hub.
+# Disabled by default (0): every download from a branch or tag checks the latest commit on the Hub.
+HF_HUB_REVISION_TTL: int = _as_int(os.environ.get("HF_HUB_REVISION_TTL")) or 0
+
+# If set, files found in a read-only cache layer (see `HF_HUB_CACHE`) are copied to the writable cache.
+HF_HUB_CACHE_PROMOTE: bool = _is_true(os.environ.get("HF_HUB_CACHE_PROMOTE"))
+
+# Maximum number of bytes kept in memory by `hf_hub_read_bytes` (process-wide LRU cache). Default to 64MB.
+HF_HUB_MEMORY_CACHE_SIZE: int = _as_int(os.environ.get("HF_HUB_MEMORY_CACHE_SIZE")) or 64 * 1024 * 1024
+
 # List frameworks that are handled by the InferenceAPI service. Useful to scan endpoints and check which models are
 # deployed and running. Since 95% of the models are using the top 4 frameworks listed below, we scan only those by
 # default. We still keep the full list of supported frameworks in case we want to scan all of them.
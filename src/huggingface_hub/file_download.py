@@ -1,17 +1,21 @@
 import contextlib
 import copy
 import errno
+import http.client
 import inspect
 import os
 import re
 import shutil
+import socket
 import stat
+import threading
 import time
 import uuid
 import warnings
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, BinaryIO, Dict, Literal, NoReturn, Optional, Tuple, Union
+from typing import Any, BinaryIO, Dict, Iterator, List, Literal, NoReturn, Optional, Tuple, Union
 from urllib.parse import quote, urlparse
 
 import requests
@@ -20,6 +24,8 @@ from . import (
     __version__,  # noqa: F401 # for backward compatibility
     constants,
 )
+from ._bandwidth import throttle
+from ._download_parts import DownloadParts, get_parts_path
 from ._local_folder import get_local_download_paths, read_download_metadata, write_download_metadata
 from .constants import (
     HUGGINGFACE_CO_URL_TEMPLATE,  # noqa: F401 # for backward compatibility
@@ -61,8 +67,10 @@ from .utils import (
     validate_hf_hub_args,
 )
 from .utils._http import _adjust_range_header
+from .utils._materialize import materialize_file
 from .utils._runtime import _PY_VERSION  # noqa: F401 # for backward compatibility
 from .utils._typing import HTTP_METHOD_T
+from .utils.insecure_hashlib import sha1, sha256
 from .utils.sha import sha_fileobj
 from .utils.tqdm import is_tqdm_disabled
 
@@ -316,6 +324,9 @@ def http_get(
     displayed_filename: Optional[str] = None,
     _nb_retries: int = 5,
     _tqdm_bar: Optional[tqdm] = None,
+    _parts: Optional[DownloadParts] = None,
+    _hasher: Optional[Any] = None,
+    _parallel_download: Optional[bool] = None,
 ) -> None:
     """
     Download a remote file. Do not gobble up errors, and will return errors tailored to the Hugging Face Hub.
@@ -324,6 +335,20 @@ def http_get(
     transient error (network outage?). We log a warning message and try to resume the download a few times before
     giving up. The method gives up after 5 attempts if no new data has being received from the server.
 
+    If `HF_HUB_ENABLE_PARALLEL_DOWNLOAD=1` is set and the file is large enough, the file is split into byte ranges
+    that are downloaded concurrently and written at their offset in `temp_file`. This requires `temp_file` to be a
+    file on disk. Each range is retried independently with the same logic as above. `_parallel_download` overrides
+    `HF_HUB_ENABLE_PARALLEL_DOWNLOAD` for this file (used by `snapshot_download` to split the largest files).
+
+    If `_parts` is provided, only the chunks it reports as missing are downloaded (using range requests) and they are
+    recorded in the sidecar file once on disk (see `_get_parts_save_interval`). `resume_size` is then the number of
+    bytes already downloaded, not necessarily contiguous. Used by `_download_to_tmp_and_move` to resume interrupted
+    parallel downloads.
+
+    If `_hasher` is provided (e.g. `hashlib.sha256()`), it is updated with the content of the file while it is
+    downloaded. It must already contain the first `resume_size` bytes of the file, except if `_parts` is provided in
+    which case the whole file is hashed. In parallel mode, ranges are hashed in order as soon as they are contiguous.
+
     Args:
         url (`str`):
             The URL of the file to download.
@@ -349,10 +374,14 @@ def http_get(
 
     hf_transfer = None
     if constants.HF_HUB_ENABLE_HF_TRANSFER:
-        if resume_size != 0:
+        if resume_size != 0 or _parts is not None:
             warnings.warn("'hf_transfer' does not support `resume_size`: falling back to regular download method")
         elif proxies is not None:
             warnings.warn("'hf_transfer' does not support `proxies`: falling back to regular download method")
+        elif constants.HF_HUB_MAX_BANDWIDTH:
+            warnings.warn(
+                "'hf_transfer' does not support `HF_HUB_MAX_BANDWIDTH`: falling back to regular download method"
+            )
         else:
             try:
                 import hf_transfer  # type: ignore[no-redef]
@@ -365,18 +394,70 @@ def http_get(
 
     initial_headers = headers
     headers = copy.deepcopy(headers) or {}
-    if resume_size > 0:
+    if resume_size > 0 and _parts is None:
         headers["Range"] = _adjust_range_header(headers.get("Range"), resume_size)
 
-    r = _request_wrapper(
-        method="GET", url=url, stream=True, proxies=proxies, headers=headers, timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT
-    )
-    hf_raise_for_status(r)
+    if _parallel_download is None:
+        _parallel_download = constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD
+    parallel_ranges: Optional[List[Tuple[int, int]]] = None
+    if _parts is not None:
+        parallel_ranges = _parts.missing_ranges(max_range_size=constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE)
+    elif hf_transfer is None and _is_parallel_download_possible(
+        temp_file, initial_headers, resume_size, expected_size, enabled=_parallel_download
+    ):
+        assert expected_size is not None  # for mypy
+        parallel_ranges = _split_in_ranges(resume_size, expected_size, constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE)
+
+    if parallel_ranges is not None:
+        # Fetch the first range only. The response tells us if the server supports range requests.
+        r = _request_wrapper(
+            method="GET",
+            url=url,
+            stream=True,
+            proxies=proxies,
+            headers=_range_headers(initial_headers, *parallel_ranges[0]),
+            timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+        )
+        hf_raise_for_status(r)
+        if r.status_code != 206:
+            logger.info("Server does not support range requests. Falling back to a single connection download.")
+            r.close()
+            parallel_ranges = None
+            if _parts is not None:
+                # Downloaded chunks are not contiguous => cannot resume without range requests. Restart from scratch.
+                _parts.delete()
+                _parts = None
+                temp_file.truncate(0)
+                temp_file.seek(0)
+                resume_size = 0
+
+    # If the first range has been redirected to another domain (typically a CDN), download the next ranges directly
+    # from the final location to save a redirect per range. The url is signed => don't send auth.
+    ranges_url, ranges_headers = url, initial_headers
+    if parallel_ranges is not None and r.url != url and urlparse(r.url).netloc != urlparse(url).netloc:
+        ranges_url = r.url
+        ranges_headers = {
+            key: value for key, value in (initial_headers or {}).items() if key.lower() != "authorization"
+        }
+
+    if parallel_ranges is None:
+        r = _request_wrapper(
+            method="GET",
+            url=url,
+            stream=True,
+            proxies=proxies,
+            headers=headers,
+            timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+        )
+        hf_raise_for_status(r)
     content_length = r.headers.get("Content-Length")
 
     # NOTE: 'total' is the total number of bytes to download, not the number of bytes in the file.
     #       If the file is compressed, the number of bytes in the saved file will be higher than 'total'.
-    total = resume_size + int(content_length) if content_length is not None else None
+    if parallel_ranges is not None:
+        total = expected_size
+    else:
+        total = resume_size + int(content_length) if content_length is not None else None
 
     if displayed_filename is None:
         displayed_filename = url
@@ -442,6 +523,9 @@ def http_get(
                 ) from e
             if not supports_callback:
                 progress.update(total)
+            if _hasher is not None:
+                with open(temp_file.name, "rb") as downloaded_file:
+                    _update_hasher_from_file(_hasher, downloaded_file, os.path.getsize(temp_file.name))
             if expected_size is not None and expected_size != os.path.getsize(temp_file.name):
                 raise EnvironmentError(
                     consistency_error_message.format(
@@ -449,35 +533,57 @@ def http_get(
                     )
                 )
             return
-        new_resume_size = resume_size
-        try:
-            for chunk in r.iter_content(chunk_size=constants.DOWNLOAD_CHUNK_SIZE):
-                if chunk:  # filter out keep-alive new chunks
-                    progress.update(len(chunk))
-                    temp_file.write(chunk)
-                    new_resume_size += len(chunk)
-                    # Some data has been downloaded from the server so we reset the number of retries.
-                    _nb_retries = 5
-        except (requests.ConnectionError, requests.ReadTimeout) as e:
-            # If ConnectionError (SSLError) or ReadTimeout happen while streaming data from the server, it is most likely
-            # a transient error (network outage?). We log a warning message and try to resume the download a few times
-            # before giving up. Tre retry mechanism is basic but should be enough in most cases.
-            if _nb_retries <= 0:
-                logger.warning("Error while downloading from %s: %s\nMax retries exceeded.", url, str(e))
-                raise
-            logger.warning("Error while downloading from %s: %s\nTrying to resume download...", url, str(e))
-            time.sleep(1)
-            reset_sessions()  # In case of SSLError it's best to reset the shared requests.Session objects
-            return http_get(
-                url=url,
-                temp_file=temp_file,
+        if parallel_ranges is not None:
+            _http_get_parallel(
+                ranges_url,
+                temp_file,
+                ranges=parallel_ranges,
+                first_response=r,
                 proxies=proxies,
-                resume_size=new_resume_size,
-                headers=initial_headers,
-                expected_size=expected_size,
-                _nb_retries=_nb_retries - 1,
-                _tqdm_bar=_tqdm_bar,
+                headers=ranges_headers,
+                progress=progress,
+                parts=_parts,
+                hasher=_hasher,
+                parallel=_parallel_download,
+                resolve_url=url if ranges_url != url else None,
+                resolve_headers=initial_headers,
             )
+            temp_file.seek(0, os.SEEK_END)
+        else:
+            new_resume_size = resume_size
+            try:
+                for chunk in _iter_chunks(r):
+                    if chunk:  # filter out keep-alive new chunks
+                        throttle(len(chunk), r.url)
+                        progress.update(len(chunk))
+                        temp_file.write(chunk)
+                        if _hasher is not None:
+                            _hasher.update(chunk)
+                        new_resume_size += len(chunk)
+                        # Some data has been downloaded from the server so we reset the number of retries.
+                        _nb_retries = 5
+            except (requests.ConnectionError, requests.ReadTimeout) as e:
+                # If ConnectionError (SSLError) or ReadTimeout happen while streaming data from the server, it is most
+                # likely a transient error (network outage?). We log a warning message and try to resume the download a
+                # few times before giving up. Tre retry mechanism is basic but should be enough in most cases.
+                if _nb_retries <= 0:
+                    logger.warning("Error while downloading from %s: %s\nMax retries exceeded.", url, str(e))
+                    raise
+                logger.warning("Error while downloading from %s: %s\nTrying to resume download...", url, str(e))
+                time.sleep(1)
+                reset_sessions()  # In case of SSLError it's best to reset the shared requests.Session objects
+                return http_get(
+                    url=url,
+                    temp_file=temp_file,
+                    proxies=proxies,
+                    resume_size=new_resume_size,
+                    headers=initial_headers,
+                    expected_size=expected_size,
+                    _nb_retries=_nb_retries - 1,
+                    _tqdm_bar=_tqdm_bar,
+                    _hasher=_hasher,
+                    _parallel_download=_parallel_download,
+                )
 
     if expected_size is not None and expected_size != temp_file.tell():
         raise EnvironmentError(
@@ -487,6 +593,283 @@ def http_get(
         )
 
 
+def _is_parallel_download_possible(
+    temp_file: BinaryIO,
+    headers: Optional[Dict[str, Any]],
+    resume_size: int,
+    expected_size: Optional[int],
+    enabled: Optional[bool] = None,
+) -> bool:
+    """Return whether a file can be downloaded with [`_http_get_parallel`].
+
+    Parallel download must be enabled (`enabled`, defaults to `HF_HUB_ENABLE_PARALLEL_DOWNLOAD`), the file must be
+    larger than a single range, no custom `Range` header must be requested and `temp_file` must be a file on disk
+    (ranges are written at their offset using its file descriptor).
+    """
+    if enabled is None:
+        enabled = constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD
+    if not enabled or expected_size is None:
+        return False
+    if expected_size - resume_size <= constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE:
+        return False
+    if headers is not None and any(key.lower() == "range" for key in headers):
+        return False
+    name = getattr(temp_file, "name", None)
+    return isinstance(name, str) and os.path.isfile(name)
+
+
+def _split_in_ranges(start: int, end: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split the `[start, end)` interval into consecutive `(start, end)` ranges of at most `chunk_size` bytes."""
+    return [(range_start, min(range_start + chunk_size, end)) for range_start in range(start, end, chunk_size)]
+
+
+def _range_headers(headers: Optional[Dict[str, Any]], start: int, end: int) -> Dict[str, Any]:
+    """Return a copy of `headers` requesting the `[start, end)` bytes of a file, without compression."""
+    return {**(headers or {}), "Range": f"bytes={start}-{end - 1}", "Accept-Encoding": "identity"}
+
+
+def _pwrite(fd: int, data: Union[bytes, memoryview], offset: int) -> None:
+    """Write all of `data` at `offset` in the file opened as `fd`, without moving its file position.
+
+    `os.pwrite` is not available on Windows, in which case writes are serialized with a lock.
+    """
+    if hasattr(os, "pwrite"):
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    else:
+        with _PWRITE_LOCK:
+            os.lseek(fd, offset, os.SEEK_SET)
+            os.write(fd, data)
+
+
+_PWRITE_LOCK = threading.Lock()
+
+
+def _iter_chunks(response: requests.Response) -> Iterator[Union[bytes, memoryview]]:
+    """Iterate over the content of a streamed `response` in chunks of at most `DOWNLOAD_CHUNK_SIZE` bytes.
+
+    When possible, data is read with `readinto` from the underlying `http.client` response into a buffer reused by the
+    current thread: no new `bytes` object is allocated (and copied) for each chunk, which matters when many threads
+    download at once. Chunks are then views on the buffer and are only valid until the next one is yielded. Falls back
+    to `response.iter_content` if the content is compressed or if the response is not backed by `http.client`.
+
+    Errors are raised as `requests.ConnectionError` or `requests.ReadTimeout`, like `iter_content` does.
+    """
+    fp = getattr(response.raw, "_fp", None)
+    if (
+        not isinstance(fp, http.client.HTTPResponse)
+        or response.headers.get("Content-Encoding", "identity").lower() != "identity"
+        or response.raw.tell() != 0  # some content has already been read by urllib3
+    ):
+        yield from response.iter_content(chunk_size=constants.DOWNLOAD_CHUNK_SIZE)
+        return
+
+    buffer = getattr(_READ_BUFFERS, "buffer", None)
+    if buffer is None or len(buffer) != constants.DOWNLOAD_CHUNK_SIZE:
+        buffer = _READ_BUFFERS.buffer = memoryview(bytearray(constants.DOWNLOAD_CHUNK_SIZE))
+    while True:
+        try:
+            nb_read = fp.readinto(buffer)
+        except socket.timeout as e:
+            raise requests.ReadTimeout(e) from e
+        except (OSError, http.client.HTTPException) as e:
+            raise requests.ConnectionError(e) from e
+        if nb_read == 0:
+            break
+        yield buffer[:nb_read]
+    if fp.length:  # `http.client` doesn't raise if the connection is closed before the end of the content
+        raise requests.ConnectionError(f"Connection broken: {fp.length} bytes missing.")
+    # Content fully read => connection can be reused
+    response.raw.release_conn()
+
+
+_READ_BUFFERS = threading.local()
+
+# Interval (in seconds) at which the content of a parallel download is hashed
+_HASH_INTERVAL = 0.5
+
+
+def _http_get_parallel(
+    url: str,
+    temp_file: BinaryIO,
+    *,
+    ranges: List[Tuple[int, int]],
+    first_response: requests.Response,
+    proxies: Optional[Dict],
+    headers: Optional[Dict[str, Any]],
+    progress: tqdm,
+    parts: Optional[DownloadParts] = None,
+    hasher: Optional[Any] = None,
+    parallel: bool = True,
+    resolve_url: Optional[str] = None,
+    resolve_headers: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Download `ranges` of a remote file concurrently and write each of them at its offset in `temp_file`.
+
+    Method should not be called directly. Please use `http_get` instead.
+
+    `first_response` is the already-opened response for the first range. Each range is downloaded by a worker of a
+    thread pool of `HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY` threads. If a ConnectionError or ReadTimeout happens, the
+    worker resumes its own range after a short pause and gives up after 5 attempts without receiving new data.
+
+    If the download fails or is interrupted, `temp_file` is truncated to the contiguous prefix of downloaded bytes so
+    that a later call can resume from `temp_file`'s size, exactly as for a single-connection download.
+
+    If `parts` is provided, ranges are absolute offsets in `temp_file` and must be aligned on its chunks. Each chunk is
+    flushed to disk and marked as completed in `parts` as soon as it is downloaded. `temp_file` is never truncated.
+    Downloads run on a single connection if `parallel=False` (i.e. when resuming a download started with parallel
+    download enabled).
+
+    If `hasher` is provided, it is updated with the downloaded content in order. Ranges are downloaded out of order so
+    the main thread periodically reads back the bytes written contiguously since the last update. They are most likely
+    still in the page cache. The whole file is hashed if `parts` is provided, otherwise only from `ranges[0][0]`.
+
+    If `url` is a signed location the file has been redirected to, `resolve_url` and `resolve_headers` are the URL and
+    headers to resolve it again. They are used for the remaining ranges once the signed URL is rejected with a 403
+    (e.g. expired signature).
+    """
+    temp_file.flush()
+    # Ranges are written at their offset in the file. Offsets are relative to the current end of `temp_file` (i.e. to
+    # the position from which the download is resumed), except when tracking chunks in which case they are absolute.
+    base_offset = 0 if parts is not None else os.fstat(temp_file.fileno()).st_size - ranges[0][0]
+    # Number of bytes written for each range
+    written = [0] * len(ranges)
+    stop_event = threading.Event()
+    progress_lock = threading.Lock()
+    # (url, headers) to download the ranges from. Shared by the workers so that the URL is re-resolved only once.
+    location: List[Tuple[str, Optional[Dict[str, Any]]]] = [(url, headers)]
+
+    def _download_range(index: int, response: Optional[requests.Response]) -> None:
+        start, end = ranges[index]
+        nb_retries = 5
+        while start + written[index] < end:
+            position = start + written[index]
+            try:
+                if response is None:
+                    location_url, location_headers = location[0]
+                    try:
+                        response = _request_wrapper(
+                            method="GET",
+                            url=location_url,
+                            stream=True,
+                            proxies=proxies,
+                            headers=_range_headers(location_headers, position, end),
+                            timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+                        )
+                    except HfHubHTTPError as e:
+                        expired = e.response is not None and e.response.status_code == 403
+                        if resolve_url is None or location_url == resolve_url or not expired:
+                            raise
+                        # Signed URL expired => resolve the file again (shared by all workers)
+                        logger.info(f"Signed URL for {resolve_url} has been rejected. Resolving it again.")
+                        location[0] = (resolve_url, resolve_headers)
+                        continue
+                    # Never write an error page or a full-body response at the offset of the range
+                    hf_raise_for_status(response)
+                    if response.status_code != 206:
+                        raise requests.ConnectionError(
+                            f"Expected a partial content (206) response for range {position}-{end - 1}, got"
+                            f" {response.status_code}."
+                        )
+                for chunk in _iter_chunks(response):
+                    if stop_event.is_set():
+                        return
+                    if chunk:  # filter out keep-alive new chunks
+                        if len(chunk) > end - position:
+                            chunk = chunk[: end - position]
+                        throttle(len(chunk), response.url)
+                        _pwrite(fd, chunk, base_offset + position)
+                        position += len(chunk)
+                        written[index] += len(chunk)
+                        with progress_lock:
+                            progress.update(len(chunk))
+                        # Some data has been downloaded from the server so we reset the number of retries.
+                        nb_retries = 5
+                        if parts is not None and (
+                            position == end or position // save_interval != (position - len(chunk)) // save_interval
+                        ):
+                            # Chunks have been fully downloaded => persist them before recording them in the sidecar
+                            os.fsync(fd)
+                            parts.mark_completed(start, position)
+                            parts.save()
+                        if position >= end:
+                            break
+                if position < end:
+                    raise requests.ConnectionError(f"Connection closed after {position - start} bytes of the range.")
+            except (requests.ConnectionError, requests.ReadTimeout) as e:
+                if stop_event.is_set():
+                    raise
+                if nb_retries <= 0:
+                    logger.warning("Error while downloading from %s: %s\nMax retries exceeded.", url, str(e))
+                    raise
+                logger.warning("Error while downloading from %s: %s\nTrying to resume download...", url, str(e))
+                nb_retries -= 1
+                time.sleep(1)
+            finally:
+                if response is not None:
+                    response.close()
+                response = None
+
+    save_interval = _get_parts_save_interval(parts) if parts is not None else 0
+    fd = os.open(temp_file.name, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+    concurrency = constants.HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY if parts is None or parallel else 1
+    executor = ThreadPoolExecutor(
+        max_workers=min(concurrency, len(ranges)),
+        thread_name_prefix="hf_http_get",
+    )
+    futures: List[Future] = []
+    hash_file = open(temp_file.name, "rb") if hasher is not None else None
+    hash_position = 0 if parts is not None else ranges[0][0]
+
+    def _contiguous_end() -> int:
+        # End of the bytes downloaded contiguously from `hash_position`. Completed chunks between ranges are on disk.
+        for (start, end), nb_written in zip(ranges, written):
+            if start + nb_written < end:
+                return start + nb_written
+        return ranges[-1][1]
+
+    try:
+        futures = [
+            executor.submit(_download_range, index, first_response if index == 0 else None)
+            for index in range(len(ranges))
+        ]
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=_HASH_INTERVAL if hash_file else None, return_when=FIRST_EXCEPTION)
+            for future in done:
+                future.result()  # raise first exception, if any
+            if hash_file is not None:
+                contiguous_end = _contiguous_end()
+                if contiguous_end > hash_position:
+                    hash_file.seek(base_offset + hash_position)
+                    _update_hasher_from_file(hasher, hash_file, contiguous_end - hash_position)
+                    hash_position = contiguous_end
+    except BaseException:
+        stop_event.set()
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        if parts is not None:
+            # Completed chunks are already recorded in the sidecar file
+            raise
+        # Truncate file to the contiguous prefix of downloaded bytes to keep it resumable
+        prefix_end = ranges[0][0]
+        for (start, end), nb_written in zip(ranges, written):
+            prefix_end = start + nb_written
+            if prefix_end < end:
+                break
+        os.ftruncate(fd, base_offset + prefix_end)
+        raise
+    finally:
+        executor.shutdown(wait=True)
+        os.close(fd)
+        if hash_file is not None:
+            hash_file.close()
+
+
 def _normalize_etag(etag: Optional[str]) -> Optional[str]:
     """Normalize ETag HTTP header, so it can be used to create nice filepaths.
 
@@ -605,13 +988,14 @@ def _create_symlink(src: str, dst: str, new_blob: bool = False) -> None:
         shutil.move(abs_src, abs_dst, copy_function=_copy_no_matter_what)
     else:
         logger.info(f"Symlink not supported. Copying file from {abs_src} to {abs_dst}")
-        shutil.copyfile(abs_src, abs_dst)
+        materialize_file(abs_src, abs_dst)
 
 
 def _cache_commit_hash_for_specific_revision(storage_folder: str, revision: str, commit_hash: str) -> None:
     """Cache reference between a revision (tag, branch or truncated commit hash) and the corresponding commit hash.
 
-    Does nothing if `revision` is already a proper `commit_hash` or reference is already cached.
+    Does nothing if `revision` is already a proper `commit_hash` or reference is already cached. If
+    `HF_HUB_REVISION_TTL` is set, the modification time of the reference is updated to mark it as freshly resolved.
     """
     if revision != commit_hash:
         ref_path = Path(storage_folder) / "refs" / revision
@@ -621,6 +1005,28 @@ def _cache_commit_hash_for_specific_revision(storage_folder: str, revision: str,
             # repo is already cached and user doesn't have write access to cache folder.
             # See https://github.com/huggingface/huggingface_hub/issues/1216.
             ref_path.write_text(commit_hash)
+        elif constants.HF_HUB_REVISION_TTL > 0:
+            try:
+                os.utime(ref_path)
+            except OSError as e:
+                logger.debug(f"Could not update modification time of {ref_path}: {e}")
+
+
+def _get_fresh_commit_hash_for_revision(storage_folder: str, revision: str) -> Optional[str]:
+    """Return the commit hash cached for `revision` if it has been resolved less than `HF_HUB_REVISION_TTL` seconds ago.
+
+    Returns `None` if the TTL is disabled, if the revision is not cached or if it is outdated.
+    """
+    if constants.HF_HUB_REVISION_TTL <= 0:
+        return None
+    ref_path = os.path.join(storage_folder, "refs", revision)
+    try:
+        if time.time() - os.path.getmtime(ref_path) > constants.HF_HUB_REVISION_TTL:
+            return None
+        with open(ref_path) as f:
+            return f.read()
+    except OSError:
+        return None
 
 
 @validate_hf_hub_args
@@ -635,29 +1041,39 @@ def repo_folder_name(*, repo_id: str, repo_type: str) -> str:
     return constants.REPO_ID_SEPARATOR.join(parts)
 
 
-def _check_disk_space(expected_size: int, target_dir: Union[str, Path]) -> None:
-    """Check disk usage and log a warning if there is not enough disk space to download the file.
+def _check_disk_space(expected_size: int, target_dir: Union[str, Path], nb_files: int = 1) -> None:
+    """Check disk usage and log a warning if there is not enough disk space to download the file(s).
+
+    If `HF_HUB_STRICT_DISK_SPACE_CHECK` is set, an `OSError` is raised instead of the warning so that the download
+    fails before starting. Nothing happens if the free disk space cannot be checked.
 
     Args:
         expected_size (`int`):
-            The expected size of the file in bytes.
+            The expected size of the file in bytes (total size if several files).
         target_dir (`str`):
             The directory where the file will be stored after downloading.
+        nb_files (`int`, *optional*):
+            Number of files to download. Used in the warning (or error) message only.
     """
 
     target_dir = Path(target_dir)  # format as `Path`
     for path in [target_dir] + list(target_dir.parents):  # first check target_dir, then each parents one by one
         try:
             target_dir_free = shutil.disk_usage(path).free
-            if target_dir_free < expected_size:
-                warnings.warn(
-                    "Not enough free disk space to download the file. "
-                    f"The expected file size is: {expected_size / 1e6:.2f} MB. "
-                    f"The target location {target_dir} only has {target_dir_free / 1e6:.2f} MB free disk space."
-                )
-            return
         except OSError:  # raise on anything: file does not exist or space disk cannot be checked
-            pass
+            continue
+        if target_dir_free < expected_size:
+            what = "the file" if nb_files == 1 else f"{nb_files} files"
+            size_label = "file size" if nb_files == 1 else "total size"
+            message = (
+                f"Not enough free disk space to download {what}. "
+                f"The expected {size_label} is: {expected_size / 1e6:.2f} MB. "
+                f"The target location {target_dir} only has {target_dir_free / 1e6:.2f} MB free disk space."
+            )
+            if constants.HF_HUB_STRICT_DISK_SPACE_CHECK:
+                raise OSError(errno.ENOSPC, message)
+            warnings.warn(message)
+        return
 
 
 @validate_hf_hub_args
@@ -680,9 +1096,13 @@ def hf_hub_download(
     local_files_only: bool = False,
     headers: Optional[Dict[str, str]] = None,
     endpoint: Optional[str] = None,
+    verify: bool = False,
     resume_download: Optional[bool] = None,
     force_filename: Optional[str] = None,
     local_dir_use_symlinks: Union[bool, Literal["auto"]] = "auto",
+    _file_metadata: Optional[HfFileMetadata] = None,
+    _parallel_download: Optional[bool] = None,
+    _promote: Optional[bool] = None,
 ) -> str:
     """Download a given file if it's not already present in the local cache.
 
@@ -761,6 +1181,10 @@ def hf_hub_download(
             local cached file if it exists.
         headers (`dict`, *optional*):
             Additional headers to be sent with the request.
+        verify (`bool`, *optional*, defaults to `False`):
+            If `True`, the content of the file is hashed while it is downloaded and checked against its ETag (sha256
+            for LFS files, git-sha1 for regular files). The file is deleted and an error is raised if they don't match.
+            Files already present in the cache are not checked.
 
     Returns:
         `str`: Local path of file or if networking is off, last version of file cached on disk.
@@ -778,7 +1202,7 @@ def hf_hub_download(
         [`EnvironmentError`](https://docs.python.org/3/library/exceptions.html#EnvironmentError)
             If `token=True` but the token cannot be found.
         [`OSError`](https://docs.python.org/3/library/exceptions.html#OSError)
-            If ETag cannot be determined.
+            If ETag cannot be determined or, with `verify=True`, if the downloaded content doesn't match it.
         [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
             If some parameter value is invalid.
 
@@ -857,6 +1281,9 @@ def hf_hub_download(
             cache_dir=cache_dir,
             force_download=force_download,
             local_files_only=local_files_only,
+            file_metadata=_file_metadata,
+            verify=verify,
+            parallel_download=_parallel_download,
         )
     else:
         return _hf_hub_download_to_cache_dir(
@@ -876,6 +1303,10 @@ def hf_hub_download(
             # Additional options
             local_files_only=local_files_only,
             force_download=force_download,
+            file_metadata=_file_metadata,
+            verify=verify,
+            parallel_download=_parallel_download,
+            promote=_promote,
         )
 
 
@@ -897,28 +1328,44 @@ def _hf_hub_download_to_cache_dir(
     # Additional options
     local_files_only: bool,
     force_download: bool,
+    file_metadata: Optional[HfFileMetadata] = None,
+    verify: bool = False,
+    parallel_download: Optional[bool] = None,
+    promote: Optional[bool] = None,
 ) -> str:
     """Download a given file to a cache folder, if not already present.
 
+    Files are looked up in the read-only cache layers (see `HF_HUB_CACHE`) before being downloaded. If `promote` is
+    True (default to `HF_HUB_CACHE_PROMOTE`), files found in a read-only layer are copied to `cache_dir`.
+
     Method should not be called directly. Please use `hf_hub_download` instead.
     """
     locks_dir = os.path.join(cache_dir, ".locks")
     storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    read_only_storage_folders = _get_read_only_storage_folders(cache_dir, repo_id=repo_id, repo_type=repo_type)
+    if promote is None:
+        promote = constants.HF_HUB_CACHE_PROMOTE
 
     # cross platform transcription of filename, to be used as a local file path.
-    relative_filename = os.path.join(*filename.split("/"))
-    if os.name == "nt":
-        if relative_filename.startswith("..\\") or "\\..\\" in relative_filename:
-            raise ValueError(
-                f"Invalid filename: cannot handle filename '{relative_filename}' on Windows. Please ask the repository"
-                " owner to rename this file."
-            )
+    relative_filename = _get_relative_filename(filename)
 
-    # if user provides a commit_hash and they already have the file on disk, shortcut everything.
-    if REGEX_COMMIT_HASH.match(revision):
-        pointer_path = _get_pointer_path(storage_folder, revision, relative_filename)
-        if os.path.exists(pointer_path) and not force_download:
+    # if file is already on disk for a commit hash or a recently resolved revision, shortcut everything.
+    if not force_download:
+        pointer_path = _get_cached_pointer_path_before_head_call(
+            storage_folder, repo_id=repo_id, filename=filename, relative_filename=relative_filename, revision=revision
+        )
+        if pointer_path is not None:
             return pointer_path
+        for read_only_storage_folder in read_only_storage_folders:
+            pointer_path = _get_cached_pointer_path_before_head_call(
+                read_only_storage_folder,
+                repo_id=repo_id,
+                filename=filename,
+                relative_filename=relative_filename,
+                revision=revision,
+            )
+            if pointer_path is not None:
+                return _get_from_read_only_cache(pointer_path, read_only_storage_folder, storage_folder, promote)
 
     # Try to get metadata (etag, commit_hash, url, size) from the server.
     # If we can't, a HEAD request error is returned.
@@ -935,6 +1382,7 @@ def _hf_hub_download_to_cache_dir(
         local_files_only=local_files_only,
         storage_folder=storage_folder,
         relative_filename=relative_filename,
+        file_metadata=file_metadata,
     )
 
     # etag can be None for several reasons:
@@ -950,20 +1398,15 @@ def _hf_hub_download_to_cache_dir(
     if head_call_error is not None:
         # Couldn't make a HEAD call => let's try to find a local file
         if not force_download:
-            commit_hash = None
-            if REGEX_COMMIT_HASH.match(revision):
-                commit_hash = revision
-            else:
-                ref_path = os.path.join(storage_folder, "refs", revision)
-                if os.path.isfile(ref_path):
-                    with open(ref_path) as f:
-                        commit_hash = f.read()
-
-            # Return pointer file if exists
-            if commit_hash is not None:
-                pointer_path = _get_pointer_path(storage_folder, commit_hash, relative_filename)
-                if os.path.exists(pointer_path) and not force_download:
-                    return pointer_path
+            pointer_path = _get_cached_pointer_path_after_head_call_error(storage_folder, relative_filename, revision)
+            if pointer_path is not None:
+                return pointer_path
+            for read_only_storage_folder in read_only_storage_folders:
+                pointer_path = _get_cached_pointer_path_after_head_call_error(
+                    read_only_storage_folder, relative_filename, revision
+                )
+                if pointer_path is not None:
+                    return _get_from_read_only_cache(pointer_path, read_only_storage_folder, storage_folder, promote)
 
         # Otherwise, raise appropriate error
         _raise_on_head_call_error(head_call_error, force_download, local_files_only)
@@ -994,6 +1437,25 @@ def _hf_hub_download_to_cache_dir(
             _create_symlink(blob_path, pointer_path, new_blob=False)
             return pointer_path
 
+        if not promote:
+            # file is in a read-only cache layer => return it as is
+            for read_only_storage_folder in read_only_storage_folders:
+                read_only_pointer_path = _get_pointer_path(read_only_storage_folder, commit_hash, relative_filename)
+                if os.path.exists(read_only_pointer_path):
+                    return read_only_pointer_path
+
+    # Blob in a read-only cache layer (maybe for another commit) => copy it instead of downloading it
+    read_only_blob_path = None
+    if not force_download:
+        read_only_blob_path = next(
+            (
+                os.path.join(folder, "blobs", etag)
+                for folder in read_only_storage_folders
+                if os.path.isfile(os.path.join(folder, "blobs", etag))
+            ),
+            None,
+        )
+
     # Prevent parallel downloads of the same file with a lock.
     # etag could be duplicated across repos,
     lock_path = os.path.join(locks_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type), f"{etag}.lock")
@@ -1006,18 +1468,32 @@ def _hf_hub_download_to_cache_dir(
     if os.name == "nt" and len(os.path.abspath(blob_path)) > 255:
         blob_path = "\\\\?\\" + os.path.abspath(blob_path)
 
+    global_blob_path = _get_global_blob_path(cache_dir, etag)
+
     Path(lock_path).parent.mkdir(parents=True, exist_ok=True)
     with WeakFileLock(lock_path):
-        _download_to_tmp_and_move(
-            incomplete_path=Path(blob_path + ".incomplete"),
-            destination_path=Path(blob_path),
-            url_to_download=url_to_download,
-            proxies=proxies,
-            headers=headers,
-            expected_size=expected_size,
-            filename=filename,
-            force_download=force_download,
-        )
+        if global_blob_path is not None and not force_download and os.path.isfile(global_blob_path):
+            # Blob already downloaded for another repo => no need to download it again
+            logger.info(f"Blob '{etag}' found in global blob store. Linking it to {blob_path}")
+            _link_or_copy(global_blob_path, blob_path)
+        elif read_only_blob_path is not None:
+            logger.info(f"Blob '{etag}' found in read-only cache. Copying it to {blob_path}")
+            _copy_from_read_only_cache(read_only_blob_path, blob_path)
+        else:
+            _download_to_tmp_and_move(
+                incomplete_path=Path(blob_path + ".incomplete"),
+                destination_path=Path(blob_path),
+                url_to_download=url_to_download,
+                proxies=proxies,
+                headers=headers,
+                expected_size=expected_size,
+                filename=filename,
+                force_download=force_download,
+                verify_etag=etag if verify else None,
+                parallel_download=parallel_download,
+            )
+            if global_blob_path is not None:
+                _add_to_global_blob_store(blob_path, global_blob_path)
         if not os.path.exists(pointer_path):
             _create_symlink(blob_path, pointer_path, new_blob=True)
 
@@ -1043,6 +1519,9 @@ def _hf_hub_download_to_local_dir(
     cache_dir: str,
     force_download: bool,
     local_files_only: bool,
+    file_metadata: Optional[HfFileMetadata] = None,
+    verify: bool = False,
+    parallel_download: Optional[bool] = None,
 ) -> str:
     """Download a given file to a local folder, if not already present.
 
@@ -1078,6 +1557,7 @@ def _hf_hub_download_to_local_dir(
         headers=headers,
         token=token,
         local_files_only=local_files_only,
+        file_metadata=file_metadata,
     )
 
     if head_call_error is not None:
@@ -1125,10 +1605,15 @@ def _hf_hub_download_to_local_dir(
             revision=commit_hash,
             repo_type=repo_type,
         )
+        global_blob_path = _get_global_blob_path(cache_dir, etag)
+        if not isinstance(cached_path, str) and global_blob_path is not None and os.path.isfile(global_blob_path):
+            cached_path = global_blob_path
         if isinstance(cached_path, str):
             with WeakFileLock(paths.lock_path):
                 paths.file_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copyfile(cached_path, paths.file_path)
+                materialize_file(
+                    cached_path, paths.file_path, allow_hardlink=constants.HF_HUB_LOCAL_DIR_ENABLE_HARDLINKS
+                )
             write_download_metadata(local_dir=local_dir, filename=filename, commit_hash=commit_hash, etag=etag)
             return str(paths.file_path)
 
@@ -1144,6 +1629,8 @@ def _hf_hub_download_to_local_dir(
             expected_size=expected_size,
             filename=filename,
             force_download=force_download,
+            verify_etag=etag if verify else None,
+            parallel_download=parallel_download,
         )
 
     write_download_metadata(local_dir=local_dir, filename=filename, commit_hash=commit_hash, etag=etag)
@@ -1161,6 +1648,8 @@ def try_to_load_from_cache(
     """
     Explores the cache to return the latest cached file for a given revision if found.
 
+    If read-only cache layers are configured (see `HF_HUB_CACHE`), they are explored after `cache_dir`.
+
     This function will not raise any exception if the file in not cached.
 
     Args:
@@ -1209,8 +1698,20 @@ def try_to_load_from_cache(
     if cache_dir is None:
         cache_dir = constants.HF_HUB_CACHE
 
-    object_id = repo_id.replace("/", "--")
-    repo_cache = os.path.join(cache_dir, f"{repo_type}s--{object_id}")
+    for repo_cache in [
+        os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type)),
+        *_get_read_only_storage_folders(cache_dir, repo_id=repo_id, repo_type=repo_type),
+    ]:
+        cached_file = _try_to_load_from_repo_cache(repo_cache, filename=filename, revision=revision)
+        if cached_file is not None:
+            return cached_file
+    return None
+
+
+def _try_to_load_from_repo_cache(
+    repo_cache: str, *, filename: str, revision: str
+) -> Union[str, _CACHED_NO_EXIST_T, None]:
+    """Look for a file in a single cached repo folder (see [`try_to_load_from_cache`])."""
     if not os.path.isdir(repo_cache):
         # No cache for this model
         return None
@@ -1334,6 +1835,8 @@ def _get_metadata_or_catch_error(
     local_files_only: bool,
     relative_filename: Optional[str] = None,  # only used to store `.no_exists` in cache
     storage_folder: Optional[str] = None,  # only used to store `.no_exists` in cache
+    file_metadata: Optional[HfFileMetadata] = None,  # if already known (e.g. from `snapshot_download`)
+    head_call_error: Optional[Exception] = None,  # if the HEAD call has already failed (e.g. in `ahf_hub_download`)
 ) -> Union[
     # Either an exception is caught and returned
     Tuple[None, None, None, None, Exception],
@@ -1344,7 +1847,8 @@ def _get_metadata_or_catch_error(
     """Get metadata for a file on the Hub, safely handling network issues.
 
     Returns either the etag, commit_hash and expected size of the file, or the error
-    raised while fetching the metadata.
+    raised while fetching the metadata. If `file_metadata` is provided, no HEAD call is made. If `head_call_error` is
+    provided, it is handled as if it had been raised by the HEAD call (used to share this logic with async downloads).
 
     NOTE: This function mutates `headers` inplace! It removes the `authorization` header
           if the file is a LFS blob and the domain of the url is different from the
@@ -1373,7 +1877,9 @@ def _get_metadata_or_catch_error(
     if not local_files_only:
         try:
             try:
-                metadata = get_hf_file_metadata(
+                if head_call_error is not None:
+                    raise head_call_error
+                metadata = file_metadata or get_hf_file_metadata(
                     url=url, proxies=proxies, timeout=etag_timeout, headers=headers, token=token
                 )
             except EntryNotFoundError as http_error:
@@ -1461,6 +1967,70 @@ def _get_metadata_or_catch_error(
     return (url_to_download, etag, commit_hash, expected_size, head_error_call)  # type: ignore [return-value]
 
 
+def _get_relative_filename(filename: str) -> str:
+    """Cross platform transcription of a filename in a repo, to be used as a local file path."""
+    relative_filename = os.path.join(*filename.split("/"))
+    if os.name == "nt":
+        if relative_filename.startswith("..\\") or "\\..\\" in relative_filename:
+            raise ValueError(
+                f"Invalid filename: cannot handle filename '{relative_filename}' on Windows. Please ask the repository"
+                " owner to rename this file."
+            )
+    return relative_filename
+
+
+def _get_cached_pointer_path_before_head_call(
+    storage_folder: str, *, repo_id: str, filename: str, relative_filename: str, revision: str
+) -> Optional[str]:
+    """Return the path of the cached file if it can be trusted without a HEAD call, None otherwise.
+
+    This is the case if `revision` is a commit hash or if it has been resolved recently (see `HF_HUB_REVISION_TTL`).
+    Raises [`EntryNotFoundError`] if the non-existence of the file has been cached for a recently resolved revision.
+    """
+    # if user provides a commit_hash and they already have the file on disk, shortcut everything.
+    if REGEX_COMMIT_HASH.match(revision):
+        pointer_path = _get_pointer_path(storage_folder, revision, relative_filename)
+        return pointer_path if os.path.exists(pointer_path) else None
+
+    # if revision has been resolved recently (see `HF_HUB_REVISION_TTL`), trust the cached commit hash.
+    fresh_commit_hash = _get_fresh_commit_hash_for_revision(storage_folder, revision)
+    if fresh_commit_hash is not None:
+        pointer_path = _get_pointer_path(storage_folder, fresh_commit_hash, relative_filename)
+        if os.path.exists(pointer_path):
+            return pointer_path
+        if os.path.isfile(os.path.join(storage_folder, ".no_exist", fresh_commit_hash, relative_filename)):
+            raise EntryNotFoundError(
+                f"File '{filename}' does not exist in {repo_id} at revision '{revision}' ({fresh_commit_hash}). "
+                "Non-existence of the file has been cached locally (see `HF_HUB_REVISION_TTL`)."
+            )
+    return None
+
+
+def _get_cached_pointer_path_after_head_call_error(
+    storage_folder: str, relative_filename: str, revision: str
+) -> Optional[str]:
+    """Return the path of the last downloaded version of the file for `revision`, if any.
+
+    Used when the HEAD call failed. If `revision` is a commit hash, look inside "snapshots". If it is a branch or a tag,
+    look inside "refs".
+    """
+    commit_hash = None
+    if REGEX_COMMIT_HASH.match(revision):
+        commit_hash = revision
+    else:
+        ref_path = os.path.join(storage_folder, "refs", revision)
+        if os.path.isfile(ref_path):
+            with open(ref_path) as f:
+                commit_hash = f.read()
+
+    # Return pointer file if exists
+    if commit_hash is not None:
+        pointer_path = _get_pointer_path(storage_folder, commit_hash, relative_filename)
+        if os.path.exists(pointer_path):
+            return pointer_path
+    return None
+
+
 def _raise_on_head_call_error(head_call_error: Exception, force_download: bool, local_files_only: bool) -> NoReturn:
     """Raise an appropriate error when the HEAD call failed and we cannot locate a local file."""
     # No head call => we cannot force download.
@@ -1502,15 +2072,19 @@ def _download_to_tmp_and_move(
     expected_size: Optional[int],
     filename: str,
     force_download: bool,
+    verify_etag: Optional[str] = None,
+    parallel_download: Optional[bool] = None,
 ) -> None:
     """Download content from a URL to a destination path.
 
     Internal logic:
     - return early if file is already downloaded
     - resume download if possible (from incomplete file)
+    - only download missing chunks if a parallel download was interrupted (see `_download_parts.py`)
     - do not resume download if `force_download=True` or `HF_HUB_ENABLE_HF_TRANSFER=True`
     - check disk space before downloading
     - download content to a temporary file
+    - if `verify_etag` is set, check the hash of the content (computed while downloading) against it
     - set correct permissions on temporary file
     - move the temporary file to the destination path
 
@@ -1531,9 +2105,13 @@ def _download_to_tmp_and_move(
             message += " (hf_transfer=True)"
         logger.info(message)
         incomplete_path.unlink(missing_ok=True)
+        get_parts_path(incomplete_path).unlink(missing_ok=True)
 
     with incomplete_path.open("ab") as f:
-        resume_size = f.tell()
+        parts = _get_download_parts(
+            incomplete_path, f, headers=headers, expected_size=expected_size, parallel_download=parallel_download
+        )
+        resume_size = parts.completed_size if parts is not None else f.tell()
         message = f"Downloading '{filename}' to '{incomplete_path}'"
         if resume_size > 0 and expected_size is not None:
             message += f" (resume from {resume_size}/{expected_size})"
@@ -1544,6 +2122,12 @@ def _download_to_tmp_and_move(
             _check_disk_space(expected_size, incomplete_path.parent)
             _check_disk_space(expected_size, destination_path.parent)
 
+        if parts is not None and constants.HF_HUB_PREALLOCATE_FILES:
+            # Chunks are tracked in the sidecar file => the file size can be set upfront without breaking resume
+            _preallocate(incomplete_path, parts.size)
+
+        hasher = _get_resumed_hasher(verify_etag, expected_size, incomplete_path, resume_size, parts)
+
         http_get(
             url_to_download,
             f,
@@ -1551,12 +2135,157 @@ def _download_to_tmp_and_move(
             resume_size=resume_size,
             headers=headers,
             expected_size=expected_size,
+            _parts=parts,
+            _hasher=hasher,
+            _parallel_download=parallel_download,
         )
 
+    if hasher is not None and verify_etag is not None:
+        _check_etag_hash(hasher, verify_etag, incomplete_path, filename)
+
+    # Delete the sidecar file before moving the blob: if the process is interrupted in between, the complete
+    # incomplete file is resumed (i.e. moved) on next call.
+    get_parts_path(incomplete_path).unlink(missing_ok=True)
     logger.info(f"Download complete. Moving file to {destination_path}")
     _chmod_and_move(incomplete_path, destination_path)
 
 
+def _preallocate(path: Path, size: int) -> None:
+    """Allocate `size` bytes on disk for the file at `path` (see `HF_HUB_PREALLOCATE_FILES`).
+
+    Only for files whose chunks are tracked in a sidecar file, as the file size is set to `size` and can no longer be
+    used to resume the download.
+
+    Best effort: nothing is done if `posix_fallocate` is not available or not supported by the file system. Raises an
+    `OSError` if there is not enough disk space.
+    """
+    if not hasattr(os, "posix_fallocate"):
+        return
+    # Not using the file object opened in append mode: the fallback of `posix_fallocate` (write zeros) would append
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError as e:
+        if e.errno == errno.ENOSPC:
+            raise OSError(
+                e.errno, f"Not enough free disk space to download the file ({size / 1e6:.2f} MB) to '{path}'."
+            ) from e
+        logger.debug(f"Could not preallocate {path}: {e}")
+    finally:
+        os.close(fd)
+
+
+def _get_etag_hasher(etag: str, size: Optional[int]) -> Optional[Any]:
+    """Return a hash object computing the etag of a file from its content, or None if the etag is not a hash.
+
+    The etag of an LFS file is the sha256 of its content. The etag of a regular file is its git-sha1, i.e. the sha1 of
+    its content prefixed by a header containing its size (see [`~utils.sha.git_hash`]).
+    """
+    if REGEX_SHA256.match(etag) is not None:
+        return sha256()
+    if REGEX_COMMIT_HASH.match(etag) is not None and size is not None:
+        hasher = sha1()
+        hasher.update(f"blob {size}\0".encode())
+        return hasher
+    logger.warning(f"Cannot verify file content: etag '{etag}' is not a sha256 or the file size is unknown.")
+    return None
+
+
+def _get_resumed_hasher(
+    verify_etag: Optional[str],
+    expected_size: Optional[int],
+    incomplete_path: Path,
+    resume_size: int,
+    parts: Optional[DownloadParts],
+) -> Optional[Any]:
+    """Return the hasher to verify a download against `verify_etag`, updated with the bytes already downloaded.
+
+    If `parts` is provided, downloaded bytes are not contiguous: the hasher is returned empty and the whole file must be
+    hashed by the downloader (see `http_get`).
+    """
+    if verify_etag is None:
+        return None
+    hasher = _get_etag_hasher(verify_etag, expected_size)
+    if hasher is not None and parts is None and resume_size > 0:
+        # Resuming a download => hash the bytes already downloaded
+        with incomplete_path.open("rb") as resumed_file:
+            _update_hasher_from_file(hasher, resumed_file, resume_size)
+    return hasher
+
+
+def _update_hasher_from_file(hasher: Any, fileobj: BinaryIO, size: int) -> None:
+    """Update `hasher` with the next `size` bytes read from `fileobj`."""
+    while size > 0:
+        chunk = fileobj.read(min(size, constants.DOWNLOAD_CHUNK_SIZE))
+        if not chunk:
+            break
+        hasher.update(chunk)
+        size -= len(chunk)
+
+
+def _check_etag_hash(hasher: Any, etag: str, incomplete_path: Path, filename: str) -> None:
+    """Raise if the hash of the downloaded content doesn't match the etag. The incomplete file is deleted."""
+    digest = hasher.hexdigest()
+    if digest != etag:
+        incomplete_path.unlink(missing_ok=True)
+        get_parts_path(incomplete_path).unlink(missing_ok=True)
+        raise EnvironmentError(
+            f"Integrity check failed: hash of the downloaded content of '{filename}' is '{digest}' but expected"
+            f" '{etag}'.\nThe corrupted file has been deleted. This is usually due to network issues while"
+            " downloading the file. Please retry."
+        )
+
+
+def _get_download_parts(
+    incomplete_path: Path,
+    temp_file: BinaryIO,
+    headers: Dict[str, str],
+    expected_size: Optional[int],
+    parallel_download: Optional[bool] = None,
+) -> Optional[DownloadParts]:
+    """Return the chunks tracker to use to download `incomplete_path`, if any.
+
+    An existing sidecar file is loaded to resume an interrupted parallel download. If it is invalid (or if the
+    incomplete file is empty), the partial download cannot be trusted and both files are reset. If no sidecar exists
+    and the file is eligible to a parallel download, a new one is created. The bytes already in the incomplete file
+    (downloaded by a single connection) are recorded as completed.
+    """
+    parts_path = get_parts_path(incomplete_path)
+    resume_size = temp_file.tell()
+    if parts_path.exists():
+        parts = DownloadParts.load(parts_path, size=expected_size) if expected_size is not None else None
+        if parts is not None and resume_size > 0:
+            if parts.is_done:
+                # All chunks downloaded (interrupted right before the move) => file is complete
+                parts.delete()
+                return None
+            return parts
+        logger.info(f"Removing incomplete file '{incomplete_path}' (invalid chunks file)")
+        parts_path.unlink(missing_ok=True)
+        temp_file.truncate(0)
+        temp_file.seek(0)
+        return None
+
+    if constants.HF_HUB_ENABLE_HF_TRANSFER or not _is_parallel_download_possible(
+        temp_file, headers, resume_size, expected_size, enabled=parallel_download
+    ):
+        return None
+    assert expected_size is not None  # for mypy
+    parts = DownloadParts(parts_path, size=expected_size, chunk_size=constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE)
+    parts.mark_completed(0, resume_size)
+    parts.save()
+    return parts
+
+
+def _get_parts_save_interval(parts: DownloadParts) -> int:
+    """Return the number of bytes of a range to download between two saves of the chunks sidecar.
+
+    Each save is fsync'd. A sidecar created with small chunks for a sparse blob (see `hf_hub_download_range`) is saved
+    at the granularity of a parallel download rather than at each of its chunks when the rest of the file is downloaded.
+    """
+    return max(parts.chunk_size, constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE)
+
+
 def _int_or_none(value: Optional[str]) -> Optional[int]:
     try:
         return int(value)  # type: ignore
@@ -1598,18 +2327,108 @@ def _chmod_and_move(src: Path, dst: Path) -> None:
     shutil.move(str(src), str(dst), copy_function=_copy_no_matter_what)
 
 
+def _get_global_blob_path(cache_dir: str, etag: str) -> Optional[str]:
+    """Return the path of a blob in the global blob store, or None if the store is disabled.
+
+    Only LFS files are shared (i.e. blobs identified by a sha256). See `HF_HUB_ENABLE_GLOBAL_BLOB_STORE`.
+    """
+    if not constants.HF_HUB_ENABLE_GLOBAL_BLOB_STORE or REGEX_SHA256.match(etag) is None:
+        return None
+    return os.path.join(cache_dir, constants.GLOBAL_BLOBS_DIR_NAME, etag)
+
+
+def _add_to_global_blob_store(blob_path: str, global_blob_path: str) -> None:
+    """Hardlink a downloaded blob into the global blob store.
+
+    Best effort: if hardlinks are not supported (e.g. Windows without permissions, store on another volume), the blob
+    is not shared. It is never copied as it would double the disk usage.
+    """
+    if os.path.exists(global_blob_path):
+        return
+    try:
+        os.makedirs(os.path.dirname(global_blob_path), exist_ok=True)
+        os.link(blob_path, global_blob_path)
+    except OSError as e:  # includes FileExistsError if the same blob is added concurrently
+        logger.debug(f"Could not add blob to global blob store ({global_blob_path}): {e}")
+
+
+def _get_read_only_storage_folders(cache_dir: Union[str, Path], *, repo_id: str, repo_type: str) -> List[str]:
+    """Return the folders of a repo in the read-only cache layers (see `HF_HUB_CACHE`), in lookup order."""
+    abs_cache_dir = os.path.abspath(cache_dir)
+    return [
+        os.path.join(layer, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+        for layer in constants.HF_HUB_READ_ONLY_CACHES
+        if os.path.abspath(layer) != abs_cache_dir
+    ]
+
+
+def _get_from_read_only_cache(
+    read_only_pointer_path: str, read_only_storage_folder: str, storage_folder: str, promote: bool
+) -> str:
+    """Return a file found in a read-only cache layer.
+
+    If `promote` is True, the file is first copied to the writable cache (with the same layout) and the path in the
+    writable cache is returned.
+    """
+    if not promote:
+        return read_only_pointer_path
+    pointer_path = os.path.join(storage_folder, os.path.relpath(read_only_pointer_path, read_only_storage_folder))
+    if os.path.exists(pointer_path):
+        return pointer_path
+
+    os.makedirs(os.path.dirname(pointer_path), exist_ok=True)
+    read_only_blob_path = os.path.realpath(read_only_pointer_path)
+    if os.path.dirname(read_only_blob_path) == os.path.realpath(os.path.join(read_only_storage_folder, "blobs")):
+        blob_path = os.path.join(storage_folder, "blobs", os.path.basename(read_only_blob_path))
+        if not os.path.exists(blob_path):
+            logger.info(f"Copying blob from read-only cache {read_only_blob_path} to {blob_path}")
+            _copy_from_read_only_cache(read_only_blob_path, blob_path)
+        _create_symlink(blob_path, pointer_path, new_blob=False)
+    else:
+        # Read-only cache doesn't use symlinks => copy the file directly
+        _copy_from_read_only_cache(read_only_blob_path, pointer_path)
+    return pointer_path
+
+
+def _copy_from_read_only_cache(src: str, dst: str) -> None:
+    """Copy a file from a read-only cache layer to the writable cache.
+
+    The file is copied to a temporary file first so that an interrupted copy never leaves a truncated blob in the cache.
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    tmp_path = f"{dst}.{uuid.uuid4().hex}.tmp"
+    try:
+        _link_or_copy(src, tmp_path)
+        os.replace(tmp_path, dst)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hardlink `src` to `dst`, or copy it if hardlinks are not supported (see [`materialize_file`])."""
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        logger.debug(f"Could not hardlink {src} to {dst}: {e}. Copying file instead.")
+        materialize_file(src, dst)
+
+
 def _copy_no_matter_what(src: str, dst: str) -> None:
     """Copy file from src to dst.
 
-    If `shutil.copy2` fails, fallback to `shutil.copyfile`.
+    File content is copied with [`materialize_file`] (reflink if possible). Metadata and permission are copied on a
+    best-effort basis.
     """
+    materialize_file(src, dst)
     try:
-        # Copy file with metadata and permission
+        # Copy metadata and permission
         # Can fail e.g. if dst is an S3 mount
-        shutil.copy2(src, dst)
+        shutil.copystat(src, dst)
     except OSError:
-        # Copy only file content
-        shutil.copyfile(src, dst)
+        pass
 
 
 def _get_pointer_path(storage_folder: str, revision: str, relative_filename: str) -> str:
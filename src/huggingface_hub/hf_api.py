@@ -100,7 +100,7 @@ from .errors import (
     RepositoryNotFoundError,
     RevisionNotFoundError,
 )
-from .file_download import HfFileMetadata, get_hf_file_metadata, hf_hub_url
+from .file_download import REGEX_COMMIT_HASH, HfFileMetadata, get_hf_file_metadata, hf_hub_url
 from .repocard_data import DatasetCardData, ModelCardData, SpaceCardData
 from .utils import (
     DEFAULT_IGNORE_PATTERNS,
@@ -5636,6 +5636,170 @@ class HfApi:
                 " formatted safetensors file."
             ) from e
 
+    @validate_hf_hub_args
+    def download_safetensors_tensors(
+        self,
+        repo_id: str,
+        tensors: Union[str, List[str]],
+        local_path: Union[str, Path],
+        *,
+        repo_type: Optional[str] = None,
+        revision: Optional[str] = None,
+        cache_dir: Union[str, Path, None] = None,
+        token: Union[bool, str, None] = None,
+    ) -> str:
+        """
+        Download a subset of the tensors of a safetensors repo on the Hub to a new safetensors file.
+
+        Only the bytes of the selected tensors are downloaded, using range requests. Tensors stored next to each other
+        are downloaded in a single request. The downloaded ranges are kept in the cache (see [`hf_hub_download_range`])
+        so that downloading the same tensors again, or the full file later, doesn't download them twice. This is useful
+        to load a single layer, an embedding matrix or one expert of a Mixture-of-Experts model without downloading
+        the whole checkpoint.
+
+        The output file is a valid safetensors file that can be loaded with `safetensors.torch.load_file`. It contains
+        the selected tensors of all shards and the metadata of the shards they come from.
+
+        Args:
+            repo_id (`str`):
+                A user or an organization name and a repo name separated by a `/`.
+            tensors (`str` or `List[str]`):
+                Names of the tensors to download. Unix shell-style wildcards are supported (e.g.
+                `"model.layers.0.*"`).
+            local_path (`str` or `Path`):
+                Path of the safetensors file to write. Parent folders are created if needed.
+            repo_type (`str`, *optional*):
+                Set to `"dataset"` or `"space"` if the file is in a dataset or space, `None` or `"model"` if in a
+                model. Default is `None`.
+            revision (`str`, *optional*):
+                The git revision to fetch the tensors from. Can be a branch name, a tag, or a commit hash. Defaults to
+                the head of the `"main"` branch.
+            cache_dir (`str`, `Path`, *optional*):
+                Path to the folder where cached files are stored.
+            token (Union[bool, str, None], optional):
+                A valid user access token (string). Defaults to the locally saved
+                token, which is the recommended method for authentication (see
+                https://huggingface.co/docs/huggingface_hub/quick-start#authentication).
+                To disable authentication, pass `False`.
+
+        Returns:
+            `str`: Path of the written safetensors file.
+
+        Raises:
+            [`NotASafetensorsRepoError`]
+                If the repo is not a safetensors repo i.e. doesn't have either a
+              `model.safetensors` or a `model.safetensors.index.json` file.
+            [`SafetensorsParsingError`]
+                If a safetensors file header couldn't be parsed correctly.
+            [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
+                If a name or pattern in `tensors` doesn't match any tensor of the repo.
+
+        Example:
+            ```py
+            >>> from huggingface_hub import download_safetensors_tensors
+            >>> from safetensors.torch import load_file
+            >>> path = download_safetensors_tensors(
+            ...     "meta-llama/Llama-3.1-8B", "model.embed_tokens.weight", "embeddings.safetensors"
+            ... )
+            >>> load_file(path)["model.embed_tokens.weight"].shape
+            torch.Size([128256, 4096])
+            ```
+        """
+        from ._download_range import _open_ranges
+
+        if isinstance(tensors, str):
+            tensors = [tensors]
+        # Resolve the revision once so that headers and tensors are read from the same commit, even if a new commit is
+        # pushed in the meantime
+        if revision is None or REGEX_COMMIT_HASH.match(revision) is None:
+            revision = self.repo_info(repo_id, repo_type=repo_type, revision=revision, token=token).sha or revision
+        repo_metadata = self.get_safetensors_metadata(repo_id, repo_type=repo_type, revision=revision, token=token)
+        selected = set(filter_repo_objects(repo_metadata.weight_map.keys(), allow_patterns=tensors))
+        unmatched = [
+            pattern
+            for pattern in tensors
+            if next(iter(filter_repo_objects(repo_metadata.weight_map.keys(), allow_patterns=pattern)), None) is None
+        ]
+        if len(unmatched) > 0:
+            raise ValueError(f"No tensor matching {unmatched} in '{repo_id}'.")
+
+        # Tensors grouped by shard, in the order of their data in the shard
+        tensors_per_file: Dict[str, List[Tuple[str, TensorInfo]]] = defaultdict(list)
+        for tensor_name in selected:
+            filename = repo_metadata.weight_map[tensor_name]
+            tensors_per_file[filename].append(
+                (tensor_name, repo_metadata.files_metadata[filename].tensors[tensor_name])
+            )
+        for file_tensors in tensors_per_file.values():
+            file_tensors.sort(key=lambda item: item[1].data_offsets)
+
+        # Header of the new file: same tensors, packed one after the other
+        header: Dict[str, Any] = {}
+        file_metadata: Dict[str, str] = {}
+        offset = 0
+        for filename, file_tensors in sorted(tensors_per_file.items()):
+            file_metadata.update(repo_metadata.files_metadata[filename].metadata)
+            for tensor_name, tensor_info in file_tensors:
+                size = tensor_info.data_offsets[1] - tensor_info.data_offsets[0]
+                header[tensor_name] = {
+                    "dtype": tensor_info.dtype,
+                    "shape": tensor_info.shape,
+                    "data_offsets": [offset, offset + size],
+                }
+                offset += size
+        if len(file_metadata) > 0:
+            header = {"__metadata__": file_metadata, **header}
+        header_bytes = json.dumps(header, separators=(",", ":")).encode()
+        header_bytes += b" " * (-len(header_bytes) % 8)  # data must be 8-bytes aligned
+
+        range_kwargs: Dict[str, Any] = {
+            "repo_id": repo_id,
+            "repo_type": repo_type or constants.REPO_TYPE_MODEL,
+            "revision": revision or constants.DEFAULT_REVISION,
+            "cache_dir": str(cache_dir or constants.HF_HUB_CACHE),
+            "proxies": None,
+            "etag_timeout": constants.DEFAULT_ETAG_TIMEOUT,
+            "token": token,
+            "local_files_only": False,
+            "endpoint": self.endpoint,
+        }
+        local_path = Path(local_path)
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = local_path.with_name(local_path.name + ".incomplete")
+        try:
+            with tmp_path.open("wb") as output:
+                output.write(struct.pack("<Q", len(header_bytes)))
+                output.write(header_bytes)
+                for filename, file_tensors in sorted(tensors_per_file.items()):
+                    # Fresh headers for each call: authorization is removed in place when redirected to a CDN
+                    file, _ = _open_ranges(
+                        filename=filename, ranges=[(0, 8)], headers=self._build_hf_headers(token=token), **range_kwargs
+                    )
+                    with file:
+                        data_start = 8 + struct.unpack("<Q", file.read(8))[0]
+                    ranges = [
+                        (data_start + tensor_info.data_offsets[0], data_start + tensor_info.data_offsets[1])
+                        for _, tensor_info in file_tensors
+                    ]
+                    file, _ = _open_ranges(
+                        filename=filename, ranges=ranges, headers=self._build_hf_headers(token=token), **range_kwargs
+                    )
+                    with file:
+                        for start, end in ranges:
+                            file.seek(start)
+                            while start < end:
+                                chunk = file.read(min(constants.DOWNLOAD_CHUNK_SIZE, end - start))
+                                if len(chunk) == 0:
+                                    raise EnvironmentError(f"Unexpected end of file while reading '{filename}'.")
+                                output.write(chunk)
+                                start += len(chunk)
+            tmp_path.replace(local_path)
+        except BaseException:
+            # Do not leave a partial file behind (downloaded ranges are kept in the cache anyway)
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return str(local_path)
+
     @validate_hf_hub_args
     def create_branch(
         self,
@@ -9563,6 +9727,7 @@ get_full_repo_name = api.get_full_repo_name
 # Safetensors helpers
 get_safetensors_metadata = api.get_safetensors_metadata
 parse_safetensors_file_metadata = api.parse_safetensors_file_metadata
+download_safetensors_tensors = api.download_safetensors_tensors
 
 # Background jobs
 run_as_future = api.run_as_future
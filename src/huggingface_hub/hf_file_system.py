@@ -1,13 +1,17 @@
 import os
+import posixpath
 import re
 import tempfile
+import threading
+import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from itertools import chain
 from pathlib import Path
 from typing import Any, Dict, Iterator, List, NoReturn, Optional, Tuple, Union
-from urllib.parse import quote, unquote
+from urllib.parse import parse_qs, quote, unquote, urlparse
 
 import fsspec
 from fsspec.callbacks import _DEFAULT_CALLBACK, NoOpCallback, TqdmCallback
@@ -15,10 +19,22 @@ from fsspec.utils import isfilelike
 from requests import Response
 
 from . import constants
+from ._bandwidth import throttle
 from ._commit_api import CommitOperationCopy, CommitOperationDelete
+from ._download_range import _open_sparse_blob
+from ._listings_cache import ListingsCache
+from ._prefetch_cache import PrefetchCache
 from .errors import EntryNotFoundError, RepositoryNotFoundError, RevisionNotFoundError
-from .file_download import hf_hub_url, http_get
-from .hf_api import HfApi, LastCommitInfo, RepoFile
+from .file_download import (
+    HfFileMetadata,
+    _get_global_blob_path,
+    _get_read_only_storage_folders,
+    get_hf_file_metadata,
+    hf_hub_url,
+    http_get,
+    repo_folder_name,
+)
+from .hf_api import BlobLfsInfo, HfApi, LastCommitInfo, RepoFile, RepoFolder
 from .utils import HFValidationError, hf_raise_for_status, http_backoff
 
 
@@ -32,6 +48,15 @@ SPECIAL_REFS_REVISION_REGEX = re.compile(
     re.VERBOSE,
 )
 
+# Signed CDN URLs are considered expired a bit before their actual expiration time
+_REDIRECT_EXPIRATION_MARGIN = 60
+# Lifetime of a cached redirect if the CDN URL doesn't tell when it expires
+_REDIRECT_DEFAULT_TTL = 5 * 60
+# Responses from a cached location meaning it is not valid anymore (expired, revoked or file moved)
+_REDIRECT_INVALID_STATUS_CODES = (401, 403, 404)
+# Ranges of a file closer than this are fetched in a single request by `cat_ranges`
+_CAT_RANGES_MAX_GAP = 64 * 1024
+
 
 @dataclass
 class HfFileSystemResolvedPath:
@@ -116,13 +141,32 @@ class HfFileSystem(fsspec.AbstractFileSystem):
         self._repo_and_revision_exists_cache: Dict[
             Tuple[str, str, Optional[str]], Tuple[bool, Optional[Exception]]
         ] = {}
+        # Maps (repo_type, repo_id, revision, path_in_repo) to a 2-tuple with:
+        #  * the 1st element being the (signed) CDN URL the file is redirected to
+        #  * the 2nd element being the timestamp after which the URL must be resolved again
+        self._redirect_cache: Dict[Tuple[str, str, str, str], Tuple[str, float]] = {}
+        # Maps (repo_type, repo_id, revision) to the commit hash of the revision.
+        # Only used to key the persistent listings cache (see `HF_HUB_FS_LISTINGS_CACHE`).
+        self._commit_hash_cache: Dict[Tuple[str, str, str], str] = {}
 
     def _repo_and_revision_exist(
         self, repo_type: str, repo_id: str, revision: Optional[str]
     ) -> Tuple[bool, Optional[Exception]]:
         if (repo_type, repo_id, revision) not in self._repo_and_revision_exists_cache:
+            listings_cache = ListingsCache(repo_type, repo_id) if constants.HF_HUB_FS_LISTINGS_CACHE else None
+            commit_hash = (
+                listings_cache.get_commit_hash(revision or constants.DEFAULT_REVISION)
+                if listings_cache is not None
+                else None
+            )
+            if commit_hash is not None:
+                # Revision resolved recently (possibly by another process): no need to call the Hub
+                self._commit_hash_cache[(repo_type, repo_id, revision or constants.DEFAULT_REVISION)] = commit_hash
+                self._repo_and_revision_exists_cache[(repo_type, repo_id, revision)] = True, None
+                self._repo_and_revision_exists_cache[(repo_type, repo_id, None)] = True, None
+                return True, None
             try:
-                self._api.repo_info(
+                repo_info = self._api.repo_info(
                     repo_id, revision=revision, repo_type=repo_type, timeout=constants.HF_HUB_ETAG_TIMEOUT
                 )
             except (RepositoryNotFoundError, HFValidationError) as e:
@@ -134,6 +178,11 @@ class HfFileSystem(fsspec.AbstractFileSystem):
             else:
                 self._repo_and_revision_exists_cache[(repo_type, repo_id, revision)] = True, None
                 self._repo_and_revision_exists_cache[(repo_type, repo_id, None)] = True, None
+                if listings_cache is not None and repo_info.sha is not None:
+                    self._commit_hash_cache[(repo_type, repo_id, revision or constants.DEFAULT_REVISION)] = (
+                        repo_info.sha
+                    )
+                    listings_cache.set_commit_hash(revision or constants.DEFAULT_REVISION, repo_info.sha)
         return self._repo_and_revision_exists_cache[(repo_type, repo_id, revision)]
 
     def resolve_path(self, path: str, revision: Optional[str] = None) -> HfFileSystemResolvedPath:
@@ -156,80 +205,19 @@ class HfFileSystem(fsspec.AbstractFileSystem):
                 If trying to list repositories.
         """
 
-        def _align_revision_in_path_with_revision(
-            revision_in_path: Optional[str], revision: Optional[str]
-        ) -> Optional[str]:
-            if revision is not None:
-                if revision_in_path is not None and revision_in_path != revision:
-                    raise ValueError(
-                        f'Revision specified in path ("{revision_in_path}") and in `revision` argument ("{revision}")'
-                        " are not the same."
-                    )
-            else:
-                revision = revision_in_path
-            return revision
-
-        path = self._strip_protocol(path)
-        if not path:
-            # can't list repositories at root
-            raise NotImplementedError("Access to repositories lists is not implemented.")
-        elif path.split("/")[0] + "/" in constants.REPO_TYPES_URL_PREFIXES.values():
-            if "/" not in path:
-                # can't list repositories at the repository type level
-                raise NotImplementedError("Access to repositories lists is not implemented.")
-            repo_type, path = path.split("/", 1)
-            repo_type = constants.REPO_TYPES_MAPPING[repo_type]
-        else:
-            repo_type = constants.REPO_TYPE_MODEL
-        if path.count("/") > 0:
-            if "@" in path:
-                repo_id, revision_in_path = path.split("@", 1)
-                if "/" in revision_in_path:
-                    match = SPECIAL_REFS_REVISION_REGEX.search(revision_in_path)
-                    if match is not None and revision in (None, match.group()):
-                        # Handle `refs/convert/parquet` and PR revisions separately
-                        path_in_repo = SPECIAL_REFS_REVISION_REGEX.sub("", revision_in_path).lstrip("/")
-                        revision_in_path = match.group()
-                    else:
-                        revision_in_path, path_in_repo = revision_in_path.split("/", 1)
-                else:
-                    path_in_repo = ""
-                revision = _align_revision_in_path_with_revision(unquote(revision_in_path), revision)
-                repo_and_revision_exist, err = self._repo_and_revision_exist(repo_type, repo_id, revision)
-                if not repo_and_revision_exist:
-                    _raise_file_not_found(path, err)
-            else:
-                revision_in_path = None
-                repo_id_with_namespace = "/".join(path.split("/")[:2])
-                path_in_repo_with_namespace = "/".join(path.split("/")[2:])
-                repo_id_without_namespace = path.split("/")[0]
-                path_in_repo_without_namespace = "/".join(path.split("/")[1:])
-                repo_id = repo_id_with_namespace
-                path_in_repo = path_in_repo_with_namespace
-                repo_and_revision_exist, err = self._repo_and_revision_exist(repo_type, repo_id, revision)
-                if not repo_and_revision_exist:
-                    if isinstance(err, (RepositoryNotFoundError, HFValidationError)):
-                        repo_id = repo_id_without_namespace
-                        path_in_repo = path_in_repo_without_namespace
-                        repo_and_revision_exist, _ = self._repo_and_revision_exist(repo_type, repo_id, revision)
-                        if not repo_and_revision_exist:
-                            _raise_file_not_found(path, err)
-                    else:
-                        _raise_file_not_found(path, err)
-        else:
-            repo_id = path
-            path_in_repo = ""
-            if "@" in path:
-                repo_id, revision_in_path = path.split("@", 1)
-                revision = _align_revision_in_path_with_revision(unquote(revision_in_path), revision)
-            else:
-                revision_in_path = None
-            repo_and_revision_exist, _ = self._repo_and_revision_exist(repo_type, repo_id, revision)
-            if not repo_and_revision_exist:
-                raise NotImplementedError("Access to repositories lists is not implemented.")
-
-        revision = revision if revision is not None else constants.DEFAULT_REVISION
-        return HfFileSystemResolvedPath(repo_type, repo_id, revision, path_in_repo, _raw_revision=revision_in_path)
+        stripped_path: str = self._strip_protocol(path)
+        parsed = _parse_path(stripped_path, revision)
+        err = None
+        for repo_id, path_in_repo in parsed.candidates:
+            repo_and_revision_exist, candidate_err = self._repo_and_revision_exist(
+                parsed.repo_type, repo_id, parsed.revision
+            )
+            if repo_and_revision_exist:
+                return parsed.resolve(repo_id, path_in_repo)
+            err = err or candidate_err
+            if not parsed.should_try_next(candidate_err):
+                break
+        parsed.raise_not_found(err)
 
     def invalidate_cache(self, path: Optional[str] = None) -> None:
         """
@@ -245,8 +233,17 @@ class HfFileSystem(fsspec.AbstractFileSystem):
         if not path:
             self.dircache.clear()
             self._repo_and_revision_exists_cache.clear()
+            self._redirect_cache.clear()
+            self._commit_hash_cache.clear()
         else:
             resolved_path = self.resolve_path(path)
+            self._redirect_cache.pop(_redirect_cache_key(resolved_path), None)
+            revision_key = (resolved_path.repo_type, resolved_path.repo_id, resolved_path.revision)
+            if self._commit_hash_cache.pop(revision_key, None) is not None:
+                # The revision may now point to a new commit: stop using the persistent listings of the old one
+                ListingsCache(resolved_path.repo_type, resolved_path.repo_id).delete_commit_hash(
+                    resolved_path.revision
+                )
             path = resolved_path.unresolve()
             while path:
                 self.dircache.pop(path, None)
@@ -398,6 +395,23 @@ class HfFileSystem(fsspec.AbstractFileSystem):
             _raw_revision=resolved_path._raw_revision,
         ).unresolve()
 
+        commit_hash = self._commit_hash_cache.get(
+            (resolved_path.repo_type, resolved_path.repo_id, resolved_path.revision)
+        )
+        listings_cache = (
+            ListingsCache(resolved_path.repo_type, resolved_path.repo_id)
+            if constants.HF_HUB_FS_LISTINGS_CACHE and commit_hash is not None
+            else None
+        )
+        if listings_cache is not None and commit_hash is not None and path not in self.dircache and not refresh:
+            # Fill the dircache from disk. Missing subdirectories are fetched from the Hub below, as if they had been
+            # evicted from the dircache.
+            cached_listings = listings_cache.get_listings(commit_hash, resolved_path.path_in_repo, recursive=recursive)
+            for dir_path, entries in cached_listings.items():
+                cache_path = root_path + "/" + dir_path if dir_path else root_path
+                if cache_path not in self.dircache:
+                    self.dircache[cache_path] = [_path_info_from_listing(root_path, entry) for entry in entries]
+
         out = []
         if path in self.dircache and not refresh:
             cached_path_infos = self.dircache[path]
@@ -460,28 +474,17 @@ class HfFileSystem(fsspec.AbstractFileSystem):
                 revision=resolved_path.revision,
                 repo_type=resolved_path.repo_type,
             )
+            listings: Dict[str, List[Dict[str, Any]]] = {resolved_path.path_in_repo: []}
             for path_info in tree:
-                if isinstance(path_info, RepoFile):
-                    cache_path_info = {
-                        "name": root_path + "/" + path_info.path,
-                        "size": path_info.size,
-                        "type": "file",
-                        "blob_id": path_info.blob_id,
-                        "lfs": path_info.lfs,
-                        "last_commit": path_info.last_commit,
-                        "security": path_info.security,
-                    }
-                else:
-                    cache_path_info = {
-                        "name": root_path + "/" + path_info.path,
-                        "size": 0,
-                        "type": "directory",
-                        "tree_id": path_info.tree_id,
-                        "last_commit": path_info.last_commit,
-                    }
+                cache_path_info = _dircache_entry(root_path, path_info)
                 parent_path = self._parent(cache_path_info["name"])
                 self.dircache.setdefault(parent_path, []).append(cache_path_info)
                 out.append(cache_path_info)
+                listings.setdefault(posixpath.dirname(path_info.path), []).append(_listing_from_path_info(path_info))
+                if recursive and cache_path_info["type"] == "directory":
+                    listings.setdefault(path_info.path, [])
+            if listings_cache is not None and commit_hash is not None:
+                listings_cache.set_listings(commit_hash, listings)
         return out
 
     def walk(self, path: str, *args, **kwargs) -> Iterator[Tuple[str, List[str], List[str]]]:
@@ -733,24 +736,7 @@ class HfFileSystem(fsspec.AbstractFileSystem):
                     path_in_repo="",
                     _raw_revision=resolved_path._raw_revision,
                 ).unresolve()
-                if isinstance(path_info, RepoFile):
-                    out = {
-                        "name": root_path + "/" + path_info.path,
-                        "size": path_info.size,
-                        "type": "file",
-                        "blob_id": path_info.blob_id,
-                        "lfs": path_info.lfs,
-                        "last_commit": path_info.last_commit,
-                        "security": path_info.security,
-                    }
-                else:
-                    out = {
-                        "name": root_path + "/" + path_info.path,
-                        "size": 0,
-                        "type": "directory",
-                        "tree_id": path_info.tree_id,
-                        "last_commit": path_info.last_commit,
-                    }
+                out = _dircache_entry(root_path, path_info)
                 if not expand_info:
                     out = {k: out[k] for k in ["name", "size", "type"]}
         assert out is not None
@@ -843,6 +829,168 @@ class HfFileSystem(fsspec.AbstractFileSystem):
             url = url.replace("/resolve/", "/tree/", 1)
         return url
 
+    def _get(
+        self, resolved_path: HfFileSystemResolvedPath, headers: Optional[Dict[str, str]] = None, stream: bool = False
+    ) -> Response:
+        """
+        Send a GET request for a file, reusing the CDN URL it was last redirected to.
+
+        Requests to `/resolve/...` are redirected to a signed CDN URL. It is cached until it expires so that subsequent
+        (range) requests for the same file skip the redirect. If the cached location answers with a 401, 403 or 404
+        (e.g. the URL expired earlier than expected), it is evicted and the file is resolved again.
+        """
+        key = _redirect_cache_key(resolved_path)
+        headers = headers or {}
+        cached = self._redirect_cache.get(key)
+        if cached is not None:
+            location, expires_at = cached
+            if time.time() < expires_at:
+                r = http_backoff(
+                    "GET",
+                    location,
+                    headers={
+                        **headers,
+                        **_get_redirect_headers(location, self.endpoint, self._api._build_hf_headers()),
+                    },
+                    retry_on_status_codes=(500, 502, 503, 504),
+                    stream=stream,
+                    timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+                )
+                if r.status_code not in _REDIRECT_INVALID_STATUS_CODES:
+                    hf_raise_for_status(r)
+                    return r
+                r.close()
+            self._redirect_cache.pop(key, None)
+
+        url = hf_hub_url(
+            repo_id=resolved_path.repo_id,
+            revision=resolved_path.revision,
+            filename=resolved_path.path_in_repo,
+            repo_type=resolved_path.repo_type,
+            endpoint=self.endpoint,
+        )
+        r = http_backoff(
+            "GET",
+            url,
+            headers={**headers, **self._api._build_hf_headers()},
+            retry_on_status_codes=(500, 502, 503, 504),
+            stream=stream,
+            timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
+        )
+        hf_raise_for_status(r)
+        if r.history and r.url != url:
+            self._redirect_cache[key] = (r.url, _get_redirect_expiration(r.url))
+        return r
+
+    def cat_ranges(
+        self,
+        paths: List[str],
+        starts: Union[int, None, List[Optional[int]]],
+        ends: Union[int, None, List[Optional[int]]],
+        max_gap: Optional[int] = None,
+        on_error: str = "return",
+        revision: Optional[str] = None,
+        max_workers: int = 8,
+        **kwargs,
+    ) -> List[Union[bytes, Exception]]:
+        """
+        Get the contents of byte ranges from one or more files.
+
+        For more details, refer to [fsspec documentation](https://filesystem-spec.readthedocs.io/en/latest/api.html#fsspec.spec.AbstractFileSystem.cat_ranges).
+
+        Ranges of a same file that are less than `max_gap` bytes apart are fetched in a single request. Requests are
+        sent concurrently, with at most `max_workers` requests in flight and at most
+        `HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY` requests per file. Files already in the local cache are read from disk.
+
+        Args:
+            paths (`List[str]`):
+                Paths of the files to read from. A path can be repeated to read several ranges of a file.
+            starts (`int` or `List[int]`):
+                Offsets of the first bytes to read. Negative values are counted from the end of the file. If an int
+                is passed, it is used for all paths.
+            ends (`int` or `List[int]`):
+                Offsets of the bytes after the last ones to read. `None` means the end of the file. Negative values
+                are counted from the end of the file. If an int is passed, it is used for all paths.
+            max_gap (`int`, *optional*):
+                Maximum number of bytes between two ranges of a file to fetch them in a single request. Defaults to
+                64KB.
+            on_error (`str`, *optional*):
+                If `"return"` (default), errors are returned in place of the content of the ranges that failed.
+                Otherwise, the first error is raised.
+            revision (`str`, *optional*):
+                The git revision to read from.
+            max_workers (`int`, *optional*):
+                Maximum number of concurrent requests. Defaults to 8.
+
+        Returns:
+            `List[Union[bytes, Exception]]`: The content of each range, in the same order as `paths`.
+        """
+        if not isinstance(paths, list):
+            raise TypeError(f"`paths` must be a list, got {type(paths)}.")
+        if not isinstance(starts, list):
+            starts = [starts] * len(paths)
+        if not isinstance(ends, list):
+            ends = [ends] * len(paths)
+        if len(starts) != len(paths) or len(ends) != len(paths):
+            raise ValueError("`paths`, `starts` and `ends` must have the same length.")
+        max_gap = _CAT_RANGES_MAX_GAP if max_gap is None else max_gap
+
+        out: List[Union[bytes, Exception]] = [b""] * len(paths)
+        files: Dict[str, Union[HfFileSystemFile, Exception]] = {}
+        # (start, end, index in output) of the ranges of each file
+        ranges_per_file: Dict[str, List[Tuple[int, int, int]]] = {}
+        for index, (path, start, end) in enumerate(zip(paths, starts, ends)):
+            if path not in files:
+                try:
+                    files[path] = HfFileSystemFile(self, path, revision=revision, mode="rb", cache_type="none")
+                except Exception as e:
+                    if on_error != "return":
+                        raise
+                    files[path] = e
+            file = files[path]
+            if isinstance(file, Exception):
+                out[index] = file
+                continue
+            start, end, _ = slice(start, end).indices(file.size)
+            if start < end:
+                ranges_per_file.setdefault(path, []).append((start, end, index))
+
+        requests = _merge_ranges(ranges_per_file, max_gap)
+
+        semaphores = {
+            path: threading.Semaphore(constants.HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY) for path in ranges_per_file
+        }
+
+        def _fetch(path: str, start: int, end: int) -> bytes:
+            file = files[path]
+            assert isinstance(file, HfFileSystemFile)
+            with semaphores[path]:
+                return file._fetch_range(start, end)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_fetch, path, start, end) for path, start, end, _ in requests]
+                for (_, request_start, request_end, members), future in zip(requests, futures):
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        if on_error != "return":
+                            raise
+                        for _, _, index in members:
+                            out[index] = e
+                        continue
+                    for start, end, index in members:
+                        # No copy if the range has not been merged with another one
+                        if (start, end) == (request_start, request_end):
+                            out[index] = data
+                        else:
+                            out[index] = data[start - request_start : end - request_start]
+        finally:
+            for file in files.values():
+                if isinstance(file, HfFileSystemFile):
+                    file.close()
+        return out
+
     def get_file(self, rpath, lpath, callback=_DEFAULT_CALLBACK, outfile=None, **kwargs) -> None:
         """
         Copy single remote file to local.
@@ -945,8 +1093,19 @@ class HfFileSystemFile(fsspec.spec.AbstractBufferedFile):
         # avoid an unnecessary .info() call with expensive expand_info=True to instantiate .details
         if kwargs.get("mode", "rb") == "rb":
             self.details = fs.info(self.resolved_path.unresolve(), expand_info=False)
+        # "prefetch" is not a cache type registered in fsspec: the cache is replaced once the file is initialized
+        prefetch_options = None
+        if kwargs.get("cache_type") == PrefetchCache.name:
+            kwargs["cache_type"] = "none"
+            prefetch_options = kwargs.pop("cache_options", None) or {}
         super().__init__(fs, self.resolved_path.unresolve(), **kwargs)
         self.fs: HfFileSystem
+        if prefetch_options is not None and self.mode == "rb":
+            self.cache = PrefetchCache(self.blocksize, self._fetch_range, self.size, **prefetch_options)
+        # Path of the blob if it is already in the local cache (e.g. downloaded with `hf_hub_download`)
+        self._blob_path = _get_cached_blob_path(self.resolved_path, self.details) if self.mode == "rb" else None
+        # Resolved on first read if blocks are persisted in the local cache (see `HF_HUB_FS_BLOCK_CACHE`)
+        self._metadata: Optional[HfFileMetadata] = None
 
     def __del__(self):
         if not hasattr(self, "resolved_path"):
@@ -955,26 +1114,61 @@ class HfFileSystemFile(fsspec.spec.AbstractBufferedFile):
         return super().__del__()
 
     def _fetch_range(self, start: int, end: int) -> bytes:
-        headers = {
-            "range": f"bytes={start}-{end - 1}",
-            **self.fs._api._build_hf_headers(),
-        }
+        if self._blob_path is not None:
+            with open(self._blob_path, "rb") as f:
+                f.seek(start)
+                return f.read(end - start)
+        if constants.HF_HUB_FS_BLOCK_CACHE:
+            return self._fetch_range_from_sparse_blob(start, end)
+        r = self.fs._get(self.resolved_path, headers={"range": f"bytes={start}-{end - 1}"})
+        content = r.content
+        throttle(len(content), r.url)
+        return content
+
+    def _fetch_range_from_sparse_blob(self, start: int, end: int) -> bytes:
+        """Fetch a range through the sparse blob of the file in the local cache (see `hf_hub_download_range`).
+
+        Blocks already fetched (e.g. in a previous epoch) are read from disk, missing ones are downloaded and persisted.
+        Metadata are resolved once per file object to pin the commit the blocks are read from.
+        """
+        if self._metadata is None:
+            self._metadata = get_hf_file_metadata(
+                hf_hub_url(
+                    repo_id=self.resolved_path.repo_id,
+                    revision=self.resolved_path.revision,
+                    filename=self.resolved_path.path_in_repo,
+                    repo_type=self.resolved_path.repo_type,
+                    endpoint=self.fs.endpoint,
+                ),
+                token=self.fs.token,
+                timeout=constants.HF_HUB_ETAG_TIMEOUT,
+            )
+        metadata = self._metadata
+        assert metadata.etag is not None, "etag must have been retrieved from server"
+        assert metadata.commit_hash is not None, "commit_hash must have been retrieved from server"
+        assert metadata.size is not None, "size must have been retrieved from server"
         url = hf_hub_url(
             repo_id=self.resolved_path.repo_id,
-            revision=self.resolved_path.revision,
+            revision=metadata.commit_hash,
             filename=self.resolved_path.path_in_repo,
             repo_type=self.resolved_path.repo_type,
             endpoint=self.fs.endpoint,
         )
-        r = http_backoff(
-            "GET",
-            url,
-            headers=headers,
-            retry_on_status_codes=(500, 502, 503, 504),
-            timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
-        )
-        hf_raise_for_status(r)
-        return r.content
+        with _open_sparse_blob(
+            cache_dir=constants.HF_HUB_CACHE,
+            repo_id=self.resolved_path.repo_id,
+            repo_type=self.resolved_path.repo_type,
+            filename=self.resolved_path.path_in_repo,
+            url=url,
+            etag=metadata.etag,
+            commit_hash=metadata.commit_hash,
+            expected_size=metadata.size,
+            ranges=[(start, min(end, metadata.size))],
+            headers=self.fs._api._build_hf_headers(),
+            proxies=None,
+        ) as f:
+            f.seek(start)
+            return f.read(end - start)
 
     def _initiate_upload(self) -> None:
         self.temp_file = tempfile.NamedTemporaryFile(prefix="hffs-", delete=False)
@@ -1007,7 +1201,14 @@ class HfFileSystemFile(fsspec.spec.AbstractBufferedFile):
         `hf_transfer` is not enabled, the file is loaded in memory directly. Otherwise, the file is downloaded to a
         temporary file and read from there.
         """
-        if self.mode == "rb" and (length is None or length == -1) and self.loc == 0:
+        if (
+            self.mode == "rb"
+            and (length is None or length == -1)
+            and self.loc == 0
+            # Read from the local cache instead
+            and self._blob_path is None
+            and not constants.HF_HUB_FS_BLOCK_CACHE
+        ):
             with self.fs.open(self.path, "rb", block_size=0) as f:  # block_size=0 enables fast streaming
                 return f.read()
         return super().read(length)
@@ -1058,49 +1259,20 @@ class HfFileSystemStreamFile(fsspec.spec.AbstractBufferedFile):
     def read(self, length: int = -1):
         read_args = (length,) if length >= 0 else ()
         if self.response is None or self.response.raw.isclosed():
-            url = hf_hub_url(
-                repo_id=self.resolved_path.repo_id,
-                revision=self.resolved_path.revision,
-                filename=self.resolved_path.path_in_repo,
-                repo_type=self.resolved_path.repo_type,
-                endpoint=self.fs.endpoint,
-            )
-            self.response = http_backoff(
-                "GET",
-                url,
-                headers=self.fs._api._build_hf_headers(),
-                retry_on_status_codes=(500, 502, 503, 504),
-                stream=True,
-                timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
-            )
-            hf_raise_for_status(self.response)
+            self.response = self.fs._get(self.resolved_path, stream=True)
         try:
             out = self.response.raw.read(*read_args)
         except Exception:
             self.response.close()
 
             # Retry by recreating the connection
-            url = hf_hub_url(
-                repo_id=self.resolved_path.repo_id,
-                revision=self.resolved_path.revision,
-                filename=self.resolved_path.path_in_repo,
-                repo_type=self.resolved_path.repo_type,
-                endpoint=self.fs.endpoint,
-            )
-            self.response = http_backoff(
-                "GET",
-                url,
-                headers={"Range": "bytes=%d-" % self.loc, **self.fs._api._build_hf_headers()},
-                retry_on_status_codes=(500, 502, 503, 504),
-                stream=True,
-                timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT,
-            )
-            hf_raise_for_status(self.response)
+            self.response = self.fs._get(self.resolved_path, headers={"Range": "bytes=%d-" % self.loc}, stream=True)
             try:
                 out = self.response.raw.read(*read_args)
             except Exception:
                 self.response.close()
                 raise
+        throttle(len(out), self.response.url)
         self.loc += len(out)
         return out
 
@@ -1125,6 +1297,248 @@ def safe_quote(s: str) -> str:
     return quote(s, safe="")
 
 
+def _get_cached_blob_path(resolved_path: HfFileSystemResolvedPath, details: Dict[str, Any]) -> Optional[str]:
+    """Return the path of the blob of a file if it is complete in the local cache, None otherwise.
+
+    Blobs are identified by their etag, i.e. the sha256 of LFS files and the git blob id of regular files. The writable
+    cache, the read-only cache layers (see `HF_HUB_CACHE`) and the global blob store are checked.
+    """
+    etag = details["lfs"]["sha256"] if details.get("lfs") else details.get("blob_id")
+    if etag is None:
+        return None
+    cache_dir = constants.HF_HUB_CACHE
+    repo_folders = [
+        os.path.join(cache_dir, repo_folder_name(repo_id=resolved_path.repo_id, repo_type=resolved_path.repo_type)),
+        *_get_read_only_storage_folders(cache_dir, repo_id=resolved_path.repo_id, repo_type=resolved_path.repo_type),
+    ]
+    blob_paths = [os.path.join(folder, "blobs", etag) for folder in repo_folders]
+    global_blob_path = _get_global_blob_path(cache_dir, etag)
+    if global_blob_path is not None:
+        blob_paths.append(global_blob_path)
+    for blob_path in blob_paths:
+        # Size check to skip a blob that would be written by a concurrent download
+        if os.path.isfile(blob_path) and os.path.getsize(blob_path) == details.get("size"):
+            return blob_path
+    return None
+
+
+def _redirect_cache_key(resolved_path: HfFileSystemResolvedPath) -> Tuple[str, str, str, str]:
+    return (resolved_path.repo_type, resolved_path.repo_id, resolved_path.revision, resolved_path.path_in_repo)
+
+
+def _redirect_cache_key_matches(key: Tuple[str, str, str, str], path: str) -> bool:
+    """Return whether `key` is the redirect cache key of `path` or of a file under `path`, whatever the format of the
+    revision in `path` (omitted if default, quoted or not)."""
+    repo_type, repo_id, revision, path_in_repo = key
+    candidates = [
+        HfFileSystemResolvedPath(repo_type, repo_id, revision, path_in_repo, _raw_revision=raw_revision).unresolve()
+        for raw_revision in (None, revision, safe_revision(revision))
+    ]
+    return any(candidate == path or candidate.startswith(path + "/") for candidate in candidates)
+
+
+def _get_redirect_headers(location: str, endpoint: str, hf_headers: Dict[str, str]) -> Dict[str, str]:
+    """Return the headers to send to a cached redirect `location`.
+
+    Like `requests` when following a redirect, the token is not sent if the location is on another host (e.g. the CDN).
+    """
+    if urlparse(location).netloc != urlparse(endpoint).netloc:
+        return {key: value for key, value in hf_headers.items() if key.lower() != "authorization"}
+    return hf_headers
+
+
+def _get_redirect_expiration(url: str) -> float:
+    """Return the timestamp after which a (signed) CDN URL must not be used anymore.
+
+    Supports CloudFront (`Expires`) and S3 (`X-Amz-Date` + `X-Amz-Expires`) signatures.
+    """
+    params = {key.lower(): values[0] for key, values in parse_qs(urlparse(url).query).items()}
+    expires_at: Optional[float] = None
+    try:
+        if "expires" in params:
+            expires_at = float(params["expires"])
+        elif "x-amz-date" in params and "x-amz-expires" in params:
+            signed_at = datetime.strptime(params["x-amz-date"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+            expires_at = signed_at.timestamp() + float(params["x-amz-expires"])
+    except ValueError:
+        pass
+    if expires_at is None:
+        return time.time() + _REDIRECT_DEFAULT_TTL
+    return expires_at - _REDIRECT_EXPIRATION_MARGIN
+
+
+def _dircache_entry(root_path: str, path_info: Union[RepoFile, RepoFolder]) -> Dict[str, Any]:
+    """Build a dircache entry from a tree entry returned by the Hub."""
+    if isinstance(path_info, RepoFile):
+        return {
+            "name": root_path + "/" + path_info.path,
+            "size": path_info.size,
+            "type": "file",
+            "blob_id": path_info.blob_id,
+            "lfs": path_info.lfs,
+            "last_commit": path_info.last_commit,
+            "security": path_info.security,
+        }
+    return {
+        "name": root_path + "/" + path_info.path,
+        "size": 0,
+        "type": "directory",
+        "tree_id": path_info.tree_id,
+        "last_commit": path_info.last_commit,
+    }
+
+
+def _merge_ranges(
+    ranges_per_file: Dict[str, List[Tuple[int, int, int]]], max_gap: int
+) -> List[Tuple[str, int, int, List[Tuple[int, int, int]]]]:
+    """Merge the ranges of a same file that are less than `max_gap` bytes apart.
+
+    Ranges are given as `(start, end, index in output)` tuples, per file. Returns the requests to send, as
+    `(path, start, end, ranges served by the request)` tuples.
+    """
+    requests: List[Tuple[str, int, int, List[Tuple[int, int, int]]]] = []
+    for path, ranges in ranges_per_file.items():
+        ranges.sort()
+        first_request = len(requests)
+        for start, end, index in ranges:
+            if len(requests) > first_request and start - requests[-1][2] <= max_gap:
+                _, request_start, request_end, members = requests[-1]
+                requests[-1] = (path, request_start, max(request_end, end), members + [(start, end, index)])
+            else:
+                requests.append((path, start, end, [(start, end, index)]))
+    return requests
+
+
+def _listing_from_path_info(path_info: Union[RepoFile, RepoFolder]) -> Dict[str, Any]:
+    """Serialize the non-expanded information of a tree entry, to be stored in the persistent listings cache."""
+    if isinstance(path_info, RepoFile):
+        return {
+            "path": path_info.path,
+            "type": "file",
+            "size": path_info.size,
+            "blob_id": path_info.blob_id,
+            "lfs": dict(path_info.lfs) if path_info.lfs is not None else None,
+        }
+    return {"path": path_info.path, "type": "directory", "tree_id": path_info.tree_id}
+
+
+def _path_info_from_listing(root_path: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a dircache entry from an entry of the persistent listings cache (see `_listing_from_path_info`)."""
+    if entry["type"] == "file":
+        return {
+            "name": root_path + "/" + entry["path"],
+            "size": entry["size"],
+            "type": "file",
+            "blob_id": entry["blob_id"],
+            "lfs": BlobLfsInfo(**entry["lfs"]) if entry["lfs"] is not None else None,
+            "last_commit": None,
+            "security": None,
+        }
+    return {
+        "name": root_path + "/" + entry["path"],
+        "size": 0,
+        "type": "directory",
+        "tree_id": entry["tree_id"],
+        "last_commit": None,
+    }
+
+
+@dataclass
+class _ParsedPath:
+    """Components of a Hugging Face file system path, before checking which repo it refers to."""
+
+    # Path without protocol and repo type prefix, used in error messages
+    path: str
+    repo_type: str
+    # Possible (repo_id, path_in_repo), by order of preference
+    candidates: List[Tuple[str, str]]
+    revision: Optional[str]
+    revision_in_path: Optional[str]
+
+    def resolve(self, repo_id: str, path_in_repo: str) -> HfFileSystemResolvedPath:
+        revision = self.revision if self.revision is not None else constants.DEFAULT_REVISION
+        return HfFileSystemResolvedPath(
+            self.repo_type, repo_id, revision, path_in_repo, _raw_revision=self.revision_in_path
+        )
+
+    def should_try_next(self, err: Optional[Exception]) -> bool:
+        # The first part of a path without namespace is the repo id, the rest is the path in the repo
+        return isinstance(err, (RepositoryNotFoundError, HFValidationError))
+
+    def raise_not_found(self, err: Optional[Exception]) -> NoReturn:
+        if "/" not in self.path:
+            # can't list repositories of a namespace
+            raise NotImplementedError("Access to repositories lists is not implemented.")
+        _raise_file_not_found(self.path, err)
+
+
+def _parse_path(path: str, revision: Optional[str] = None) -> _ParsedPath:
+    """
+    Split a Hugging Face file system path (without protocol) into its possible components.
+
+    Does not send any request: callers check which candidate repo exists, then call `_ParsedPath.resolve`, or
+    `_ParsedPath.raise_not_found` if none does (see `HfFileSystem.resolve_path`).
+    """
+
+    def _align_revision_in_path_with_revision(
+        revision_in_path: Optional[str], revision: Optional[str]
+    ) -> Optional[str]:
+        if revision is not None:
+            if revision_in_path is not None and revision_in_path != revision:
+                raise ValueError(
+                    f'Revision specified in path ("{revision_in_path}") and in `revision` argument ("{revision}")'
+                    " are not the same."
+                )
+        else:
+            revision = revision_in_path
+        return revision
+
+    if not path:
+        # can't list repositories at root
+        raise NotImplementedError("Access to repositories lists is not implemented.")
+    elif path.split("/")[0] + "/" in constants.REPO_TYPES_URL_PREFIXES.values():
+        if "/" not in path:
+            # can't list repositories at the repository type level
+            raise NotImplementedError("Access to repositories lists is not implemented.")
+        repo_type, path = path.split("/", 1)
+        repo_type = constants.REPO_TYPES_MAPPING[repo_type]
+    else:
+        repo_type = constants.REPO_TYPE_MODEL
+    revision_in_path: Optional[str]
+    if path.count("/") > 0:
+        if "@" in path:
+            repo_id, revision_in_path = path.split("@", 1)
+            if "/" in revision_in_path:
+                match = SPECIAL_REFS_REVISION_REGEX.search(revision_in_path)
+                if match is not None and revision in (None, match.group()):
+                    # Handle `refs/convert/parquet` and PR revisions separately
+                    path_in_repo = SPECIAL_REFS_REVISION_REGEX.sub("", revision_in_path).lstrip("/")
+                    revision_in_path = match.group()
+                else:
+                    revision_in_path, path_in_repo = revision_in_path.split("/", 1)
+            else:
+                path_in_repo = ""
+            revision = _align_revision_in_path_with_revision(unquote(revision_in_path), revision)
+            candidates = [(repo_id, path_in_repo)]
+        else:
+            revision_in_path = None
+            candidates = [
+                # With namespace
+                ("/".join(path.split("/")[:2]), "/".join(path.split("/")[2:])),
+                # Without namespace
+                (path.split("/")[0], "/".join(path.split("/")[1:])),
+            ]
+    else:
+        repo_id = path
+        if "@" in path:
+            repo_id, revision_in_path = path.split("@", 1)
+            revision = _align_revision_in_path_with_revision(unquote(revision_in_path), revision)
+        else:
+            revision_in_path = None
+        candidates = [(repo_id, "")]
+    return _ParsedPath(path, repo_type, candidates, revision, revision_in_path)
+
+
 def _raise_file_not_found(path: str, err: Optional[Exception]) -> NoReturn:
     msg = path
     if isinstance(err, RepositoryNotFoundError):
@@ -27,6 +27,7 @@ from urllib.parse import unquote
 
 from huggingface_hub import constants
 
+from ._bandwidth import throttle_fileobj
 from .utils import (
     build_hf_headers,
     fix_hf_endpoint_in_url,
@@ -316,7 +317,12 @@ def _upload_single_part(operation: "CommitOperationAdd", upload_url: str) -> Non
     """
     with operation.as_file(with_tqdm=True) as fileobj:
         # S3 might raise a transient 500 error -> let's retry if that happens
-        response = http_backoff("PUT", upload_url, data=fileobj, retry_on_status_codes=(500, 502, 503, 504))
+        response = http_backoff(
+            "PUT",
+            upload_url,
+            data=throttle_fileobj(fileobj, upload_url),
+            retry_on_status_codes=(500, 502, 503, 504),
+        )
         hf_raise_for_status(response)
 
 
@@ -339,6 +345,9 @@ def _upload_multi_part(operation: "CommitOperationAdd", header: Dict, chunk_size
             " upload"
         )
         use_hf_transfer = False
+    elif constants.HF_HUB_ENABLE_HF_TRANSFER and constants.HF_HUB_MAX_BANDWIDTH:
+        warnings.warn("hf_transfer does not support `HF_HUB_MAX_BANDWIDTH`, falling back to regular upload")
+        use_hf_transfer = False
 
     response_headers = (
         _upload_parts_hf_transfer(operation=operation, sorted_parts_urls=sorted_parts_urls, chunk_size=chunk_size)
@@ -401,7 +410,10 @@ def _upload_parts_iteratively(
             ) as fileobj_slice:
                 # S3 might raise a transient 500 error -> let's retry if that happens
                 part_upload_res = http_backoff(
-                    "PUT", part_upload_url, data=fileobj_slice, retry_on_status_codes=(500, 502, 503, 504)
+                    "PUT",
+                    part_upload_url,
+                    data=throttle_fileobj(fileobj_slice, part_upload_url),  # type: ignore[arg-type]
+                    retry_on_status_codes=(500, 502, 503, 504),
                 )
                 hf_raise_for_status(part_upload_res)
                 headers.append(part_upload_res.headers)
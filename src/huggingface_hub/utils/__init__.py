@@ -48,7 +48,7 @@ from ._cache_manager import (
 from ._chunk_utils import chunk_iterable
 from ._datetime import parse_datetime
 from ._experimental import experimental
-from ._fixes import SoftTemporaryDirectory, WeakFileLock, yaml_dump
+from ._fixes import AsyncWeakFileLock, SoftTemporaryDirectory, WeakFileLock, yaml_dump
 from ._git_credential import list_credential_helpers, set_git_credential, unset_git_credential
 from ._headers import build_hf_headers, get_token_to_send
 from ._hf_folder import HfFolder
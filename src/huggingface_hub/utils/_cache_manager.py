@@ -18,14 +18,20 @@ import os
 import shutil
 import time
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Dict, FrozenSet, List, Literal, Optional, Set, Union
+from typing import Dict, FrozenSet, List, Literal, Optional, Set, Tuple, Union
 
 from huggingface_hub.errors import CacheNotFound, CorruptedCacheException
 
 from ..commands._cli_utils import tabulate
-from ..constants import HF_HUB_CACHE
+from ..constants import (
+    GLOBAL_BLOBS_DIR_NAME,
+    HF_HUB_CACHE,
+    HF_HUB_READ_ONLY_CACHES,
+    LISTINGS_CACHE_DIR_NAME,
+    SNAPSHOT_MANIFEST_NAME,
+)
 from . import logging
 
 
@@ -202,6 +208,9 @@ class CachedRepoInfo:
             Timestamp of the last time a blob file of the repo has been accessed.
         last_modified (`float`):
             Timestamp of the last time a blob file of the repo has been modified/created.
+        read_only (`bool`):
+            Whether the repo is cached in a read-only cache layer (see `HF_HUB_CACHE`). Read-only repos are never
+            deleted by [`~HFCacheInfo.delete_revisions`].
 
     <Tip warning={true}>
 
@@ -229,6 +238,7 @@ class CachedRepoInfo:
 
     last_accessed: float
     last_modified: float
+    read_only: bool = False
 
     @property
     def last_accessed_str(self) -> str:
@@ -285,6 +295,9 @@ class DeleteCacheStrategy:
             Set of entire repo paths to be deleted.
         snapshots (`FrozenSet[Path]`):
             Set of snapshots to be deleted (directory of symlinks).
+        global_blobs (`FrozenSet[Path]`, *optional*):
+            Set of blob files of the global blob store (see `HF_HUB_ENABLE_GLOBAL_BLOB_STORE`) to be deleted, as no
+            repo uses them anymore.
     """
 
     expected_freed_size: int
@@ -292,6 +305,7 @@ class DeleteCacheStrategy:
     refs: FrozenSet[Path]
     repos: FrozenSet[Path]
     snapshots: FrozenSet[Path]
+    global_blobs: FrozenSet[Path] = frozenset()
 
     @property
     def expected_freed_size_str(self) -> str:
@@ -340,6 +354,13 @@ class DeleteCacheStrategy:
         for path in self.blobs:
             _try_delete_path(path, path_type="blob")
 
+        # Delete global blobs not linked in any repo
+        for path in self.global_blobs:
+            if _get_nb_links(path) > 1:
+                logger.info(f"Keep global blob: linked in a repo in the meantime ({path})")
+                continue
+            _try_delete_path(path, path_type="global blob")
+
         logger.info(f"Cache deletion done. Saved {self.expected_freed_size_str}.")
 
 
@@ -412,6 +433,11 @@ class HFCacheInfo:
         Cache deletion done. Saved 8.6G.
         ```
 
+        If the global blob store is used (see `HF_HUB_ENABLE_GLOBAL_BLOB_STORE`), blobs of
+        the store that are not linked in any repo anymore are deleted as well. A blob
+        hardlinked in several places only frees disk space once all its links are deleted,
+        which is taken into account in the expected freed size.
+
         <Tip warning={true}>
 
         `delete_revisions` returns a [`~utils.DeleteCacheStrategy`] object that needs to
@@ -425,6 +451,8 @@ class HFCacheInfo:
         repos_with_revisions: Dict[CachedRepoInfo, Set[CachedRevisionInfo]] = defaultdict(set)
 
         for repo in self.repos:
+            if repo.read_only:
+                continue  # never delete from a read-only cache layer
             for revision in repo.revisions:
                 if revision.commit_hash in hashes_to_delete:
                     repos_with_revisions[repo].add(revision)
@@ -438,6 +466,8 @@ class HFCacheInfo:
         delete_strategy_repos: Set[Path] = set()
         delete_strategy_snapshots: Set[Path] = set()
         delete_strategy_expected_freed_size = 0
+        # Size of each blob file deleted, either alone or with its repo
+        deleted_blobs: Dict[Path, int] = {}
 
         for affected_repo, revisions_to_delete in repos_with_revisions.items():
             other_revisions = affected_repo.revisions - revisions_to_delete
@@ -447,6 +477,9 @@ class HFCacheInfo:
             if len(other_revisions) == 0:
                 delete_strategy_repos.add(affected_repo.repo_path)
                 delete_strategy_expected_freed_size += affected_repo.size_on_disk
+                for revision in affected_repo.revisions:
+                    for file in revision.files:
+                        deleted_blobs[file.blob_path] = file.size_on_disk
                 continue
 
             # Some revisions of the repo will be deleted but not all. We need to filter
@@ -475,6 +508,11 @@ class HFCacheInfo:
                         if is_file_alone:
                             delete_strategy_blobs.add(file.blob_path)
                             delete_strategy_expected_freed_size += file.size_on_disk
+                            deleted_blobs[file.blob_path] = file.size_on_disk
+
+        delete_strategy_global_blobs, freed_size_correction = _get_global_blobs_to_delete(
+            deleted_blobs, cache_dirs={repo.repo_path.parent for repo in self.repos if not repo.read_only}
+        )
 
         # Return the strategy instead of executing it.
         return DeleteCacheStrategy(
@@ -482,7 +520,8 @@ class HFCacheInfo:
             refs=frozenset(delete_strategy_refs),
             repos=frozenset(delete_strategy_repos),
             snapshots=frozenset(delete_strategy_snapshots),
-            expected_freed_size=delete_strategy_expected_freed_size,
+            global_blobs=frozenset(delete_strategy_global_blobs),
+            expected_freed_size=delete_strategy_expected_freed_size + freed_size_correction,
         )
 
     def export_as_table(self, *, verbosity: int = 0) -> str:
@@ -650,7 +689,8 @@ def scan_cache_dir(cache_dir: Optional[Union[str, Path]] = None) -> HFCacheInfo:
 
     Args:
         cache_dir (`str` or `Path`, `optional`):
-            Cache directory to cache. Defaults to the default HF cache directory.
+            Cache directory to cache. Defaults to the default HF cache directory. In that case, the read-only cache
+            layers (see `HF_HUB_CACHE`) are scanned as well. Repos cached in several layers are reported once per layer.
 
     <Tip warning={true}>
 
@@ -666,10 +706,14 @@ def scan_cache_dir(cache_dir: Optional[Union[str, Path]] = None) -> HFCacheInfo:
 
     Returns: a [`~HFCacheInfo`] object.
     """
+    read_only_layers: List[str] = []
     if cache_dir is None:
         cache_dir = HF_HUB_CACHE
+        read_only_layers = HF_HUB_READ_ONLY_CACHES
 
     cache_dir = Path(cache_dir).expanduser().resolve()
+    read_only_cache_dirs = [Path(layer).expanduser().resolve() for layer in read_only_layers]
+    read_only_cache_dirs = [layer for layer in read_only_cache_dirs if layer != cache_dir]
     if not cache_dir.exists():
         raise CacheNotFound(
             f"Cache directory not found: {cache_dir}. Please use `cache_dir` argument or set `HF_HUB_CACHE` environment variable.",
@@ -683,13 +727,19 @@ def scan_cache_dir(cache_dir: Optional[Union[str, Path]] = None) -> HFCacheInfo:
 
     repos: Set[CachedRepoInfo] = set()
     warnings: List[CorruptedCacheException] = []
-    for repo_path in cache_dir.iterdir():
-        if repo_path.name == ".locks":  # skip './.locks/' folder
+    for layer in [cache_dir, *read_only_cache_dirs]:
+        if not layer.is_dir():  # only for read-only layers, `cache_dir` is checked above
+            logger.warning(f"Read-only cache directory not found: {layer}. Skipping it.")
             continue
-        try:
-            repos.add(_scan_cached_repo(repo_path))
-        except CorruptedCacheException as e:
-            warnings.append(e)
+        for repo_path in layer.iterdir():
+            if repo_path.name in (".locks", GLOBAL_BLOBS_DIR_NAME, LISTINGS_CACHE_DIR_NAME):
+                # skip './.locks/', './blobs-global/' and './.listings/' folders
+                continue
+            try:
+                repo = _scan_cached_repo(repo_path)
+                repos.add(repo if layer == cache_dir else replace(repo, read_only=True))
+            except CorruptedCacheException as e:
+                warnings.append(e)
 
     return HFCacheInfo(
         repos=frozenset(repos),
@@ -765,6 +815,13 @@ def _scan_cached_repo(repo_path: Path) -> CachedRepoInfo:
             # glob("**/*") iterates over all files and directories -> skip directories
             if file_path.is_dir():
                 continue
+            # Skip the snapshot manifest written by `snapshot_download` (not a symlink to a blob)
+            if (
+                file_path.name == SNAPSHOT_MANIFEST_NAME
+                and file_path.parent == revision_path
+                and not file_path.is_symlink()
+            ):
+                continue
 
             blob_path = Path(file_path).resolve()
             if not blob_path.exists():
@@ -873,6 +930,70 @@ def _format_timesince(ts: float) -> str:
     return f"{value} {label}{'s' if value > 1 else ''} ago"
 
 
+def _get_global_blobs_to_delete(deleted_blobs: Dict[Path, int], cache_dirs: Set[Path]) -> Tuple[Set[Path], int]:
+    """Return the blobs of the global blob store to delete along with `deleted_blobs`.
+
+    A blob is hardlinked in the global blob store (see `HF_HUB_ENABLE_GLOBAL_BLOB_STORE`) and in each repo using it.
+    Once its links in the deleted repos are removed, a global blob with no other link is not used anymore: it is deleted
+    as well. Global blobs already unused (e.g. repo deleted manually) in `cache_dirs` are deleted too.
+
+    Also returns the correction to apply to the expected freed size, which counts the size of each deleted blob file:
+    a file hardlinked elsewhere frees no space and a file deleted from several repos frees its size only once.
+    """
+    global_blobs: Set[Path] = set()
+    correction = 0
+
+    # Deleted links of each file on disk
+    links: Dict[Tuple[int, int], List[Path]] = defaultdict(list)
+    stats: Dict[Tuple[int, int], os.stat_result] = {}
+    for blob_path in deleted_blobs:
+        try:
+            stat = blob_path.stat()
+        except OSError:
+            continue  # missing file, reported when deleting it
+        stats[(stat.st_dev, stat.st_ino)] = stat
+        links[(stat.st_dev, stat.st_ino)].append(blob_path)
+
+    for key, paths in links.items():
+        nb_remaining_links = stats[key].st_nlink - len(paths)
+        # Path of the blob in the global blob store: `<cache_dir>/blobs-global/<sha256>`
+        global_blob_path = paths[0].parent.parent.parent / GLOBAL_BLOBS_DIR_NAME / paths[0].name
+        if nb_remaining_links == 1 and _is_same_file(global_blob_path, stats[key]):
+            global_blobs.add(global_blob_path)
+            nb_remaining_links = 0
+        nb_freed = 1 if nb_remaining_links == 0 else 0
+        correction -= deleted_blobs[paths[0]] * (len(paths) - nb_freed)
+
+    for cache_dir in cache_dirs:
+        global_blobs_dir = cache_dir / GLOBAL_BLOBS_DIR_NAME
+        if not global_blobs_dir.is_dir():
+            continue
+        for global_blob_path in global_blobs_dir.iterdir():
+            if global_blob_path in global_blobs or not global_blob_path.is_file():
+                continue
+            stat = global_blob_path.stat()
+            if stat.st_nlink == 1:
+                global_blobs.add(global_blob_path)
+                correction += stat.st_size
+
+    return global_blobs, correction
+
+
+def _is_same_file(path: Path, stat: os.stat_result) -> bool:
+    try:
+        path_stat = path.stat()
+    except OSError:
+        return False
+    return (path_stat.st_dev, path_stat.st_ino) == (stat.st_dev, stat.st_ino)
+
+
+def _get_nb_links(path: Path) -> int:
+    try:
+        return path.stat().st_nlink
+    except OSError:
+        return 0
+
+
 def _try_delete_path(path: Path, path_type: str) -> None:
     """Try to delete a local file or folder.
 
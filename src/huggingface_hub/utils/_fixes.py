@@ -8,6 +8,7 @@ except ImportError:
         from simplejson import JSONDecodeError  # type: ignore # noqa: F401
     except ImportError:
         from json import JSONDecodeError  # type: ignore  # noqa: F401
+import asyncio
 import contextlib
 import os
 import shutil
@@ -16,7 +17,7 @@ import tempfile
 import time
 from functools import partial
 from pathlib import Path
-from typing import Callable, Generator, Optional, Union
+from typing import AsyncGenerator, Callable, Generator, Optional, Union
 
 import yaml
 from filelock import BaseFileLock, FileLock, SoftFileLock, Timeout
@@ -131,3 +132,46 @@ def WeakFileLock(
                 Path(lock_file).unlink()
             except OSError:
                 pass
+
+
+@contextlib.asynccontextmanager
+async def AsyncWeakFileLock(lock_file: Union[str, Path]) -> AsyncGenerator[BaseFileLock, None]:
+    """Asynchronous version of [`WeakFileLock`].
+
+    The lock is polled without blocking the event loop. Coroutines running in the same process and waiting for the same
+    lock wait for each other (each coroutine uses its own file descriptor).
+    """
+    log_interval = constants.FILELOCK_LOG_EVERY_SECONDS
+    lock: BaseFileLock = FileLock(lock_file)
+    start_time = last_log_time = time.time()
+
+    while True:
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            if time.time() - last_log_time >= log_interval:
+                last_log_time = time.time()
+                logger.info(
+                    f"Still waiting to acquire lock on {lock_file} (elapsed: {time.time() - start_time:.1f} seconds)"
+                )
+            await asyncio.sleep(0.1)
+        except NotImplementedError as e:
+            if "use SoftFileLock instead" in str(e):
+                logger.warning(
+                    "FileSystem does not appear to support flock. Falling back to SoftFileLock for %s", lock_file
+                )
+                lock = SoftFileLock(lock_file)
+                continue
+        else:
+            break
+
+    try:
+        yield lock
+    finally:
+        try:
+            lock.release()
+        except OSError:
+            try:
+                Path(lock_file).unlink()
+            except OSError:
+                pass
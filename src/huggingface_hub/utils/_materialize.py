@@ -0,0 +1,135 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains utilities to copy a file using the cheapest strategy supported by the file system."""
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Callable, Literal, Union
+
+from . import logging
+
+
+logger = logging.get_logger(__name__)
+
+MaterializeStrategy = Literal["reflink", "hardlink", "copy_file_range", "sendfile", "copy"]
+
+# See `ioctl_ficlone(2)`. Value is the same on all Linux architectures.
+_FICLONE = 0x40049409
+
+# Max number of bytes to copy in a single `copy_file_range`/`sendfile` call (some kernels limit it to ~2GB)
+_MAX_COPY_SIZE = 1024 * 1024 * 1024
+
+
+def materialize_file(
+    src: Union[str, Path], dst: Union[str, Path], *, allow_hardlink: bool = False
+) -> MaterializeStrategy:
+    """Create `dst` with the same content as `src`, using the cheapest strategy available.
+
+    Strategies are tried in this order:
+    1. `"reflink"`: copy-on-write clone of the file (`FICLONE` ioctl). Instant and no extra disk space, but only on
+       file systems supporting it (btrfs, XFS, ...) and only on Linux.
+    2. `"hardlink"`: `dst` and `src` are the same file on disk. Only if `allow_hardlink=True` as modifying one file
+       in place modifies the other.
+    3. `"copy_file_range"`: in-kernel copy. Some file systems (NFS, SMB, ...) perform it server-side.
+    4. `"sendfile"`: in-kernel copy.
+    5. `"copy"`: regular copy.
+
+    If a strategy fails (not supported by the platform or the file system), the next one is tried. `dst` is written
+    to a temporary file and moved in place at the end, so it is never partially written. An existing `dst` is
+    overwritten.
+
+    Args:
+        src (`str` or `Path`):
+            Path of the file to copy.
+        dst (`str` or `Path`):
+            Path of the file to create.
+        allow_hardlink (`bool`, *optional*):
+            Whether `dst` can be a hardlink to `src`. Defaults to `False`.
+
+    Returns:
+        `str`: the strategy that has been used.
+    """
+    src, dst = str(src), str(dst)
+    tmp_dst = os.path.join(os.path.dirname(dst), f".{os.path.basename(dst)}.{uuid.uuid4().hex}.tmp")
+    try:
+        strategy = _materialize_to(src, tmp_dst, allow_hardlink=allow_hardlink)
+        os.replace(tmp_dst, dst)
+    finally:
+        if os.path.lexists(tmp_dst):
+            os.remove(tmp_dst)
+    logger.info(f"Materialized {dst} from {src} (strategy: {strategy})")
+    return strategy
+
+
+def _materialize_to(src: str, dst: str, *, allow_hardlink: bool) -> MaterializeStrategy:
+    """Create the non-existing `dst` file from `src`. See [`materialize_file`]."""
+    with open(src, "rb") as fsrc, open(dst, "xb") as fdst:
+        if _reflink(fsrc.fileno(), fdst.fileno()):
+            return "reflink"
+
+    if allow_hardlink:
+        os.remove(dst)
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as e:  # not supported by the file system or not on the same volume
+            logger.debug(f"Cannot hardlink {src} to {dst}: {e}")
+
+    size = os.path.getsize(src)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if size > 0:
+            for strategy, copy_range in (("copy_file_range", _copy_file_range), ("sendfile", _sendfile)):
+                if _copy_with(copy_range, fsrc.fileno(), fdst.fileno(), size):
+                    return strategy  # type: ignore [return-value]
+                fdst.seek(0)
+                fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst)
+    return "copy"
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        return False
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+        return True
+    except OSError:  # not Linux, not supported by the file system or not on the same volume
+        return False
+
+
+def _copy_with(copy_range: Callable[[int, int, int, int], int], src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copy `size` bytes from `src_fd` to `dst_fd` with `copy_range`. Return False if it is not supported."""
+    offset = 0
+    try:
+        while offset < size:
+            copied = copy_range(src_fd, dst_fd, offset, min(size - offset, _MAX_COPY_SIZE))
+            if copied == 0:  # file has been truncated in the meantime
+                break
+            offset += copied
+    except (OSError, AttributeError):  # not supported by the platform or the file system
+        return False
+    return offset == size
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+    return os.sendfile(dst_fd, src_fd, offset, count)
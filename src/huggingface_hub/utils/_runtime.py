@@ -361,6 +361,7 @@ def dump_environment_info() -> Dict[str, Any]:
     # Environment variables
     info["ENDPOINT"] = constants.ENDPOINT
     info["HF_HUB_CACHE"] = constants.HF_HUB_CACHE
+    info["HF_HUB_READ_ONLY_CACHES"] = constants.HF_HUB_READ_ONLY_CACHES
     info["HF_ASSETS_CACHE"] = constants.HF_ASSETS_CACHE
     info["HF_TOKEN_PATH"] = constants.HF_TOKEN_PATH
     info["HF_STORED_TOKENS_PATH"] = constants.HF_STORED_TOKENS_PATH
@@ -371,8 +372,20 @@ def dump_environment_info() -> Dict[str, Any]:
     info["HF_HUB_DISABLE_EXPERIMENTAL_WARNING"] = constants.HF_HUB_DISABLE_EXPERIMENTAL_WARNING
     info["HF_HUB_DISABLE_IMPLICIT_TOKEN"] = constants.HF_HUB_DISABLE_IMPLICIT_TOKEN
     info["HF_HUB_ENABLE_HF_TRANSFER"] = constants.HF_HUB_ENABLE_HF_TRANSFER
+    info["HF_HUB_ENABLE_PARALLEL_DOWNLOAD"] = constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD
+    info["HF_HUB_PREALLOCATE_FILES"] = constants.HF_HUB_PREALLOCATE_FILES
+    info["HF_HUB_STRICT_DISK_SPACE_CHECK"] = constants.HF_HUB_STRICT_DISK_SPACE_CHECK
+    info["HF_HUB_ENABLE_GLOBAL_BLOB_STORE"] = constants.HF_HUB_ENABLE_GLOBAL_BLOB_STORE
+    info["HF_HUB_LOCAL_DIR_ENABLE_HARDLINKS"] = constants.HF_HUB_LOCAL_DIR_ENABLE_HARDLINKS
+    info["HF_HUB_CACHE_PROMOTE"] = constants.HF_HUB_CACHE_PROMOTE
+    info["HF_HUB_FS_LISTINGS_CACHE"] = constants.HF_HUB_FS_LISTINGS_CACHE
+    info["HF_HUB_FS_BLOCK_CACHE"] = constants.HF_HUB_FS_BLOCK_CACHE
     info["HF_HUB_ETAG_TIMEOUT"] = constants.HF_HUB_ETAG_TIMEOUT
     info["HF_HUB_DOWNLOAD_TIMEOUT"] = constants.HF_HUB_DOWNLOAD_TIMEOUT
+    info["HF_HUB_MAX_BANDWIDTH"] = constants.HF_HUB_MAX_BANDWIDTH
+    info["HF_HUB_MAX_BANDWIDTH_PER_HOST"] = constants.HF_HUB_MAX_BANDWIDTH_PER_HOST
+    info["HF_HUB_REVISION_TTL"] = constants.HF_HUB_REVISION_TTL
+    info["HF_HUB_MEMORY_CACHE_SIZE"] = constants.HF_HUB_MEMORY_CACHE_SIZE
 
     print("\nCopy-and-paste the text below in your GitHub issue.\n")
     print("\n".join([f"- {prop}: {val}" for prop, val in info.items()]) + "\n")
@@ -0,0 +1,290 @@
+"""Tests for `ahf_hub_download` and `asnapshot_download`.
+
+Tests run against a minimal fake Hub served locally with `aiohttp`.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Tuple
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from huggingface_hub import ahf_hub_download, asnapshot_download
+from huggingface_hub._snapshot_download import _SnapshotToDownload
+from huggingface_hub.errors import EntryNotFoundError, LocalEntryNotFoundError
+from huggingface_hub.file_download import HfFileMetadata, hf_hub_url
+from huggingface_hub.utils.insecure_hashlib import sha256
+
+
+COMMIT_HASH = "a" * 40
+REPO_ID = "user/repo"
+FILES = {
+    "config.json": b'{"foo": "bar"}',
+    "model.safetensors": bytes(range(256)) * 100,
+    "folder/data.bin": b"some data" * 10,
+}
+
+
+class _FakeHub:
+    """Serve `files` at `/{repo_id}/resolve/{revision}/{filename}` and record the requests."""
+
+    def __init__(self, files: Dict[str, bytes]) -> None:
+        self.files = files
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        filename = request.match_info["filename"]
+        self.requests.append((request.method, filename, dict(request.headers)))
+        if filename not in self.files:
+            return web.Response(
+                status=404, headers={"X-Error-Code": "EntryNotFound", "X-Repo-Commit": COMMIT_HASH}, text="Not found"
+            )
+        content = self.files[filename]
+        headers = {"X-Repo-Commit": COMMIT_HASH, "ETag": f'"{sha256(content).hexdigest()}"'}
+        if request.method == "HEAD":
+            return web.Response(headers={**headers, "Content-Length": str(len(content))})
+        if "Range" in request.headers:
+            start_str, end_str = request.headers["Range"][len("bytes=") :].split("-")
+            start, end = int(start_str), int(end_str) + 1 if end_str else len(content)
+            return web.Response(status=206, body=content[start:end], headers=headers)
+        return web.Response(body=content, headers=headers)
+
+    def count(self, method: str) -> int:
+        return len([request for request in self.requests if request[0] == method])
+
+
+@pytest_asyncio.fixture
+async def hub() -> AsyncIterator[Tuple[_FakeHub, str]]:
+    fake_hub = _FakeHub(FILES)
+    app = web.Application()
+    app.router.add_route("*", "/{namespace}/{name}/resolve/{revision}/{filename:.+}", fake_hub.handle)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        yield fake_hub, str(server.make_url("")).rstrip("/")
+    finally:
+        await server.close()
+
+
+def _metadata(endpoint: str, filename: str) -> HfFileMetadata:
+    content = FILES[filename]
+    return HfFileMetadata(
+        commit_hash=COMMIT_HASH,
+        etag=sha256(content).hexdigest(),
+        location=hf_hub_url(REPO_ID, filename, revision=COMMIT_HASH, endpoint=endpoint),
+        size=len(content),
+    )
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download(hub, tmp_path: Path) -> None:
+    fake_hub, endpoint = hub
+    path = await ahf_hub_download(REPO_ID, "model.safetensors", cache_dir=tmp_path, endpoint=endpoint)
+
+    assert Path(path).read_bytes() == FILES["model.safetensors"]
+    storage_folder = tmp_path / "models--user--repo"
+    assert Path(path) == storage_folder / "snapshots" / COMMIT_HASH / "model.safetensors"
+    assert (storage_folder / "blobs" / sha256(FILES["model.safetensors"]).hexdigest()).is_file()
+    assert (storage_folder / "refs" / "main").read_text() == COMMIT_HASH
+    assert fake_hub.count("HEAD") == 1
+    assert fake_hub.count("GET") == 1
+
+    # File is cached => no GET call
+    assert await ahf_hub_download(REPO_ID, "model.safetensors", cache_dir=tmp_path, endpoint=endpoint) == path
+    assert fake_hub.count("GET") == 1
+
+    # Commit hash => no call at all
+    assert (
+        await ahf_hub_download(
+            REPO_ID, "model.safetensors", cache_dir=tmp_path, endpoint=endpoint, revision=COMMIT_HASH
+        )
+        == path
+    )
+    assert fake_hub.count("HEAD") == 2
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_subfolder_and_verify(hub, tmp_path: Path) -> None:
+    _, endpoint = hub
+    path = await ahf_hub_download(
+        REPO_ID, "data.bin", subfolder="folder", cache_dir=tmp_path, endpoint=endpoint, verify=True
+    )
+    assert Path(path).read_bytes() == FILES["folder/data.bin"]
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_verify_fails(hub, tmp_path: Path) -> None:
+    fake_hub, endpoint = hub
+    fake_hub.files = {**FILES, "config.json": b'{"foo": "baz"}'}  # same size, different content
+    metadata = _metadata(endpoint, "config.json")
+    with pytest.raises(EnvironmentError, match="Integrity check failed"):
+        await ahf_hub_download(
+            REPO_ID, "config.json", cache_dir=tmp_path, endpoint=endpoint, verify=True, _file_metadata=metadata
+        )
+    assert not list((tmp_path / "models--user--repo" / "blobs").iterdir())
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_resume(hub, tmp_path: Path) -> None:
+    fake_hub, endpoint = hub
+    blobs = tmp_path / "models--user--repo" / "blobs"
+    blobs.mkdir(parents=True)
+    etag = sha256(FILES["model.safetensors"]).hexdigest()
+    (blobs / f"{etag}.incomplete").write_bytes(FILES["model.safetensors"][:1000])
+
+    path = await ahf_hub_download(REPO_ID, "model.safetensors", cache_dir=tmp_path, endpoint=endpoint, verify=True)
+    assert Path(path).read_bytes() == FILES["model.safetensors"]
+    get_requests = [headers for method, _, headers in fake_hub.requests if method == "GET"]
+    assert get_requests[0]["Range"] == "bytes=1000-"
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_entry_not_found(hub, tmp_path: Path) -> None:
+    _, endpoint = hub
+    with pytest.raises(EntryNotFoundError):
+        await ahf_hub_download(REPO_ID, "missing.txt", cache_dir=tmp_path, endpoint=endpoint)
+    # Non-existence is cached as for sync downloads
+    assert (tmp_path / "models--user--repo" / ".no_exist" / COMMIT_HASH / "missing.txt").is_file()
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_offline_fallback(hub, tmp_path: Path) -> None:
+    _, endpoint = hub
+    path = await ahf_hub_download(REPO_ID, "config.json", cache_dir=tmp_path, endpoint=endpoint)
+
+    # Server unreachable => return cached file
+    unreachable_endpoint = "http://127.0.0.1:1"
+    assert await ahf_hub_download(REPO_ID, "config.json", cache_dir=tmp_path, endpoint=unreachable_endpoint) == path
+
+    # Not in cache => raise
+    with pytest.raises(LocalEntryNotFoundError):
+        await ahf_hub_download(REPO_ID, "model.safetensors", cache_dir=tmp_path, endpoint=unreachable_endpoint)
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_from_read_only_layer(hub, tmp_path: Path) -> None:
+    fake_hub, endpoint = hub
+    writable, read_only = tmp_path / "local", tmp_path / "shared"
+    read_only_path = await ahf_hub_download(REPO_ID, "config.json", cache_dir=read_only, endpoint=endpoint)
+    await ahf_hub_download(REPO_ID, "model.safetensors", cache_dir=read_only, endpoint=endpoint)
+    (read_only / "models--user--repo" / "snapshots" / COMMIT_HASH / "model.safetensors").unlink()
+    fake_hub.requests.clear()
+
+    with patch("huggingface_hub.constants.HF_HUB_READ_ONLY_CACHES", [str(read_only)]):
+        # Commit hash => file returned from the read-only layer without any call
+        path = await ahf_hub_download(
+            REPO_ID, "config.json", cache_dir=writable, endpoint=endpoint, revision=COMMIT_HASH
+        )
+        assert path == read_only_path
+        assert fake_hub.requests == []
+
+        # Server unreachable => file returned from the read-only layer
+        unreachable_endpoint = "http://127.0.0.1:1"
+        assert await ahf_hub_download(REPO_ID, "config.json", cache_dir=writable, endpoint=unreachable_endpoint) == (
+            read_only_path
+        )
+
+        # Blob in the read-only layer but not the pointer => blob copied after the HEAD call instead of downloaded
+        path = await ahf_hub_download(REPO_ID, "model.safetensors", cache_dir=writable, endpoint=endpoint)
+        assert Path(path) == writable / "models--user--repo" / "snapshots" / COMMIT_HASH / "model.safetensors"
+        assert Path(path).read_bytes() == FILES["model.safetensors"]
+        assert fake_hub.count("HEAD") == 1
+        assert fake_hub.count("GET") == 0
+
+        # Promote => file copied to the writable cache
+        with patch("huggingface_hub.constants.HF_HUB_CACHE_PROMOTE", True):
+            path = await ahf_hub_download(
+                REPO_ID, "config.json", cache_dir=writable, endpoint=endpoint, revision=COMMIT_HASH
+            )
+        assert Path(path) == writable / "models--user--repo" / "snapshots" / COMMIT_HASH / "config.json"
+        assert Path(path).read_bytes() == FILES["config.json"]
+        assert fake_hub.count("GET") == 0
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_concurrent_same_file(hub, tmp_path: Path) -> None:
+    fake_hub, endpoint = hub
+    paths = await asyncio.gather(
+        *[ahf_hub_download(REPO_ID, "model.safetensors", cache_dir=tmp_path, endpoint=endpoint) for _ in range(5)]
+    )
+    assert len(set(paths)) == 1
+    assert Path(paths[0]).read_bytes() == FILES["model.safetensors"]
+    assert fake_hub.count("GET") == 1  # other coroutines waited for the lock
+
+
+@pytest.mark.asyncio
+async def test_asnapshot_download(hub, tmp_path: Path) -> None:
+    fake_hub, endpoint = hub
+    snapshot_folder = tmp_path / "models--user--repo" / "snapshots" / COMMIT_HASH
+    resolved = _SnapshotToDownload(
+        commit_hash=COMMIT_HASH,
+        snapshot_folder=str(snapshot_folder),
+        filenames=list(FILES),
+        files_metadata={filename: _metadata(endpoint, filename) for filename in FILES},
+    )
+    with patch("huggingface_hub._async_download._resolve_snapshot", return_value=resolved):
+        path = await asnapshot_download(REPO_ID, cache_dir=tmp_path, endpoint=endpoint, max_connections=1)
+
+    assert path == str(snapshot_folder)
+    for filename, content in FILES.items():
+        assert (snapshot_folder / filename).read_bytes() == content
+    assert fake_hub.count("HEAD") == 0  # metadata already known
+    # Largest file first (one file at a time => disk operations run in a thread do not change the order)
+    assert [filename for _, filename, _ in fake_hub.requests] == [
+        "model.safetensors",
+        "folder/data.bin",
+        "config.json",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_asnapshot_download_links_cached_blobs(hub, tmp_path: Path) -> None:
+    fake_hub, endpoint = hub
+    storage_folder = tmp_path / "models--user--repo"
+    snapshot_folder = storage_folder / "snapshots" / COMMIT_HASH
+    (storage_folder / "blobs").mkdir(parents=True)
+    for filename, content in FILES.items():
+        (storage_folder / "blobs" / sha256(content).hexdigest()).write_bytes(content)
+    resolved = _SnapshotToDownload(
+        commit_hash=COMMIT_HASH,
+        snapshot_folder=str(snapshot_folder),
+        filenames=list(FILES),
+        files_metadata={filename: _metadata(endpoint, filename) for filename in FILES},
+    )
+    with patch("huggingface_hub._async_download._resolve_snapshot", return_value=resolved):
+        with patch("huggingface_hub._snapshot_download._check_disk_space") as mock_check_disk_space:
+            await asnapshot_download(REPO_ID, cache_dir=tmp_path, endpoint=endpoint)
+
+    for filename, content in FILES.items():
+        assert (snapshot_folder / filename).read_bytes() == content
+    assert fake_hub.requests == []  # blobs already cached => linked without going through `ahf_hub_download`
+    mock_check_disk_space.assert_not_called()  # nothing to download
+
+
+@pytest.mark.asyncio
+async def test_asnapshot_download_checks_disk_space(hub, tmp_path: Path) -> None:
+    fake_hub, endpoint = hub
+    resolved = _SnapshotToDownload(
+        commit_hash=COMMIT_HASH,
+        snapshot_folder=str(tmp_path / "models--user--repo" / "snapshots" / COMMIT_HASH),
+        filenames=list(FILES),
+        files_metadata={filename: _metadata(endpoint, filename) for filename in FILES},
+    )
+    with patch("huggingface_hub._async_download._resolve_snapshot", return_value=resolved):
+        with patch("huggingface_hub._snapshot_download._check_disk_space") as mock_check_disk_space:
+            await asnapshot_download(REPO_ID, cache_dir=tmp_path, endpoint=endpoint)
+
+    # Disk space checked once for the whole snapshot
+    mock_check_disk_space.assert_called_once_with(
+        sum(len(content) for content in FILES.values()), str(tmp_path / "models--user--repo"), nb_files=len(FILES)
+    )
+
+
+@pytest.mark.asyncio
+async def test_asnapshot_download_offline(tmp_path: Path) -> None:
+    with patch("huggingface_hub._async_download._resolve_snapshot", return_value=str(tmp_path)):
+        assert await asnapshot_download(REPO_ID, cache_dir=tmp_path) == str(tmp_path)
@@ -0,0 +1,313 @@
+"""Tests for `AsyncHfFileSystem`.
+
+Tests run against a minimal fake Hub served locally with `aiohttp`. Files are redirected to a fake CDN on another host
+(`localhost` instead of `127.0.0.1`), like on the Hub.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Tuple
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from fsspec.asyn import get_loop, sync
+
+from huggingface_hub import AsyncHfFileSystem
+from huggingface_hub.utils.insecure_hashlib import sha1
+
+
+COMMIT_HASH = "a" * 40
+REPO_ID = "user/repo"
+FILES = {
+    "config.json": b'{"foo": "bar"}',
+    "data/0.bin": bytes(range(256)) * 100,
+    "data/1.bin": b"some data" * 10,
+    "data/2.bin": b"more data" * 10,
+    "data/sub/3.bin": b"nested",
+}
+
+
+class _FakeHub:
+    """Serve the repo info, tree and resolve endpoints of a single repo, and record the requests."""
+
+    page_size = 2
+
+    def __init__(self) -> None:
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []
+        # Status code returned by the CDN for the paths listed here (e.g. 403 for an expired URL)
+        self.cdn_errors: Dict[str, int] = {}
+
+    def _record(self, request: web.Request) -> None:
+        self.requests.append((request.method, request.path, dict(request.headers)))
+
+    async def repo_info(self, request: web.Request) -> web.Response:
+        self._record(request)
+        repo_id = "/".join(filter(None, [request.match_info.get("namespace"), request.match_info["name"]]))
+        if repo_id != REPO_ID:
+            return web.Response(status=404, headers={"X-Error-Code": "RepoNotFound"}, text="Repository not found")
+        return web.json_response({"id": REPO_ID, "sha": COMMIT_HASH})
+
+    async def tree(self, request: web.Request) -> web.Response:
+        self._record(request)
+        path = request.match_info.get("path", "")
+        if path in FILES:
+            return web.Response(status=404, headers={"X-Error-Code": "EntryNotFound"}, text="Not a directory")
+        prefix = path + "/" if path else ""
+        entries = {}
+        for filename, content in FILES.items():
+            if filename.startswith(prefix):
+                name = filename[len(prefix) :].split("/")[0]
+                if "/" in filename[len(prefix) :]:
+                    entries[name] = {"type": "directory", "oid": "0" * 40, "path": prefix + name}
+                else:
+                    entries[name] = {"type": "file", "oid": sha1(content).hexdigest(), "size": len(content)}
+                    entries[name]["path"] = prefix + name
+        if not entries:
+            return web.Response(status=404, headers={"X-Error-Code": "EntryNotFound"}, text="Not found")
+        items = sorted(entries.values(), key=lambda entry: entry["path"])
+        cursor = int(request.query.get("cursor", 0))
+        headers = {}
+        if cursor + self.page_size < len(items):
+            next_url = request.url.with_query({**request.query, "cursor": str(cursor + self.page_size)})
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return web.json_response(items[cursor : cursor + self.page_size], headers=headers)
+
+    async def resolve(self, request: web.Request) -> web.Response:
+        self._record(request)
+        filename = request.match_info["filename"]
+        if filename not in FILES:
+            return web.Response(status=404, headers={"X-Error-Code": "EntryNotFound"}, text="Not found")
+        raise web.HTTPFound(f"http://localhost:{request.url.port}/cdn/{filename}?Expires={int(time.time()) + 3600}")
+
+    async def cdn(self, request: web.Request) -> web.Response:
+        self._record(request)
+        if request.path in self.cdn_errors:
+            return web.Response(status=self.cdn_errors[request.path], text="Request has expired")
+        content = FILES[request.match_info["filename"]]
+        if "Range" in request.headers:
+            start_str, end_str = request.headers["Range"][len("bytes=") :].split("-")
+            start, end = int(start_str), int(end_str) + 1 if end_str else len(content)
+            return web.Response(status=206, body=content[start:end])
+        return web.Response(body=content)
+
+    def paths(self, prefix: str) -> List[str]:
+        return [path for _, path, _ in self.requests if path.startswith(prefix)]
+
+
+def _make_app(fake_hub: _FakeHub) -> web.Application:
+    app = web.Application()
+    app.router.add_get("/api/models/{name}", fake_hub.repo_info)
+    app.router.add_get("/api/models/{namespace}/{name}", fake_hub.repo_info)
+    app.router.add_get("/api/models/{namespace}/{name}/revision/{revision}", fake_hub.repo_info)
+    app.router.add_get("/api/models/{namespace}/{name}/tree/{revision}", fake_hub.tree)
+    app.router.add_get("/api/models/{namespace}/{name}/tree/{revision}/{path:.+}", fake_hub.tree)
+    app.router.add_get("/{namespace}/{name}/resolve/{revision}/{filename:.+}", fake_hub.resolve)
+    app.router.add_get("/cdn/{filename:.+}", fake_hub.cdn)
+    return app
+
+
+@pytest_asyncio.fixture
+async def hub() -> AsyncIterator[Tuple[_FakeHub, str]]:
+    fake_hub = _FakeHub()
+    server = TestServer(_make_app(fake_hub))
+    await server.start_server()
+    try:
+        yield fake_hub, str(server.make_url("")).rstrip("/")
+    finally:
+        await server.close()
+
+
+@pytest_asyncio.fixture
+async def fs(hub: Tuple[_FakeHub, str], tmp_path: Path) -> AsyncIterator[AsyncHfFileSystem]:
+    fs = AsyncHfFileSystem(endpoint=hub[1], token="hf_token", asynchronous=True, skip_instance_cache=True)
+    session = await fs.set_session()
+    try:
+        with patch("huggingface_hub.constants.HF_HUB_CACHE", str(tmp_path / "cache")):
+            yield fs
+    finally:
+        await session.close()
+
+
+@pytest.mark.asyncio
+async def test_ls(hub: Tuple[_FakeHub, str], fs: AsyncHfFileSystem) -> None:
+    fake_hub, _ = hub
+    assert await fs._ls(REPO_ID, detail=False) == [f"{REPO_ID}/config.json", f"{REPO_ID}/data"]
+    # 4 entries => 2 pages
+    entries = await fs._ls(f"{REPO_ID}/data")
+    assert [entry["name"] for entry in entries] == [
+        f"{REPO_ID}/data/{name}" for name in ["0.bin", "1.bin", "2.bin", "sub"]
+    ]
+    assert len(fake_hub.paths("/api/models/user/repo/tree/main/data")) == 2
+    assert entries[0]["size"] == len(FILES["data/0.bin"])
+    assert entries[0]["type"] == "file"
+    assert entries[3]["type"] == "directory"
+
+    # A file is listed as itself
+    assert await fs._ls(f"{REPO_ID}/data/1.bin", detail=False) == [f"{REPO_ID}/data/1.bin"]
+
+    # Listings and repo info are cached
+    nb_requests = len(fake_hub.requests)
+    await fs._ls(f"{REPO_ID}/data")
+    assert len(fake_hub.requests) == nb_requests
+    assert len(fake_hub.paths("/api/models/user/repo")) - len(fake_hub.paths("/api/models/user/repo/tree")) == 1
+
+
+@pytest.mark.asyncio
+async def test_find(fs: AsyncHfFileSystem) -> None:
+    assert await fs._find(REPO_ID) == [f"{REPO_ID}/{filename}" for filename in sorted(FILES)]
+
+
+@pytest.mark.asyncio
+async def test_info_and_not_found(fs: AsyncHfFileSystem) -> None:
+    info = await fs._info(f"{REPO_ID}/config.json")
+    assert info["size"] == len(FILES["config.json"])
+    assert info["type"] == "file"
+    assert (await fs._info(f"{REPO_ID}/data"))["type"] == "directory"
+    assert (await fs._info(REPO_ID))["type"] == "directory"
+    assert await fs._exists(f"{REPO_ID}/data/sub/3.bin")
+
+    with pytest.raises(FileNotFoundError):
+        await fs._info(f"{REPO_ID}/missing.json")
+    with pytest.raises(FileNotFoundError, match="repository not found"):
+        await fs._info("user/missing/config.json")
+    with pytest.raises(FileNotFoundError):
+        await fs._info(f"{REPO_ID}/missing/config.json")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_requests(hub: Tuple[_FakeHub, str], fs: AsyncHfFileSystem) -> None:
+    fake_hub, _ = hub
+    paths = [f"{REPO_ID}/data/{i}.bin" for i in range(3)] * 20
+    contents = await asyncio.gather(*[fs._cat_file(path) for path in paths])
+    assert contents == [FILES[f"data/{i}.bin"] for i in range(3)] * 20
+    # A single repo info and a single listing of the directory (2 pages)
+    assert fake_hub.paths("/api/") == ["/api/models/user/repo"] + ["/api/models/user/repo/tree/main/data"] * 2
+
+
+@pytest.mark.asyncio
+async def test_cat_file(hub: Tuple[_FakeHub, str], fs: AsyncHfFileSystem) -> None:
+    fake_hub, _ = hub
+    content = FILES["data/0.bin"]
+    assert await fs._cat_file(f"{REPO_ID}/data/0.bin", start=100, end=200) == content[100:200]
+    assert await fs._cat_file(f"{REPO_ID}/data/0.bin", start=-10) == content[-10:]
+    assert await fs._cat_file(f"{REPO_ID}/data/0.bin", start=200, end=100) == b""
+
+    # Only the first read is redirected, then the CDN is requested directly, without the token
+    assert len(fake_hub.paths("/user/repo/resolve/")) == 1
+    cdn_requests = [headers for _, path, headers in fake_hub.requests if path.startswith("/cdn/")]
+    assert len(cdn_requests) == 2
+    assert all("Authorization" not in headers for headers in cdn_requests)
+
+    with pytest.raises(IsADirectoryError):
+        await fs._cat_file(f"{REPO_ID}/data")
+
+
+@pytest.mark.asyncio
+async def test_token_sent_to_same_host_location(hub: Tuple[_FakeHub, str], fs: AsyncHfFileSystem) -> None:
+    fake_hub, endpoint = hub
+    fs._redirect_cache[("model", REPO_ID, "main", "config.json")] = (f"{endpoint}/cdn/config.json", time.time() + 60)
+    assert await fs._cat_file(f"{REPO_ID}/config.json") == FILES["config.json"]
+    assert fake_hub.paths("/user/repo/resolve/") == []
+    assert fake_hub.requests[-1][2]["Authorization"] == "Bearer hf_token"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status_code", [401, 403, 404])
+async def test_resolve_again_on_invalid_location(
+    hub: Tuple[_FakeHub, str], fs: AsyncHfFileSystem, status_code: int
+) -> None:
+    fake_hub, endpoint = hub
+    expired_location = f"http://localhost:{endpoint.rsplit(':', 1)[1]}/cdn/expired/config.json"
+    fake_hub.cdn_errors["/cdn/expired/config.json"] = status_code
+    fs._redirect_cache[("model", REPO_ID, "main", "config.json")] = (expired_location, time.time() + 60)
+
+    assert await fs._cat_file(f"{REPO_ID}/config.json") == FILES["config.json"]
+    assert fake_hub.paths("/cdn/") == ["/cdn/expired/config.json", "/cdn/config.json"]
+    assert fs._redirect_cache[("model", REPO_ID, "main", "config.json")][0].startswith(
+        f"http://localhost:{endpoint.rsplit(':', 1)[1]}/cdn/config.json?"
+    )
+
+
+@pytest.mark.asyncio
+async def test_cat_file_from_local_cache(hub: Tuple[_FakeHub, str], fs: AsyncHfFileSystem, tmp_path: Path) -> None:
+    fake_hub, _ = hub
+    content = FILES["config.json"]
+    blob_path = tmp_path / "cache" / "models--user--repo" / "blobs" / sha1(content).hexdigest()
+    blob_path.parent.mkdir(parents=True)
+    blob_path.write_bytes(content)
+    assert await fs._cat_file(f"{REPO_ID}/config.json", start=1) == content[1:]
+    assert fake_hub.paths("/user/repo/resolve/") == []
+
+
+@pytest.mark.asyncio
+async def test_cat_ranges(hub: Tuple[_FakeHub, str], fs: AsyncHfFileSystem) -> None:
+    fake_hub, _ = hub
+    content = FILES["data/0.bin"]
+    out = await fs._cat_ranges(
+        [f"{REPO_ID}/data/0.bin", f"{REPO_ID}/data/0.bin", f"{REPO_ID}/data/1.bin", f"{REPO_ID}/missing.bin"],
+        [0, 1000, 5, 0],
+        [10, 1010, -5, 10],
+        max_gap=2000,
+    )
+    assert out[:3] == [content[0:10], content[1000:1010], FILES["data/1.bin"][5:-5]]
+    assert isinstance(out[3], FileNotFoundError)
+    # The two ranges of the first file are merged
+    ranges = [headers["Range"] for _, path, headers in fake_hub.requests if path == "/cdn/data/0.bin"]
+    assert ranges == ["bytes=0-1009"]
+
+    with pytest.raises(FileNotFoundError):
+        await fs._cat_ranges([f"{REPO_ID}/missing.bin"], 0, 10, on_error="raise")
+    with pytest.raises(ValueError):
+        await fs._cat_ranges([f"{REPO_ID}/config.json"], [0, 1], 10)
+
+
+@pytest.mark.asyncio
+async def test_get_file(fs: AsyncHfFileSystem, tmp_path: Path) -> None:
+    await fs._get_file(f"{REPO_ID}/data/0.bin", str(tmp_path / "out" / "0.bin"))
+    assert (tmp_path / "out" / "0.bin").read_bytes() == FILES["data/0.bin"]
+
+    await fs._get(f"{REPO_ID}/data", str(tmp_path / "data"), recursive=True)
+    assert (tmp_path / "data" / "sub" / "3.bin").read_bytes() == FILES["data/sub/3.bin"]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cache(hub: Tuple[_FakeHub, str], fs: AsyncHfFileSystem) -> None:
+    fake_hub, _ = hub
+    await fs._ls(f"{REPO_ID}/data")
+    await fs._cat_file(f"{REPO_ID}/data/0.bin")
+    await fs._cat_file(f"{REPO_ID}/data/1.bin")
+    assert len(fs._redirect_cache) == 2
+    fs.invalidate_cache(f"{REPO_ID}/data/0.bin")
+    assert f"{REPO_ID}/data" not in fs.dircache
+    assert list(fs._redirect_cache) == [("model", REPO_ID, "main", "data/1.bin")]
+    await fs._ls(f"{REPO_ID}/data")
+    assert len(fake_hub.paths("/api/models/user/repo/tree/main/data")) == 4
+
+    # Same file with an explicit revision or the whole repo
+    await fs._cat_file(f"{REPO_ID}/data/0.bin")
+    fs.invalidate_cache(f"{REPO_ID}@main/data/0.bin")
+    assert list(fs._redirect_cache) == [("model", REPO_ID, "main", "data/1.bin")]
+    fs.invalidate_cache(REPO_ID)
+    assert fs._redirect_cache == {}
+
+
+def test_sync_api() -> None:
+    """Sync methods run on fsspec's event loop, with the session created there."""
+    loop = get_loop()
+
+    async def _start_server() -> TestServer:
+        server = TestServer(_make_app(_FakeHub()))
+        await server.start_server()
+        return server
+
+    server = sync(loop, _start_server)
+    try:
+        fs = AsyncHfFileSystem(endpoint=str(server.make_url("")).rstrip("/"), token=False, skip_instance_cache=True)
+        assert fs.cat_file(f"{REPO_ID}/config.json") == FILES["config.json"]
+        assert fs.ls(REPO_ID, detail=False) == [f"{REPO_ID}/config.json", f"{REPO_ID}/data"]
+    finally:
+        sync(loop, server.close)
@@ -0,0 +1,149 @@
+import asyncio
+import io
+from typing import Iterator, List
+from unittest.mock import Mock, patch
+
+import pytest
+
+from huggingface_hub import _bandwidth
+from huggingface_hub._bandwidth import (
+    ThrottledFileObj,
+    _TokenBucket,
+    athrottle,
+    parse_bandwidth,
+    throttle,
+    throttle_fileobj,
+)
+from huggingface_hub.utils import http_backoff
+
+
+class _FakeClock:
+    """Fake `time.monotonic` and `time.sleep`: sleeping advances the clock."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: List[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> Iterator[_FakeClock]:
+    fake_clock = _FakeClock()
+    with patch.object(_bandwidth.time, "monotonic", fake_clock.monotonic):
+        with patch.object(_bandwidth.time, "sleep", fake_clock.sleep):
+            with patch.object(_bandwidth, "_BUCKETS", {}):
+                yield fake_clock
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("500MB/s", 500 * 10**6), ("1GB/s", 10**9), ("1.5 MB", 1_500_000), ("1000", 1000), ("10kb/S", 10_000)],
+)
+def test_parse_bandwidth(value: str, expected: int) -> None:
+    assert parse_bandwidth(value) == expected
+
+
+@pytest.mark.parametrize("value", ["fast", "500Mbps", "0MB/s"])
+def test_parse_bandwidth_invalid(value: str) -> None:
+    with pytest.raises(ValueError, match="Invalid bandwidth"):
+        parse_bandwidth(value)
+
+
+def test_token_bucket(clock: _FakeClock) -> None:
+    bucket = _TokenBucket(rate=1000)
+    assert bucket.reserve(1000) == 0  # 1 second of burst
+    assert bucket.reserve(500) == 0.5  # in debt
+    assert bucket.reserve(500) == 1.0  # waits after the previous transfer
+
+    # Budget refills over time but never exceeds 1 second
+    clock.now += 100
+    assert bucket.reserve(1000) == 0
+    assert bucket.reserve(1) > 0
+
+
+def test_throttle_no_limit(clock: _FakeClock) -> None:
+    throttle(10**12)
+    assert clock.sleeps == []
+
+
+@patch("huggingface_hub.constants.HF_HUB_MAX_BANDWIDTH", "1KB/s")
+def test_throttle_average_rate(clock: _FakeClock) -> None:
+    start = clock.now
+    for _ in range(10):
+        throttle(500, "https://huggingface.co/file")
+    # 5000 bytes at 1000 bytes/s with 1 second of burst => 4 seconds
+    assert clock.now - start == pytest.approx(4.0)
+
+
+@patch("huggingface_hub.constants.HF_HUB_MAX_BANDWIDTH", "1KB/s")
+def test_throttle_shared_across_hosts(clock: _FakeClock) -> None:
+    throttle(1000, "https://huggingface.co/file")
+    throttle(1000, "https://cdn-lfs.hf.co/file")
+    assert clock.sleeps == [1.0]
+
+
+@patch("huggingface_hub.constants.HF_HUB_MAX_BANDWIDTH", "1KB/s")
+@patch("huggingface_hub.constants.HF_HUB_MAX_BANDWIDTH_PER_HOST", True)
+def test_throttle_per_host(clock: _FakeClock) -> None:
+    throttle(1000, "https://huggingface.co/file")
+    throttle(1000, "https://cdn-lfs.hf.co/file")
+    assert clock.sleeps == []
+    throttle(1000, "https://huggingface.co/other")
+    assert clock.sleeps == [1.0]
+
+
+@patch("huggingface_hub.constants.HF_HUB_MAX_BANDWIDTH", "1KB/s")
+def test_athrottle(clock: _FakeClock) -> None:
+    sleeps: List[float] = []
+
+    async def _sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    async def _main() -> None:
+        with patch.object(_bandwidth.asyncio, "sleep", _sleep):
+            await athrottle(1500)
+
+    asyncio.run(_main())
+    assert sleeps == [0.5]
+    assert clock.sleeps == []  # event loop not blocked
+
+
+@patch("huggingface_hub.constants.HF_HUB_MAX_BANDWIDTH", "1KB/s")
+def test_throttled_fileobj(clock: _FakeClock) -> None:
+    fileobj = throttle_fileobj(io.BytesIO(b"a" * 3000), "https://s3.amazonaws.com/part")
+    assert isinstance(fileobj, ThrottledFileObj)
+    assert fileobj.seek(0, io.SEEK_END) == 3000  # used by `requests` to compute the Content-Length
+    fileobj.seek(0)
+    assert fileobj.read(1000) == b"a" * 1000
+    assert fileobj.read() == b"a" * 2000
+    assert fileobj.tell() == 3000
+    assert clock.sleeps == [2.0]
+
+
+@patch("huggingface_hub.constants.HF_HUB_MAX_BANDWIDTH", "1MB/s")
+def test_throttled_fileobj_rewound_on_retry(clock: _FakeClock) -> None:
+    # e.g. a part upload retried after a 503: the whole body must be sent again
+    bodies: List[bytes] = []
+
+    def _request(method: str, url: str, data: ThrottledFileObj, **kwargs) -> Mock:
+        bodies.append(data.read())
+        return Mock(status_code=503 if len(bodies) == 1 else 200)
+
+    fileobj = throttle_fileobj(io.BytesIO(b"a" * 3000), "https://s3.amazonaws.com/part")
+    with patch("huggingface_hub.utils._http.get_session") as get_session:
+        get_session.return_value.request.side_effect = _request
+        response = http_backoff("PUT", "https://s3.amazonaws.com/part", data=fileobj, base_wait_time=0)
+
+    assert response.status_code == 200
+    assert bodies == [b"a" * 3000, b"a" * 3000]
+
+
+def test_throttle_fileobj_no_limit() -> None:
+    fileobj = io.BytesIO(b"content")
+    assert throttle_fileobj(fileobj) is fileobj
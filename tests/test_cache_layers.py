@@ -0,0 +1,155 @@
+"""Tests for read-only cache layers (see `HF_HUB_CACHE`)."""
+
+import os
+from pathlib import Path
+from typing import Iterator, Tuple
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from huggingface_hub import hf_hub_download, scan_cache_dir, snapshot_download, try_to_load_from_cache
+from huggingface_hub.file_download import HfFileMetadata
+
+
+COMMIT_HASH = "a" * 40
+OTHER_COMMIT_HASH = "b" * 40
+REPO_ID = "user/repo"
+CONTENT = b"some content"
+ETAG = "c" * 40
+
+
+def _populate(cache_dir: Path, commit_hash: str = COMMIT_HASH, filename: str = "file.txt") -> Path:
+    """Cache `filename` in `cache_dir` for `commit_hash` (with `main` pointing to it). Return the pointer path."""
+    storage_folder = cache_dir / "models--user--repo"
+    blob_path = storage_folder / "blobs" / ETAG
+    blob_path.parent.mkdir(parents=True, exist_ok=True)
+    blob_path.write_bytes(CONTENT)
+    pointer_path = storage_folder / "snapshots" / commit_hash / filename
+    pointer_path.parent.mkdir(parents=True, exist_ok=True)
+    pointer_path.symlink_to(os.path.relpath(blob_path, pointer_path.parent))
+    (storage_folder / "refs").mkdir(exist_ok=True)
+    (storage_folder / "refs" / "main").write_text(commit_hash)
+    return pointer_path
+
+
+def _metadata(commit_hash: str = COMMIT_HASH) -> HfFileMetadata:
+    return HfFileMetadata(
+        commit_hash=commit_hash,
+        etag=ETAG,
+        location=f"https://huggingface.co/{REPO_ID}/resolve/{commit_hash}/file.txt",
+        size=len(CONTENT),
+    )
+
+
+@pytest.fixture
+def layers(tmp_path: Path) -> Iterator[Tuple[Path, Path]]:
+    """Return (writable cache, read-only cache layer)."""
+    writable, read_only = tmp_path / "local", tmp_path / "shared"
+    writable.mkdir()
+    read_only.mkdir()
+    with patch("huggingface_hub.constants.HF_HUB_READ_ONLY_CACHES", [str(read_only)]):
+        yield writable, read_only
+
+
+@pytest.fixture
+def no_download() -> Iterator[Mock]:
+    with patch("huggingface_hub.file_download.http_get", side_effect=AssertionError("should not download")) as mock:
+        yield mock
+
+
+def test_try_to_load_from_cache(layers: Tuple[Path, Path]) -> None:
+    writable, read_only = layers
+    assert try_to_load_from_cache(REPO_ID, "file.txt", cache_dir=writable) is None
+
+    read_only_pointer = _populate(read_only)
+    assert try_to_load_from_cache(REPO_ID, "file.txt", cache_dir=writable) == str(read_only_pointer)
+
+    # Writable cache has priority
+    writable_pointer = _populate(writable)
+    assert try_to_load_from_cache(REPO_ID, "file.txt", cache_dir=writable) == str(writable_pointer)
+
+
+def test_download_commit_hash_from_read_only_layer(layers: Tuple[Path, Path], no_download: Mock) -> None:
+    writable, read_only = layers
+    read_only_pointer = _populate(read_only)
+    with patch("huggingface_hub.file_download.get_hf_file_metadata") as head:
+        path = hf_hub_download(REPO_ID, "file.txt", cache_dir=writable, revision=COMMIT_HASH)
+    head.assert_not_called()
+    assert path == str(read_only_pointer)
+    assert not (writable / "models--user--repo").exists()  # nothing written
+
+
+def test_download_promote_from_read_only_layer(layers: Tuple[Path, Path], no_download: Mock) -> None:
+    writable, read_only = layers
+    _populate(read_only)
+    with patch("huggingface_hub.constants.HF_HUB_CACHE_PROMOTE", True):
+        path = hf_hub_download(REPO_ID, "file.txt", cache_dir=writable, revision=COMMIT_HASH)
+
+    assert path == str(writable / "models--user--repo" / "snapshots" / COMMIT_HASH / "file.txt")
+    assert Path(path).read_bytes() == CONTENT
+    blob_path = writable / "models--user--repo" / "blobs" / ETAG
+    assert Path(path).resolve() == blob_path.resolve()
+    assert not blob_path.is_symlink()  # blob has been copied, not linked to the read-only layer
+    assert not list((writable / "models--user--repo" / "blobs").glob("*.tmp"))
+
+
+def test_download_after_head_call_file_in_read_only_layer(layers: Tuple[Path, Path], no_download: Mock) -> None:
+    writable, read_only = layers
+    read_only_pointer = _populate(read_only)
+    with patch("huggingface_hub.file_download.get_hf_file_metadata", return_value=_metadata()):
+        path = hf_hub_download(REPO_ID, "file.txt", cache_dir=writable)
+    assert path == str(read_only_pointer)
+
+
+def test_download_after_head_call_blob_in_read_only_layer(layers: Tuple[Path, Path], no_download: Mock) -> None:
+    # Same blob in the read-only layer but for another commit => copied instead of downloaded
+    writable, read_only = layers
+    _populate(read_only, commit_hash=OTHER_COMMIT_HASH)
+    with patch("huggingface_hub.file_download.get_hf_file_metadata", return_value=_metadata()):
+        path = hf_hub_download(REPO_ID, "file.txt", cache_dir=writable)
+    assert path == str(writable / "models--user--repo" / "snapshots" / COMMIT_HASH / "file.txt")
+    assert Path(path).read_bytes() == CONTENT
+
+
+def test_download_offline_from_read_only_layer(layers: Tuple[Path, Path]) -> None:
+    writable, read_only = layers
+    read_only_pointer = _populate(read_only)
+    with patch("huggingface_hub.file_download.get_hf_file_metadata", side_effect=requests.ConnectionError("offline")):
+        path = hf_hub_download(REPO_ID, "file.txt", cache_dir=writable)
+    assert path == str(read_only_pointer)
+
+
+def test_snapshot_download_complete_in_read_only_layer(layers: Tuple[Path, Path], no_download: Mock) -> None:
+    writable, read_only = layers
+    read_only_pointer = _populate(read_only)
+    repo_info = Mock(sha=COMMIT_HASH, siblings=[Mock(rfilename="file.txt")])
+    with patch("huggingface_hub._snapshot_download.HfApi.repo_info", return_value=repo_info):
+        path = snapshot_download(REPO_ID, cache_dir=writable)
+    assert path == str(read_only_pointer.parent)
+
+
+def test_snapshot_download_offline_from_read_only_layer(layers: Tuple[Path, Path]) -> None:
+    writable, read_only = layers
+    read_only_pointer = _populate(read_only)
+    path = snapshot_download(REPO_ID, cache_dir=writable, local_files_only=True)
+    assert path == str(read_only_pointer.parent)
+
+
+def test_scan_cache_dir(layers: Tuple[Path, Path]) -> None:
+    writable, read_only = layers
+    _populate(writable)
+    _populate(read_only)
+    with patch("huggingface_hub.utils._cache_manager.HF_HUB_CACHE", str(writable)):
+        with patch("huggingface_hub.utils._cache_manager.HF_HUB_READ_ONLY_CACHES", [str(read_only)]):
+            report = scan_cache_dir()
+            # Explicit cache_dir => read-only layers are not scanned
+            assert len(scan_cache_dir(writable).repos) == 1
+    assert {(repo.repo_path, repo.read_only) for repo in report.repos} == {
+        (writable.resolve() / "models--user--repo", False),
+        (read_only.resolve() / "models--user--repo", True),
+    }
+
+    # Revisions in read-only layers are never deleted
+    strategy = report.delete_revisions(COMMIT_HASH)
+    assert strategy.repos == {writable.resolve() / "models--user--repo"}
@@ -0,0 +1,103 @@
+# coding=utf-8
+# Copyright 2025-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains tests for the `.incomplete.parts` sidecar files.
+
+See `huggingface_hub/src/_download_parts.py` for the implementation.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from huggingface_hub._download_parts import DownloadParts, get_parts_path
+
+
+def test_get_parts_path(tmp_path: Path):
+    assert get_parts_path(tmp_path / "abc.incomplete") == tmp_path / "abc.incomplete.parts"
+
+
+def test_mark_completed_only_full_chunks(tmp_path: Path):
+    parts = DownloadParts(tmp_path / "parts", size=1050, chunk_size=100)
+    assert parts.nb_chunks == 11
+
+    parts.mark_completed(0, 250)  # chunks 0 and 1
+    parts.mark_completed(350, 600)  # chunks 4 and 5 (chunk 3 is not fully covered)
+    parts.mark_completed(1000, 1050)  # last chunk is smaller
+    assert [index for index in range(parts.nb_chunks) if parts.is_completed(index)] == [0, 1, 4, 5, 10]
+    assert parts.completed_size == 450
+    assert not parts.is_done
+
+
+def test_missing_ranges(tmp_path: Path):
+    parts = DownloadParts(tmp_path / "parts", size=1050, chunk_size=100)
+    parts.mark_completed(0, 200)
+    parts.mark_completed(500, 600)
+    parts.mark_completed(1000, 1050)
+
+    assert parts.missing_ranges(max_range_size=100) == [
+        (200, 300),
+        (300, 400),
+        (400, 500),
+        (600, 700),
+        (700, 800),
+        (800, 900),
+        (900, 1000),
+    ]
+    assert parts.missing_ranges(max_range_size=250) == [(200, 400), (400, 500), (600, 800), (800, 1000)]
+    assert parts.missing_ranges(max_range_size=10) == parts.missing_ranges(max_range_size=100)  # at least a chunk
+
+
+def test_is_done(tmp_path: Path):
+    parts = DownloadParts(tmp_path / "parts", size=250, chunk_size=100)
+    parts.mark_completed(0, 250)
+    assert parts.is_done
+    assert parts.missing_ranges(max_range_size=100) == []
+
+
+def test_save_and_load(tmp_path: Path):
+    path = tmp_path / "blob.incomplete.parts"
+    parts = DownloadParts(path, size=2000, chunk_size=100)
+    parts.mark_completed(300, 900)
+    parts.save()
+    assert not (tmp_path / "blob.incomplete.parts.tmp").exists()
+
+    loaded = DownloadParts.load(path, size=2000)
+    assert loaded is not None
+    assert loaded.chunk_size == 100
+    assert loaded.missing_ranges(max_range_size=100) == parts.missing_ranges(max_range_size=100)
+
+    loaded.delete()
+    assert not path.exists()
+    loaded.delete()  # no error if already deleted
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        None,  # missing file
+        "not a json",
+        '{"version": 1}',
+        '{"version": 2, "size": 2000, "chunk_size": 100, "completed": "00000000"}',
+        '{"version": 1, "size": 3000, "chunk_size": 100, "completed": "00000000"}',  # different size
+        '{"version": 1, "size": 2000, "chunk_size": 100, "completed": "0000"}',  # wrong bitmap length
+        '{"version": 1, "size": 2000, "chunk_size": 0, "completed": "00000000"}',
+        '{"version": 1, "size": 2000, "chunk_size": 100, "completed": "zz"}',
+    ],
+)
+def test_load_invalid(tmp_path: Path, content):
+    path = tmp_path / "blob.incomplete.parts"
+    if content is not None:
+        path.write_text(content)
+    assert DownloadParts.load(path, size=2000) is None
@@ -0,0 +1,254 @@
+import json
+import struct
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from huggingface_hub import HfApi, _download_range, hf_hub_download, hf_hub_download_range
+from huggingface_hub._download_parts import DownloadParts
+from huggingface_hub.file_download import HfFileMetadata
+from huggingface_hub.utils import SafetensorsFileMetadata, SafetensorsRepoMetadata, TensorInfo
+
+from .test_file_download import _RangeRequestHandler
+
+
+COMMIT_HASH = "a" * 40
+ETAG = "b" * 64
+REPO_ID = "user/repo"
+FILENAME = "model.safetensors"
+CONTENT = bytes(range(256)) * 400  # 102400 bytes
+CHUNK_SIZE = 10_000
+
+
+class _RecordingHandler(_RangeRequestHandler):
+    """Record the requested ranges. Ranges are ignored if `server.support_ranges` is False."""
+
+    def do_GET(self) -> None:
+        self.server.requested_ranges.append(self.headers.get("Range"))  # type: ignore
+        if not self.server.support_ranges:  # type: ignore
+            del self.headers["Range"]
+        super().do_GET()
+
+
+@pytest.fixture
+def hub() -> Iterator[ThreadingHTTPServer]:
+    """Serve `CONTENT` locally and mock the HEAD call to point to it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+    server.content = CONTENT  # type: ignore
+    server.nb_truncated = 0  # type: ignore
+    server.requested_ranges: List[str] = []  # type: ignore
+    server.support_ranges = True  # type: ignore
+    server.handle_error = lambda request, client_address: None  # type: ignore # responses closed early by the client
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    metadata = HfFileMetadata(
+        commit_hash=COMMIT_HASH,
+        etag=ETAG,
+        location=f"http://127.0.0.1:{server.server_port}/{FILENAME}",
+        size=len(CONTENT),
+    )
+    try:
+        with patch("huggingface_hub.file_download.get_hf_file_metadata", return_value=metadata) as server.head:  # type: ignore
+            with patch.object(_download_range, "_SPARSE_CHUNK_SIZE", CHUNK_SIZE):
+                yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _blob_path(cache_dir: Path) -> Path:
+    return cache_dir / "models--user--repo" / "blobs" / ETAG
+
+
+def test_download_range(hub: Mock, tmp_path: Path) -> None:
+    assert hf_hub_download_range(REPO_ID, FILENAME, 15_000, 25_000, cache_dir=tmp_path) == CONTENT[15_000:25_000]
+    assert hub.requested_ranges == ["bytes=10000-29999"]  # aligned on chunks
+    assert _blob_path(tmp_path).with_suffix(".incomplete").stat().st_size == 30_000
+    assert not _blob_path(tmp_path).exists()
+
+    # Range already cached => no download
+    assert hf_hub_download_range(REPO_ID, FILENAME, 20_000, 21_000, cache_dir=tmp_path) == CONTENT[20_000:21_000]
+    assert len(hub.requested_ranges) == 1
+
+    # Only the missing chunks are downloaded
+    assert hf_hub_download_range(REPO_ID, FILENAME, 5_000, 35_000, cache_dir=tmp_path) == CONTENT[5_000:35_000]
+    assert hub.requested_ranges[1:] == ["bytes=0-9999", "bytes=30000-39999"]
+
+
+def test_download_range_negative_offsets(hub: Mock, tmp_path: Path) -> None:
+    assert hf_hub_download_range(REPO_ID, FILENAME, -8, cache_dir=tmp_path) == CONTENT[-8:]
+    assert hub.requested_ranges == ["bytes=100000-102399"]  # last chunk is shorter
+    assert hf_hub_download_range(REPO_ID, FILENAME, -100, -50, cache_dir=tmp_path) == CONTENT[-100:-50]
+    assert hf_hub_download_range(REPO_ID, FILENAME, 50, 50, cache_dir=tmp_path) == b""
+    assert len(hub.requested_ranges) == 1
+
+
+def test_download_range_then_full_download(hub: Mock, tmp_path: Path) -> None:
+    hf_hub_download_range(REPO_ID, FILENAME, 0, 8, cache_dir=tmp_path)
+    hf_hub_download_range(REPO_ID, FILENAME, -8, cache_dir=tmp_path)
+
+    path = hf_hub_download(REPO_ID, FILENAME, cache_dir=tmp_path)
+    assert Path(path).read_bytes() == CONTENT
+    # First and last chunks are reused
+    assert hub.requested_ranges == ["bytes=0-9999", "bytes=100000-102399", "bytes=10000-99999"]
+    assert not _blob_path(tmp_path).with_suffix(".incomplete").exists()
+
+
+def test_full_download_saves_sparse_sidecar_per_parallel_chunk(hub: Mock, tmp_path: Path) -> None:
+    hf_hub_download_range(REPO_ID, FILENAME, 0, 8, cache_dir=tmp_path)
+
+    # Sidecar has 10KB chunks: saved every 50KB only (and at the end of each range) when the rest of the file is read
+    with patch("huggingface_hub.constants.DOWNLOAD_CHUNK_SIZE", 1_000):
+        with patch("huggingface_hub.constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE", 50_000):
+            with patch.object(DownloadParts, "save", autospec=True, side_effect=DownloadParts.save) as save:
+                path = hf_hub_download(REPO_ID, FILENAME, cache_dir=tmp_path)
+    assert Path(path).read_bytes() == CONTENT
+    assert hub.requested_ranges == ["bytes=0-9999", "bytes=10000-59999", "bytes=60000-102399"]
+    assert save.call_count == 4  # at 50000, 60000 (end of range), 100000 and 102400 (end of file)
+
+
+def test_download_all_ranges_completes_blob(hub: Mock, tmp_path: Path) -> None:
+    assert hf_hub_download_range(REPO_ID, FILENAME, 0, cache_dir=tmp_path) == CONTENT
+    assert _blob_path(tmp_path).read_bytes() == CONTENT
+    pointer_path = tmp_path / "models--user--repo" / "snapshots" / COMMIT_HASH / FILENAME
+    assert pointer_path.resolve() == _blob_path(tmp_path).resolve()
+
+    # Fully cached for a commit hash => no HTTP call at all
+    hub.head.reset_mock()
+    assert hf_hub_download_range(REPO_ID, FILENAME, 10, 20, cache_dir=tmp_path, revision=COMMIT_HASH) == CONTENT[10:20]
+    hub.head.assert_not_called()
+    assert len(hub.requested_ranges) == 1
+
+
+def test_download_range_server_without_range_support(hub: Mock, tmp_path: Path) -> None:
+    hub.support_ranges = False
+    assert hf_hub_download_range(REPO_ID, FILENAME, 10, 20, cache_dir=tmp_path) == CONTENT[10:20]
+    assert _blob_path(tmp_path).read_bytes() == CONTENT  # whole file downloaded
+
+
+def _safetensors_file(tensors: Dict[str, bytes]) -> bytes:
+    header: Dict[str, Any] = {"__metadata__": {"format": "pt"}}
+    offset = 0
+    for name, data in tensors.items():
+        header[name] = {"dtype": "U8", "shape": [len(data)], "data_offsets": [offset, offset + len(data)]}
+        offset += len(data)
+    header_bytes = json.dumps(header).encode()
+    return struct.pack("<Q", len(header_bytes)) + header_bytes + b"".join(tensors.values())
+
+
+def _parse_safetensors_file(content: bytes) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+    header_size = struct.unpack("<Q", content[:8])[0]
+    header = json.loads(content[8 : 8 + header_size])
+    metadata = header.pop("__metadata__")
+    data = content[8 + header_size :]
+    return metadata, {name: data[slice(*info["data_offsets"])] for name, info in header.items()}
+
+
+def _safetensors_repo_metadata(hub: Mock, tensors: Dict[str, bytes]) -> SafetensorsRepoMetadata:
+    """Serve a safetensors file containing `tensors` and return the metadata of the repo."""
+    hub.content = _safetensors_file(tensors)
+    hub.head.return_value = HfFileMetadata(
+        commit_hash=COMMIT_HASH,
+        etag=ETAG,
+        location=hub.head.return_value.location,
+        size=len(hub.content),
+    )
+    file_metadata = SafetensorsFileMetadata(
+        metadata={"format": "pt"},
+        tensors={
+            name: TensorInfo(dtype=info["dtype"], shape=info["shape"], data_offsets=tuple(info["data_offsets"]))
+            for name, info in json.loads(hub.content[8 : 8 + struct.unpack("<Q", hub.content[:8])[0]]).items()
+            if name != "__metadata__"
+        },
+    )
+    return SafetensorsRepoMetadata(
+        metadata=None,
+        sharded=False,
+        weight_map={name: FILENAME for name in tensors},
+        files_metadata={FILENAME: file_metadata},
+    )
+
+
+def test_download_safetensors_tensors(hub: Mock, tmp_path: Path) -> None:
+    tensors = {
+        "model.embed_tokens.weight": b"e" * 12_000,
+        "model.layers.0.weight": b"0" * 8_000,
+        "model.layers.1.weight": b"1" * 30_000,
+        "lm_head.weight": b"h" * 25_000,
+    }
+    repo_metadata = _safetensors_repo_metadata(hub, tensors)
+
+    with patch.object(HfApi, "get_safetensors_metadata", return_value=repo_metadata) as get_safetensors_metadata:
+        with patch.object(HfApi, "repo_info", return_value=Mock(sha=COMMIT_HASH)) as repo_info:
+            path = HfApi().download_safetensors_tensors(
+                REPO_ID,
+                ["model.layers.*", "lm_head.weight"],
+                tmp_path / "out" / "subset.safetensors",
+                cache_dir=tmp_path,
+            )
+        metadata, content = _parse_safetensors_file(Path(path).read_bytes())
+        assert struct.unpack("<Q", Path(path).read_bytes()[:8])[0] % 8 == 0  # header is padded
+        assert metadata == {"format": "pt"}
+        assert content == {name: data for name, data in tensors.items() if name != "model.embed_tokens.weight"}
+        assert len(hub.requested_ranges) == 2  # first chunk (header), then all tensors in a single request
+        assert not (tmp_path / "out" / "subset.safetensors.incomplete").exists()
+
+        # "main" resolved once => headers and tensors are read from the same commit
+        repo_info.assert_called_once()
+        assert get_safetensors_metadata.call_args.kwargs["revision"] == COMMIT_HASH
+        assert all(f"/resolve/{COMMIT_HASH}/" in call.kwargs["url"] for call in hub.head.call_args_list)
+
+        # Commit hash => not resolved again
+        with patch.object(HfApi, "repo_info") as repo_info:
+            HfApi().download_safetensors_tensors(
+                REPO_ID, "lm_head.weight", tmp_path / "lm_head.safetensors", cache_dir=tmp_path, revision=COMMIT_HASH
+            )
+        repo_info.assert_not_called()
+
+        with pytest.raises(ValueError, match="No tensor matching \\['model.layers.2.*'\\]"):
+            HfApi().download_safetensors_tensors(
+                REPO_ID, "model.layers.2.*", tmp_path / "x", cache_dir=tmp_path, revision=COMMIT_HASH
+            )
+
+
+def test_download_safetensors_tensors_failure_removes_incomplete_file(hub: Mock, tmp_path: Path) -> None:
+    repo_metadata = _safetensors_repo_metadata(hub, {"lm_head.weight": b"h" * 25_000})
+    open_ranges = _download_range._open_ranges
+
+    def _open_ranges_failing_on_data(ranges: List[Tuple[int, int]], **kwargs: Any):
+        if ranges != [(0, 8)]:
+            raise requests.ConnectionError("Connection lost")
+        return open_ranges(ranges=ranges, **kwargs)
+
+    with patch.object(HfApi, "get_safetensors_metadata", return_value=repo_metadata):
+        with patch.object(_download_range, "_open_ranges", side_effect=_open_ranges_failing_on_data):
+            with pytest.raises(requests.ConnectionError):
+                HfApi().download_safetensors_tensors(
+                    REPO_ID, "lm_head.weight", tmp_path / "out.safetensors", cache_dir=tmp_path, revision=COMMIT_HASH
+                )
+    assert not (tmp_path / "out.safetensors").exists()
+    assert not (tmp_path / "out.safetensors.incomplete").exists()
+
+
+def test_download_safetensors_tensors_sends_token_to_every_head_call(hub: Mock, tmp_path: Path) -> None:
+    repo_metadata = _safetensors_repo_metadata(hub, {"lm_head.weight": b"h" * 25_000})
+    metadata = hub.head.return_value  # redirects to another host, i.e. a CDN
+    sent_authorization: List[bool] = []
+
+    def _head(url: str, headers: Dict[str, str], **kwargs: Any) -> HfFileMetadata:
+        sent_authorization.append("authorization" in headers)
+        return metadata
+
+    hub.head.side_effect = _head
+    with patch.object(HfApi, "get_safetensors_metadata", return_value=repo_metadata):
+        path = HfApi(token="hf_token").download_safetensors_tensors(
+            REPO_ID, "lm_head.weight", tmp_path / "out.safetensors", cache_dir=tmp_path, revision=COMMIT_HASH
+        )
+    assert _parse_safetensors_file(Path(path).read_bytes())[1] == {"lm_head.weight": b"h" * 25_000}
+    # HEAD calls for the header and for the tensors both authenticated
+    assert sent_authorization == [True, True]
@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Dict, List, Tuple
+from unittest.mock import patch
+
+import pytest
+
+from huggingface_hub._download_scheduler import download_largest_first
+
+
+class _FakeDownloader:
+    """Record the order of downloads, whether they are split and the max number of bytes in flight."""
+
+    def __init__(self, files: Dict[str, int], delay: float = 0.01) -> None:
+        self.files = files
+        self.delay = delay
+        self.calls: List[Tuple[str, bool]] = []
+        self.bytes_in_flight = 0
+        self.max_bytes_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, filename: str, split: bool) -> None:
+        with self.lock:
+            self.calls.append((filename, split))
+            self.bytes_in_flight += self.files[filename]
+            self.max_bytes_in_flight = max(self.max_bytes_in_flight, self.bytes_in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.bytes_in_flight -= self.files[filename]
+
+
+FILES = {"small.json": 10, "medium.bin": 500, "large.bin": 2000, "tiny.txt": 1, "other.bin": 500}
+
+
+def test_largest_first() -> None:
+    downloader = _FakeDownloader(FILES)
+    download_largest_first(downloader, FILES, max_workers=1)
+    assert [filename for filename, _ in downloader.calls] == [
+        "large.bin",
+        "medium.bin",  # listing order for same size
+        "other.bin",
+        "small.json",
+        "tiny.txt",
+    ]
+
+
+def test_max_bytes_in_flight() -> None:
+    downloader = _FakeDownloader(FILES)
+    download_largest_first(downloader, FILES, max_workers=8, max_bytes_in_flight=1000)
+    assert len(downloader.calls) == len(FILES)
+    # "large.bin" doesn't fit in the budget => downloaded alone. Others share the budget.
+    assert downloader.max_bytes_in_flight <= 2000
+    assert downloader.max_bytes_in_flight >= 1000
+
+
+def test_max_bytes_in_flight_file_larger_than_budget_downloaded_alone() -> None:
+    files = {"a.bin": 2000, "b.bin": 2000, "c.bin": 2000}
+    downloader = _FakeDownloader(files)
+    download_largest_first(downloader, files, max_workers=8, max_bytes_in_flight=1000)
+    assert downloader.max_bytes_in_flight == 2000
+
+
+def test_no_budget_all_files_concurrently() -> None:
+    barrier = threading.Barrier(len(FILES), timeout=10)  # fails if all files are not in flight at the same time
+    downloader = _FakeDownloader(FILES, delay=0)
+
+    def _download(filename: str, split: bool) -> None:
+        downloader(filename, split)
+        barrier.wait()
+
+    download_largest_first(_download, FILES, max_workers=8)
+    assert len(downloader.calls) == len(FILES)
+
+
+@patch("huggingface_hub.constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD", True)
+@patch("huggingface_hub.constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE", 100)
+def test_largest_files_are_split() -> None:
+    downloader = _FakeDownloader(FILES)
+    download_largest_first(downloader, FILES, max_workers=4)
+    split = {filename for filename, is_split in downloader.calls if is_split}
+    # Only "large.bin" is more than a fair share of the total (3011 bytes / 4 workers)
+    assert split == {"large.bin"}
+
+
+@patch("huggingface_hub.constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD", True)
+@patch("huggingface_hub.constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE", 100)
+def test_files_larger_than_budget_are_split() -> None:
+    downloader = _FakeDownloader(FILES)
+    download_largest_first(downloader, FILES, max_workers=1, max_bytes_in_flight=400)
+    split = {filename for filename, is_split in downloader.calls if is_split}
+    assert split == {"large.bin", "medium.bin", "other.bin"}
+
+
+@patch("huggingface_hub.constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD", False)
+@patch("huggingface_hub.constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE", 100)
+def test_no_split_if_parallel_download_disabled() -> None:
+    downloader = _FakeDownloader(FILES)
+    download_largest_first(downloader, FILES, max_workers=4, max_bytes_in_flight=400)
+    assert not any(is_split for _, is_split in downloader.calls)
+
+
+def test_small_files_not_split() -> None:
+    downloader = _FakeDownloader(FILES)
+    download_largest_first(downloader, FILES, max_workers=1)
+    assert not any(is_split for _, is_split in downloader.calls)
+
+
+def test_error_stops_scheduling() -> None:
+    calls = []
+
+    def _download(filename: str, split: bool) -> None:
+        calls.append(filename)
+        if filename == "large.bin":
+            raise ValueError("Download failed")
+
+    with pytest.raises(ValueError, match="Download failed"):
+        download_largest_first(_download, FILES, max_workers=1)
+    assert calls == ["large.bin"]
+
+
+def test_empty() -> None:
+    download_largest_first(lambda filename, split: None, {}, max_workers=8)
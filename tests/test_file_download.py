@@ -11,15 +11,19 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import errno
 import io
 import os
 import shutil
 import stat
+import threading
+import time
 import unittest
 import warnings
 from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Optional, Tuple
 from unittest.mock import Mock, patch
 
 import pytest
@@ -27,14 +31,17 @@ import requests
 from requests import Response
 
 import huggingface_hub.file_download
-from huggingface_hub import HfApi, RepoUrl, constants
+from huggingface_hub import HfApi, RepoUrl, constants, scan_cache_dir
+from huggingface_hub._download_parts import DownloadParts, get_parts_path
 from huggingface_hub._local_folder import write_download_metadata
-from huggingface_hub.errors import EntryNotFoundError, GatedRepoError, LocalEntryNotFoundError
+from huggingface_hub.errors import EntryNotFoundError, GatedRepoError, HfHubHTTPError, LocalEntryNotFoundError
 from huggingface_hub.file_download import (
     _CACHED_NO_EXIST,
     HfFileMetadata,
+    _cache_commit_hash_for_specific_revision,
     _check_disk_space,
     _create_symlink,
+    _download_to_tmp_and_move,
     _get_pointer_path,
     _normalize_etag,
     _request_wrapper,
@@ -45,6 +52,8 @@ from huggingface_hub.file_download import (
     try_to_load_from_cache,
 )
 from huggingface_hub.utils import SoftTemporaryDirectory, get_session, hf_raise_for_status
+from huggingface_hub.utils.insecure_hashlib import sha256
+from huggingface_hub.utils.sha import git_hash
 
 from .testing_constants import ENDPOINT_STAGING, OTHER_TOKEN, TOKEN
 from .testing_utils import (
@@ -112,6 +121,24 @@ class TestDiskUsageWarning(unittest.TestCase):
             _check_disk_space(expected_size=self.expected_size, target_dir="/path/to/not_existent_path")
             assert len(w) == 0
 
+    @patch("huggingface_hub.constants.HF_HUB_STRICT_DISK_SPACE_CHECK", True)
+    @patch("huggingface_hub.file_download.shutil.disk_usage")
+    def test_disk_usage_strict(self, disk_usage_mock: Mock) -> None:
+        # Not enough disk space => raise instead of warning
+        disk_usage_mock.return_value.free = 1024 * 1024
+        with pytest.raises(OSError, match="Not enough free disk space to download 3 files") as exc_info:
+            _check_disk_space(expected_size=self.expected_size, target_dir=disk_usage_mock, nb_files=3)
+        assert exc_info.value.errno == errno.ENOSPC
+
+        # Enough disk space => nothing happens
+        disk_usage_mock.return_value.free = 200 * 1024 * 1024
+        _check_disk_space(expected_size=self.expected_size, target_dir=disk_usage_mock)
+
+    @patch("huggingface_hub.constants.HF_HUB_STRICT_DISK_SPACE_CHECK", True)
+    def test_disk_usage_strict_with_non_existent_path(self) -> None:
+        # Free disk space cannot be checked => no error
+        _check_disk_space(expected_size=self.expected_size, target_dir="path/to/not_existent_path")
+
 
 class StagingDownloadTests(unittest.TestCase):
     _api = HfApi(endpoint=ENDPOINT_STAGING, token=TOKEN)
@@ -575,6 +602,34 @@ class CachedDownloadTests(unittest.TestCase):
             # Download must not fail
             hf_hub_download(DUMMY_MODEL_ID, filename="pytorch_model.bin", cache_dir=tmpdir)
 
+    def test_hf_hub_download_with_known_metadata(self):
+        """No HEAD call is made if metadata is already known (e.g. from `snapshot_download`)."""
+        metadata = HfFileMetadata(
+            commit_hash="a" * 40,
+            etag="b" * 40,
+            location=hf_hub_url(DUMMY_MODEL_ID, constants.CONFIG_NAME, revision="a" * 40),
+            size=4,
+        )
+
+        def _http_get(url, temp_file, **kwargs):
+            temp_file.write(b"1234")
+
+        with SoftTemporaryDirectory() as tmpdir:
+            with patch("huggingface_hub.file_download.get_hf_file_metadata") as mock_metadata:
+                with patch("huggingface_hub.file_download.http_get", side_effect=_http_get) as mock_http_get:
+                    path = hf_hub_download(
+                        DUMMY_MODEL_ID,
+                        filename=constants.CONFIG_NAME,
+                        revision="a" * 40,
+                        cache_dir=tmpdir,
+                        _file_metadata=metadata,
+                    )
+
+            mock_metadata.assert_not_called()
+            self.assertEqual(mock_http_get.call_args.args[0], metadata.location)
+            self.assertEqual(Path(path).read_bytes(), b"1234")
+            self.assertEqual(Path(path).resolve().name, "b" * 40)
+
     @unittest.skipIf(os.name == "nt", "Lock files are always deleted on Windows.")
     def test_keep_lock_file(self):
         """Lock files should not be deleted on Linux."""
@@ -784,6 +839,17 @@ class HfHubDownloadToLocalDir(unittest.TestCase):
 
         assert Path(path) == self.file_path
 
+    @unittest.skipIf(os.name == "nt", "Hardlinks require specific permissions on Windows.")
+    @patch("huggingface_hub.utils._materialize._reflink", return_value=False)
+    @patch("huggingface_hub.constants.HF_HUB_LOCAL_DIR_ENABLE_HARDLINKS", True)
+    def test_file_exists_in_cache_hardlinked(self, _reflink: Mock):
+        cached_path = self.api.hf_hub_download(self.repo_id, filename=self.file_name, cache_dir=self.hub_cache_dir)
+        path = self.api.hf_hub_download(
+            self.repo_id, filename=self.file_name, cache_dir=self.hub_cache_dir, local_dir=self.local_dir
+        )
+        # Local file is the cached blob (no copy)
+        assert Path(path).stat().st_ino == Path(cached_path).resolve().stat().st_ino
+
     def test_file_exists_and_overwrites(self):
         # 1 HEAD call + 1 download
         self.file_path.write_text("another content")
@@ -888,6 +954,155 @@ class StagingCachedDownloadOnAwfulFilenamesTest(unittest.TestCase):
 
 
 @pytest.mark.usefixtures("fx_cache_dir")
+@patch("huggingface_hub.constants.HF_HUB_ENABLE_GLOBAL_BLOB_STORE", True)
+class TestGlobalBlobStore:
+    sha256 = "a" * 64
+
+    def _metadata(self, filename: str, etag: str, commit_hash: str = "b" * 40) -> HfFileMetadata:
+        return HfFileMetadata(commit_hash=commit_hash, etag=etag, location=f"https://hf.co/{filename}", size=4)
+
+    def _download(self, tmp_path: Path, repo_id: str, etag: str, commit_hash: str = "b" * 40, **kwargs) -> Mock:
+        def _http_get(url, temp_file, **kwargs):
+            temp_file.write(b"1234")
+
+        metadata = self._metadata("file", etag, commit_hash=commit_hash)
+        with patch("huggingface_hub.file_download.get_hf_file_metadata", return_value=metadata):
+            with patch("huggingface_hub.file_download.http_get", side_effect=_http_get) as mock:
+                hf_hub_download(repo_id, "model.bin", cache_dir=tmp_path, **kwargs)
+        return mock
+
+    def test_lfs_blob_shared_across_repos(self, tmp_path: Path) -> None:
+        assert self._download(tmp_path, "user/repo_a", self.sha256).call_count == 1
+        assert self._download(tmp_path, "user/repo_b", self.sha256).call_count == 0  # no download
+
+        blob_a = tmp_path / "models--user--repo_a" / "blobs" / self.sha256
+        blob_b = tmp_path / "models--user--repo_b" / "blobs" / self.sha256
+        global_blob = tmp_path / "blobs-global" / self.sha256
+        assert blob_b.read_bytes() == b"1234"
+        if os.name != "nt":
+            assert blob_a.stat().st_ino == blob_b.stat().st_ino == global_blob.stat().st_ino
+
+    def test_regular_file_not_shared(self, tmp_path: Path) -> None:
+        git_hash = "c" * 40
+        assert self._download(tmp_path, "user/repo_a", git_hash).call_count == 1
+        assert self._download(tmp_path, "user/repo_b", git_hash).call_count == 1
+        assert not (tmp_path / "blobs-global").exists()
+
+    def test_force_download_ignores_global_store(self, tmp_path: Path) -> None:
+        self._download(tmp_path, "user/repo_a", self.sha256)
+        assert self._download(tmp_path, "user/repo_b", self.sha256, force_download=True).call_count == 1
+
+    def test_local_dir_from_global_store(self, tmp_path: Path) -> None:
+        self._download(tmp_path, "user/repo_a", self.sha256)
+        mock = self._download(tmp_path, "user/repo_b", self.sha256, local_dir=tmp_path / "local")
+        assert mock.call_count == 0
+        assert (tmp_path / "local" / "model.bin").read_bytes() == b"1234"
+
+    @pytest.mark.skipif(os.name == "nt", reason="Hardlinks are not always supported on Windows")
+    def test_delete_cache_prunes_global_store(self, tmp_path: Path) -> None:
+        commit_a, commit_b = "1" * 40, "2" * 40
+        self._download(tmp_path, "user/repo_a", self.sha256, commit_hash=commit_a)
+        self._download(tmp_path, "user/repo_b", self.sha256, commit_hash=commit_b)
+        global_blob = tmp_path / "blobs-global" / self.sha256
+
+        # Blob still used by repo_b => no space freed, global blob kept
+        strategy = scan_cache_dir(tmp_path).delete_revisions(commit_a)
+        assert strategy.expected_freed_size == 0
+        assert strategy.global_blobs == frozenset()
+        strategy.execute()
+        assert global_blob.is_file()
+
+        # Last repo using the blob => global blob deleted as well
+        strategy = scan_cache_dir(tmp_path).delete_revisions(commit_b)
+        assert strategy.expected_freed_size == 4
+        assert strategy.global_blobs == {global_blob}
+        strategy.execute()
+        assert not global_blob.exists()
+
+    @pytest.mark.skipif(os.name == "nt", reason="Hardlinks are not always supported on Windows")
+    def test_delete_cache_prunes_orphan_global_blobs(self, tmp_path: Path) -> None:
+        self._download(tmp_path, "user/repo_a", self.sha256, commit_hash="1" * 40)
+        self._download(tmp_path, "user/repo_b", self.sha256, commit_hash="2" * 40)
+        shutil.rmtree(tmp_path / "models--user--repo_a")  # deleted manually
+        shutil.rmtree(tmp_path / "models--user--repo_b")
+        self._download(tmp_path, "user/repo_c", "d" * 64, commit_hash="3" * 40)
+
+        # Unused global blob deleted along with any revision
+        strategy = scan_cache_dir(tmp_path).delete_revisions("3" * 40)
+        assert strategy.global_blobs == {
+            tmp_path / "blobs-global" / self.sha256,
+            tmp_path / "blobs-global" / ("d" * 64),
+        }
+        assert strategy.expected_freed_size == 8
+        strategy.execute()
+        assert list((tmp_path / "blobs-global").iterdir()) == []
+
+    def test_global_store_disabled(self, tmp_path: Path) -> None:
+        with patch("huggingface_hub.constants.HF_HUB_ENABLE_GLOBAL_BLOB_STORE", False):
+            self._download(tmp_path, "user/repo_a", self.sha256)
+            assert self._download(tmp_path, "user/repo_b", self.sha256).call_count == 1
+        assert not (tmp_path / "blobs-global").exists()
+
+
+@patch("huggingface_hub.constants.HF_HUB_REVISION_TTL", 60)
+class TestRevisionTTL:
+    commit_hash = "a" * 40
+
+    @pytest.fixture(autouse=True)
+    def _cache(self, tmp_path: Path) -> None:
+        self.cache_dir = tmp_path
+        self.storage_folder = tmp_path / "models--user--repo"
+        (self.storage_folder / "refs").mkdir(parents=True)
+        (self.storage_folder / "refs" / "main").write_text(self.commit_hash)
+        (self.storage_folder / "snapshots" / self.commit_hash).mkdir(parents=True)
+        (self.storage_folder / "snapshots" / self.commit_hash / "config.json").write_text("{}")
+
+    def _download(self, filename: str = "config.json") -> Tuple[str, Mock]:
+        with patch(
+            "huggingface_hub.file_download._get_metadata_or_catch_error",
+            return_value=(None, None, None, None, requests.ConnectionError("Fake error")),
+        ) as mock:
+            path = hf_hub_download("user/repo", filename, cache_dir=self.cache_dir)
+        return path, mock
+
+    def _age_ref(self, seconds: int) -> None:
+        ref_path = self.storage_folder / "refs" / "main"
+        mtime = time.time() - seconds
+        os.utime(ref_path, (mtime, mtime))
+
+    def test_fresh_revision_no_head_call(self) -> None:
+        path, mock = self._download()
+        mock.assert_not_called()
+        assert Path(path) == self.storage_folder / "snapshots" / self.commit_hash / "config.json"
+
+    def test_outdated_revision_head_call(self) -> None:
+        self._age_ref(120)
+        _, mock = self._download()
+        mock.assert_called_once()
+
+    def test_ttl_disabled(self) -> None:
+        with patch("huggingface_hub.constants.HF_HUB_REVISION_TTL", 0):
+            _, mock = self._download()
+        mock.assert_called_once()
+
+    def test_fresh_revision_file_not_cached(self) -> None:
+        # File is not cached => HEAD call (fails here, no connection)
+        with pytest.raises(LocalEntryNotFoundError):
+            self._download("model.safetensors")
+
+    def test_fresh_revision_file_cached_as_non_existent(self) -> None:
+        no_exist_path = self.storage_folder / ".no_exist" / self.commit_hash / "tokenizer.json"
+        no_exist_path.parent.mkdir(parents=True)
+        no_exist_path.touch()
+        with pytest.raises(EntryNotFoundError):
+            self._download("tokenizer.json")
+
+    def test_resolving_revision_refreshes_ref(self) -> None:
+        self._age_ref(120)
+        _cache_commit_hash_for_specific_revision(str(self.storage_folder), "main", self.commit_hash)
+        assert time.time() - (self.storage_folder / "refs" / "main").stat().st_mtime < 60
+
+
 class TestHfHubDownloadRelativePaths(unittest.TestCase):
     """Regression test for HackerOne report 1928845.
 
@@ -1061,6 +1276,492 @@ class TestHttpGet:
             assert mock.call_args_list[i].kwargs["headers"] == {"Range": expected_range}
 
 
+def _mock_range_server(
+    content: bytes,
+    status_code: int = 206,
+    failures: Optional[Dict[int, int]] = None,
+    broken_from: int = -1,
+    redirect_url: Optional[str] = None,
+    ignored_ranges: Optional[Dict[int, int]] = None,
+    redirect_expires_after: Optional[int] = None,
+):
+    """Return a fake `_request_wrapper` serving `content` with support for range requests.
+
+    `failures` maps a range start to the number of times the connection should break after 10 bytes.
+    Requests starting at `broken_from` always fail without sending data.
+    If `redirect_url` is set, responses are served as if they had been redirected to it.
+    `ignored_ranges` maps a range start to the number of times the whole content should be sent with a 200 instead.
+    If `redirect_expires_after` is set, direct requests to `redirect_url` are rejected with a 403 after that many.
+    """
+    failures = dict(failures or {})
+    ignored_ranges = dict(ignored_ranges or {})
+    nb_direct_requests = [0]
+
+    def _request(method: str, url: str, headers: Dict[str, str], **kwargs) -> Mock:
+        if redirect_expires_after is not None and url == redirect_url:
+            nb_direct_requests[0] += 1
+            if nb_direct_requests[0] > redirect_expires_after:
+                raise HfHubHTTPError("403 Forbidden: Request has expired", response=Mock(status_code=403))
+        start, end = 0, len(content)
+        response_status_code = status_code
+        if status_code == 206 and "Range" in headers:
+            range_start = int(headers["Range"][len("bytes=") :].split("-")[0])
+            if ignored_ranges.get(range_start, 0) > 0:
+                ignored_ranges[range_start] -= 1
+                response_status_code = 200
+        if response_status_code == 206 and "Range" in headers:
+            start_str, end_str = headers["Range"][len("bytes=") :].split("-")
+            start, end = int(start_str), int(end_str) + 1 if end_str else len(content)
+
+        def _iter_content(chunk_size: int) -> Iterable[bytes]:
+            body = content[start:end]
+            if start == broken_from:
+                raise requests.ConnectionError("Fake ConnectionError")
+            if failures.get(start, 0) > 0:
+                failures[start] -= 1
+                yield body[:10]
+                raise requests.ConnectionError("Fake ConnectionError")
+            for i in range(0, len(body), 7):
+                yield body[i : i + 7]
+
+        response = Mock(
+            status_code=response_status_code, url=redirect_url or url, headers={"Content-Length": str(end - start)}
+        )
+        response.iter_content.side_effect = _iter_content
+        return response
+
+    return _request
+
+
+@patch("huggingface_hub.file_download.time.sleep", Mock())
+@patch("huggingface_hub.constants.HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY", 4)
+@patch("huggingface_hub.constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE", 100)
+@patch("huggingface_hub.constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD", True)
+class TestHttpGetParallel:
+    content = bytes(range(256)) * 4  # 1024 bytes => 11 ranges
+
+    def test_parallel_download(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        with patch("huggingface_hub.file_download._request_wrapper", side_effect=_mock_range_server(self.content)):
+            with path.open("ab") as f:
+                http_get("fake_url", f, expected_size=len(self.content))
+                assert f.tell() == len(self.content)
+        assert path.read_bytes() == self.content
+
+    def test_parallel_download_resume(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        path.write_bytes(self.content[:250])
+        with patch(
+            "huggingface_hub.file_download._request_wrapper", side_effect=_mock_range_server(self.content)
+        ) as mock:
+            with path.open("ab") as f:
+                http_get("fake_url", f, resume_size=250, expected_size=len(self.content))
+        assert path.read_bytes() == self.content
+        requested_ranges = sorted(call.kwargs["headers"]["Range"] for call in mock.call_args_list)
+        assert requested_ranges[0] == "bytes=250-349"
+        assert len(requested_ranges) == 8
+
+    def test_parallel_download_retry_range(self, tmp_path: Path, caplog) -> None:
+        path = tmp_path / "file.incomplete"
+        with patch(
+            "huggingface_hub.file_download._request_wrapper",
+            side_effect=_mock_range_server(self.content, failures={300: 1, 310: 1}),
+        ) as mock:
+            with path.open("ab") as f:
+                http_get("fake_url", f, expected_size=len(self.content))
+        assert path.read_bytes() == self.content
+        requested_ranges = [call.kwargs["headers"]["Range"] for call in mock.call_args_list]
+        assert requested_ranges.count("bytes=300-399") == 1
+        assert requested_ranges.count("bytes=310-399") == 1  # resumed after first failure
+        assert requested_ranges.count("bytes=320-399") == 1  # resumed after second failure
+        assert len([r for r in caplog.records if r.levelname == "WARNING"]) == 2
+
+    def test_parallel_download_range_ignored_by_server(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        with patch(
+            "huggingface_hub.file_download._request_wrapper",
+            side_effect=_mock_range_server(self.content, ignored_ranges={300: 1}),
+        ) as mock:
+            with path.open("ab") as f:
+                http_get("fake_url", f, expected_size=len(self.content))
+        # The full-body response is not written at the offset of the range => range is requested again
+        assert path.read_bytes() == self.content
+        requested_ranges = [call.kwargs["headers"]["Range"] for call in mock.call_args_list]
+        assert requested_ranges.count("bytes=300-399") == 2
+
+    def test_parallel_download_range_always_ignored_by_server(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        with patch(
+            "huggingface_hub.file_download._request_wrapper",
+            side_effect=_mock_range_server(self.content, ignored_ranges={300: 100}),
+        ):
+            with path.open("ab") as f:
+                with pytest.raises(requests.ConnectionError, match="206"):
+                    http_get("fake_url", f, expected_size=len(self.content))
+        assert path.read_bytes() == self.content[: path.stat().st_size]
+        assert path.stat().st_size <= 300
+
+    def test_parallel_download_failure_truncates_to_contiguous_prefix(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        with patch(
+            "huggingface_hub.file_download._request_wrapper",
+            side_effect=_mock_range_server(self.content, failures={500: 1}, broken_from=510),
+        ):
+            with path.open("ab") as f:
+                with pytest.raises(requests.ConnectionError):
+                    http_get("fake_url", f, expected_size=len(self.content))
+
+        # Only the bytes before the failing range are kept => download can be resumed as usual
+        assert path.read_bytes() == self.content[: path.stat().st_size]
+        assert path.stat().st_size <= 510
+
+    def test_fallback_if_range_not_supported(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        with patch(
+            "huggingface_hub.file_download._request_wrapper",
+            side_effect=_mock_range_server(self.content, status_code=200),
+        ) as mock:
+            with path.open("ab") as f:
+                http_get("fake_url", f, expected_size=len(self.content))
+        assert path.read_bytes() == self.content
+        assert len(mock.call_args_list) == 2  # first range request + regular download
+        assert "Range" not in mock.call_args_list[1].kwargs["headers"]
+
+    def test_next_ranges_downloaded_from_redirect_location(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        with patch(
+            "huggingface_hub.file_download._request_wrapper",
+            side_effect=_mock_range_server(self.content, redirect_url="https://cdn.example.com/signed"),
+        ) as mock:
+            with path.open("ab") as f:
+                http_get(
+                    "https://huggingface.co/user/repo/resolve/main/file.bin",
+                    f,
+                    headers={"authorization": "Bearer token"},
+                    expected_size=len(self.content),
+                )
+        assert path.read_bytes() == self.content
+
+        # First range on the Hub, next ones on the CDN without auth
+        first_call, *next_calls = mock.call_args_list
+        assert first_call.kwargs["url"] == "https://huggingface.co/user/repo/resolve/main/file.bin"
+        assert first_call.kwargs["headers"]["authorization"] == "Bearer token"
+        assert len(next_calls) == 10
+        for call in next_calls:
+            assert call.kwargs["url"] == "https://cdn.example.com/signed"
+            assert "authorization" not in call.kwargs["headers"]
+
+    def test_expired_redirect_location_is_resolved_again(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        resolve_url = "https://huggingface.co/user/repo/resolve/main/file.bin"
+        with patch("huggingface_hub.constants.HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY", 1):
+            with patch(
+                "huggingface_hub.file_download._request_wrapper",
+                side_effect=_mock_range_server(
+                    self.content, redirect_url="https://cdn.example.com/signed", redirect_expires_after=3
+                ),
+            ) as mock:
+                with path.open("ab") as f:
+                    http_get(
+                        resolve_url, f, headers={"authorization": "Bearer token"}, expected_size=len(self.content)
+                    )
+        assert path.read_bytes() == self.content
+
+        # 1 range from the Hub, 3 from the CDN, 1 rejected, then the remaining ones are resolved again with auth
+        urls = [call.kwargs["url"] for call in mock.call_args_list]
+        assert urls[:5] == [resolve_url] + ["https://cdn.example.com/signed"] * 4
+        assert urls[5:] == [resolve_url] * 7
+        assert all(call.kwargs["headers"]["authorization"] == "Bearer token" for call in mock.call_args_list[5:])
+
+    def test_parallel_download_enabled_for_a_single_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "file.incomplete"
+        with patch("huggingface_hub.constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD", False):
+            with patch(
+                "huggingface_hub.file_download._request_wrapper", side_effect=_mock_range_server(self.content)
+            ) as mock:
+                with path.open("ab") as f:
+                    http_get("fake_url", f, expected_size=len(self.content), _parallel_download=True)
+        assert path.read_bytes() == self.content
+        assert len(mock.call_args_list) == 11
+
+    def test_no_parallel_download_for_in_memory_buffer(self) -> None:
+        temp_file = io.BytesIO()
+        with patch(
+            "huggingface_hub.file_download._request_wrapper", side_effect=_mock_range_server(self.content)
+        ) as mock:
+            http_get("fake_url", temp_file, expected_size=len(self.content))
+        assert temp_file.getvalue() == self.content
+        assert len(mock.call_args_list) == 1
+
+    def _download_to_tmp_and_move(self, tmp_path: Path, server, verify_etag: Optional[str] = None) -> Mock:
+        with patch("huggingface_hub.file_download._request_wrapper", side_effect=server) as mock:
+            _download_to_tmp_and_move(
+                incomplete_path=tmp_path / "blob.incomplete",
+                destination_path=tmp_path / "blob",
+                url_to_download="fake_url",
+                proxies=None,
+                headers={},
+                expected_size=len(self.content),
+                filename="file.bin",
+                force_download=False,
+                verify_etag=verify_etag,
+            )
+        return mock
+
+    def test_interrupted_download_resumes_missing_chunks(self, tmp_path: Path) -> None:
+        incomplete_path = tmp_path / "blob.incomplete"
+        parts_path = get_parts_path(incomplete_path)
+
+        # First attempt fails in the middle: completed chunks are scattered
+        with pytest.raises(requests.ConnectionError):
+            self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content, broken_from=500))
+        parts = DownloadParts.load(parts_path, size=len(self.content))
+        assert parts is not None
+        assert not parts.is_completed(5)
+        completed = [index for index in range(parts.nb_chunks) if parts.is_completed(index)]
+        assert completed  # some chunks have been downloaded
+
+        # Second attempt only downloads the missing chunks
+        mock = self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+        assert not incomplete_path.exists()
+        assert not parts_path.exists()
+        requested_starts = {
+            int(call.kwargs["headers"]["Range"][len("bytes=") :].split("-")[0]) for call in mock.call_args_list
+        }
+        assert 500 in requested_starts
+        assert not any(index * 100 in requested_starts for index in completed)
+
+    @patch("huggingface_hub.constants.HF_HUB_MAX_BANDWIDTH", "1GB/s")
+    def test_parallel_download_throttled(self, tmp_path: Path) -> None:
+        with patch("huggingface_hub.file_download.throttle") as throttle:
+            self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+        assert sum(call.args[0] for call in throttle.call_args_list) == len(self.content)
+
+    @patch("huggingface_hub.constants.HF_HUB_PREALLOCATE_FILES", True)
+    def test_preallocate_then_resume(self, tmp_path: Path) -> None:
+        incomplete_path = tmp_path / "blob.incomplete"
+        with patch("huggingface_hub.file_download.os.posix_fallocate", create=True) as fallocate:
+            fallocate.side_effect = lambda fd, offset, length: os.ftruncate(fd, length)
+            with pytest.raises(requests.ConnectionError):
+                self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content, broken_from=500))
+            assert fallocate.call_args.args[1:] == (0, len(self.content))
+            assert incomplete_path.stat().st_size == len(self.content)  # whole file allocated
+
+            # Chunks are tracked => resume is not confused by the file size
+            self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+
+    @patch("huggingface_hub.constants.HF_HUB_PREALLOCATE_FILES", True)
+    def test_preallocate_not_enough_disk_space(self, tmp_path: Path) -> None:
+        with patch(
+            "huggingface_hub.file_download.os.posix_fallocate",
+            create=True,
+            side_effect=OSError(errno.ENOSPC, "No space left on device"),
+        ):
+            with pytest.raises(OSError, match="Not enough free disk space"):
+                self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content))
+
+    @patch("huggingface_hub.constants.HF_HUB_PREALLOCATE_FILES", True)
+    def test_preallocate_not_supported(self, tmp_path: Path) -> None:
+        with patch(
+            "huggingface_hub.file_download.os.posix_fallocate",
+            create=True,
+            side_effect=OSError(errno.EOPNOTSUPP, "Operation not supported"),
+        ):
+            self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+
+    def test_resume_scattered_chunks(self, tmp_path: Path) -> None:
+        incomplete_path = tmp_path / "blob.incomplete"
+        incomplete_path.write_bytes(self.content[:100] + b"\0" * 200 + self.content[300:400])
+        parts = DownloadParts(get_parts_path(incomplete_path), size=len(self.content), chunk_size=100)
+        parts.mark_completed(0, 100)
+        parts.mark_completed(300, 400)
+        parts.save()
+
+        mock = self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+        requested_ranges = sorted(call.kwargs["headers"]["Range"] for call in mock.call_args_list)
+        assert "bytes=0-99" not in requested_ranges
+        assert "bytes=300-399" not in requested_ranges
+        assert "bytes=100-199" in requested_ranges  # missing chunks before and after a completed one
+        assert "bytes=400-499" in requested_ranges
+
+    def test_resume_scattered_chunks_with_parallel_download_disabled(self, tmp_path: Path) -> None:
+        incomplete_path = tmp_path / "blob.incomplete"
+        incomplete_path.write_bytes(b"\0" * 100 + self.content[100:200])
+        parts = DownloadParts(get_parts_path(incomplete_path), size=len(self.content), chunk_size=100)
+        parts.mark_completed(100, 200)
+        parts.save()
+
+        with patch("huggingface_hub.constants.HF_HUB_ENABLE_PARALLEL_DOWNLOAD", False):
+            mock = self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+        assert "bytes=100-199" not in [call.kwargs["headers"]["Range"] for call in mock.call_args_list]
+
+    def test_invalid_parts_file_restarts_download(self, tmp_path: Path) -> None:
+        incomplete_path = tmp_path / "blob.incomplete"
+        incomplete_path.write_bytes(b"\0" * 300)
+        get_parts_path(incomplete_path).write_text("not a json")
+
+        self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+        assert not get_parts_path(incomplete_path).exists()
+
+    def test_resume_scattered_chunks_range_not_supported(self, tmp_path: Path) -> None:
+        incomplete_path = tmp_path / "blob.incomplete"
+        incomplete_path.write_bytes(b"\0" * 100 + self.content[100:200])
+        parts = DownloadParts(get_parts_path(incomplete_path), size=len(self.content), chunk_size=100)
+        parts.mark_completed(100, 200)
+        parts.save()
+
+        # Server ignores ranges => restart from scratch
+        self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content, status_code=200))
+        assert (tmp_path / "blob").read_bytes() == self.content
+        assert not get_parts_path(incomplete_path).exists()
+
+    @pytest.mark.parametrize("etag_fn", [lambda data: sha256(data).hexdigest(), git_hash])
+    def test_verify_parallel_download(self, tmp_path: Path, etag_fn) -> None:
+        self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content), verify_etag=etag_fn(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+
+    def test_verify_parallel_download_resume_scattered_chunks(self, tmp_path: Path) -> None:
+        incomplete_path = tmp_path / "blob.incomplete"
+        incomplete_path.write_bytes(b"\0" * 100 + self.content[100:200])
+        parts = DownloadParts(get_parts_path(incomplete_path), size=len(self.content), chunk_size=100)
+        parts.mark_completed(100, 200)
+        parts.save()
+
+        # Already downloaded chunks are hashed as well
+        etag = sha256(self.content).hexdigest()
+        self._download_to_tmp_and_move(tmp_path, _mock_range_server(self.content), verify_etag=etag)
+        assert (tmp_path / "blob").read_bytes() == self.content
+
+    def test_verify_parallel_download_corrupted(self, tmp_path: Path) -> None:
+        corrupted = self.content[:500] + b"x" + self.content[501:]
+        with pytest.raises(EnvironmentError, match="Integrity check failed"):
+            self._download_to_tmp_and_move(
+                tmp_path, _mock_range_server(corrupted), verify_etag=sha256(self.content).hexdigest()
+            )
+        assert not (tmp_path / "blob").exists()
+        assert not (tmp_path / "blob.incomplete").exists()
+        assert not get_parts_path(tmp_path / "blob.incomplete").exists()
+
+
+class TestVerifyDownload:
+    content = b"some content to download"
+
+    def _download_to_tmp_and_move(self, tmp_path: Path, content: bytes, verify_etag: str) -> None:
+        with patch("huggingface_hub.file_download._request_wrapper", side_effect=_mock_range_server(content)):
+            _download_to_tmp_and_move(
+                incomplete_path=tmp_path / "blob.incomplete",
+                destination_path=tmp_path / "blob",
+                url_to_download="fake_url",
+                proxies=None,
+                headers={},
+                expected_size=len(content),
+                filename="file.bin",
+                force_download=False,
+                verify_etag=verify_etag,
+            )
+
+    @pytest.mark.parametrize("etag_fn", [lambda data: sha256(data).hexdigest(), git_hash])
+    def test_verify(self, tmp_path: Path, etag_fn) -> None:
+        self._download_to_tmp_and_move(tmp_path, self.content, verify_etag=etag_fn(self.content))
+        assert (tmp_path / "blob").read_bytes() == self.content
+
+    def test_verify_resumed_download(self, tmp_path: Path) -> None:
+        (tmp_path / "blob.incomplete").write_bytes(self.content[:10])
+        self._download_to_tmp_and_move(tmp_path, self.content, verify_etag=sha256(self.content).hexdigest())
+        assert (tmp_path / "blob").read_bytes() == self.content
+
+    def test_verify_corrupted_download(self, tmp_path: Path) -> None:
+        with pytest.raises(EnvironmentError, match="Integrity check failed"):
+            self._download_to_tmp_and_move(tmp_path, b"some CORRUPTED to download", sha256(self.content).hexdigest())
+        assert not (tmp_path / "blob").exists()
+        assert not (tmp_path / "blob.incomplete").exists()
+
+    def test_etag_not_a_hash(self, tmp_path: Path, caplog) -> None:
+        self._download_to_tmp_and_move(tmp_path, self.content, verify_etag="not-a-hash")
+        assert (tmp_path / "blob").read_bytes() == self.content
+        assert "Cannot verify file content" in caplog.text
+
+
+class _RangeRequestHandler(BaseHTTPRequestHandler):
+    """Serve `server.content` with range support. The first `server.nb_truncated` responses are cut in the middle."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self) -> None:
+        content: bytes = self.server.content  # type: ignore
+        start, end = 0, len(content)
+        if "Range" in self.headers:
+            start_str, end_str = self.headers["Range"][len("bytes=") :].split("-")
+            start, end = int(start_str), int(end_str) + 1 if end_str else len(content)
+        self.send_response(206 if "Range" in self.headers else 200)
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+        if self.server.nb_truncated > 0:  # type: ignore
+            self.server.nb_truncated -= 1  # type: ignore
+            self.wfile.write(content[start : (start + end) // 2])
+            self.close_connection = True
+        else:
+            self.wfile.write(content[start:end])
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def range_server() -> Iterable[ThreadingHTTPServer]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeRequestHandler)
+    server.content = bytes(range(256)) * 400  # type: ignore
+    server.nb_truncated = 0  # type: ignore
+    server.url = f"http://127.0.0.1:{server.server_port}/file"  # type: ignore
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@patch("huggingface_hub.file_download.time.sleep", Mock())
+@patch("huggingface_hub.constants.DOWNLOAD_CHUNK_SIZE", 1000)
+class TestHttpGetReadInto:
+    """Test `http_get` against a real HTTP server, i.e. reading the content with `readinto`."""
+
+    def test_http_get(self, range_server, tmp_path: Path) -> None:
+        path = tmp_path / "file"
+        with patch.object(Response, "iter_content", side_effect=AssertionError("should use readinto")):
+            with path.open("ab") as f:
+                http_get(range_server.url, f, expected_size=len(range_server.content))
+        assert path.read_bytes() == range_server.content
+
+    def test_http_get_in_memory(self, range_server) -> None:
+        buffer = io.BytesIO()
+        http_get(range_server.url, buffer, expected_size=len(range_server.content))
+        assert buffer.getvalue() == range_server.content  # chunks have been copied before the buffer is reused
+
+    def test_http_get_truncated_response_resumes(self, range_server, tmp_path: Path) -> None:
+        range_server.nb_truncated = 1
+        path = tmp_path / "file"
+        with path.open("ab") as f:
+            http_get(range_server.url, f, expected_size=len(range_server.content))
+        assert path.read_bytes() == range_server.content
+
+    @patch("huggingface_hub.constants.HF_HUB_PARALLEL_DOWNLOAD_CHUNK_SIZE", 10_000)
+    def test_parallel_download(self, range_server, tmp_path: Path) -> None:
+        range_server.nb_truncated = 2
+        path = tmp_path / "file"
+        with path.open("ab") as f:
+            http_get(range_server.url, f, expected_size=len(range_server.content), _parallel_download=True)
+        assert path.read_bytes() == range_server.content
+
+
 class CreateSymlinkTest(unittest.TestCase):
     @unittest.skipIf(os.name == "nt", "No symlinks on Windows")
     @patch("huggingface_hub.file_download.are_symlinks_supported")
@@ -3,18 +3,26 @@ import datetime
 import io
 import os
 import tempfile
+import threading
+import time
 import unittest
+from http.server import ThreadingHTTPServer
 from pathlib import Path
-from typing import Optional
-from unittest.mock import patch
+from typing import Iterator, List, Optional, Tuple
+from unittest.mock import MagicMock, patch
 
 import fsspec
 import pytest
+from requests import Response
 
-from huggingface_hub import hf_file_system
-from huggingface_hub.errors import RepositoryNotFoundError, RevisionNotFoundError
+from huggingface_hub import _download_range, constants, hf_file_system
+from huggingface_hub._prefetch_cache import PrefetchCache
+from huggingface_hub.errors import HfHubHTTPError, RepositoryNotFoundError, RevisionNotFoundError
+from huggingface_hub.file_download import HfFileMetadata
+from huggingface_hub.hf_api import BlobLfsInfo, RepoFile, RepoFolder
 from huggingface_hub.hf_file_system import HfFileSystem, HfFileSystemFile, HfFileSystemStreamFile
 
+from .test_download_range import _RecordingHandler
 from .testing_constants import ENDPOINT_STAGING, TOKEN
 from .testing_utils import repo_name
 
@@ -603,3 +611,382 @@ def test_exists_after_repo_deletion():
     api.delete_repo(repo_id=repo_id, repo_type="model")
     # Verify that the repo no longer exists.
     assert not hffs.exists(repo_id, refresh=True)
+
+
+def _mock_response(url: str, status_code: int = 206, content: bytes = b"", redirected: bool = False) -> Response:
+    response = Response()
+    response.url = url
+    response.status_code = status_code
+    response._content = content
+    response._content_consumed = True
+    response.history = [Response()] if redirected else []
+    return response
+
+
+class TestRedirectCache:
+    RESOLVE_URL = "https://huggingface.co/gpt2/resolve/main/model.bin"
+
+    @pytest.fixture
+    def fs(self) -> HfFileSystem:
+        fs = HfFileSystem(endpoint="https://huggingface.co", token="hf_token", skip_instance_cache=True)
+        fs.dircache["gpt2"] = [{"name": "gpt2/model.bin", "type": "file", "size": 100}]
+        with mock_repo_info(fs):
+            yield fs
+
+    def test_cdn_url_reused_for_range_reads(self, fs: HfFileSystem) -> None:
+        cdn_url = f"https://cdn-lfs.hf.co/model.bin?Expires={int(time.time()) + 3600}&Signature=abc"
+        calls = []
+
+        def _http_backoff(method, url, headers, **kwargs):
+            calls.append((url, headers))
+            return _mock_response(cdn_url, content=b"0123456789", redirected=url == self.RESOLVE_URL)
+
+        with patch.object(hf_file_system, "http_backoff", _http_backoff):
+            with fs.open("gpt2/model.bin", block_size=10, cache_type="none") as f:
+                f.read(10)
+                f.seek(50)
+                f.read(10)
+
+        # First request is redirected, the next one goes straight to the CDN without the token
+        assert [url for url, _ in calls] == [self.RESOLVE_URL, cdn_url]
+        assert "authorization" in calls[0][1]
+        assert "authorization" not in calls[1][1]
+        assert calls[1][1]["range"] == "bytes=50-59"
+
+    def test_token_sent_to_same_host_location(self, fs: HfFileSystem) -> None:
+        # e.g. file redirected to another path on the Hub: the location is cached but the token is still needed
+        location = "https://huggingface.co/gpt2-renamed/resolve/main/model.bin"
+        fs._redirect_cache[("model", "gpt2", "main", "model.bin")] = (location, time.time() + 60)
+        with patch.object(hf_file_system, "http_backoff", return_value=_mock_response(location)) as mock:
+            with fs.open("gpt2/model.bin", block_size=10, cache_type="none") as f:
+                f.read(10)
+        assert mock.call_args[0][1] == location
+        assert mock.call_args.kwargs["headers"]["authorization"] == "Bearer hf_token"
+
+    @pytest.mark.parametrize("status_code", [401, 403, 404])
+    def test_resolve_again_on_invalid_location(self, fs: HfFileSystem, status_code: int) -> None:
+        cdn_url = f"https://cdn-lfs.hf.co/model.bin?Expires={int(time.time()) + 3600}"
+        fs._redirect_cache[("model", "gpt2", "main", "model.bin")] = (
+            "https://cdn-lfs.hf.co/expired",
+            time.time() + 60,
+        )
+        calls = []
+
+        def _http_backoff(method, url, headers, **kwargs):
+            calls.append(url)
+            if url == "https://cdn-lfs.hf.co/expired":
+                return _mock_response(url, status_code=status_code)
+            return _mock_response(cdn_url, content=b"0123456789", redirected=True)
+
+        with patch.object(hf_file_system, "http_backoff", _http_backoff):
+            with fs.open("gpt2/model.bin", block_size=10, cache_type="none") as f:
+                assert f.read(10) == b"0123456789"
+
+        assert calls == ["https://cdn-lfs.hf.co/expired", self.RESOLVE_URL]
+        assert fs._redirect_cache[("model", "gpt2", "main", "model.bin")][0] == cdn_url
+
+    def test_expired_url_not_used(self, fs: HfFileSystem) -> None:
+        fs._redirect_cache[("model", "gpt2", "main", "model.bin")] = ("https://cdn-lfs.hf.co/expired", time.time() - 1)
+        with patch.object(hf_file_system, "http_backoff", return_value=_mock_response(self.RESOLVE_URL)) as mock:
+            with fs.open("gpt2/model.bin", block_size=10, cache_type="none") as f:
+                f.read(10)
+        assert mock.call_args[0][1] == self.RESOLVE_URL
+        assert ("model", "gpt2", "main", "model.bin") not in fs._redirect_cache  # not redirected => nothing cached
+
+    def test_invalidate_cache(self, fs: HfFileSystem) -> None:
+        fs._redirect_cache[("model", "gpt2", "main", "model.bin")] = ("https://cdn-lfs.hf.co/file", time.time() + 60)
+        fs.invalidate_cache("gpt2/model.bin")
+        assert fs._redirect_cache == {}
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://cdn-lfs.hf.co/file?Expires=1700000000&Signature=abc", 1700000000 - 60),
+        (
+            "https://s3.amazonaws.com/file?X-Amz-Date=20231114T221320Z&X-Amz-Expires=3600&X-Amz-Signature=abc",
+            1700000000 + 3600 - 60,
+        ),
+    ],
+)
+def test_get_redirect_expiration(url: str, expected: float) -> None:
+    assert hf_file_system._get_redirect_expiration(url) == expected
+
+
+def test_get_redirect_expiration_default() -> None:
+    with patch.object(hf_file_system.time, "time", return_value=1000.0):
+        assert hf_file_system._get_redirect_expiration("https://cdn-lfs.hf.co/file") == 1000.0 + 5 * 60
+
+
+class TestPersistentListingsCache:
+    COMMIT_HASH = "a" * 40
+    TREE = [
+        RepoFile(path="README.md", size=10, oid="blob1"),
+        RepoFolder(path="data", oid="tree1"),
+        RepoFolder(path="data/empty", oid="tree2"),
+        RepoFile(
+            path="data/train.parquet", size=2000, oid="blob2", lfs={"size": 2000, "oid": "sha", "pointerSize": 130}
+        ),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def listings_cache(self, tmp_path: Path) -> Iterator[None]:
+        with patch.object(constants, "HF_HUB_FS_LISTINGS_CACHE", True):
+            with patch.object(constants, "HF_HUB_CACHE", str(tmp_path)):
+                yield
+
+    def _new_fs(self) -> HfFileSystem:
+        fs = HfFileSystem(skip_instance_cache=True)
+        fs._api = MagicMock()
+        fs._api.repo_info.return_value.sha = self.COMMIT_HASH
+
+        def _list_repo_tree(repo_id, path_in_repo, recursive, **kwargs):
+            prefix = path_in_repo + "/" if path_in_repo else ""
+            for path_info in self.TREE:
+                relative_path = path_info.path[len(prefix) :]
+                if path_info.path.startswith(prefix) and (recursive or "/" not in relative_path):
+                    yield path_info
+
+        fs._api.list_repo_tree.side_effect = _list_repo_tree
+        return fs
+
+    def test_listings_shared_between_instances(self) -> None:
+        fs = self._new_fs()
+        expected = fs.find("username/my_model", withdirs=True, detail=True)
+        fs._api.list_repo_tree.assert_called_once()
+
+        # A new instance (e.g. in another process) reads the listings from disk
+        fs = self._new_fs()
+        assert fs.find("username/my_model", withdirs=True) == sorted(expected)
+        assert fs.ls("username/my_model/data/empty", detail=False) == []
+        assert fs.info("username/my_model/data/train.parquet", expand_info=False)["size"] == 2000
+        assert (
+            fs.ls("username/my_model/data", expand_info=False)[1]["lfs"]
+            == expected["username/my_model/data/train.parquet"]["lfs"]
+        )
+        assert fs.glob("username/my_model/**/*.parquet") == ["username/my_model/data/train.parquet"]
+        fs._api.list_repo_tree.assert_not_called()
+
+    def test_incomplete_listings_fetched_from_hub(self) -> None:
+        fs = self._new_fs()
+        fs.ls("username/my_model", detail=False)  # only the root directory is cached
+
+        fs = self._new_fs()
+        assert fs.ls("username/my_model", detail=False) == ["username/my_model/README.md", "username/my_model/data"]
+        fs._api.list_repo_tree.assert_not_called()
+        assert fs.find("username/my_model") == ["username/my_model/README.md", "username/my_model/data/train.parquet"]
+        fs._api.list_repo_tree.assert_called_once()
+
+    def test_expanded_info_fetched_from_hub(self) -> None:
+        fs = self._new_fs()
+        fs.ls("username/my_model", detail=False)
+
+        fs = self._new_fs()
+        fs.ls("username/my_model", detail=True)  # last commit info is not persisted
+        assert fs._api.list_repo_tree.call_args.kwargs["expand"] is True
+
+    def test_branch_resolved_again_without_ttl(self) -> None:
+        self._new_fs().ls("username/my_model", detail=False)
+        fs = self._new_fs()
+        fs.ls("username/my_model", detail=False)
+        fs._api.repo_info.assert_called_once()
+
+    def test_branch_trusted_during_ttl(self) -> None:
+        self._new_fs().ls("username/my_model", detail=False)
+        with patch.object(constants, "HF_HUB_REVISION_TTL", 60):
+            fs = self._new_fs()
+            fs.ls("username/my_model", detail=False)
+        fs._api.repo_info.assert_not_called()
+        fs._api.list_repo_tree.assert_not_called()
+
+    def test_invalidate_cache_forgets_commit(self) -> None:
+        with patch.object(constants, "HF_HUB_REVISION_TTL", 60):
+            fs = self._new_fs()
+            fs.ls("username/my_model", detail=False)
+            fs.invalidate_cache("username/my_model/README.md")  # e.g. after an upload
+
+            fs = self._new_fs()
+            fs._api.repo_info.return_value.sha = "b" * 40
+            fs.ls("username/my_model", detail=False)
+        fs._api.repo_info.assert_called_once()  # branch resolved again despite the TTL
+        fs._api.list_repo_tree.assert_called_once()  # listings of the previous commit are not used
+
+
+class TestLocalBlobCache:
+    CONTENT = bytes(range(256)) * 400  # 102400 bytes
+    ETAG = "b" * 64
+
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, tmp_path: Path) -> Iterator[Path]:
+        with patch.object(constants, "HF_HUB_CACHE", str(tmp_path)):
+            yield tmp_path
+
+    @pytest.fixture
+    def hub(self) -> Iterator[ThreadingHTTPServer]:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+        server.content = self.CONTENT  # type: ignore
+        server.nb_truncated = 0  # type: ignore
+        server.requested_ranges: List[str] = []  # type: ignore
+        server.support_ranges = True  # type: ignore
+        server.handle_error = lambda request, client_address: None  # type: ignore
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+        thread.start()
+        metadata = HfFileMetadata(commit_hash="a" * 40, etag=self.ETAG, location="unused", size=len(self.CONTENT))
+        try:
+            with patch.object(hf_file_system, "get_hf_file_metadata", return_value=metadata) as server.head:  # type: ignore
+                with patch.object(_download_range, "_SPARSE_CHUNK_SIZE", 10_000):
+                    yield server
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def _new_fs(self, endpoint: str = "https://huggingface.co") -> HfFileSystem:
+        fs = HfFileSystem(endpoint=endpoint, skip_instance_cache=True)
+        fs._repo_and_revision_exists_cache[("model", "username/my_model", None)] = True, None
+        fs.dircache["username/my_model"] = [
+            {
+                "name": "username/my_model/model.bin",
+                "size": len(self.CONTENT),
+                "type": "file",
+                "blob_id": "c" * 40,
+                "lfs": BlobLfsInfo(size=len(self.CONTENT), sha256=self.ETAG, pointer_size=130),
+                "last_commit": None,
+                "security": None,
+            }
+        ]
+        return fs
+
+    def test_read_from_cached_blob(self, cache_dir: Path) -> None:
+        blob_path = cache_dir / "models--username--my_model" / "blobs" / self.ETAG
+        blob_path.parent.mkdir(parents=True)
+        blob_path.write_bytes(self.CONTENT)
+
+        with patch.object(hf_file_system, "http_backoff", side_effect=AssertionError("no network")):
+            with self._new_fs().open("username/my_model/model.bin", block_size=1000) as f:
+                f.seek(50_000)
+                assert f.read(100) == self.CONTENT[50_000:50_100]
+                f.seek(0)
+                assert f.read() == self.CONTENT
+
+    def test_incomplete_blob_not_used(self, cache_dir: Path) -> None:
+        blob_path = cache_dir / "models--username--my_model" / "blobs" / self.ETAG
+        blob_path.parent.mkdir(parents=True)
+        blob_path.write_bytes(self.CONTENT[:10])
+        with self._new_fs().open("username/my_model/model.bin") as f:
+            assert f._blob_path is None
+
+    @patch.object(constants, "HF_HUB_FS_BLOCK_CACHE", True)
+    def test_blocks_persisted_in_sparse_blob(self, hub: ThreadingHTTPServer, cache_dir: Path) -> None:
+        endpoint = f"http://127.0.0.1:{hub.server_port}"
+        with self._new_fs(endpoint).open("username/my_model/model.bin", block_size=1000, cache_type="none") as f:
+            f.seek(15_000)
+            assert f.read(1000) == self.CONTENT[15_000:16_000]
+        assert hub.requested_ranges == ["bytes=10000-19999"]  # type: ignore
+
+        # Re-opened (e.g. next epoch) => read from disk
+        with self._new_fs(endpoint).open("username/my_model/model.bin", block_size=1000, cache_type="none") as f:
+            f.seek(12_000)
+            assert f.read(1000) == self.CONTENT[12_000:13_000]
+        assert len(hub.requested_ranges) == 1  # type: ignore
+
+        # Reading everything completes the blob
+        with self._new_fs(endpoint).open("username/my_model/model.bin") as f:
+            assert f.read() == self.CONTENT
+        assert (cache_dir / "models--username--my_model" / "blobs" / self.ETAG).read_bytes() == self.CONTENT
+        assert (cache_dir / "models--username--my_model" / "snapshots" / ("a" * 40) / "model.bin").exists()
+
+    def test_prefetch_cache_type(self, cache_dir: Path) -> None:
+        blob_path = cache_dir / "models--username--my_model" / "blobs" / self.ETAG
+        blob_path.parent.mkdir(parents=True)
+        blob_path.write_bytes(self.CONTENT)
+        fs = self._new_fs()
+        with fs.open(
+            "username/my_model/model.bin", block_size=1000, cache_type="prefetch", cache_options={"max_workers": 2}
+        ) as f:
+            assert isinstance(f.cache, PrefetchCache)
+            assert f.cache.max_workers == 2
+            assert b"".join(iter(lambda: f.read(300), b"")) == self.CONTENT
+
+
+class TestCatRanges:
+    CONTENT = bytes(range(256)) * 4000  # 1_024_000 bytes
+
+    @pytest.fixture
+    def fs(self, tmp_path: Path) -> Iterator[HfFileSystem]:
+        fs = HfFileSystem(endpoint="https://huggingface.co", skip_instance_cache=True)
+        fs._repo_and_revision_exists_cache[("model", "username/my_model", None)] = True, None
+        fs.dircache["username/my_model"] = [
+            {"name": f"username/my_model/{name}", "size": len(self.CONTENT), "type": "file", "blob_id": name}
+            for name in ("a.parquet", "b.parquet")
+        ]
+        self.requests: List[Tuple[str, str]] = []
+
+        def _http_backoff(method, url, headers, **kwargs):
+            start, end = map(int, headers["range"][len("bytes=") :].split("-"))
+            self.requests.append((url.rsplit("/", 1)[-1], headers["range"]))
+            if url.endswith("b.parquet") and start > 500_000:
+                return _mock_response(url, status_code=500)
+            return _mock_response(url, content=self.CONTENT[start : end + 1])
+
+        with patch.object(constants, "HF_HUB_CACHE", str(tmp_path)):
+            with patch.object(hf_file_system, "http_backoff", _http_backoff):
+                yield fs
+
+    def test_cat_ranges(self, fs: HfFileSystem) -> None:
+        paths = ["username/my_model/a.parquet"] * 4 + ["username/my_model/b.parquet"]
+        starts = [200_000, 0, 1000, -100, 10]
+        ends = [300_000, 100, 2000, None, 20]
+        out = fs.cat_ranges(paths, starts, ends)
+        assert out == [
+            self.CONTENT[200_000:300_000],
+            self.CONTENT[0:100],
+            self.CONTENT[1000:2000],
+            self.CONTENT[-100:],
+            self.CONTENT[10:20],
+        ]
+        # Close ranges are merged in a single request
+        assert sorted(self.requests) == [
+            ("a.parquet", "bytes=0-1999"),
+            ("a.parquet", "bytes=1023900-1023999"),
+            ("a.parquet", "bytes=200000-299999"),
+            ("b.parquet", "bytes=10-19"),
+        ]
+
+    def test_cat_ranges_max_gap(self, fs: HfFileSystem) -> None:
+        fs.cat_ranges(["username/my_model/a.parquet"] * 2, [0, 1000], [100, 2000], max_gap=0)
+        assert len(self.requests) == 2
+
+    def test_cat_ranges_errors(self, fs: HfFileSystem) -> None:
+        out = fs.cat_ranges(
+            ["username/my_model/b.parquet", "username/my_model/b.parquet", "username/my_model/missing.bin"],
+            [0, 600_000, 0],
+            [10, 600_010, 10],
+        )
+        assert out[0] == self.CONTENT[:10]
+        assert isinstance(out[1], HfHubHTTPError)
+        assert isinstance(out[2], FileNotFoundError)
+
+        with pytest.raises(HfHubHTTPError):
+            fs.cat_ranges(["username/my_model/b.parquet"], 600_000, 600_010, on_error="raise")
+
+    def test_cat_ranges_concurrency_per_file(self, fs: HfFileSystem) -> None:
+        in_flight, max_in_flight = 0, 0
+        lock = threading.Lock()
+        fetch_range = HfFileSystemFile._fetch_range
+
+        def _fetch_range(self, start: int, end: int) -> bytes:
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return fetch_range(self, start, end)
+
+        with patch.object(constants, "HF_HUB_PARALLEL_DOWNLOAD_CONCURRENCY", 2):
+            with patch.object(HfFileSystemFile, "_fetch_range", _fetch_range):
+                starts = list(range(0, 1_000_000, 100_000))
+                out = fs.cat_ranges(["username/my_model/a.parquet"] * 10, starts, [start + 10 for start in starts])
+        assert out[3] == self.CONTENT[300_000:300_010]
+        assert max_in_flight == 2
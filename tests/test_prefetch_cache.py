@@ -0,0 +1,129 @@
+import pickle
+import random
+import threading
+from typing import List, Set, Tuple
+
+import pytest
+
+from huggingface_hub._prefetch_cache import PrefetchCache
+
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+BLOCK_SIZE = 1000
+
+
+class _Fetcher:
+    """Record fetched ranges. Fetches starting at an offset in `slow` wait for `release` to simulate a slow network.
+    Fetches starting at an offset in `fail` fail once."""
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[int, int]] = []
+        self.release = threading.Event()
+        self.slow: Set[int] = set()
+        self.fail: Set[int] = set()
+
+    def __call__(self, start: int, end: int) -> bytes:
+        if start in self.slow:
+            self.release.wait(timeout=5)
+        self.calls.append((start, end))
+        if start in self.fail:
+            self.fail.remove(start)
+            raise OSError("Connection reset")
+        return CONTENT[start:end]
+
+
+def _wait_for_prefetch(cache: PrefetchCache) -> None:
+    for future in list(cache._blocks.values()):
+        try:
+            future.result(timeout=5)
+        except Exception:
+            pass
+
+
+def test_sequential_reads_prefetch_next_blocks() -> None:
+    fetcher = _Fetcher()
+    cache = PrefetchCache(BLOCK_SIZE, fetcher, len(CONTENT))
+
+    assert cache._fetch(0, 500) == CONTENT[0:500]
+    assert cache._blocks.keys() == {0}  # not sequential yet => no read-ahead
+    assert cache._fetch(500, 1500) == CONTENT[500:1500]
+    _wait_for_prefetch(cache)
+    assert (2000, 3000) in fetcher.calls  # next block fetched in background
+
+    nb_calls = len(fetcher.calls)
+    assert cache._fetch(1500, 2500) == CONTENT[1500:2500]
+    assert cache.hit_count >= 1
+    assert 0 not in cache._blocks  # consumed blocks are dropped
+    _wait_for_prefetch(cache)
+    assert len(fetcher.calls) == nb_calls + 1  # block 3 prefetched
+
+
+def test_window_grows_when_reader_waits() -> None:
+    fetcher = _Fetcher()
+    fetcher.slow = {2000}
+    cache = PrefetchCache(BLOCK_SIZE, fetcher, len(CONTENT), max_workers=4)
+    cache._fetch(0, 1000)
+    cache._fetch(1000, 2000)  # prefetch block 2
+
+    threading.Timer(0.1, fetcher.release.set).start()
+    assert cache._fetch(2000, 3000) == CONTENT[2000:3000]  # waits for the prefetched block
+    assert cache.window == 2
+
+    _wait_for_prefetch(cache)
+    assert set(cache._blocks) == {2, 3, 4}
+
+
+def test_window_capped_by_memory_budget() -> None:
+    cache = PrefetchCache(BLOCK_SIZE, _Fetcher(), len(CONTENT), max_prefetch_size=2500)
+    assert cache.max_window == 2
+    assert PrefetchCache(BLOCK_SIZE, _Fetcher(), len(CONTENT), max_prefetch_size=10).max_window == 1
+
+
+def test_random_access_stops_read_ahead() -> None:
+    fetcher = _Fetcher()
+    cache = PrefetchCache(BLOCK_SIZE, fetcher, len(CONTENT))
+    cache._fetch(0, 1000)
+    cache._fetch(1000, 2000)
+    cache.window = 4
+
+    assert cache._fetch(7500, 7600) == CONTENT[7500:7600]
+    assert cache.window == 1
+    assert set(cache._blocks) == {7}
+
+
+def test_failed_prefetch_is_retried() -> None:
+    fetcher = _Fetcher()
+    cache = PrefetchCache(BLOCK_SIZE, fetcher, len(CONTENT))
+    fetcher.fail = {2000}
+    cache._fetch(0, 1000)
+    cache._fetch(1000, 2000)  # prefetch of block 2 fails
+    _wait_for_prefetch(cache)
+    assert cache._fetch(2000, 3000) == CONTENT[2000:3000]
+    assert fetcher.calls.count((2000, 3000)) == 2
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_reads_return_correct_data(seed: int) -> None:
+    rng = random.Random(seed)
+    cache = PrefetchCache(BLOCK_SIZE, _Fetcher(), len(CONTENT))
+    position = 0
+    for _ in range(50):
+        if rng.random() < 0.2:
+            position = rng.randrange(len(CONTENT))
+        length = rng.randrange(1, 3000)
+        assert cache._fetch(position, position + length) == CONTENT[position : position + length]
+        position = min(position + length, len(CONTENT))
+    assert cache._fetch(len(CONTENT), None) == b""
+
+
+def _fetch_content(start: int, end: int) -> bytes:
+    return CONTENT[start:end]
+
+
+def test_pickle() -> None:
+    cache = PrefetchCache(BLOCK_SIZE, _fetch_content, len(CONTENT))
+    cache._fetch(0, 1000)
+    cache._fetch(1000, 2000)
+    cache = pickle.loads(pickle.dumps(cache))
+    assert cache._blocks == {}
+    assert cache._fetch(2000, 2500) == CONTENT[2000:2500]
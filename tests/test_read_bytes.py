@@ -0,0 +1,178 @@
+import os
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from huggingface_hub import _read_bytes, hf_hub_read_bytes
+from huggingface_hub._read_bytes import _BytesLRUCache
+from huggingface_hub.errors import EntryNotFoundError, HfHubHTTPError, LocalEntryNotFoundError
+from huggingface_hub.file_download import HfFileMetadata
+
+
+COMMIT_HASH = "a" * 40
+OTHER_COMMIT_HASH = "b" * 40
+REPO_ID = "user/repo"
+CONTENT = b'{"foo": "bar"}'
+ETAG = "c" * 40
+ENDPOINT = "https://huggingface.co"
+
+
+def _metadata(commit_hash: str = COMMIT_HASH, content: bytes = CONTENT) -> HfFileMetadata:
+    return HfFileMetadata(
+        commit_hash=commit_hash,
+        etag=ETAG,
+        location=f"https://huggingface.co/{REPO_ID}/resolve/{commit_hash}/config.json",
+        size=len(content),
+    )
+
+
+@pytest.fixture(autouse=True)
+def memory_cache() -> Iterator[_BytesLRUCache]:
+    cache = _BytesLRUCache(max_size=1024)
+    with patch.object(_read_bytes, "_MEMORY_CACHE", cache):
+        yield cache
+
+
+@pytest.fixture
+def hub() -> Iterator[Mock]:
+    """Mock HEAD and GET calls. `hub.metadata` is returned by the HEAD call and `hub.content` by the GET call."""
+    mock = Mock()
+    mock.metadata = _metadata()
+    mock.content = CONTENT
+    head = patch("huggingface_hub.file_download.get_hf_file_metadata", side_effect=lambda **kwargs: mock.metadata)
+    get = patch(
+        "huggingface_hub._read_bytes._request_wrapper", side_effect=lambda **kwargs: Mock(content=mock.content)
+    )
+    with head as mock.head, get as mock.get:
+        yield mock
+
+
+def _write_cached_file(cache_dir: Path, commit_hash: str, content: bytes, ref: str = "main") -> None:
+    storage_folder = cache_dir / "models--user--repo"
+    (storage_folder / "snapshots" / commit_hash).mkdir(parents=True)
+    (storage_folder / "snapshots" / commit_hash / "config.json").write_bytes(content)
+    (storage_folder / "refs").mkdir()
+    (storage_folder / "refs" / ref).write_text(commit_hash)
+
+
+def test_read_bytes_from_hub(hub: Mock, tmp_path: Path) -> None:
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+    assert hub.head.call_count == 1
+    assert hub.get.call_count == 1
+    assert os.listdir(tmp_path) == []  # nothing written to disk
+
+    # Second call => HEAD to resolve "main" but content is read from memory
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+    assert hub.head.call_count == 2
+    assert hub.get.call_count == 1
+
+    # Commit hash => no HTTP call at all
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path, revision=COMMIT_HASH) == CONTENT
+    assert hub.head.call_count == 2
+
+
+def test_read_bytes_new_commit(hub: Mock, tmp_path: Path) -> None:
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+    hub.metadata = _metadata(commit_hash=OTHER_COMMIT_HASH, content=b'{"foo": "baz"}')
+    hub.content = b'{"foo": "baz"}'
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == b'{"foo": "baz"}'
+    assert hub.get.call_count == 2
+
+
+def test_read_bytes_from_disk_cache(hub: Mock, tmp_path: Path) -> None:
+    _write_cached_file(tmp_path, COMMIT_HASH, CONTENT)
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+    assert hub.get.call_count == 0
+
+
+def test_read_bytes_revision_ttl(hub: Mock, tmp_path: Path) -> None:
+    with patch("huggingface_hub.constants.HF_HUB_REVISION_TTL", 60):
+        assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+        assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+    assert hub.head.call_count == 1  # "main" resolved once
+
+
+def test_read_bytes_offline_fallback(hub: Mock, tmp_path: Path) -> None:
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+
+    # Hub unreachable => last known version from memory
+    hub.head.side_effect = requests.ConnectionError("offline")
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+
+    # Not in memory nor on disk => raise
+    with pytest.raises(LocalEntryNotFoundError):
+        hf_hub_read_bytes(REPO_ID, "other.json", cache_dir=tmp_path)
+
+
+def test_read_bytes_local_files_only(hub: Mock, tmp_path: Path) -> None:
+    _write_cached_file(tmp_path, COMMIT_HASH, CONTENT)
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path, local_files_only=True) == CONTENT
+    with pytest.raises(LocalEntryNotFoundError):
+        hf_hub_read_bytes(REPO_ID, "other.json", cache_dir=tmp_path, local_files_only=True)
+    assert hub.head.call_count == 0
+
+
+def test_read_bytes_no_exist_cached(hub: Mock, tmp_path: Path) -> None:
+    no_exist = tmp_path / "models--user--repo" / ".no_exist" / COMMIT_HASH / "missing.json"
+    no_exist.parent.mkdir(parents=True)
+    no_exist.touch()
+    with pytest.raises(EntryNotFoundError):
+        hf_hub_read_bytes(REPO_ID, "missing.json", cache_dir=tmp_path, revision=COMMIT_HASH)
+    assert hub.head.call_count == 0
+
+
+def test_read_bytes_consistency_check(hub: Mock, tmp_path: Path) -> None:
+    hub.content = CONTENT[:-1]
+    with pytest.raises(EnvironmentError, match="Consistency check failed"):
+        hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path)
+
+
+def test_read_bytes_http_error(hub: Mock, tmp_path: Path) -> None:
+    error_response = requests.Response()
+    error_response.status_code = 500
+    error_response._content = b"Internal Error"
+    error_response.url = _metadata().location
+    hub.get.side_effect = lambda **kwargs: error_response
+    with pytest.raises(HfHubHTTPError):
+        hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path)
+
+    # Error page is not cached
+    hub.get.side_effect = lambda **kwargs: Mock(content=CONTENT)
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path) == CONTENT
+
+
+def test_read_bytes_cached_per_endpoint(hub: Mock, tmp_path: Path) -> None:
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path, revision=COMMIT_HASH) == CONTENT
+    assert hub.get.call_count == 1
+
+    # Same repo and commit hash on another endpoint => not read from memory
+    hub.content = b'{"foo": "mirror"}'
+    hub.metadata = _metadata(content=hub.content)
+    assert (
+        hf_hub_read_bytes(
+            REPO_ID, "config.json", cache_dir=tmp_path, revision=COMMIT_HASH, endpoint="https://mirror.example.com"
+        )
+        == b'{"foo": "mirror"}'
+    )
+    assert hub.get.call_count == 2
+    assert hf_hub_read_bytes(REPO_ID, "config.json", cache_dir=tmp_path, revision=COMMIT_HASH) == CONTENT
+
+
+def test_lru_cache_eviction() -> None:
+    cache = _BytesLRUCache(max_size=10)
+    cache.put((ENDPOINT, "model", REPO_ID, COMMIT_HASH, "a"), b"aaaa")
+    cache.put((ENDPOINT, "model", REPO_ID, COMMIT_HASH, "b"), b"bbbb")
+    assert cache.get((ENDPOINT, "model", REPO_ID, COMMIT_HASH, "a")) == b"aaaa"  # "a" is now the most recently used
+
+    cache.put((ENDPOINT, "model", REPO_ID, COMMIT_HASH, "c"), b"cccc")
+    assert cache.get((ENDPOINT, "model", REPO_ID, COMMIT_HASH, "b")) is None
+    assert cache.get((ENDPOINT, "model", REPO_ID, COMMIT_HASH, "a")) == b"aaaa"
+    assert cache.size == 8
+
+    # Too large => not cached and nothing evicted
+    cache.put((ENDPOINT, "model", REPO_ID, COMMIT_HASH, "d"), b"d" * 11)
+    assert cache.get((ENDPOINT, "model", REPO_ID, COMMIT_HASH, "d")) is None
+    assert cache.size == 8
@@ -0,0 +1,195 @@
+import json
+import struct
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from huggingface_hub import RemoteSafetensorsFile, _download_range
+from huggingface_hub.errors import HfHubHTTPError, SafetensorsParsingError
+from huggingface_hub.file_download import HfFileMetadata
+
+from .test_download_range import _RecordingHandler
+from .testing_utils import requires
+
+
+COMMIT_HASH = "a" * 40
+ETAG = "b" * 64
+REPO_ID = "user/repo"
+FILENAME = "model.safetensors"
+BLOCK_SIZE = 4096
+
+TENSORS = {
+    "a": np.arange(100 * 50, dtype=np.float32).reshape(100, 50),
+    "b": np.arange(10, dtype=np.int64),
+    "c": np.arange(3 * 4 * 5, dtype=np.float16).reshape(3, 4, 5),
+}
+
+
+def _safetensors_file(tensors: Dict[str, np.ndarray], dtypes: Dict[str, str]) -> bytes:
+    header: Dict[str, Any] = {"__metadata__": {"format": "np"}}
+    offset = 0
+    for name, array in tensors.items():
+        header[name] = {
+            "dtype": dtypes.get(name, {"float32": "F32", "int64": "I64", "float16": "F16"}[str(array.dtype)]),
+            "shape": list(array.shape),
+            "data_offsets": [offset, offset + array.nbytes],
+        }
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode()
+    return (
+        struct.pack("<Q", len(header_bytes)) + header_bytes + b"".join(array.tobytes() for array in tensors.values())
+    )
+
+
+class _ExpiringHandler(_RecordingHandler):
+    """Reject requests to `server.expired_paths` with a 403, as a CDN does for an expired signed URL."""
+
+    def do_GET(self) -> None:
+        if self.path in self.server.expired_paths:  # type: ignore
+            self.send_response(403)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        super().do_GET()
+
+
+@pytest.fixture
+def hub() -> Iterator[ThreadingHTTPServer]:
+    """Serve a safetensors file locally and mock the HEAD call to point to it (at `/{server.location_path}`)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ExpiringHandler)
+    server.content = _safetensors_file(TENSORS, dtypes={})  # type: ignore
+    server.nb_truncated = 0  # type: ignore
+    server.requested_ranges: List[str] = []  # type: ignore
+    server.support_ranges = True  # type: ignore
+    server.expired_paths: Set[str] = set()  # type: ignore
+    server.location_path = FILENAME  # type: ignore
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    head = patch(
+        "huggingface_hub._remote_safetensors.get_hf_file_metadata",
+        side_effect=lambda *args, **kwargs: HfFileMetadata(
+            commit_hash=COMMIT_HASH,
+            etag=ETAG,
+            location=f"http://127.0.0.1:{server.server_port}/{server.location_path}",  # type: ignore
+            size=len(server.content),  # type: ignore
+        ),
+    )
+    try:
+        with head as server.head:  # type: ignore
+            with patch.object(_download_range, "_SPARSE_CHUNK_SIZE", BLOCK_SIZE):
+                yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_get_tensor(hub: Mock, tmp_path: Path) -> None:
+    with RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path) as f:
+        assert f.keys() == ["a", "b", "c"]
+        assert f.metadata() == {"format": "np"}
+        assert len(hub.requested_ranges) == 1  # header in first block
+        for name, array in TENSORS.items():
+            np.testing.assert_array_equal(f.get_tensor(name), array)
+        nb_requests = len(hub.requested_ranges)
+
+        # Blocks are cached in memory
+        with patch.object(_download_range, "_open_sparse_blob", side_effect=AssertionError("should not be called")):
+            np.testing.assert_array_equal(f.get_tensor("a"), TENSORS["a"])
+
+    # Blocks are cached on disk
+    with RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path) as f:
+        np.testing.assert_array_equal(f.get_tensor("c"), TENSORS["c"])
+    assert len(hub.requested_ranges) == nb_requests
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        slice(10, 20),
+        slice(None),
+        slice(-5, None),
+        slice(90, 10, -3),
+        slice(5, 5),
+        3,
+        -1,
+        (slice(10, 12), 3),
+        (slice(None, None, 7), slice(1, 4)),
+        Ellipsis,
+        (Ellipsis, 0),
+    ],
+)
+def test_get_slice(hub: Mock, tmp_path: Path, key: Any) -> None:
+    with RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path) as f:
+        tensor_slice = f.get_slice("a")
+        assert tensor_slice.get_shape() == [100, 50]
+        assert tensor_slice.get_dtype() == "F32"
+        np.testing.assert_array_equal(tensor_slice[key], TENSORS["a"][key])
+
+
+def test_get_slice_downloads_only_needed_rows(hub: Mock, tmp_path: Path) -> None:
+    with RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path) as f:
+        np.testing.assert_array_equal(f.get_slice("a")[60:61], TENSORS["a"][60:61])
+        # Row 60 is bytes 12000-12200 of the data => only the blocks covering them are downloaded
+        start, end = f._data_start + 12000, f._data_start + 12200
+    first_block, last_block = start // BLOCK_SIZE, (end - 1) // BLOCK_SIZE
+    assert hub.requested_ranges[1:] == [f"bytes={first_block * BLOCK_SIZE}-{(last_block + 1) * BLOCK_SIZE - 1}"]
+
+
+def test_file_fully_cached(hub: Mock, tmp_path: Path) -> None:
+    pointer_path = tmp_path / "models--user--repo" / "snapshots" / COMMIT_HASH / FILENAME
+    pointer_path.parent.mkdir(parents=True)
+    pointer_path.write_bytes(hub.content)
+    with RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path, revision=COMMIT_HASH) as f:
+        np.testing.assert_array_equal(f.get_tensor("b"), TENSORS["b"])
+    hub.head.assert_not_called()
+    assert hub.requested_ranges == []
+
+
+def test_expired_location_is_resolved_again(hub: Mock, tmp_path: Path) -> None:
+    hub.location_path = "signed?expires=1"
+    with RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path) as f:
+        assert hub.head.call_count == 1
+
+        # Signed URL expires while the file is open => resolved again at the same commit
+        hub.expired_paths.add("/signed?expires=1")
+        hub.location_path = "signed?expires=2"
+        np.testing.assert_array_equal(f.get_tensor("a"), TENSORS["a"])
+        assert hub.head.call_count == 2
+        assert hub.head.call_args.args[0].endswith(f"/{REPO_ID}/resolve/{COMMIT_HASH}/{FILENAME}")
+
+
+def test_location_rejected_again_raises(hub: Mock, tmp_path: Path) -> None:
+    hub.location_path = "signed"
+    hub.expired_paths.add("/signed")
+    with pytest.raises(HfHubHTTPError):
+        RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path)
+    assert hub.head.call_count == 2  # resolved again only once
+
+
+def test_unsupported_numpy_dtype(hub: Mock, tmp_path: Path) -> None:
+    hub.content = _safetensors_file(TENSORS, dtypes={"c": "BF16"})
+    with RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path) as f:
+        with pytest.raises(ValueError, match="not supported by numpy"):
+            f.get_tensor("c")
+        with pytest.raises(KeyError, match="Tensor 'd' not found"):
+            f.get_tensor("d")
+
+
+def test_invalid_header(hub: Mock, tmp_path: Path) -> None:
+    hub.content = struct.pack("<Q", 10) + b"not a json" + b"0" * 100
+    with pytest.raises(SafetensorsParsingError):
+        RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path)
+
+
+@requires("torch")
+def test_get_tensor_torch(hub: Mock, tmp_path: Path) -> None:
+    import torch
+
+    with RemoteSafetensorsFile(REPO_ID, cache_dir=tmp_path, framework="pt") as f:
+        assert torch.equal(f.get_tensor("a"), torch.from_numpy(TENSORS["a"]))
+        assert torch.equal(f.get_slice("c")[1:, 2], torch.from_numpy(TENSORS["c"])[1:, 2])
@@ -1,10 +1,19 @@
+import json
 import os
+import posixpath
 import unittest
 from pathlib import Path
-from unittest.mock import patch
+from typing import Dict, List, Optional, Tuple, Union
+from unittest.mock import Mock, patch
 
-from huggingface_hub import CommitOperationAdd, HfApi, snapshot_download
+import pytest
+import requests
+
+from huggingface_hub import CommitOperationAdd, HfApi, scan_cache_dir, snapshot_download
+from huggingface_hub._snapshot_download import _list_repo_tree, _RepoTree
 from huggingface_hub.errors import LocalEntryNotFoundError, RepositoryNotFoundError
+from huggingface_hub.file_download import HfFileMetadata
+from huggingface_hub.hf_api import RepoFile, RepoFolder
 from huggingface_hub.utils import SoftTemporaryDirectory
 
 from .testing_constants import TOKEN
@@ -95,6 +104,15 @@ class SnapshotDownloadTests(unittest.TestCase):
             # folder name contains the revision's commit sha.
             self.assertTrue(self.first_commit_hash in storage_folder)
 
+    def test_download_model_no_head_call_per_file(self):
+        # Metadata is resolved for all files at once => no HEAD call
+        with patch("huggingface_hub.file_download.get_hf_file_metadata") as mock:
+            with SoftTemporaryDirectory() as tmpdir:
+                storage_folder = snapshot_download(self.repo_id, revision="main", cache_dir=tmpdir)
+                self.assertEqual(Path(storage_folder, "dummy_file.txt").read_text(), "v2")
+                self.assertEqual(Path(storage_folder, "subpath", "file.txt").read_text(), "content in subpath")
+        mock.assert_not_called()
+
     def test_download_private_model(self):
         self.api.update_repo_settings(repo_id=self.repo_id, private=True)
 
@@ -260,3 +278,338 @@ class SnapshotDownloadTests(unittest.TestCase):
                 # Nothing has been added to cache dir (except some subfolders created)
                 for path in cache_dir.glob("*"):
                     assert path.is_dir()
+
+
+def test_list_repo_tree():
+    api = Mock()
+    api.list_repo_tree.return_value = [
+        RepoFile(path="config.json", size=12, oid="a" * 40),
+        RepoFolder(path="subfolder", oid="b" * 40),
+        RepoFile(
+            path="subfolder/model.safetensors",
+            size=1000,
+            oid="c" * 40,
+            lfs={"size": 1000, "oid": "d" * 64, "pointerSize": 130},
+        ),
+    ]
+    tree = _list_repo_tree(
+        api, repo_id="user/repo", repo_type="model", commit_hash="e" * 40, endpoint=None, token=None
+    )
+    api.list_repo_tree.assert_called_once_with(
+        repo_id="user/repo", recursive=True, revision="e" * 40, repo_type="model", token=None
+    )
+    metadata = tree.files
+    assert tree.folders == {"subfolder": "b" * 40}
+
+    assert set(metadata) == {"config.json", "subfolder/model.safetensors"}
+    assert metadata["config.json"].etag == "a" * 40  # git hash
+    assert metadata["config.json"].size == 12
+    assert metadata["config.json"].commit_hash == "e" * 40
+    assert metadata["config.json"].location.endswith(f"/user/repo/resolve/{'e' * 40}/config.json")
+    assert metadata["subfolder/model.safetensors"].etag == "d" * 64  # sha256
+    assert metadata["subfolder/model.safetensors"].size == 1000
+
+
+def test_list_repo_tree_error():
+    api = Mock()
+    api.list_repo_tree.side_effect = requests.ConnectionError("Fake error")
+    tree = _list_repo_tree(
+        api, repo_id="user/repo", repo_type="model", commit_hash="e" * 40, endpoint=None, token=None
+    )
+    assert tree == _RepoTree()
+
+
+def test_list_repo_tree_from_base_tree():
+    base_tree = {
+        "files": {
+            "README.md": {"size": 5, "etag": "a" * 40},
+            "data/train/0.parquet": {"size": 100, "etag": "b" * 64},
+            "data/train/1.parquet": {"size": 200, "etag": "c" * 64},
+            "data/test/0.parquet": {"size": 50, "etag": "d" * 64},
+            "images/0.png": {"size": 10, "etag": "e" * 64},
+        },
+        "folders": {"data": "tree-data", "data/train": "tree-train", "data/test": "tree-test", "images": "tree-img"},
+    }
+    listings = {
+        None: [
+            RepoFile(path="README.md", size=6, oid="f" * 40),  # changed
+            RepoFolder(path="data", oid="tree-data-2"),  # changed
+            RepoFolder(path="images", oid="tree-img"),  # unchanged => not listed
+        ],
+        "data": [
+            RepoFolder(path="data/train", oid="tree-train-2"),  # changed
+            RepoFolder(path="data/test", oid="tree-test"),  # unchanged => not listed
+        ],
+        "data/train": [
+            RepoFile(
+                path="data/train/0.parquet",
+                size=100,
+                oid="0" * 40,
+                lfs={"size": 100, "oid": "b" * 64, "pointerSize": 130},
+            ),
+            RepoFile(
+                path="data/train/2.parquet",
+                size=300,
+                oid="1" * 40,
+                lfs={"size": 300, "oid": "9" * 64, "pointerSize": 130},
+            ),
+        ],
+    }
+    api = Mock()
+    api.list_repo_tree.side_effect = lambda path_in_repo, **kwargs: listings[path_in_repo]
+
+    tree = _list_repo_tree(
+        api,
+        repo_id="user/repo",
+        repo_type="dataset",
+        commit_hash="e" * 40,
+        endpoint=None,
+        token=None,
+        base_tree=base_tree,
+    )
+    assert sorted(call.kwargs["path_in_repo"] or "" for call in api.list_repo_tree.call_args_list) == [
+        "",
+        "data",
+        "data/train",
+    ]
+    assert {path: (metadata.etag, metadata.size) for path, metadata in tree.files.items()} == {
+        "README.md": ("f" * 40, 6),
+        "data/train/0.parquet": ("b" * 64, 100),
+        "data/train/2.parquet": ("9" * 64, 300),
+        "data/test/0.parquet": ("d" * 64, 50),
+        "images/0.png": ("e" * 64, 10),
+    }
+    assert tree.files["images/0.png"].location.endswith(f"/datasets/user/repo/resolve/{'e' * 40}/images/0.png")
+    assert tree.folders == {
+        "data": "tree-data-2",
+        "data/train": "tree-train-2",
+        "data/test": "tree-test",
+        "images": "tree-img",
+    }
+
+
+@patch("huggingface_hub._snapshot_download.hf_hub_download")
+@patch("huggingface_hub._snapshot_download._check_disk_space")
+def test_snapshot_download_checks_disk_space_once(check_disk_space: Mock, hf_hub_download: Mock, tmp_path: Path):
+    commit_hash = "e" * 40
+    files_metadata = {
+        filename: HfFileMetadata(
+            commit_hash=commit_hash,
+            etag=etag,
+            location=f"https://huggingface.co/user/repo/resolve/{commit_hash}/{filename}",
+            size=size,
+        )
+        for filename, etag, size in [
+            ("cached.bin", "a" * 40, 100),
+            ("model.bin", "b" * 40, 1000),
+            ("c.json", "c" * 40, 10),
+        ]
+    }
+    # "cached.bin" is already in the cache => not counted
+    blob_path = tmp_path / "models--user--repo" / "blobs" / ("a" * 40)
+    blob_path.parent.mkdir(parents=True)
+    blob_path.touch()
+
+    repo_info = Mock(sha=commit_hash, siblings=[Mock(rfilename=filename) for filename in files_metadata])
+    with patch("huggingface_hub._snapshot_download.HfApi.repo_info", return_value=repo_info):
+        with patch("huggingface_hub._snapshot_download._list_repo_tree", return_value=_RepoTree(files=files_metadata)):
+            snapshot_download("user/repo", cache_dir=tmp_path)
+
+    check_disk_space.assert_called_once_with(1010, str(tmp_path / "models--user--repo"), nb_files=2)
+    assert hf_hub_download.call_count == 2  # "cached.bin" is linked directly to its blob
+    assert (tmp_path / "models--user--repo" / "snapshots" / commit_hash / "cached.bin").is_symlink()
+
+
+@patch("huggingface_hub.constants.HF_HUB_STRICT_DISK_SPACE_CHECK", True)
+@patch("huggingface_hub.file_download.shutil.disk_usage")
+@patch("huggingface_hub._snapshot_download.hf_hub_download")
+def test_snapshot_download_strict_disk_space_check(hf_hub_download: Mock, disk_usage: Mock, tmp_path: Path):
+    disk_usage.return_value.free = 500
+    commit_hash = "e" * 40
+    files_metadata = {
+        filename: HfFileMetadata(
+            commit_hash=commit_hash,
+            etag=etag,
+            location=f"https://huggingface.co/user/repo/resolve/{commit_hash}/{filename}",
+            size=size,
+        )
+        for filename, etag, size in [("model.bin", "b" * 40, 1000), ("c.json", "c" * 40, 10)]
+    }
+    repo_info = Mock(sha=commit_hash, siblings=[Mock(rfilename=filename) for filename in files_metadata])
+    with patch("huggingface_hub._snapshot_download.HfApi.repo_info", return_value=repo_info):
+        with patch("huggingface_hub._snapshot_download._list_repo_tree", return_value=_RepoTree(files=files_metadata)):
+            with pytest.raises(OSError, match="Not enough free disk space to download 2 files"):
+                snapshot_download("user/repo", cache_dir=tmp_path)
+
+    hf_hub_download.assert_not_called()  # fails before downloading anything
+
+
+class TestSnapshotManifest:
+    commit_hash = "e" * 40
+    files = {"config.json": 10, "model.safetensors": 1000, "README.md": 5}
+
+    def _metadata(self) -> Dict[str, HfFileMetadata]:
+        return {
+            filename: HfFileMetadata(
+                commit_hash=self.commit_hash,
+                etag=f"etag-{filename}",
+                location=f"https://huggingface.co/user/repo/resolve/{self.commit_hash}/{filename}",
+                size=size,
+            )
+            for filename, size in self.files.items()
+        }
+
+    def _snapshot_download(self, tmp_path: Path, **kwargs) -> Tuple[str, Mock, Mock]:
+        repo_info = Mock(sha=self.commit_hash, siblings=[Mock(rfilename=filename) for filename in self.files])
+        with patch("huggingface_hub._snapshot_download.HfApi.repo_info", return_value=repo_info) as repo_info_mock:
+            with patch(
+                "huggingface_hub._snapshot_download._list_repo_tree", return_value=_RepoTree(files=self._metadata())
+            ):
+                with patch(
+                    "huggingface_hub._snapshot_download.hf_hub_download", side_effect=self._fake_download
+                ) as hf_hub_download_mock:
+                    path = snapshot_download("user/repo", cache_dir=tmp_path, **kwargs)
+        return path, repo_info_mock, hf_hub_download_mock
+
+    def _fake_download(self, repo_id: str, filename: str, cache_dir: str, revision: str, **kwargs) -> str:
+        path = Path(cache_dir) / "models--user--repo" / "snapshots" / revision / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"0" * self.files[filename])
+        return str(path)
+
+    def test_manifest_written(self, tmp_path: Path) -> None:
+        path, _, _ = self._snapshot_download(tmp_path, allow_patterns="*.json")
+        manifest = json.loads((Path(path) / ".manifest").read_text())
+        assert manifest["commit_hash"] == self.commit_hash
+        assert manifest["allow_patterns"] == "*.json"
+        assert manifest["repo_files"] == list(self.files)
+        assert manifest["files"] == {"config.json": {"size": 10, "etag": "etag-config.json"}}
+
+        # Files downloaded with other patterns are added to the manifest
+        self._snapshot_download(tmp_path, allow_patterns="*.safetensors")
+        manifest = json.loads((Path(path) / ".manifest").read_text())
+        assert set(manifest["files"]) == {"config.json", "model.safetensors"}
+
+    def test_pinned_commit_no_network_call(self, tmp_path: Path) -> None:
+        path, _, _ = self._snapshot_download(tmp_path, allow_patterns=["*.json", "*.safetensors"])
+
+        # Requested files are in the manifest => nothing is called
+        for allow_patterns in ["*.json", ["*.json", "*.safetensors"]]:
+            new_path, repo_info, hf_hub_download = self._snapshot_download(
+                tmp_path, revision=self.commit_hash, allow_patterns=allow_patterns
+            )
+            assert new_path == path
+            repo_info.assert_not_called()
+            hf_hub_download.assert_not_called()
+
+        # "README.md" is missing => resolved online
+        _, repo_info, hf_hub_download = self._snapshot_download(tmp_path, revision=self.commit_hash)
+        repo_info.assert_called_once()
+        hf_hub_download.assert_called_once()  # other files already in the snapshot
+
+    def test_branch_complete_in_manifest(self, tmp_path: Path) -> None:
+        path, _, _ = self._snapshot_download(tmp_path)
+        new_path, repo_info, hf_hub_download = self._snapshot_download(tmp_path)
+        assert new_path == path
+        repo_info.assert_called_once()  # to resolve "main"
+        hf_hub_download.assert_not_called()
+
+    def test_force_download_ignores_manifest(self, tmp_path: Path) -> None:
+        self._snapshot_download(tmp_path)
+        _, _, hf_hub_download = self._snapshot_download(tmp_path, revision=self.commit_hash, force_download=True)
+        assert hf_hub_download.call_count == 3
+
+    def test_invalid_manifest_ignored(self, tmp_path: Path) -> None:
+        path, _, _ = self._snapshot_download(tmp_path)
+        (Path(path) / ".manifest").write_text("not a json")
+        _, repo_info, _ = self._snapshot_download(tmp_path, revision=self.commit_hash)
+        repo_info.assert_called_once()
+        assert json.loads((Path(path) / ".manifest").read_text())["version"] == 1  # rewritten
+
+    def test_manifest_not_in_cache_scan(self, tmp_path: Path) -> None:
+        blob_path = tmp_path / "models--user--repo" / "blobs" / "etag-config.json"
+        blob_path.parent.mkdir(parents=True)
+        blob_path.write_text("config")
+        pointer_path = tmp_path / "models--user--repo" / "snapshots" / self.commit_hash / "config.json"
+        pointer_path.parent.mkdir(parents=True)
+        pointer_path.symlink_to(os.path.relpath(blob_path, pointer_path.parent))
+        (pointer_path.parent / ".manifest").write_text("{}")
+
+        report = scan_cache_dir(tmp_path)
+        (revision,) = next(iter(report.repos)).revisions
+        assert [file.file_name for file in revision.files] == ["config.json"]
+
+
+class TestSnapshotDifferentialUpdate:
+    commit_a = "a" * 40
+    commit_b = "b" * 40
+
+    def _tree(self, readme_oid: str, weights_tree_id: str) -> List[Union[RepoFile, RepoFolder]]:
+        return [
+            RepoFile(path="README.md", size=5, oid=readme_oid),
+            RepoFolder(path="weights", oid=weights_tree_id),
+            RepoFile(
+                path="weights/model.bin",
+                size=100,
+                oid="0" * 40,
+                lfs={"size": 100, "oid": "1" * 64, "pointerSize": 130},
+            ),
+        ]
+
+    def _snapshot_download(self, tmp_path: Path, commit_hash: str, listing: List) -> Tuple[Mock, Mock]:
+        def _list_repo_tree(path_in_repo: Optional[str] = None, recursive: bool = False, **kwargs):
+            if recursive:
+                return listing
+            return [item for item in listing if posixpath.dirname(item.path) == (path_in_repo or "")]
+
+        def _fake_download(repo_id: str, filename: str, cache_dir: str, revision: str, **kwargs) -> str:
+            storage_folder = Path(cache_dir) / "models--user--repo"
+            etag = next(
+                item.lfs.sha256 if item.lfs is not None else item.blob_id for item in listing if item.path == filename
+            )
+            blob_path = storage_folder / "blobs" / etag
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            blob_path.write_bytes(b"0")
+            pointer_path = storage_folder / "snapshots" / revision / filename
+            pointer_path.parent.mkdir(parents=True, exist_ok=True)
+            pointer_path.symlink_to(blob_path)
+            return str(pointer_path)
+
+        repo_info = Mock(
+            sha=commit_hash, siblings=[Mock(rfilename=item.path) for item in listing if isinstance(item, RepoFile)]
+        )
+        with patch("huggingface_hub._snapshot_download.HfApi.repo_info", return_value=repo_info):
+            with patch(
+                "huggingface_hub._snapshot_download.HfApi.list_repo_tree", side_effect=_list_repo_tree
+            ) as list_repo_tree_mock:
+                with patch(
+                    "huggingface_hub._snapshot_download.hf_hub_download", side_effect=_fake_download
+                ) as hf_hub_download_mock:
+                    snapshot_download("user/repo", cache_dir=tmp_path)
+        return list_repo_tree_mock, hf_hub_download_mock
+
+    def test_update_lists_only_changed_folders(self, tmp_path: Path) -> None:
+        list_repo_tree, hf_hub_download = self._snapshot_download(
+            tmp_path, self.commit_a, self._tree(readme_oid="c" * 40, weights_tree_id="d" * 40)
+        )
+        list_repo_tree.assert_called_once()
+        assert list_repo_tree.call_args.kwargs["recursive"] is True
+        assert hf_hub_download.call_count == 2
+
+        # "README.md" changed, "weights/" did not => only the root is listed and only "README.md" is downloaded
+        list_repo_tree, hf_hub_download = self._snapshot_download(
+            tmp_path, self.commit_b, self._tree(readme_oid="e" * 40, weights_tree_id="d" * 40)
+        )
+        list_repo_tree.assert_called_once()
+        assert list_repo_tree.call_args.kwargs["path_in_repo"] is None
+        assert "recursive" not in list_repo_tree.call_args.kwargs
+        hf_hub_download.assert_called_once()
+        assert hf_hub_download.call_args.kwargs["filename"] == "README.md"
+
+        snapshot_b = tmp_path / "models--user--repo" / "snapshots" / self.commit_b
+        assert (snapshot_b / "weights" / "model.bin").resolve() == (
+            tmp_path / "models--user--repo" / "blobs" / ("1" * 64)
+        ).resolve()
+        manifest = json.loads((snapshot_b / ".manifest").read_text())
+        assert manifest["tree"]["folders"] == {"weights": "d" * 40}
+        assert manifest["tree"]["files"]["README.md"] == {"size": 5, "etag": "e" * 40}
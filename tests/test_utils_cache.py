@@ -587,6 +587,7 @@ class TestDeleteRevisionsDryRun(unittest.TestCase):
         repo_A.repo_path = Path("repo_A")
         repo_A.size_on_disk = 4444
         repo_A.revisions = {repo_A_rev_main, repo_A_rev_detached, repo_A_rev_pr_1}
+        repo_A.read_only = False
 
         # Define cache
         cache_info = Mock()
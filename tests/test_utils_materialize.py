@@ -0,0 +1,89 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from huggingface_hub.utils._materialize import materialize_file
+
+
+CONTENT = os.urandom(100_000)
+
+
+@pytest.fixture
+def src(tmp_path: Path) -> Path:
+    path = tmp_path / "src.bin"
+    path.write_bytes(CONTENT)
+    return path
+
+
+def _assert_no_tmp_files(folder: Path) -> None:
+    assert not [path for path in folder.iterdir() if path.name.endswith(".tmp")]
+
+
+def test_materialize_file(src: Path, tmp_path: Path) -> None:
+    dst = tmp_path / "dst.bin"
+    strategy = materialize_file(src, dst)
+    assert strategy in ("reflink", "copy_file_range", "sendfile", "copy")
+    assert dst.read_bytes() == CONTENT
+    assert dst.stat().st_ino != src.stat().st_ino
+    _assert_no_tmp_files(tmp_path)
+
+
+def test_materialize_file_overwrites_existing_file(src: Path, tmp_path: Path) -> None:
+    dst = tmp_path / "dst.bin"
+    dst.write_bytes(b"outdated content")
+    materialize_file(src, dst)
+    assert dst.read_bytes() == CONTENT
+
+
+def test_materialize_empty_file(tmp_path: Path) -> None:
+    src = tmp_path / "empty"
+    src.touch()
+    materialize_file(src, tmp_path / "dst")
+    assert (tmp_path / "dst").read_bytes() == b""
+
+
+@patch("huggingface_hub.utils._materialize._reflink", return_value=False)
+class TestFallbackStrategies:
+    @pytest.mark.skipif(os.name == "nt", reason="Hardlinks require specific permissions on Windows.")
+    def test_hardlink(self, _reflink, src: Path, tmp_path: Path) -> None:
+        dst = tmp_path / "dst.bin"
+        assert materialize_file(src, dst, allow_hardlink=True) == "hardlink"
+        assert dst.stat().st_ino == src.stat().st_ino
+        _assert_no_tmp_files(tmp_path)
+
+    def test_hardlink_not_supported(self, _reflink, src: Path, tmp_path: Path) -> None:
+        dst = tmp_path / "dst.bin"
+        with patch("os.link", side_effect=OSError("Not supported")):
+            assert materialize_file(src, dst, allow_hardlink=True) != "hardlink"
+        assert dst.read_bytes() == CONTENT
+
+    def test_sendfile_if_no_copy_file_range(self, _reflink, src: Path, tmp_path: Path) -> None:
+        if not hasattr(os, "sendfile"):
+            pytest.skip("sendfile not available")
+        dst = tmp_path / "dst.bin"
+        with patch("huggingface_hub.utils._materialize._copy_file_range", side_effect=OSError("Not supported")):
+            assert materialize_file(src, dst) == "sendfile"
+        assert dst.read_bytes() == CONTENT
+
+    def test_regular_copy(self, _reflink, src: Path, tmp_path: Path) -> None:
+        dst = tmp_path / "dst.bin"
+        with patch("huggingface_hub.utils._materialize._copy_file_range", side_effect=OSError("Not supported")):
+            with patch("huggingface_hub.utils._materialize._sendfile", side_effect=OSError("Not supported")):
+                assert materialize_file(src, dst) == "copy"
+        assert dst.read_bytes() == CONTENT
+
+    def test_regular_copy_after_partial_failure(self, _reflink, src: Path, tmp_path: Path) -> None:
+        # First call copies some bytes, next call fails => file must be rewritten from scratch
+        def _partial_copy(src_fd: int, dst_fd: int, offset: int, count: int) -> int:
+            if offset > 0:
+                raise OSError("Fake error")
+            os.write(dst_fd, b"x" * 1000)
+            return 1000
+
+        dst = tmp_path / "dst.bin"
+        with patch("huggingface_hub.utils._materialize._copy_file_range", side_effect=_partial_copy):
+            with patch("huggingface_hub.utils._materialize._sendfile", side_effect=_partial_copy):
+                assert materialize_file(src, dst) == "copy"
+        assert dst.read_bytes() == CONTENT